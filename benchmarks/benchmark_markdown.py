@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+HTML to Markdown Benchmark
+
+Checks the tree-walking emitter in webfetcher.parsing.engine.markdown_emitter
+against the previous pipeline (serialize the lxml tree, html2text, then the
+regex/replace cleanup passes) on a golden corpus, and compares their speed.
+
+The built-in corpus covers the constructs templates produce (paragraphs,
+headings, emphasis, links, lazy and base64 images, lists, tables, quotes,
+code); ``--corpus DIR`` adds every *.html file below DIR (the <body> of each).
+
+Usage:
+    python benchmarks/benchmark_markdown.py [--corpus DIR] [--blocks 2000] [--repeat 3]
+"""
+
+import argparse
+import difflib
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import html2text
+import lxml.html
+
+from webfetcher.parsing.engine.markdown_emitter import tree_to_markdown
+
+BLOCKS = [
+    '<p>Para <a href="https://example.com/x?a=1&amp;b=2">link</a> and text &amp; more</p>',
+    '<p>Mixed <b>bold</b>, <i>italic</i>, <code>code()</code>, <del>old</del> and <u>u</u>.</p>',
+    '<p>1. not a list, - not a bullet, back\\slash</p>',
+    '<h2>Heading <a href="https://example.com/h">linked</a></h2>',
+    '<h3><b>Bold heading</b></h3>',
+    '<img data-src="https://cdn.example.com/a.jpg" alt="lazy">',
+    '<img src="https://example.com/b.png" alt="b [1]">',
+    '<img src="data:image/png;base64,iVBORw0KGgo=" alt="inline">',
+    '<a href="https://example.com/"><img src="https://example.com/logo.png" alt=""></a>',
+    '<a href="https://example.com/auto">https://example.com/auto</a>',
+    '<a href="#section">internal</a> <a>no href</a>',
+    '<table><tr><th>Head</th><th>H2</th></tr><tr><td>a</td><td><input type="radio" name="r"></td></tr>'
+    '<tr><td>[ ]</td><td>z</td></tr></table>',
+    '<ul><li>one</li><li>two <b>bold</b><ul><li>nested</li></ul></li></ul>',
+    '<ol start="3"><li>three</li><li>four<ul><li>under ordered</li></ul></li></ol>',
+    '<blockquote>quote <i>it</i><br>second line<blockquote>inner</blockquote></blockquote>',
+    '<pre><code>code\n  block &lt;tag&gt;</code></pre>',
+    '<div><span>a</span><span>b</span> <span>c</span>\n   <p>  spaced\n text </p></div>',
+    '<dl><dt>term</dt><dd>definition</dd></dl>',
+    '<p>中文段落，包含<strong>加粗</strong>与<em>强调</em>。</p>',
+    '<p>line one<br>line two<br><br>after break</p><hr>',
+]
+
+
+def legacy_markdown(root) -> str:
+    """The previous pipeline, kept here as the golden reference."""
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    converter.ignore_images = False
+    converter.body_width = 0
+    markdown = converter.handle(lxml.html.tostring(root, encoding='unicode'))
+    markdown = re.sub(r'!\[([^\]]*)\]\(data:image/[^)]+\)', r'', markdown)
+    markdown = re.sub(r'data:image/[^\s)]+', '', markdown)
+    markdown = '\n'.join(line.rstrip() for line in markdown.split('\n'))
+    while '\n\n\n' in markdown:
+        markdown = markdown.replace('\n\n\n', '\n\n')
+    return markdown.strip()
+
+
+def emitter_markdown(root) -> str:
+    return tree_to_markdown(root).strip()
+
+
+def parse(html: str):
+    return lxml.html.fragment_fromstring(html, create_parent='div')
+
+
+def build_corpus(blocks: int, corpus_dir: str = None) -> list:
+    """(name, html) pairs / 语料"""
+    # Lazy images are promoted by TemplateParser before conversion; do the
+    # same here so both sides see identical trees
+    samples = [(f'block-{i}', html.replace('data-src=', 'src='))
+               for i, html in enumerate(BLOCKS)]
+    rng = random.Random(0)
+    page = ''.join(rng.choice(BLOCKS) for _ in range(blocks)).replace('data-src=', 'src=')
+    samples.append((f'page-{blocks}-blocks', page))
+
+    if corpus_dir:
+        for path in sorted(Path(corpus_dir).rglob('*.html')):
+            try:
+                body = lxml.html.parse(str(path)).getroot().find('body')
+            except Exception:
+                continue
+            if body is not None and len(body):
+                samples.append((str(path), ''.join(
+                    lxml.html.tostring(child, encoding='unicode') for child in body)))
+    return samples
+
+
+def time_it(func, html: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(parse(html))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML to Markdown conversion')
+    parser.add_argument('--corpus', help='Directory of extra *.html pages')
+    parser.add_argument('--blocks', type=int, default=2000, help='Blocks in the synthetic page')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case (best is reported)')
+    args = parser.parse_args()
+
+    samples = build_corpus(args.blocks, args.corpus)
+    mismatches = 0
+    legacy_total = emitter_total = 0.0
+    for name, html in samples:
+        expected = legacy_markdown(parse(html))
+        actual = emitter_markdown(parse(html))
+        if actual != expected:
+            mismatches += 1
+            print(f"MISMATCH {name}")
+            diff = difflib.unified_diff(expected.split('\n'), actual.split('\n'),
+                                        'html2text', 'emitter', lineterm='', n=1)
+            print('\n'.join(list(diff)[:12]))
+        legacy_total += time_it(legacy_markdown, html, args.repeat)
+        emitter_total += time_it(emitter_markdown, html, args.repeat)
+
+    print(f"golden: {len(samples) - mismatches}/{len(samples)} identical")
+    print(f"html2text {legacy_total * 1000:.1f}ms  emitter {emitter_total * 1000:.1f}ms  "
+          f"speedup {legacy_total / emitter_total:.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
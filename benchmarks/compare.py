@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compare Benchmark Results
+
+Matches benchmarks by name across two results files from benchmarks/run.py
+and reports the change in median time. Exits with status 1 when any
+benchmark slowed down by more than --threshold, so it can gate a change.
+
+Usage:
+    python benchmarks/compare.py BASELINE.json CANDIDATE.json [--threshold 0.10]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path: str) -> dict:
+    payload = json.loads(Path(path).read_text(encoding='utf-8'))
+    return payload, {entry['benchmark']: entry for entry in payload.get('results', [])}
+
+
+def describe(payload: dict) -> str:
+    git = payload.get('git') or {}
+    commit = (git.get('commit') or 'unknown')[:10] + ('-dirty' if git.get('dirty') else '')
+    return f"{commit} ({payload.get('created', '?')}, Python {payload.get('python', '?')})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('baseline', help='Results JSON of the reference commit')
+    parser.add_argument('candidate', help='Results JSON of the commit under test')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Slowdown (fraction of the baseline median) counted as a regression')
+    args = parser.parse_args()
+
+    base_payload, baseline = load(args.baseline)
+    cand_payload, candidate = load(args.candidate)
+    print(f"baseline:  {describe(base_payload)}")
+    print(f"candidate: {describe(cand_payload)}")
+    if base_payload.get('params') != cand_payload.get('params'):
+        print("warning: runs used different parameters")
+    print()
+
+    print(f"{'benchmark':<28} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    regressions = []
+    for name in list(baseline) + [name for name in candidate if name not in baseline]:
+        old, new = baseline.get(name), candidate.get(name)
+        if old is None or new is None:
+            print(f"{name:<28} {'-' if old is None else format(old['median_s'] * 1000, '.2f') + 'ms':>10} "
+                  f"{'-' if new is None else format(new['median_s'] * 1000, '.2f') + 'ms':>10}")
+            continue
+        change = new['median_s'] / old['median_s'] - 1 if old['median_s'] else 0.0
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif change < -args.threshold:
+            flag = '  faster'
+        print(f"{name:<28} {old['median_s'] * 1000:>8.2f}ms {new['median_s'] * 1000:>8.2f}ms "
+              f"{change * 100:>+7.1f}%{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark Fixture Corpus
+
+Deterministic pages shaped like the sites webfetcher handles: the markup each
+site template keys on (WeChat #js_content, Xiaohongshu's inline state,
+news.cn #detail, the Wikipedia content area), plus an SPA shell, GBK pages
+with and without a declared charset, and a large table. Each fixture carries
+the URL it would have been fetched from, so parsing selects the same template
+and parser as a live fetch.
+
+Recorded pages can be added with --fixtures DIR: every *.html file below DIR
+(for example snapshots written by ``wf <url> --save-html``) is loaded, and
+``DIR/manifest.json`` may map file names to their original URLs:
+
+    {"article.html": "https://mp.weixin.qq.com/s/abc"}
+
+Files without a manifest entry are parsed as generic pages.
+"""
+
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+PARAGRAPH_ZH = (
+    "网页抓取工具需要在保留正文结构的同时去除导航、广告与脚本，"
+    "并把标题、作者、发布时间等元数据整理为结构化的 Markdown 输出。"
+)
+PARAGRAPH_EN = (
+    "The quick brown fox jumps over the lazy dog while the crawler keeps a "
+    "bounded frontier, deduplicates URLs and converts each page to Markdown."
+)
+
+
+@dataclass
+class Fixture:
+    """One benchmark page / 一个基准测试页面"""
+    name: str
+    url: str              # URL the page was (or would be) fetched from
+    parser: str           # 'wechat', 'xhs' or 'generic', as core selects by host
+    body: bytes
+    content_type: str = 'text/html; charset=utf-8'
+
+    @property
+    def encoding(self) -> Optional[str]:
+        _, _, charset = self.content_type.partition('charset=')
+        return charset or None
+
+
+def _paragraphs(rng: random.Random, count: int, text: str) -> List[str]:
+    words = text.split(' ') if ' ' in text else list(text)
+    joiner = ' ' if ' ' in text else ''
+    result = []
+    for _ in range(count):
+        start = rng.randrange(len(words) // 2)
+        result.append(joiner.join(words[start:] + words[:start]))
+    return result
+
+
+def wechat_article(rng: random.Random, scale: int) -> Fixture:
+    sections = []
+    for index, text in enumerate(_paragraphs(rng, 40 * scale, PARAGRAPH_ZH)):
+        # WeChat wraps every paragraph in styled <section>/<span> layers
+        sections.append(
+            f'<section style="margin:0 8px;line-height:1.75em;"><p style="text-align:justify;">'
+            f'<span style="font-size:15px;color:#3f3f3f;">{text}</span></p></section>')
+        if index % 8 == 0:
+            sections.append(
+                f'<p style="text-align:center;"><img class="rich_pages wxw-img" '
+                f'data-src="https://mmbiz.qpic.cn/mmbiz_jpg/bench{index}/640?wx_fmt=jpeg" '
+                f'data-ratio="0.75" data-w="1080" style="width:100%;"></p>')
+    html = f"""<!DOCTYPE html><html><head><meta charset="utf-8">
+<meta property="og:title" content="基准测试：公众号文章标题">
+<meta property="og:article:author" content="基准测试作者">
+<meta property="article:published_time" content="2024-10-19T08:30:00+08:00">
+<title>基准测试：公众号文章标题</title>
+<script>var msg_title = "基准测试"; var ct = "1729297800";{'/* wx runtime */' * 200 * scale}</script>
+</head><body id="activity-detail" class="zh_CN">
+<div class="rich_media_wrp"><div class="rich_media_area_primary">
+<h1 class="rich_media_title" id="activity-name">基准测试：公众号文章标题</h1>
+<div class="rich_media_meta_list"><span class="rich_media_meta rich_media_meta_text">基准测试作者</span>
+<a class="profile_nickname" id="js_name">基准测试公众号</a><em id="publish_time">2024-10-19 08:30</em></div>
+<div class="rich_media_content js_underline_content" id="js_content" style="visibility: hidden;">
+{''.join(sections)}
+</div></div></div>
+<div id="js_pc_qr_code"><img src="https://mp.weixin.qq.com/mp/qrcode?scene=10000004"></div>
+</body></html>"""
+    return Fixture('wechat', 'https://mp.weixin.qq.com/s/BenchmarkArticle', 'wechat', html.encode('utf-8'))
+
+
+def xhs_note(rng: random.Random, scale: int) -> Fixture:
+    description = ''.join(_paragraphs(rng, 6, PARAGRAPH_ZH))
+    state = {
+        'note': {'noteDetailMap': {'bench': {'note': {
+            'noteId': 'bench', 'title': '基准测试笔记', 'desc': description, 'type': 'normal',
+            'user': {'nickname': '基准测试用户', 'userId': 'u1'},
+            'imageList': [{'urlDefault': f'https://sns-webpic-qc.xhscdn.com/bench/{i}!nd_dft_wlteh_webp_3'}
+                          for i in range(9)],
+            'tagList': [{'name': f'标签{i}'} for i in range(12)],
+            'interactInfo': {'likedCount': '1024', 'collectedCount': '512'},
+        }}}},
+        # The real page ships feeds, comments and user state in the same blob
+        'feed': {'feeds': [{'id': f'feed{i}', 'displayTitle': PARAGRAPH_ZH[:30], 'cover': f'https://x/{i}'}
+                           for i in range(60 * scale)]},
+    }
+    ld_json = {'@context': 'https://schema.org', '@type': 'SocialMediaPosting',
+               'headline': '基准测试笔记', 'author': {'name': '基准测试用户'}}
+    html = f"""<!DOCTYPE html><html><head><meta charset="utf-8">
+<meta property="og:title" content="基准测试笔记 - 小红书">
+<meta name="description" content="{description}">
+<meta name="author" content="基准测试用户">
+<title>基准测试笔记 - 小红书</title>
+<script type="application/ld+json">{json.dumps(ld_json, ensure_ascii=False)}</script>
+</head><body><div id="app"><div class="note-container">
+<div class="author-name">基准测试用户</div><div class="note-title">基准测试笔记</div>
+<div class="note-content"><span>{description}</span></div></div></div>
+<script>window.__INITIAL_STATE__={json.dumps(state, ensure_ascii=False)}</script>
+</body></html>"""
+    return Fixture('xhs', 'https://www.xiaohongshu.com/explore/BenchmarkNote', 'xhs', html.encode('utf-8'))
+
+
+def news_cn_article(rng: random.Random, scale: int) -> Fixture:
+    body = []
+    for index, text in enumerate(_paragraphs(rng, 30 * scale, PARAGRAPH_ZH)):
+        body.append(f'<p>　　{text}</p>')
+        if index % 10 == 5:
+            body.append(f'<p style="text-align:center"><img src="2024{index:04d}_bench.jpg"></p>')
+    nav = ''.join(f'<li><a href="https://www.news.cn/channel{i}/">频道{i}</a></li>' for i in range(40))
+    html = f"""<!DOCTYPE html><html><head><meta charset="utf-8">
+<meta name="publishdate" content="2024-10-19">
+<title>基准测试新闻标题-新华网</title></head><body>
+<div class="nav"><ul>{nav}</ul></div>
+<div class="header"><div class="head-line"><h1><span class="title">基准测试新闻标题</span></h1>
+<div class="info"><span class="source">来源：新华网</span><span class="time">2024-10-19 10:00:00</span></div></div></div>
+<div class="main clearfix"><div id="detail">{''.join(body)}</div>
+<div class="editor">【责任编辑：基准】</div></div>
+<div class="footer">{'<a href="#">链接</a>' * 50}</div></body></html>"""
+    return Fixture('news_cn', 'https://www.news.cn/politics/20241019/benchmark/c.html', 'generic',
+                   html.encode('utf-8'))
+
+
+def wikipedia_article(rng: random.Random, scale: int) -> Fixture:
+    parts = ['<table class="infobox"><tbody>' + ''.join(
+        f'<tr><th scope="row">属性{i}</th><td>值{i}</td></tr>' for i in range(15)) + '</tbody></table>']
+    for section in range(8 * scale):
+        parts.append(f'<h2><span class="mw-headline" id="s{section}">章节{section}</span></h2>')
+        for text in _paragraphs(rng, 5, PARAGRAPH_ZH):
+            parts.append(f'<p>{text}<sup class="reference"><a href="#cite_note-{section}">[{section}]</a></sup>'
+                         f'，参见<a href="/wiki/Link{section}" title="Link">相关条目</a>。</p>')
+    parts.append('<ol class="references">' + ''.join(
+        f'<li id="cite_note-{i}"><span class="reference-text">参考文献 {i}</span></li>'
+        for i in range(8 * scale)) + '</ol>')
+    navbox = '<div class="navbox">' + ''.join(f'<a href="/wiki/N{i}">导航{i}</a>' for i in range(200)) + '</div>'
+    html = f"""<!DOCTYPE html><html lang="zh"><head><meta charset="UTF-8">
+<title>基准测试条目 - 维基百科，自由的百科全书</title></head><body class="mediawiki">
+<div id="mw-navigation">{'<li><a href="/wiki/Special">特殊页面</a></li>' * 60}</div>
+<div id="content" class="mw-body"><h1 id="firstHeading" class="firstHeading">基准测试条目</h1>
+<div id="bodyContent"><div id="mw-content-text" class="mw-body-content"><div class="mw-parser-output">
+{''.join(parts)}{navbox}</div></div></div></div></body></html>"""
+    return Fixture('wikipedia', 'https://zh.wikipedia.org/wiki/Benchmark', 'generic', html.encode('utf-8'))
+
+
+def spa_shell(rng: random.Random, scale: int) -> Fixture:
+    bundle = ';'.join(f'function m{i}(a,b){{return a*{i}+b}}' for i in range(800 * scale))
+    html = f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>App</title>
+<link rel="stylesheet" href="/static/app.css"></head><body>
+<noscript>You need to enable JavaScript to run this app.</noscript><div id="root"></div>
+<script>{bundle}</script><script src="/static/js/main.chunk.js"></script></body></html>"""
+    return Fixture('spa_shell', 'https://app.example.com/dashboard', 'generic', html.encode('utf-8'))
+
+
+def gbk_article(rng: random.Random, scale: int, declared: bool) -> Fixture:
+    paragraphs = ''.join(f'<p>{text}</p>' for text in _paragraphs(rng, 40 * scale, PARAGRAPH_ZH))
+    meta = '<meta http-equiv="Content-Type" content="text/html; charset=gbk">' if declared else ''
+    html = f"""<html><head>{meta}<title>基准测试 GBK 页面</title></head><body>
+<div class="article"><h1>基准测试 GBK 页面</h1><div class="content">{paragraphs}</div></div></body></html>"""
+    name = 'gbk' if declared else 'gbk_undeclared'
+    return Fixture(name, f'http://www.example.gov.cn/{name}/article.html', 'generic',
+                   html.encode('gbk'), 'text/html; charset=gbk' if declared else 'text/html')
+
+
+def large_table(rng: random.Random, scale: int) -> Fixture:
+    rows = ''.join(
+        f'<tr><td>{i}</td><td>项目{i}</td><td>{rng.randint(0, 10 ** 6)}</td>'
+        f'<td>{rng.random():.4f}</td><td><a href="/item/{i}">详情</a></td></tr>'
+        for i in range(1500 * scale))
+    html = f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>数据表</title></head><body>
+<main><h1>基准测试数据表</h1><table><thead><tr><th>序号</th><th>名称</th><th>数量</th><th>比例</th>
+<th>链接</th></tr></thead><tbody>{rows}</tbody></table></main></body></html>"""
+    return Fixture('large_table', 'https://data.example.org/tables/benchmark.html', 'generic',
+                   html.encode('utf-8'))
+
+
+def builtin_fixtures(scale: int = 1, seed: int = 0) -> List[Fixture]:
+    """The built-in corpus; scale multiplies page sizes / 内置语料，scale 放大页面尺寸"""
+    rng = random.Random(seed)
+    return [
+        wechat_article(rng, scale),
+        xhs_note(rng, scale),
+        news_cn_article(rng, scale),
+        wikipedia_article(rng, scale),
+        spa_shell(rng, scale),
+        gbk_article(rng, scale, declared=True),
+        gbk_article(rng, scale, declared=False),
+        large_table(rng, scale),
+    ]
+
+
+def load_fixture_dir(directory: str) -> List[Fixture]:
+    """Recorded pages below directory / 加载目录中录制的页面"""
+    root = Path(directory)
+    manifest_path = root / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8')) if manifest_path.exists() else {}
+    fixtures = []
+    for path in sorted(root.rglob('*.html')):
+        relative = path.relative_to(root).as_posix()
+        url = manifest.get(relative) or manifest.get(path.name) or f'https://recorded.invalid/{relative}'
+        host = url.split('/')[2] if '://' in url else ''
+        if 'mp.weixin.qq.com' in host:
+            parser = 'wechat'
+        elif 'xiaohongshu.com' in host or 'xhslink.com' in host:
+            parser = 'xhs'
+        else:
+            parser = 'generic'
+        name = 'recorded/' + relative[:-len('.html')]
+        fixtures.append(Fixture(name, url, parser, path.read_bytes(), 'text/html'))
+    return fixtures
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+WebFetcher Benchmark Suite
+
+Runs each pipeline stage against the local fixture server and writes the
+timings as JSON, so runs on different commits can be compared with
+benchmarks/compare.py:
+
+    decode     bytes -> text (webfetcher.fetchers.charset.decode_html)
+    parse      TemplateParser.parse on the decoded page
+    markdown   the parser core selects for the page's host
+               (wechat_to_markdown / xhs_to_markdown / generic_to_markdown),
+               with the parse cache disabled
+    fetch      fetch_html_with_retry over HTTP from the fixture server (urllib)
+    crawl      crawl_site over the synthetic site, then aggregate_crawled_site
+
+Every measurement is repeated; best, median and mean are recorded, and
+throughput (MB/s, items/s) is computed from the median.
+
+Usage:
+    python benchmarks/run.py [--stages decode,parse,markdown,fetch,crawl]
+                             [--repeat 5] [--scale 1] [--fixtures DIR]
+                             [--crawl-pages 100] [--latency-ms 2]
+                             [--redirect-rate 0.05] [--error-rate 0]
+                             [--output results.json]
+
+Results go to benchmarks/results/<timestamp>-<commit>.json unless --output
+is given.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+# Measure parsing itself and keep benchmark hosts out of the user's learned routes
+os.environ['WF_PARSE_CACHE'] = '0'
+os.environ.setdefault('WF_HOST_OUTCOMES_FILE', os.path.join(tempfile.mkdtemp(prefix='wf-bench-'),
+                                                            'host_outcomes.json'))
+
+from fixtures import Fixture, builtin_fixtures, load_fixture_dir
+from server import FixtureServer, SiteConfig
+
+STAGES = ('decode', 'parse', 'markdown', 'fetch', 'crawl')
+RESULTS_DIR = Path(__file__).parent / 'results'
+RESULTS_SCHEMA = 1
+UA = 'Mozilla/5.0 (webfetcher benchmark)'
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+    """Silence the library's progress prints / 屏蔽库输出"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def measure(func: Callable[[], object], repeat: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def record(benchmark: str, stage: str, times: List[float], size: int = 0, items: int = 1, **extra) -> Dict:
+    median = statistics.median(times)
+    entry = {
+        'benchmark': benchmark,
+        'stage': stage,
+        'runs': len(times),
+        'best_s': min(times),
+        'median_s': median,
+        'mean_s': statistics.fmean(times),
+        'bytes': size,
+        'items': items,
+        'mb_per_s': size / median / 1e6 if size and median else None,
+        'items_per_s': items / median if median else None,
+    }
+    entry.update(extra)
+    return entry
+
+
+def bench_decode(fixtures: List[Fixture], args) -> List[Dict]:
+    from webfetcher.fetchers.charset import decode_html
+    results = []
+    for fixture in fixtures:
+        times = measure(lambda: decode_html(fixture.body, fixture.encoding), args.repeat)
+        results.append(record(f'decode/{fixture.name}', 'decode', times, len(fixture.body)))
+    return results
+
+
+def _texts(fixtures: List[Fixture]) -> Dict[str, str]:
+    from webfetcher.fetchers.charset import decode_html
+    return {fixture.name: decode_html(fixture.body, fixture.encoding).text for fixture in fixtures}
+
+
+def bench_parse(fixtures: List[Fixture], args) -> List[Dict]:
+    from webfetcher.parsing.engine.template_parser import TemplateParser
+    texts = _texts(fixtures)
+    with quiet(not args.verbose):
+        parser = TemplateParser(template_dir=str(ROOT / 'src' / 'webfetcher' / 'parsing' / 'engine' / 'templates'))
+    results = []
+    for fixture in fixtures:
+        html = texts[fixture.name]
+        with quiet(not args.verbose):
+            outcome = parser.parse(html, fixture.url)
+            times = measure(lambda: parser.parse(html, fixture.url), args.repeat)
+        results.append(record(f'parse/{fixture.name}', 'parse', times, len(fixture.body),
+                              template=outcome.template_name, success=bool(outcome.success)))
+    return results
+
+
+def bench_markdown(fixtures: List[Fixture], args) -> List[Dict]:
+    from webfetcher.parsing.parser import generic_to_markdown, wechat_to_markdown, xhs_to_markdown
+    parsers = {
+        'wechat': wechat_to_markdown,
+        'xhs': xhs_to_markdown,
+        'generic': lambda html, url: generic_to_markdown(html, url, 'safe'),
+    }
+    texts = _texts(fixtures)
+    results = []
+    for fixture in fixtures:
+        html, parse = texts[fixture.name], parsers[fixture.parser]
+        with quiet(not args.verbose):
+            _, markdown, _ = parse(html, fixture.url)
+            times = measure(lambda: parse(html, fixture.url), args.repeat)
+        results.append(record(f'markdown/{fixture.name}', 'markdown', times, len(fixture.body),
+                              parser=fixture.parser, markdown_chars=len(markdown)))
+    return results
+
+
+def bench_fetch(server: FixtureServer, fixtures: List[Fixture], args) -> List[Dict]:
+    from webfetcher.core import fetch_html_with_retry
+    results = []
+    total_times = [0.0] * args.repeat
+    for fixture in fixtures:
+        url = server.fixture_url(fixture)
+        with quiet(not args.verbose):
+            times = measure(lambda: fetch_html_with_retry(url, ua=UA, timeout=30, fetch_mode='urllib'),
+                            args.repeat)
+        total_times = [total + elapsed for total, elapsed in zip(total_times, times)]
+        results.append(record(f'fetch/{fixture.name}', 'fetch', times, len(fixture.body)))
+    results.append(record('fetch/all', 'fetch', total_times, sum(len(f.body) for f in fixtures),
+                          items=len(fixtures)))
+    return results
+
+
+def bench_crawl(server: FixtureServer, args) -> List[Dict]:
+    from webfetcher.core import crawl_site, aggregate_crawled_site
+    from webfetcher.parsing.parser import generic_to_markdown
+    crawl_times, aggregate_times, pages = [], [], []
+    requests_before = server.requests
+    for _ in range(args.crawl_repeat):
+        with quiet(not args.verbose):
+            start = time.perf_counter()
+            pages = crawl_site(server.url('/site/'), UA, max_depth=50, max_pages=args.crawl_pages, delay=0)
+            crawl_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            aggregate_crawled_site(pages, generic_to_markdown)
+            aggregate_times.append(time.perf_counter() - start)
+    size = sum(len(html.encode('utf-8')) for _, html, _ in pages)
+    requests = (server.requests - requests_before) // max(args.crawl_repeat, 1)
+    site = vars(server.site)
+    return [
+        record('crawl/fetch', 'crawl', crawl_times, size, len(pages), requests=requests, site=site),
+        record('crawl/aggregate', 'crawl', aggregate_times, size, len(pages)),
+        record('crawl/end-to-end', 'crawl', [c + a for c, a in zip(crawl_times, aggregate_times)],
+               size, len(pages), site=site),
+    ]
+
+
+def git_info() -> Dict:
+    def git(*command):
+        return subprocess.run(['git', *command], cwd=ROOT, capture_output=True, text=True,
+                              timeout=30).stdout.strip()
+    try:
+        return {'commit': git('rev-parse', 'HEAD') or None,
+                'subject': git('log', '-1', '--format=%s') or None,
+                'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+    except (OSError, subprocess.SubprocessError):
+        return {'commit': None, 'subject': None, 'dirty': None}
+
+
+def print_table(results: List[Dict]) -> None:
+    print(f"{'benchmark':<28} {'median':>10} {'best':>10} {'MB/s':>8} {'items/s':>9}")
+    for entry in results:
+        mb = f"{entry['mb_per_s']:.2f}" if entry['mb_per_s'] else '-'
+        items = f"{entry['items_per_s']:.1f}" if entry['items_per_s'] else '-'
+        print(f"{entry['benchmark']:<28} {entry['median_s'] * 1000:>8.2f}ms {entry['best_s'] * 1000:>8.2f}ms "
+              f"{mb:>8} {items:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the webfetcher benchmark suite')
+    parser.add_argument('--stages', default=','.join(STAGES), help=f'Comma-separated stages ({", ".join(STAGES)})')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement')
+    parser.add_argument('--scale', type=int, default=1, help='Multiply built-in fixture page sizes')
+    parser.add_argument('--fixtures', metavar='DIR', help='Add recorded *.html pages (see fixtures.py)')
+    parser.add_argument('--only', metavar='SUBSTRING', help='Only fixtures whose name contains SUBSTRING')
+    parser.add_argument('--crawl-pages', type=int, default=100, help='Synthetic site size and crawl budget')
+    parser.add_argument('--crawl-repeat', type=int, default=2, help='Timed crawls')
+    parser.add_argument('--size-kb', type=int, default=SiteConfig.size_kb, help='Synthetic page body size')
+    parser.add_argument('--links', type=int, default=SiteConfig.links, help='Links per synthetic page')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='Synthetic site latency per request')
+    parser.add_argument('--redirect-rate', type=float, default=0.05, help='Fraction of synthetic links that redirect')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of synthetic pages answering 503 (crawls then include retry backoff)')
+    parser.add_argument('--output', help='Results JSON path (default: benchmarks/results/<timestamp>-<commit>.json)')
+    parser.add_argument('--verbose', action='store_true', help='Show library output and logging')
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+
+    fixtures = builtin_fixtures(args.scale)
+    if args.fixtures:
+        fixtures += load_fixture_dir(args.fixtures)
+    if args.only:
+        fixtures = [fixture for fixture in fixtures if args.only in fixture.name]
+
+    # Not a no-op: importing webfetcher.core prints availability banners (CDP,
+    # Selenium, routing config) to stdout and takes ~0.6 s, which the first
+    # stage to import it would otherwise print and, in its warmup, absorb.
+    # Importing it here, silenced, keeps both out of the results.
+    with quiet(not args.verbose):
+        import webfetcher.core  # noqa: F401
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    site = SiteConfig(pages=args.crawl_pages, links=args.links, size_kb=args.size_kb, latency_ms=args.latency_ms,
+                      redirect_rate=args.redirect_rate, error_rate=args.error_rate)
+    results: List[Dict] = []
+    started = time.perf_counter()
+    with FixtureServer(fixtures, site) as server:
+        for stage in stages:
+            print(f"Running {stage}...", file=sys.stderr)
+            if stage == 'decode':
+                results += bench_decode(fixtures, args)
+            elif stage == 'parse':
+                results += bench_parse(fixtures, args)
+            elif stage == 'markdown':
+                results += bench_markdown(fixtures, args)
+            elif stage == 'fetch':
+                results += bench_fetch(server, fixtures, args)
+            elif stage == 'crawl':
+                results += bench_crawl(server, args)
+
+    git = git_info()
+    payload = {
+        'schema': RESULTS_SCHEMA,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git': git,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'params': {key: value for key, value in vars(args).items() if key not in ('output', 'verbose')},
+        'fixtures': {fixture.name: {'url': fixture.url, 'parser': fixture.parser, 'bytes': len(fixture.body)}
+                     for fixture in fixtures},
+        'duration_s': time.perf_counter() - started,
+        'results': results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{(git['commit'] or 'nogit')[:10]}"
+        f"{'-dirty' if git['dirty'] else ''}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    print_table(results)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark Fixture HTTP Server
+
+Serves the fixture corpus and a synthetic site on 127.0.0.1 so fetch and
+crawl benchmarks run without network access or a browser:
+
+    /fixtures/<name>          a fixture page, with its Content-Type
+    /site/                    synthetic site start page
+    /site/p/<n>.html          synthetic page n
+    /site/r/<n>               302 redirect to page n
+
+Synthetic pages are generated from SiteConfig: page count, links per page,
+body size, per-request latency, and the fraction of links that go through a
+redirect or of pages that answer 503. Which pages redirect or fail is derived
+from the seed, so every run crawls the same site. Any request also accepts
+?latency_ms=N to add latency to that response.
+
+Usage:
+    python benchmarks/server.py [--port 8800] [--pages 500] [--latency-ms 20]
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+
+from fixtures import Fixture, builtin_fixtures
+
+WORDS = ('crawler frontier markdown template parser fetch decode render latency '
+         'throughput article section heading paragraph table image link').split()
+
+
+@dataclass
+class SiteConfig:
+    """Shape of the synthetic site / 合成站点参数"""
+    pages: int = 200
+    links: int = 8
+    size_kb: int = 16
+    latency_ms: float = 0.0
+    redirect_rate: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+class FixtureServer:
+    """
+    Threaded local HTTP server for benchmarks / 基准测试用本地 HTTP 服务器
+
+    Usage:
+        with FixtureServer(builtin_fixtures(), SiteConfig(pages=100)) as server:
+            fetch(server.url('/fixtures/wechat'))
+    """
+
+    def __init__(self, fixtures: Iterable[Fixture] = (), site: Optional[SiteConfig] = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.fixtures: Dict[str, Fixture] = {fixture.name: fixture for fixture in fixtures}
+        self.site = site or SiteConfig()
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._page_cache: Dict[int, bytes] = {}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def fixture_url(self, fixture: Fixture) -> str:
+        return self.url('/fixtures/' + urllib.parse.quote(fixture.name))
+
+    def start(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='wf-bench-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Synthetic site / 合成站点
+    # ------------------------------------------------------------------
+
+    def _roll(self, kind: str, number: int) -> float:
+        """Deterministic value in [0, 1) for a page / 由种子决定的伪随机值"""
+        digest = hashlib.blake2b(f'{self.site.seed}:{kind}:{number}'.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') / 2 ** 64
+
+    def _link(self, number: int) -> str:
+        if self._roll('redirect', number) < self.site.redirect_rate:
+            return f'/site/r/{number}'
+        return f'/site/p/{number}.html'
+
+    def site_page(self, number: int) -> bytes:
+        """HTML of synthetic page n / 合成页面 n 的 HTML"""
+        cached = self._page_cache.get(number)
+        if cached is not None:
+            return cached
+        site = self.site
+        rng = random.Random(f'{site.seed}:{number}')
+        # Page n links forward (n+1, so every page is reachable) plus random pages
+        targets = [(number + 1) % site.pages] + [rng.randrange(site.pages) for _ in range(max(site.links - 1, 0))]
+        links = ''.join(f'<li><a href="{self._link(target)}">{" ".join(rng.sample(WORDS, 4))} {target}</a></li>'
+                        for target in targets)
+        paragraphs = []
+        size = 0
+        while size < site.size_kb * 1024:
+            text = ' '.join(rng.choice(WORDS) for _ in range(60))
+            paragraphs.append(f'<p>{text}.</p>')
+            size += len(text) + 8
+        html = (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Page {number}</title></head>'
+                f'<body><nav><a href="/site/">Home</a></nav><article><h1>Synthetic page {number}</h1>'
+                f'{"".join(paragraphs)}</article><aside><ul>{links}</ul></aside></body></html>').encode('utf-8')
+        with self._lock:
+            self._page_cache[number] = html
+        return html
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urllib.parse.urlsplit(self.path)
+                query = urllib.parse.parse_qs(parts.query)
+                latency = server.site.latency_ms if parts.path.startswith('/site/') else 0.0
+                if 'latency_ms' in query:
+                    latency = float(query['latency_ms'][0])
+                if latency:
+                    time.sleep(latency / 1000)
+                with server._lock:
+                    server.requests += 1
+                self._route(urllib.parse.unquote(parts.path))
+
+            def _route(self, path: str):
+                if path.startswith('/fixtures/'):
+                    fixture = server.fixtures.get(path[len('/fixtures/'):])
+                    if fixture is None:
+                        return self._send(404, b'not found')
+                    return self._send(200, fixture.body, fixture.content_type)
+                if path in ('/site', '/site/'):
+                    return self._send(200, server.site_page(0))
+                if path.startswith('/site/r/'):
+                    number = path[len('/site/r/'):]
+                    return self._send(302, b'', headers={'Location': f'/site/p/{number}.html'})
+                if path.startswith('/site/p/') and path.endswith('.html'):
+                    try:
+                        number = int(path[len('/site/p/'):-len('.html')])
+                    except ValueError:
+                        return self._send(404, b'not found')
+                    if not 0 <= number < server.site.pages:
+                        return self._send(404, b'not found')
+                    if server._roll('error', number) < server.site.error_rate:
+                        return self._send(503, b'service unavailable')
+                    return self._send(200, server.site_page(number))
+                return self._send(404, b'not found')
+
+            def _send(self, status: int, body: bytes, content_type: str = 'text/html; charset=utf-8',
+                      headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.bytes_sent += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve benchmark fixtures and a synthetic site')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--pages', type=int, default=SiteConfig.pages, help='Synthetic site pages')
+    parser.add_argument('--links', type=int, default=SiteConfig.links, help='Links per synthetic page')
+    parser.add_argument('--size-kb', type=int, default=SiteConfig.size_kb, help='Synthetic page body size')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latency per synthetic page')
+    parser.add_argument('--redirect-rate', type=float, default=0.0, help='Fraction of links that redirect')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of pages answering 503')
+    args = parser.parse_args()
+
+    site = SiteConfig(pages=args.pages, links=args.links, size_kb=args.size_kb, latency_ms=args.latency_ms,
+                      redirect_rate=args.redirect_rate, error_rate=args.error_rate)
+    server = FixtureServer(builtin_fixtures(), site, port=args.port)
+    print(f"Serving on {server.base_url}")
+    for name in server.fixtures:
+        print(f"  {server.url('/fixtures/' + name)}")
+    print(f"  {server.url('/site/')} ({site.pages} pages)")
+    try:
+        server.start()._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
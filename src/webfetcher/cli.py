@@ -349,6 +349,130 @@ def diagnose_system():
 
     sys.exit(exit_code)
 
+def manage_learned_routes(args):
+    """
+    查看/重置按主机学习到的路由
+    Inspect or reset learned per-host routes
+
+    用法 / Usage:
+        wf routes [list]          列出所有主机 / list all hosts
+        wf routes show <HOST>     显示主机详情 / show host details
+        wf routes reset [HOST]    重置主机或全部 / reset one host or all
+    """
+    import json
+    import datetime
+    from webfetcher.routing import HostOutcomeStore
+
+    store = HostOutcomeStore(autosave=False)
+    action = args[0] if args else 'list'
+
+    if action == 'list':
+        hosts = store.list_hosts()
+        print(f"Learned routes / 已学习路由: {store.path}")
+        if not hosts:
+            print("  (empty / 无记录)")
+            return
+        print(f"  {'HOST':<40} {'ROUTE':<10} {'URLLIB ok/fail':<16} LAST UPDATE")
+        for host in hosts:
+            outcomes = store.get_host(host)
+            route = store.recommend(host)
+            urllib_outcome = outcomes.get('urllib')
+            urllib_col = (f"{urllib_outcome.successes:.1f}/{urllib_outcome.failures:.1f}"
+                          if urllib_outcome else "-")
+            updated = max(o.updated for o in outcomes.values())
+            updated_str = datetime.datetime.fromtimestamp(updated).strftime('%Y-%m-%d %H:%M')
+            print(f"  {host:<40} {route.fetcher if route else 'default':<10} {urllib_col:<16} {updated_str}")
+
+    elif action == 'show':
+        if len(args) < 2:
+            print("用法: wf routes show <HOST>")
+            return
+        host = args[1]
+        outcomes = store.to_dict().get(host.lower())
+        if not outcomes:
+            print(f"No learned outcomes for {host} / 无该主机记录")
+            return
+        route = store.recommend(host)
+        print(json.dumps({
+            'host': host.lower(),
+            'learned_route': route.fetcher if route else None,
+            'reason': route.reason if route else None,
+            'fetchers': outcomes
+        }, ensure_ascii=False, indent=2))
+
+    elif action == 'reset':
+        host = args[1] if len(args) > 1 else None
+        removed = store.reset(host)
+        target = host or 'all hosts / 全部主机'
+        print(f"Reset learned routes for {target}: {removed} removed / 已重置 {removed} 条")
+
+    else:
+        print(f"未知操作: {action}")
+        print("用法: wf routes [list|show <HOST>|reset [HOST]]")
+
+
+def manage_crawl_journals(args):
+    """
+    查看/清理站点爬取检查点
+    List or prune site crawl checkpoint journals
+
+    用法 / Usage:
+        wf crawls [list]              列出所有检查点 / list all journals
+        wf crawls prune [DAYS]        删除超过 DAYS 天（默认 7）未更新的检查点 / remove journals idle for DAYS (default 7)
+        wf crawls remove <CRAWL_ID>   删除指定检查点 / remove one journal
+    """
+    import datetime
+    import shutil
+    from webfetcher.crawl import format_bytes, list_crawls, prune_crawls
+    from webfetcher.crawl.journal import DEFAULT_CRAWL_DIR
+
+    action = args[0] if args else 'list'
+    root = os.environ.get('WF_CRAWL_DIR') or str(DEFAULT_CRAWL_DIR)
+
+    if action == 'list':
+        crawls = list_crawls()
+        print(f"Crawl checkpoints / 爬取检查点: {root}")
+        if not crawls:
+            print("  (empty / 无记录)")
+            return
+        print(f"  {'CRAWL ID':<40} {'PAGES':>6} {'FAILED':>6} {'STATUS':<12} {'SIZE':>10}  LAST UPDATE  START URL")
+        for entry in crawls:
+            updated_str = datetime.datetime.fromtimestamp(entry['updated']).strftime('%Y-%m-%d %H:%M')
+            if 'error' in entry:
+                print(f"  {entry['crawl_id']:<40} {'-':>6} {'-':>6} {'unreadable':<12} "
+                      f"{format_bytes(entry['size']):>10}  {updated_str}  {entry['error']}")
+                continue
+            status = 'finished' if entry['finished'] else 'interrupted'
+            print(f"  {entry['crawl_id']:<40} {entry['pages']:>6} {entry['failed']:>6} {status:<12} "
+                  f"{format_bytes(entry['size']):>10}  {updated_str}  {entry['start_url']}")
+
+    elif action == 'prune':
+        try:
+            days = float(args[1]) if len(args) > 1 else 7.0
+        except ValueError:
+            print("用法: wf crawls prune [DAYS]")
+            return
+        removed = prune_crawls(days)
+        print(f"Removed {len(removed)} crawl checkpoints idle for {days:g}+ days / 已删除 {len(removed)} 个检查点")
+        for crawl_id in removed:
+            print(f"  {crawl_id}")
+
+    elif action == 'remove':
+        if len(args) < 2:
+            print("用法: wf crawls remove <CRAWL_ID>")
+            return
+        path = os.path.join(root, os.path.basename(args[1]))
+        if not os.path.isdir(path):
+            print(f"No crawl checkpoint named {args[1]} / 未找到该检查点")
+            return
+        shutil.rmtree(path, ignore_errors=True)
+        print(f"Removed crawl checkpoint {args[1]} / 已删除")
+
+    else:
+        print(f"未知操作: {action}")
+        print("用法: wf crawls [list|prune [DAYS]|remove <CRAWL_ID>]")
+
+
 def main():
     # Check for updates (async, non-blocking)
     try:
@@ -373,7 +497,7 @@ def main():
     extraction_performed = False
 
     # Skip extraction for known commands
-    skip_commands = ['help', '-h', '--help', 'fast', 'full', 'site', 'raw', 'batch']
+    skip_commands = ['help', '-h', '--help', 'fast', 'full', 'site', 'raw', 'batch', 'routes', 'crawls']
 
     if cmd not in skip_commands:
         # Attempt to extract URL from mixed text
@@ -390,7 +514,13 @@ def main():
             extracted_url = cmd
 
     # Quick grab mode - detect URL (modified condition)
-    if extracted_url or 'http://' in cmd or 'https://' in cmd or 'file://' in cmd or ('.' in cmd and cmd not in ['help', '-h', '--help']):
+    if cmd == 'routes':
+        manage_learned_routes(raw_args[1:])
+
+    elif cmd == 'crawls':
+        manage_crawl_journals(raw_args[1:])
+
+    elif extracted_url or 'http://' in cmd or 'https://' in cmd or 'file://' in cmd or ('.' in cmd and cmd not in ['help', '-h', '--help']):
         # Use extracted URL if available, otherwise process normally
         # Support file:// protocol for local files
         if extracted_url:
@@ -464,8 +594,21 @@ def main():
             print("  --max-depth N          最大爬取深度 (默认: 5) / Max crawl depth (default: 5)")
             print("  --delay SECONDS        请求间隔秒数 (默认: 0.5) / Request delay in seconds (default: 0.5)")
             print("  --follow-pagination    跟随分页链接 / Follow pagination links")
+            print("  --pagination-prefetch N  并发预取的分页页数 (默认: 2) / Pagination pages fetched ahead (default: 2)")
             print("  --same-domain-only     仅爬取同域名 (默认启用) / Only crawl same domain (default enabled)")
             print("  --use-sitemap          使用sitemap.xml进行爬取 / Use sitemap.xml for crawling (Phase 2)")
+            print("  --seen-set KIND        URL已见集合: exact/bloom/strings (默认: exact) / URL seen-set (default: exact)")
+            print("  --frontier-memory N    队列溢出到磁盘前的内存条目数 / Queue entries kept in memory before spilling")
+            print("  --resume CRAWL_ID      从检查点恢复中断的爬取 / Resume an interrupted crawl from its checkpoint")
+            print("  --no-checkpoint        不记录爬取检查点 / Do not journal crawl progress")
+            print("  --skip-near-duplicates 跳过正文近重复的页面 (默认关闭) / Skip pages whose main text nearly duplicates an earlier page (off by default)")
+            print("  --near-dup-distance N  近重复页面SimHash阈值，隐含启用检测 (默认: 3) / Near-duplicate SimHash distance, implies detection (default: 3)")
+            print("  --keep-duplicates      保留近重复页面 (默认) / Keep near-duplicate pages (default)")
+            print("  --skip-duplicate-links 不跟随近重复页面中的链接 / Do not follow links on near-duplicate pages")
+            print("  --crawl-order ORDER    爬取顺序: best-first/bfs (默认: best-first) / Crawl order (default: best-first)")
+            print("  --crawl-priority-config PATH  覆盖链接评分配置的YAML / YAML overriding link scoring")
+            print("  --profile {cpu,alloc}  性能分析，按模板统计开销 / Profile the crawl, with per-template costs")
+            print("  --profile-top N        列出的热点数量 (默认: 20) / Hot spots listed (default: 20)")
             return
 
         # Extract URL from potentially mixed text
@@ -489,13 +632,20 @@ def main():
         max_pages_value = None
         max_depth_value = None
         delay_value = None
+        frontier_memory_value = None
+        near_dup_distance_value = None
+        priority_config_value = None
+        pagination_prefetch_value = None
+        profile_top_value = None
 
         # Extract parameters manually (simple approach)
         i = 0
         while i < len(remaining_args):
             arg = remaining_args[i]
 
-            if arg in ['--max-pages', '--max-crawl-depth', '--max-depth', '--delay', '--crawl-delay']:
+            if arg in ['--max-pages', '--max-crawl-depth', '--max-depth', '--delay', '--crawl-delay',
+                       '--frontier-memory', '--near-dup-distance', '--crawl-priority-config',
+                       '--pagination-prefetch', '--profile-top']:
                 if i + 1 < len(remaining_args):
                     value = remaining_args[i + 1]
 
@@ -505,6 +655,16 @@ def main():
                         max_depth_value = value
                     elif arg in ['--delay', '--crawl-delay']:
                         delay_value = value
+                    elif arg == '--frontier-memory':
+                        frontier_memory_value = value
+                    elif arg == '--near-dup-distance':
+                        near_dup_distance_value = value
+                    elif arg == '--crawl-priority-config':
+                        priority_config_value = value
+                    elif arg == '--pagination-prefetch':
+                        pagination_prefetch_value = value
+                    elif arg == '--profile-top':
+                        profile_top_value = value
 
                     # Skip next item (the value)
                     i += 2
@@ -523,6 +683,16 @@ def main():
         cmd_args.extend(['--max-pages', max_pages_value])
         cmd_args.extend(['--max-crawl-depth', max_depth_value])
         cmd_args.extend(['--crawl-delay', delay_value])
+        if frontier_memory_value is not None:
+            cmd_args.extend(['--frontier-memory', frontier_memory_value])
+        if near_dup_distance_value is not None:
+            cmd_args.extend(['--near-dup-distance', near_dup_distance_value])
+        if priority_config_value is not None:
+            cmd_args.extend(['--crawl-priority-config', priority_config_value])
+        if pagination_prefetch_value is not None:
+            cmd_args.extend(['--pagination-prefetch', pagination_prefetch_value])
+        if profile_top_value is not None:
+            cmd_args.extend(['--profile-top', profile_top_value])
 
         # Add boolean flags if present
         if '--follow-pagination' in remaining_args:
@@ -538,9 +708,11 @@ def main():
         # Add any other remaining args (like --fetch-mode, etc.)
         for arg in remaining_args:
             if arg not in ['--max-pages', '--max-depth', '--max-crawl-depth',
-                          '--delay', '--crawl-delay', '--follow-pagination', '--same-domain-only', '--use-sitemap']:
+                          '--delay', '--crawl-delay', '--follow-pagination', '--same-domain-only', '--use-sitemap',
+                          '--frontier-memory', '--near-dup-distance', '--crawl-priority-config',
+                          '--pagination-prefetch', '--profile-top']:
                 # Check if it's a value (next to a parameter we already processed)
-                if not (arg.replace('.', '').isdigit() or arg.startswith('/')):
+                if not (arg.replace('.', '').isdigit() or arg.startswith('/') or arg == priority_config_value):
                     cmd_args.append(arg)
 
         logger.info(f"Site crawling with: max-pages={max_pages_value}, max-depth={max_depth_value}, delay={delay_value}")
@@ -682,6 +854,8 @@ wf - WebFetcher便捷命令
   wf site URL [输出目录]            # 整站爬虫
   wf batch urls.txt [输出目录]     # 批量抓取
   wf diagnose                       # 系统诊断（含ChromeDriver检查）
+  wf routes [list|show|reset]       # 查看/重置按主机学习的路由
+  wf crawls [list|prune|remove]     # 查看/清理站点爬取检查点
 
 处理复杂URL的示例:
   # URL包含路径时，推荐使用-o或--
@@ -705,6 +879,11 @@ wf - WebFetcher便捷命令
   wf example.com --fetch-mode selenium    # 强制使用Selenium
   wf example.com --fetch-mode auto        # 自动回退（默认）
   wf example.com --selenium-timeout 60    # 设置Selenium超时
+  wf example.com --parse-cache            # 复用解析结果缓存（~/.cache/webfetcher/parse；爬取时默认启用）
+  wf site example.com --no-parse-cache    # 爬取时不使用解析结果缓存
+  wf example.com --timings                # 输出分阶段耗时（重定向、抓取、解析、写文件等）
+  wf example.com --profile cpu            # cProfile+调用栈采样，输出热点函数及 .prof/.collapsed 文件
+  wf site example.com --profile alloc     # tracemalloc 内存分配热点，爬取时按模板统计开销
 
   # 设置默认输出目录后
   export WF_OUTPUT_DIR=~/Documents/web-content
@@ -13,9 +13,11 @@ __version__ = "1.0.0"
 __author__ = "WebFetcher Team"
 
 import argparse
+import atexit
 import datetime
 import html as ihtml
 import json
+import mimetypes
 import os
 import re
 import http.client as http_client
@@ -24,16 +26,17 @@ import urllib.request
 import urllib.error
 import ssl
 import sys
-from typing import Optional, List, Dict, Set, Any
-from dataclasses import dataclass
+from typing import Optional, List, Dict, Set, Any, Callable
+from dataclasses import dataclass, field
 from enum import Enum
 from html.parser import HTMLParser
 from pathlib import Path
 import logging
 import time
+import heapq
 import random
 import signal
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET  # Task-008 Phase 2: Sitemap parsing
 import gzip  # Task-008 Phase 2: Gzipped sitemap support
 
@@ -67,6 +70,19 @@ except ImportError as e:
     CDP_INTEGRATION_AVAILABLE = False
     CDP_AVAILABLE = False
 
+# Playwright render service - one shared browser per process (batch/crawl reuse it)
+try:
+    from webfetcher.fetchers.render_service import get_render_service, PLAYWRIGHT_AVAILABLE
+except ImportError as e:
+    logging.debug(f"Render service not available: {e}")
+    get_render_service = None
+    PLAYWRIGHT_AVAILABLE = False
+
+# SPA shell / soft-failure detection after urllib fetches
+from webfetcher.fetchers.content_sufficiency import score_content, render_host_memo
+from webfetcher.fetchers.charset import decode_html
+from webfetcher.fetchers.streaming import read_html_stream, NonHTMLContentError
+
 # Chrome error handling (Phase 2.3) - enhanced error messages
 from webfetcher.errors.handler import (
     ChromeDebugError, ChromePortConflictError,
@@ -79,18 +95,22 @@ from webfetcher.config.ssl_problematic_domains import should_use_selenium_direct
 
 # Config-Driven Routing System (Task-1) - intelligently route URLs to appropriate fetcher
 try:
-    from webfetcher.routing import RoutingEngine, RoutingDecision
-    routing_engine = RoutingEngine()
+    from webfetcher.routing import RoutingEngine, RoutingDecision, HostOutcomeStore
+    # Learned per-host outcomes (persisted) are consulted ahead of routing.yaml rules
+    host_outcome_store = HostOutcomeStore()
+    routing_engine = RoutingEngine(outcome_store=host_outcome_store)
     ROUTING_ENGINE_AVAILABLE = True
     logging.info("Config-driven routing system initialized")
 except ImportError as e:
     logging.debug(f"Routing engine not available: {e}")
     ROUTING_ENGINE_AVAILABLE = False
     routing_engine = None
+    host_outcome_store = None
 except Exception as e:
     logging.warning(f"Failed to initialize routing engine: {e}")
     ROUTING_ENGINE_AVAILABLE = False
     routing_engine = None
+    host_outcome_store = None
 
 # Manual Chrome Hybrid Mode (Task 000) - graceful degradation when not available
 try:
@@ -144,9 +164,23 @@ from webfetcher.parsing.parser import (
     xhs_to_markdown,
     generic_to_markdown
 )
+from webfetcher.parsing.cache import configure_parse_cache
 
 # Task-003 Phase 3: URL Formatter Module
 from webfetcher.utils.url_formatter import insert_dual_url_section
+# Re-exported: normalize_media_url used to live here and is still imported from webfetcher.core
+from webfetcher.utils.url_formatter import normalize_media_url  # noqa: F401
+from webfetcher.utils.timing import span, timed, enable_timings, disable_timings, get_timings
+from webfetcher.utils.profiling import (
+    PROFILE_MODES, DEFAULT_PROFILE_TOP, start_profiler, stop_profiler, profile_page, profile_checkpoint
+)
+from webfetcher.crawl import (
+    CrawlFrontier, FetchPacer, SpillQueue, make_seen_set, current_rss_bytes, format_bytes,
+    SEEN_SET_KINDS, DEFAULT_SEEN_SET, DEFAULT_FRONTIER_MEMORY,
+    CrawlJournal, CrawlJournalError, NearDuplicateDetector, DEFAULT_NEAR_DUP_DISTANCE,
+    BestFirstQueue, load_priority_config, make_link_scorer, CRAWL_ORDERS, DEFAULT_CRAWL_ORDER,
+    PaginationPrefetcher, find_next_page, pagination_chain, same_sequence, DEFAULT_PAGINATION_PREFETCH
+)
 
 # Error handler integration (Task 1 Phase 2)
 try:
@@ -215,28 +249,8 @@ class SimpleDownloader:
             # Extract filename from URL
             filename = parsed_url.path.split('/')[-1] if parsed_url.path else f"download.{file_extension}"
             if not filename or filename == f".{file_extension}":
-                # Generate filename from domain and timestamp if path is empty
-                domain = parsed_url.hostname or 'unknown'
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{domain}_{timestamp}.{file_extension}"
-            
-            # Sanitize filename for filesystem
-            filename = sanitize_filename(filename)
-            
-            # Ensure unique filename to avoid conflicts
-            outdir = Path(outdir)
-            outdir.mkdir(parents=True, exist_ok=True)
-            base_path = outdir / filename
-            final_path = base_path
-            
-            counter = 1
-            while final_path.exists():
-                name_part, ext_part = filename.rsplit('.', 1) if '.' in filename else (filename, '')
-                if ext_part:
-                    final_path = outdir / f"{name_part}_{counter}.{ext_part}"
-                else:
-                    final_path = outdir / f"{filename}_{counter}"
-                counter += 1
+                filename = ''
+            final_path = self._unique_path(outdir, filename, url, f".{file_extension}")
             
             try:
                 # Download binary file directly
@@ -245,13 +259,7 @@ class SimpleDownloader:
                 # Re-fetch the content as binary data
                 req = urllib.request.Request(url, headers={"User-Agent": ua, "Accept-Language": "zh-CN,zh;q=0.9"})
                 with urllib.request.urlopen(req, timeout=timeout, context=ssl_context_unverified) as response:
-                    # Write binary data to file
-                    with open(final_path, 'wb') as f:
-                        while True:
-                            chunk = response.read(8192)  # Read in 8KB chunks
-                            if not chunk:
-                                break
-                            f.write(chunk)
+                    self._write_stream(response, final_path)
                 
                 file_size = final_path.stat().st_size
                 logging.info(f"File downloaded successfully: {final_path} ({file_size} bytes)")
@@ -264,6 +272,94 @@ class SimpleDownloader:
                 logging.info("Falling back to HTML processing")
         
         return False  # Not a downloadable file or download failed
+
+    def save_response(self, response, url, outdir, content_type=None, content_disposition=None):
+        """
+        Stream an already-open response to disk (no second request).
+        将已打开的响应直接写入磁盘（不再重复请求）
+
+        The filename comes from Content-Disposition, then the URL path, then
+        host + timestamp with an extension guessed from the Content-Type.
+
+        Returns:
+            Optional[Path]: Saved file path, or None if writing failed
+        """
+        filename = _filename_from_content_disposition(content_disposition) or \
+            urllib.parse.unquote(urllib.parse.urlparse(url).path.rsplit('/', 1)[-1])
+        mime = (content_type or '').split(';', 1)[0].strip().lower()
+        guessed_ext = mimetypes.guess_extension(mime) if mime else None
+        final_path = self._unique_path(outdir, filename, url, guessed_ext or '.bin')
+
+        try:
+            logging.info(f"Streaming {mime or 'binary'} response to: {final_path}")
+            with response:
+                self._write_stream(response, final_path)
+            file_size = final_path.stat().st_size
+            logging.info(f"File downloaded successfully: {final_path} ({file_size} bytes)")
+            return final_path
+        except Exception as e:
+            logging.error(f"Failed to download file: {e}")
+            try:
+                final_path.unlink()
+            except OSError:
+                pass
+            return None
+
+    @staticmethod
+    def _write_stream(response, path):
+        with open(path, 'wb') as f:
+            while True:
+                chunk = response.read(64 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+
+    @staticmethod
+    def _unique_path(outdir, filename, url, default_ext):
+        """Sanitized, non-clashing path in outdir / 生成不冲突的输出路径"""
+        if not filename:
+            # Generate filename from domain and timestamp if path is empty
+            domain = urllib.parse.urlparse(url).hostname or 'unknown'
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{domain}_{timestamp}{default_ext}"
+        elif '.' not in filename and default_ext:
+            filename = f"{filename}{default_ext}"
+
+        # Sanitize filename for filesystem
+        filename = sanitize_filename(filename)
+
+        # Ensure unique filename to avoid conflicts
+        outdir = Path(outdir)
+        outdir.mkdir(parents=True, exist_ok=True)
+        final_path = outdir / filename
+
+        counter = 1
+        while final_path.exists():
+            name_part, ext_part = filename.rsplit('.', 1) if '.' in filename else (filename, '')
+            if ext_part:
+                final_path = outdir / f"{name_part}_{counter}.{ext_part}"
+            else:
+                final_path = outdir / f"{filename}_{counter}"
+            counter += 1
+        return final_path
+
+
+def _filename_from_content_disposition(value):
+    """Filename from a Content-Disposition header (RFC 6266 filename* first)."""
+    if not value:
+        return None
+    match = re.search(r"filename\*\s*=\s*([\w-]+)'[^']*'([^;]+)", value, re.IGNORECASE)
+    if match:
+        try:
+            return urllib.parse.unquote(match.group(2).strip().strip('"'), encoding=match.group(1))
+        except LookupError:
+            pass
+    match = re.search(r'filename\s*=\s*"([^"]*)"|filename\s*=\s*([^;]+)', value, re.IGNORECASE)
+    if match:
+        name = (match.group(1) or match.group(2) or '').strip()
+        # Strip any directory part a server might send
+        return name.replace('\\', '/').rsplit('/', 1)[-1] or None
+    return None
 # === END EMBEDDED DOWNLOADER MODULE ===
 
 
@@ -289,6 +385,23 @@ class FetchMetrics:
     chrome_auto_launched: bool = False
     chrome_launch_message: Optional[str] = None
 
+    # Soft failure: urllib returned 200 but the page was an empty SPA shell
+    soft_failure_reason: Optional[str] = None
+    # Failure class of the last urllib attempt (ErrorType value / exception name)
+    urllib_error_class: Optional[str] = None
+    # Charset used to decode the body and the stage that chose it (bom/header/meta/...)
+    encoding: Optional[str] = None
+    encoding_source: Optional[str] = None
+    # Streamed body size and whether the byte budget cut it off
+    bytes_read: int = 0
+    truncated: bool = False
+    # Content-Type of the urllib response (None for browser fetchers)
+    content_type: Optional[str] = None
+    # From the streamed <head>: title, og:* properties, and the head rule that rerouted the fetch
+    page_title: Optional[str] = None
+    open_graph: Dict[str, str] = field(default_factory=dict)
+    head_route: Optional[str] = None
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert metrics to dictionary for JSON serialization."""
         return {
@@ -304,7 +417,17 @@ class FetchMetrics:
             'chrome_connected': self.chrome_connected,
             'js_detection_used': self.js_detection_used,
             'chrome_auto_launched': self.chrome_auto_launched,
-            'chrome_launch_message': self.chrome_launch_message
+            'chrome_launch_message': self.chrome_launch_message,
+            'soft_failure_reason': self.soft_failure_reason,
+            'urllib_error_class': self.urllib_error_class,
+            'encoding': self.encoding,
+            'encoding_source': self.encoding_source,
+            'bytes_read': self.bytes_read,
+            'truncated': self.truncated,
+            'content_type': self.content_type,
+            'page_title': self.page_title,
+            'open_graph': self.open_graph,
+            'head_route': self.head_route
         }
     
     def get_summary(self) -> str:
@@ -545,220 +668,193 @@ def get_beautifulsoup_parser():
 # HTML解析降级支持
 from html.parser import HTMLParser
 
+# Content filter rule table / 内容过滤规则表
+# Semantic HTML5 tags white-list: NEVER delete these (hidden/ad rules)
+_FILTER_SEMANTIC_TAGS = frozenset({'body', 'html', 'main', 'article', 'section',
+                                   'nav', 'header', 'footer', 'aside'})
+
+_FILTER_SCRIPT_TAGS = frozenset({'script', 'style', 'noscript'})
+
+# Phase 2 Fix: exact class name matching only, so Tailwind utilities like
+# "overflow-hidden" or "mx-auto-hidden" are kept
+_FILTER_HIDDEN_CLASSES = frozenset({
+    'hidden',           # Plain hidden class
+    'sr-only',          # Screen reader only
+    'screen-reader-only',
+    'visually-hidden',  # Visually hidden
+    'invisible',        # Invisible class
+    'hide',             # Alternative hidden class
+    'd-none'            # Bootstrap hidden class
+})
+
+# Phase 2 Fix: precise ad patterns instead of '[class*="ad"]', which matched
+# "antialiased" and removed whole <body> tags on many Tailwind sites.
+# Equivalent of the former selectors:
+#   [id^="ad-"] [id^="ad_"] [id$="-ad"] [id$="_ad"] #ad #ads #advertisement
+#   .ad .ads ... .sponsored-content, [id*="banner"][id*="ad"], [class*="popup"][class*="modal"]
+_FILTER_AD_IDS = frozenset({'ad', 'ads', 'advertisement'})
+_FILTER_AD_ID_PREFIXES = ('ad-', 'ad_')
+_FILTER_AD_ID_SUFFIXES = ('-ad', '_ad')
+_FILTER_AD_CLASSES = frozenset({
+    'ad', 'ads', 'ad-container', 'ad-wrapper',
+    'advertisement', 'adsbygoogle', 'ad-slot', 'ad-banner',
+    'ad-unit', 'ad-content', 'ad-box', 'ad-space',
+    # Common ad networks
+    'google-ad', 'amazon-ad', 'facebook-ad',
+    # Promotional and sponsored content
+    'promo', 'promo-banner', 'sponsored', 'sponsored-content'
+})
+# Ads inside main content containers are kept
+_FILTER_AD_PROTECTED_RE = re.compile(r'main|content|article|post|entry')
+
+_FILTER_NAV_TAGS = frozenset({'nav', 'header', 'footer', 'aside'})
+_FILTER_KEPT_META = frozenset({'description', 'author', 'keywords'})
+_FILTER_ESSENTIAL_ATTRS = frozenset({'href', 'src', 'alt', 'title', 'id'})
+
+_FILTER_LEVELS = ('safe', 'moderate', 'aggressive')
+
+
+def _rule_script(name, attrs, classes, class_str):
+    return name in _FILTER_SCRIPT_TAGS
+
+
+def _rule_hidden_style(name, attrs, classes, class_str):
+    style = attrs.get('style')
+    if not style or name in _FILTER_SEMANTIC_TAGS:
+        return False
+    style = style.replace(' ', '')
+    return 'display:none' in style or 'visibility:hidden' in style
+
+
+def _rule_hidden_class(name, attrs, classes, class_str):
+    return bool(classes) and name not in _FILTER_SEMANTIC_TAGS and \
+        not _FILTER_HIDDEN_CLASSES.isdisjoint(classes)
+
+
+def _rule_ad(name, attrs, classes, class_str):
+    if name in _FILTER_SEMANTIC_TAGS:
+        return False
+    elem_id = attrs.get('id') or ''
+    matched = (
+        elem_id in _FILTER_AD_IDS
+        or elem_id.startswith(_FILTER_AD_ID_PREFIXES)
+        or elem_id.endswith(_FILTER_AD_ID_SUFFIXES)
+        or ('banner' in elem_id and 'ad' in elem_id)
+        or (classes and not _FILTER_AD_CLASSES.isdisjoint(classes))
+        or ('popup' in class_str and 'modal' in class_str)
+    )
+    if not matched:
+        return False
+    # Protect main content areas
+    return not (_FILTER_AD_PROTECTED_RE.search(class_str.lower())
+                or _FILTER_AD_PROTECTED_RE.search(elem_id.lower()))
+
+
+def _rule_nav_tag(name, attrs, classes, class_str):
+    return name in _FILTER_NAV_TAGS
+
+
+def _rule_meta(name, attrs, classes, class_str):
+    return name == 'meta' and attrs.get('name') not in _FILTER_KEPT_META
+
+
+# (category, minimum level, predicate), evaluated in order for every element.
+# The former substring class passes (nav/menu/sidebar, analytics/tracking,
+# social/share) are not part of the table: BeautifulSoup handed their
+# lambdas one class string at a time, so they iterated characters and never
+# matched; enabling them now would remove e.g. <body class="has-sidebar">.
+_FILTER_RULES = (
+    ('script/style', 'safe', _rule_script),
+    ('hidden', 'safe', _rule_hidden_style),
+    ('hidden class', 'safe', _rule_hidden_class),
+    ('ad', 'safe', _rule_ad),
+    ('navigation', 'moderate', _rule_nav_tag),
+    ('metadata', 'aggressive', _rule_meta),
+)
+
+
 class ContentFilter:
-    """Generic content filtering system for noise removal from any website"""
+    """Generic content filtering system for noise removal from any website
+
+    All rules of the selected level are compiled into one table and applied
+    in a single depth-first walk: tag names, class sets and ids are checked
+    against hashed sets, and a removed element's subtree is never visited.
+    所有规则编译为一张规则表，在一次深度优先遍历中完成过滤。
+    """
     
     def __init__(self, filter_level='safe'):
         self.filter_level = filter_level
-        self.removed_elements = []
+        self.removal_counts = {}
+        self._removed = []  # (category, tag name) per removed element
+        if filter_level in _FILTER_LEVELS:
+            allowed = _FILTER_LEVELS[:_FILTER_LEVELS.index(filter_level) + 1]
+            self._rules = tuple((category, rule) for category, level, rule in _FILTER_RULES
+                                if level in allowed)
+        else:
+            self._rules = ()
+        self._aggressive = filter_level == 'aggressive'
         
     def filter_content(self, soup):
         """Apply content filtering based on filter level"""
         if not soup:
             return soup
             
-        self.removed_elements = []
+        self.removal_counts = {}
+        self._removed = []
         
-        if self.filter_level == 'none':
+        if not self._rules:
             return soup
-            
-        # Safe filters (default) - remove obvious noise
-        if self.filter_level in ['safe', 'moderate', 'aggressive']:
-            self._remove_scripts_and_styles(soup)
-            self._remove_hidden_elements(soup)
-            self._remove_ads_and_popups(soup)
-            
-        # Moderate filters - also remove navigation
-        if self.filter_level in ['moderate', 'aggressive']:
-            self._remove_navigation_elements(soup)
-            
-        # Aggressive filters - remove all identified noise
-        if self.filter_level == 'aggressive':
-            self._remove_metadata_elements(soup)
-            self._remove_social_elements(soup)
-            self._clean_attributes(soup)
-            
-        return soup
-    
-    def _remove_scripts_and_styles(self, soup):
-        """Remove script and style tags"""
-        for tag in soup.find_all(['script', 'style', 'noscript']):
-            self.removed_elements.append(f"script/style: {tag.name}")
-            tag.decompose()
-    
-    def _remove_hidden_elements(self, soup):
-        """Remove visually hidden elements with precise class matching
 
-        Phase 2 Fix: Changed from substring matching to exact word matching.
-        Previously matched any class containing "hidden" (e.g., "mx-auto-hidden"),
-        now only matches complete class names like "hidden", "visually-hidden", etc.
-        """
-        # Semantic HTML5 tags white-list: NEVER delete these
-        semantic_tags = {'body', 'html', 'main', 'article', 'section',
-                        'nav', 'header', 'footer', 'aside'}
-
-        # Elements with display:none or visibility:hidden
-        for element in soup.find_all(style=lambda x: x and ('display:none' in x.replace(' ', '') or 'visibility:hidden' in x.replace(' ', ''))):
-            # Protect semantic tags
-            if element.name in semantic_tags:
-                continue
-            self.removed_elements.append(f"hidden: {element.name}")
-            element.decompose()
-
-        # Common hidden classes - Phase 2 Fix: exact class name matching only
-        # Only match standalone "hidden" class, not Tailwind utility classes like "overflow-hidden"
-        hidden_classes = [
-            'hidden',           # Plain hidden class
-            'sr-only',          # Screen reader only
-            'screen-reader-only',
-            'visually-hidden',  # Visually hidden
-            'invisible',        # Invisible class
-            'hide',             # Alternative hidden class
-            'd-none'            # Bootstrap hidden class
-        ]
+        from bs4 import Comment, Tag
 
-        # Build list first to avoid modification during iteration
-        elements_to_remove = []
-        for element in soup.find_all():
-            if not element or not hasattr(element, 'get'):
-                continue
+        counts = self.removal_counts
+        removed = self._removed
+        rules = self._rules
+        strip_comments = clean_attributes = self._aggressive
 
-            elem_classes = element.get('class', [])
-            if not elem_classes:
+        stack = list(reversed(soup.contents))
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, Tag):
+                if strip_comments and isinstance(node, Comment):
+                    node.extract()
+                    counts['comment'] = counts.get('comment', 0) + 1
                 continue
 
-            # Check if element has any exact hidden class (not as substring)
-            has_hidden_class = any(cls in hidden_classes for cls in elem_classes)
-
-            if has_hidden_class:
-                # Protect semantic tags
-                if element.name in semantic_tags:
-                    continue
-                elements_to_remove.append(element)
+            attrs = node.attrs
+            classes = attrs.get('class') or ()
+            if isinstance(classes, str):
+                classes = classes.split()
+            class_str = ' '.join(classes)
+            name = node.name
+
+            for category, rule in rules:
+                if rule(name, attrs, classes, class_str):
+                    counts[category] = counts.get(category, 0) + 1
+                    removed.append((category, name))
+                    node.decompose()
+                    break
+            else:
+                if clean_attributes:
+                    # Keep only essential attributes
+                    for attr in [a for a in attrs if a not in _FILTER_ESSENTIAL_ATTRS]:
+                        del attrs[attr]
+                stack.extend(reversed(node.contents))
 
-        # Remove collected elements
-        for element in elements_to_remove:
-            self.removed_elements.append(f"hidden class: {element.name}")
-            element.decompose()
+        return soup
     
-    def _remove_ads_and_popups(self, soup):
-        """Remove advertisement and popup elements with precise selectors
-
-        Phase 2 Fix: Replaced broad selectors like '[class*="ad"]' which incorrectly
-        matched semantic classes like "antialiased" (used by Tailwind CSS), causing
-        entire body tags to be removed on 30-50% of modern websites.
-
-        Now using precise selectors that match exact ad patterns while protecting
-        semantic HTML5 tags (body, main, article, etc.).
+    @property
+    def removed_elements(self):
         """
-        # Precise ad selectors - Phase 2 Fix
-        # Only match explicit ad-related patterns, not substrings in unrelated classes
-        ad_selectors = [
-            # ID selectors: precise prefix/suffix matching
-            '[id^="ad-"]', '[id^="ad_"]', '[id$="-ad"]', '[id$="_ad"]',
-            '[id="ad"]', '[id="ads"]', '[id="advertisement"]',
-
-            # Class selectors: complete class names only
-            '.ad', '.ads', '.ad-container', '.ad-wrapper',
-            '.advertisement', '.adsbygoogle', '.ad-slot', '.ad-banner',
-            '.ad-unit', '.ad-content', '.ad-box', '.ad-space',
-
-            # Common ad networks
-            '.google-ad', '.amazon-ad', '.facebook-ad',
-
-            # Explicit banner and popup patterns (must contain both keywords)
-            '[id*="banner"][id*="ad"]',
-            '[class*="popup"][class*="modal"]',
-
-            # Promotional and sponsored content
-            '.promo', '.promo-banner', '.sponsored', '.sponsored-content'
-        ]
+        Removed elements as "category: tag" strings (the pre-rule-table attribute)
 
-        # Semantic HTML5 tags white-list: NEVER delete these
-        semantic_tags = {'body', 'html', 'main', 'article', 'section',
-                        'nav', 'header', 'footer', 'aside'}
+        Listed in document order; removed <meta> tags were never listed and still are not.
+        """
+        return [f"{category}: {name}" for category, name in self._removed if category != 'metadata']
 
-        for selector in ad_selectors:
-            try:
-                for element in soup.select(selector):
-                    # CRITICAL: Protect semantic tags (Phase 2 Fix)
-                    if element.name in semantic_tags:
-                        continue
-
-                    # Protect main content areas (preserve original logic)
-                    elem_classes = ' '.join(element.get('class', [])).lower()
-                    elem_id = element.get('id', '').lower()
-
-                    protected_keywords = ['main', 'content', 'article', 'post', 'entry']
-                    if any(kw in elem_classes or kw in elem_id
-                           for kw in protected_keywords):
-                        continue
-
-                    # Safe to remove: not semantic, not main content
-                    self.removed_elements.append(f"ad: {element.name}")
-                    element.decompose()
-            except Exception as e:
-                # Silently continue on selector errors
-                continue
-    
-    def _remove_navigation_elements(self, soup):
-        """Remove navigation, header, footer elements"""
-        nav_tags = ['nav', 'header', 'footer', 'aside']
-        for tag in nav_tags:
-            for element in soup.find_all(tag):
-                self.removed_elements.append(f"navigation: {element.name}")
-                element.decompose()
-        
-        # Common navigation classes
-        nav_classes = ['nav', 'navigation', 'menu', 'sidebar', 'breadcrumb', 'pagination']
-        for class_name in nav_classes:
-            for element in soup.find_all(class_=lambda x: x and any(cls for cls in x if class_name in cls.lower())):
-                self.removed_elements.append(f"nav class: {element.name}")
-                element.decompose()
-    
-    def _remove_metadata_elements(self, soup):
-        """Remove metadata and tracking elements"""
-        # Meta tags not needed for content
-        for meta in soup.find_all('meta'):
-            if meta.get('name') not in ['description', 'author', 'keywords']:
-                meta.decompose()
-        
-        # Comments
-        from bs4 import Comment
-        comments = soup.find_all(string=lambda text: isinstance(text, Comment))
-        for comment in comments:
-            comment.extract()
-            
-        # Tracking and analytics
-        tracking_classes = ['analytics', 'tracking', 'pixel', 'beacon']
-        for class_name in tracking_classes:
-            for element in soup.find_all(class_=lambda x: x and any(cls for cls in x if class_name in cls.lower())):
-                element.decompose()
-    
-    def _remove_social_elements(self, soup):
-        """Remove social media widgets and share buttons"""
-        social_classes = ['social', 'share', 'facebook', 'twitter', 'linkedin', 'pinterest']
-        for class_name in social_classes:
-            for element in soup.find_all(class_=lambda x: x and any(cls for cls in x if class_name in cls.lower())):
-                self.removed_elements.append(f"social: {element.name}")
-                element.decompose()
-    
-    def _clean_attributes(self, soup):
-        """Remove unnecessary attributes to clean up HTML"""
-        for element in soup.find_all(True):
-            # Keep only essential attributes
-            essential_attrs = ['href', 'src', 'alt', 'title', 'id']
-            attrs_to_remove = [attr for attr in element.attrs.keys() if attr not in essential_attrs]
-            for attr in attrs_to_remove:
-                del element.attrs[attr]
-    
     def get_filter_stats(self):
-        """Return filtering statistics"""
-        stats = {}
-        for item in self.removed_elements:
-            category = item.split(':')[0]
-            stats[category] = stats.get(category, 0) + 1
-        return stats
+        """Return filtering statistics (removals per rule category)"""
+        return dict(self.removal_counts)
 
 
 class NavigationFilter:
@@ -905,11 +1001,15 @@ MAX_PAGINATION_DEPTH = 5
 
 # Site crawling configuration
 MAX_CRAWL_DEPTH = 10  # Absolute maximum to prevent infinite recursion
-MAX_CRAWL_PAGES = 1000  # Absolute maximum pages (increased for larger documentation sites)
+# Absolute maximum pages (increased for larger documentation sites); WF_MAX_CRAWL_PAGES overrides it
+MAX_CRAWL_PAGES = int(os.environ.get('WF_MAX_CRAWL_PAGES') or 1000)
 DEFAULT_CRAWL_DELAY = 0.5  # Polite crawling delay
+CATEGORY_CRAWL_WORKERS = 4  # Parallel workers sharing one frontier in category-first crawls
+CRAWL_MEMORY_REPORT_INTERVAL = 100  # Sample (and in verbose mode log) crawl memory every N pages
 
 # Memory protection constants
-MAX_PAGE_SIZE = 10 * 1024 * 1024  # 10MB limit for individual pages
+# 10MB limit for individual pages; WF_MAX_PAGE_BYTES overrides the byte budget
+MAX_PAGE_SIZE = int(os.environ.get('WF_MAX_PAGE_BYTES') or 10 * 1024 * 1024)
 
 # Smart URL filtering constants
 BINARY_EXTENSIONS = {'.pdf', '.zip', '.tar', '.gz', '.rar', '.7z', '.exe', '.dmg', '.iso'}
@@ -924,6 +1024,13 @@ BUILD_PATTERNS = {'/node_modules/', '/dist/', '/build/', '/.git/', '/target/',
 MAX_RETRIES = 3
 BASE_DELAY = 1.0  # Base delay in seconds (1s, 2s, 4s progression)
 MAX_JITTER = 0.1  # Add small random jitter to prevent thundering herd
+RETRY_DEADLINE = 120.0  # Total seconds per URL across urllib attempts and waits
+
+# Unified retry policy (one wait per attempt) and per-host circuit breakers,
+# shared by every fetch in the process (batch and crawl included)
+from webfetcher.errors.retry_policy import RetryPolicy, HostCircuitBreakers, CircuitState, CircuitOpenError
+retry_policy = RetryPolicy(max_retries=MAX_RETRIES, base_delay=BASE_DELAY, deadline=RETRY_DEADLINE)
+host_circuit_breakers = HostCircuitBreakers()
 
 # Define which exceptions and HTTP status codes are retryable
 RETRYABLE_EXCEPTIONS = (
@@ -961,48 +1068,11 @@ def sanitize_filename(name: str) -> str:
     return name[:160]
 
 
-def normalize_media_url(u: str, base_url: str = None) -> str:
-    """
-    Normalize media URL to absolute URL.
-
-    Args:
-        u: Media URL (can be absolute, protocol-relative, or relative)
-        base_url: Base URL to resolve relative URLs against
-
-    Returns:
-        Normalized absolute URL
-    """
-    if not u:
-        return u
-    u = u.strip()
-
-    # Already absolute URL (http:// or https://)
-    if u.startswith(('http://', 'https://')):
-        return u
-
-    # Protocol-relative URL (//example.com/image.jpg)
-    if u.startswith('//'):
-        return 'https:' + u
-
-    # Absolute path (/path/to/image.jpg)
-    if u.startswith('/'):
-        if base_url:
-            # Extract domain from base_url
-            parsed = urllib.parse.urlparse(base_url)
-            return f"{parsed.scheme}://{parsed.netloc}{u}"
-        else:
-            # Fallback to https: prefix for protocol-relative
-            return 'https:' + u
-
-    # Relative path (image.jpg or path/image.jpg)
-    if base_url:
-        # Use urljoin to properly handle relative paths
-        return urllib.parse.urljoin(base_url, u)
-    else:
-        # No base URL provided, return as-is
-        return u
-
-
+def is_host_level_failure(exc: Exception) -> bool:
+    """Whether an exception says the host itself is unhealthy (feeds the circuit breaker)."""
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code >= 500 or exc.code == 429
+    return isinstance(exc, RETRYABLE_EXCEPTIONS)
 
 def should_retry_exception(exc: Exception) -> bool:
     """Determine if an exception warrants a retry attempt."""
@@ -1235,6 +1305,17 @@ def ensure_chrome_debug(config: Optional[Dict[str, Any]] = None, force_mode: boo
         )
 
 
+class HeadRouted(Exception):
+    """
+    Raised from the on_head callback when a head rule sends the page to a browser.
+    head 规则要求改用浏览器时，从 on_head 回调中抛出以中止 urllib 读取
+    """
+
+    def __init__(self, decision):
+        self.decision = decision
+        super().__init__(f"Head rule '{decision.rule_name}' routes to {decision.fetcher}")
+
+
 def _determine_fetcher_via_routing(url: str) -> Optional[str]:
     """
     Determine which fetcher to use based on routing configuration.
@@ -1266,10 +1347,86 @@ def _determine_fetcher_via_routing(url: str) -> Optional[str]:
         return None
 
 
+@timed('fetch')
 def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
                          fetch_mode: str = 'auto', force_chrome: bool = False,
                          input_url: str = None) -> tuple[str, FetchMetrics, dict]:
     """
+    Fetch HTML through the fallback chain and record the per-host outcome.
+    通过降级链获取 HTML，并记录主机级获取结果供路由学习
+
+    In auto mode the outcome of each fetcher is written to the host outcome
+    store, which the routing engine consults ahead of routing.yaml rules.
+    See _fetch_html_with_fallback_chain for the chain itself.
+
+    Returns:
+        tuple[str, FetchMetrics, dict]: (html_content, fetch_metrics, url_metadata)
+    """
+    if fetch_mode != 'auto' or host_outcome_store is None:
+        return _fetch_html_with_fallback_chain(url, ua, timeout, fetch_mode, force_chrome, input_url)
+
+    try:
+        html, metrics, url_metadata = _fetch_html_with_fallback_chain(
+            url, ua, timeout, fetch_mode, force_chrome, input_url
+        )
+    except NonHTMLContentError:
+        # The host answered fine; the resource just is not a page
+        raise
+    except Exception as e:
+        _record_host_outcome(url, 'urllib', False, error_class=type(e).__name__)
+        raise
+
+    _record_fetch_outcomes(url, html, metrics)
+    return html, metrics, url_metadata
+
+
+# Metrics method names -> fetcher names used by routing
+_FETCHER_ALIASES = {'selenium_direct': 'selenium', 'cdp_direct': 'cdp'}
+
+
+def _record_host_outcome(url: str, fetcher: str, success: bool,
+                         latency: float = 0.0, error_class: Optional[str] = None) -> None:
+    """Record one fetcher outcome for the URL's host; never raises."""
+    if host_outcome_store is None:
+        return
+    try:
+        host = urllib.parse.urlparse(url).hostname
+        host_outcome_store.record(host, fetcher, success, latency=latency, error_class=error_class)
+    except Exception as e:
+        logging.debug(f"Failed to record host outcome for {url}: {e}")
+
+
+def _record_fetch_outcomes(url: str, html: str, metrics: FetchMetrics) -> None:
+    """Derive urllib and final-fetcher outcomes from a completed fetch."""
+    if metrics.fallback_method in ('cdp', 'selenium', 'manual_chrome'):
+        used = metrics.fallback_method
+    else:
+        used = _FETCHER_ALIASES.get(metrics.primary_method, metrics.primary_method)
+
+    if metrics.urllib_error_class == "circuit_open":
+        # urllib was skipped, not tried; only the fallback result is evidence
+        if used != 'urllib':
+            succeeded = bool(html) and metrics.final_status == "success"
+            _record_host_outcome(url, used, succeeded, latency=metrics.fetch_duration,
+                                 error_class=None if succeeded else "failed")
+        return
+
+    urllib_failed = metrics.urllib_error_class is not None
+    if urllib_failed:
+        _record_host_outcome(url, 'urllib', False, error_class=metrics.urllib_error_class)
+        if used == 'urllib':
+            # Every renderer failed and the urllib document was kept
+            return
+
+    succeeded = bool(html) and metrics.final_status == "success"
+    _record_host_outcome(url, used, succeeded, latency=metrics.fetch_duration,
+                         error_class=None if succeeded else "failed")
+
+
+def _fetch_html_with_fallback_chain(url: str, ua: Optional[str] = None, timeout: int = 30,
+                                    fetch_mode: str = 'auto', force_chrome: bool = False,
+                                    input_url: str = None) -> tuple[str, FetchMetrics, dict]:
+    """
     Fetch HTML with exponential backoff retry logic and multi-layer fallback strategy.
 
     Implements intelligent fallback chain:
@@ -1294,6 +1451,7 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
     metrics = FetchMetrics(primary_method="urllib")
     start_time = time.time()
     last_exception = None
+    renderer_failed = False
 
     # === CONFIG-DRIVEN ROUTING: Intelligent fetcher selection ===
     # === 配置驱动路由：智能获取器选择 ===
@@ -1310,6 +1468,8 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
                 return _try_selenium_fetch(url, ua, timeout, metrics, start_time, force_chrome, input_url)
             except Exception as e:
                 logging.warning(f"Selenium fetch failed for {url}, falling back to urllib: {e}")
+                _record_host_outcome(url, 'selenium', False, latency=time.time() - start_time,
+                                     error_class=type(e).__name__)
                 metrics.primary_method = "urllib"
                 # Continue to urllib logic below
 
@@ -1323,6 +1483,8 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
                 return _try_cdp_fetch(url, ua, timeout, metrics, start_time, input_url)
             except Exception as e:
                 logging.warning(f"CDP fetch failed for {url}, falling back to urllib: {e}")
+                _record_host_outcome(url, 'cdp', False, latency=time.time() - start_time,
+                                     error_class=type(e).__name__)
                 metrics.primary_method = "urllib"
                 # Continue to urllib logic below
 
@@ -1337,6 +1499,28 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
 
         # If fetcher_choice is 'urllib' or None, continue with normal urllib flow
 
+        # Hosts that already served an SPA shell in this process skip urllib
+        # 本进程中已返回过 SPA 空壳的主机直接使用渲染器
+        if fetcher_choice in (None, 'urllib'):
+            memo_host = urllib.parse.urlparse(url).hostname
+            shell_reason = render_host_memo.needs_rendering(memo_host)
+            if shell_reason:
+                logging.info(f"Host previously served an SPA shell ({shell_reason}), rendering directly: {url}")
+                html, metrics, url_metadata = _try_cdp_fallback_after_urllib_failure(
+                    url, ua, timeout, metrics, start_time,
+                    f"skipped urllib: {shell_reason}", input_url, force_chrome
+                )
+                if html:
+                    if score_content(html).is_soft_failure:
+                        # Rendering no longer helps on this host: stop routing it to the renderer
+                        render_host_memo.forget(memo_host)
+                    metrics.soft_failure_reason = shell_reason
+                    return html, metrics, url_metadata
+                logging.warning(f"Renderer failed for {url}, retrying with urllib")
+                render_host_memo.forget(memo_host)
+                metrics = FetchMetrics(primary_method="urllib")
+                renderer_failed = True
+
     # Phase 2: Handle explicit fetch mode requests
     if fetch_mode == 'selenium':
         metrics.primary_method = "selenium"
@@ -1347,111 +1531,200 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
         return _try_cdp_fetch(url, ua, timeout, metrics, start_time, input_url)
 
     # Try urllib first (fetch_mode: 'auto' or 'urllib')
-    for attempt in range(MAX_RETRIES + 1):  # 0, 1, 2, 3 (4 total attempts)
-        metrics.total_attempts = attempt + 1
-        
-        try:
-            if attempt > 0:
-                delay = calculate_backoff_delay(attempt - 1)
-                logging.info(f"Retry attempt {attempt}/{MAX_RETRIES} for {url} after {delay:.1f}s delay")
-                time.sleep(delay)
-            
-            # Call the original fetch_html function and track metrics
-            html, fetch_metrics, final_url = fetch_html_original(url, ua, timeout)
-            logging.debug(f"Task-003: Received final_url from fetch_html_original: {final_url}")
+    # Hosts whose circuit is open are skipped straight to the fallbacks (or failure)
+    host = urllib.parse.urlparse(url).hostname
+    if not host_circuit_breakers.allow(host):
+        circuit_error = CircuitOpenError(host, host_circuit_breakers.retry_in(host))
+        logging.warning(str(circuit_error))
+        metrics.urllib_error_class = "circuit_open"
+        if fetch_mode == 'auto':
+            return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(circuit_error), input_url, force_chrome)
 
-            # Merge metrics from original fetch
-            metrics.fetch_duration = time.time() - start_time
-            metrics.ssl_fallback_used = fetch_metrics.ssl_fallback_used
-            if fetch_metrics.fallback_method:
-                metrics.fallback_method = fetch_metrics.fallback_method
-            metrics.final_status = "success"
+        metrics.fetch_duration = time.time() - start_time
+        metrics.final_status = "failed"
+        metrics.error_message = str(circuit_error)
+        raise circuit_error
+
+    # The streamed <head> fills title/og:* and may reroute the page: rules with
+    # head_* conditions are checked before the body is read
+    # 流式读取到 <head> 后记录标题/og:*，并在读取正文前检查 head 规则
+    def on_head(head):
+        metrics.page_title = head.title
+        metrics.open_graph = head.open_graph
+        if fetch_mode == 'auto' and not renderer_failed and ROUTING_ENGINE_AVAILABLE \
+                and routing_engine is not None and routing_engine.has_head_rules:
+            decision = routing_engine.evaluate_head(url, head)
+            if decision is not None and decision.fetcher in ('cdp', 'selenium'):
+                raise HeadRouted(decision)
+
+    # One wait per attempt, bounded by the classifier budget and a per-URL deadline
+    retry_state = retry_policy.start()
+    attempt = 0
+    # The finally releases a half-open trial that recorded no outcome
+    try:
+        while True:
+            metrics.total_attempts = attempt + 1
+        
+            try:
+                # Call the original fetch_html function and track metrics
+                html, fetch_metrics, final_url = fetch_html_original(url, ua, retry_state.attempt_timeout(timeout),
+                                                                     on_head=on_head)
+                host_circuit_breakers.record_success(host)
+                logging.debug(f"Task-003: Received final_url from fetch_html_original: {final_url}")
 
-            # Task-003 Phase 1: Create URL metadata
-            url_metadata = create_url_metadata(
-                input_url=input_url or url,  # Use preserved input_url if provided
-                final_url=final_url,
-                fetch_mode='urllib'
-            )
-            logging.debug(f"Task-003: Created URL metadata: {url_metadata}")
+                # Merge metrics from original fetch
+                metrics.fetch_duration = time.time() - start_time
+                metrics.ssl_fallback_used = fetch_metrics.ssl_fallback_used
+                if fetch_metrics.fallback_method:
+                    metrics.fallback_method = fetch_metrics.fallback_method
+                metrics.encoding = fetch_metrics.encoding
+                metrics.encoding_source = fetch_metrics.encoding_source
+                metrics.bytes_read = fetch_metrics.bytes_read
+                metrics.truncated = fetch_metrics.truncated
+                metrics.content_type = fetch_metrics.content_type
+                metrics.final_status = "success"
+                metrics.urllib_error_class = None
+
+                # Task-003 Phase 1: Create URL metadata
+                url_metadata = create_url_metadata(
+                    input_url=input_url or url,  # Use preserved input_url if provided
+                    final_url=final_url,
+                    fetch_mode='urllib'
+                )
+                logging.debug(f"Task-003: Created URL metadata: {url_metadata}")
 
-            return html, metrics, url_metadata
+                # Soft-failure check: a 200 SPA shell would parse to an empty document
+                if fetch_mode == 'auto':
+                    with span('soft_failure_check'):
+                        report = score_content(html)
+                    if report.is_soft_failure:
+                        metrics.urllib_error_class = "soft_failure"
+                    if report.is_soft_failure and renderer_failed:
+                        metrics.soft_failure_reason = report.reason
+                    elif report.is_soft_failure:
+                        return _try_renderer_after_soft_failure(
+                            url, ua, timeout, metrics, start_time, input_url,
+                            force_chrome, html, url_metadata, report.reason
+                        )
+
+                return html, metrics, url_metadata
             
-        except Exception as e:
-            last_exception = e
-
-            # Log the error with context
-            if attempt == 0:
-                logging.warning(f"Initial fetch failed for {url}: {type(e).__name__}: {e}")
-            else:
-                logging.warning(f"Retry {attempt}/{MAX_RETRIES} failed for {url}: {type(e).__name__}: {e}")
-
-            # Phase 1: Classify error using unified classifier
-            should_retry = True
-            wait_time = calculate_backoff_delay(attempt) if attempt < MAX_RETRIES else 0
-
-            if ERROR_CLASSIFIER_AVAILABLE and error_classifier:
-                classification = error_classifier.classify_error(e, url)
-                logging.info(f"Error classified as {classification.error_type.value}: {classification.reason}")
+            except HeadRouted as e:
+                # The host answered, but its <head> matched a rule asking for a browser
+                host_circuit_breakers.record_success(host)
+                decision = e.decision
+                metrics.head_route = decision.rule_name
+                logging.info(f"{e} for {url}: {decision.reason}")
+                if decision.fetcher == 'selenium':
+                    metrics.primary_method = "selenium_direct"
+                    try:
+                        return _try_selenium_fetch(url, ua, timeout, metrics, start_time, force_chrome, input_url)
+                    except Exception as selenium_error:
+                        logging.warning(f"Selenium fetch failed for {url}, trying the fallback chain: {selenium_error}")
+                return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time,
+                                                              str(e), input_url, force_chrome)
+
+            except NonHTMLContentError as e:
+                # Not a page: retries and browsers cannot help / 非网页内容，不重试也不回退浏览器
+                # The host answered, which is what the circuit breaker cares about
+                host_circuit_breakers.record_success(host)
+                logging.info(str(e))
+                metrics.fetch_duration = time.time() - start_time
+                metrics.final_status = "failed"
+                metrics.error_message = str(e)
+                metrics.urllib_error_class = "non_html"
+                raise
 
-                # Handle permanent errors
-                if classification.error_type == ErrorType.PERMANENT:
-                    logging.error(f"Permanent error: {classification.reason}")
-                    if classification.fallback_method == "selenium" and fetch_mode == 'auto':
-                        return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(e), input_url, force_chrome)
+            except Exception as e:
+                last_exception = e
 
-                    # Store the exception for error reporting
-                    metrics.fetch_duration = time.time() - start_time
-                    metrics.final_status = "failed"
-                    metrics.error_message = str(e)
-                    raise e
+                # Log the error with context
+                if attempt == 0:
+                    logging.warning(f"Initial fetch failed for {url}: {type(e).__name__}: {e}")
+                else:
+                    logging.warning(f"Retry {attempt}/{MAX_RETRIES} failed for {url}: {type(e).__name__}: {e}")
+
+                # Feed the host circuit breaker: only host-level failures count,
+                # any other response (e.g. 404) proves the host is alive
+                if is_host_level_failure(e):
+                    if host_circuit_breakers.record_failure(host) == CircuitState.OPEN:
+                        logging.warning(f"Circuit opened for {host} after repeated failures, stopping retries")
+                        metrics.urllib_error_class = type(e).__name__
+                        break
+                else:
+                    host_circuit_breakers.record_success(host)
+
+                # Phase 1: Classify error using unified classifier
+                should_retry = True
+                classification = None
+
+                metrics.urllib_error_class = type(e).__name__
+                if ERROR_CLASSIFIER_AVAILABLE and error_classifier:
+                    classification = error_classifier.classify_error(e, url)
+                    logging.info(f"Error classified as {classification.error_type.value}: {classification.reason}")
+                    metrics.urllib_error_class = classification.error_type.value
+
+                    # Handle permanent errors
+                    if classification.error_type == ErrorType.PERMANENT:
+                        logging.error(f"Permanent error: {classification.reason}")
+                        if classification.fallback_method == "selenium" and fetch_mode == 'auto':
+                            return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(e), input_url, force_chrome)
+
+                        # Store the exception for error reporting
+                        metrics.fetch_duration = time.time() - start_time
+                        metrics.final_status = "failed"
+                        metrics.error_message = str(e)
+                        raise e
+
+                    # Handle SSL configuration errors - immediate CDP/Selenium fallback
+                    elif classification.error_type == ErrorType.SSL_CONFIG:
+                        logging.warning(f"SSL configuration error: {classification.reason}")
+                        if fetch_mode == 'auto':
+                            return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(e), input_url, force_chrome)
+
+                        metrics.fetch_duration = time.time() - start_time
+                        metrics.final_status = "failed"
+                        metrics.error_message = str(e)
+                        raise e
+
+                    # Use classifier's retry recommendation
+                    should_retry = classification.should_retry
+                else:
+                    # Fallback to legacy should_retry_exception logic
+                    should_retry = should_retry_exception(e)
+
+                # Check if we should retry this exception
+                if not should_retry:
+                    # Special handling for HTTP 307 redirect loops
+                    if isinstance(e, urllib.error.HTTPError) and e.status == 307:
+                        logging.error(f"HTTP 307 redirect loop detected for {url}. "
+                                     f"This may indicate a redirect loop. "
+                                     f"Try using a specific page URL instead of the root domain.")
+                    else:
+                        logging.info(f"Non-retryable error for {url}, failing immediately: {type(e).__name__}")
 
-                # Handle SSL configuration errors - immediate CDP/Selenium fallback
-                elif classification.error_type == ErrorType.SSL_CONFIG:
-                    logging.warning(f"SSL configuration error: {classification.reason}")
+                    # Phase 2: Immediate CDP/Selenium fallback for non-retryable errors (if enabled)
                     if fetch_mode == 'auto':
                         return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(e), input_url, force_chrome)
 
+                    # Store the exception for error reporting
                     metrics.fetch_duration = time.time() - start_time
                     metrics.final_status = "failed"
                     metrics.error_message = str(e)
                     raise e
 
-                # Use classifier's retry recommendation
-                should_retry = classification.should_retry
-                wait_time = classification.recommended_wait if classification.should_retry else 0
-            else:
-                # Fallback to legacy should_retry_exception logic
-                should_retry = should_retry_exception(e)
-
-            # Check if we should retry this exception
-            if not should_retry:
-                # Special handling for HTTP 307 redirect loops
-                if isinstance(e, urllib.error.HTTPError) and e.status == 307:
-                    logging.error(f"HTTP 307 redirect loop detected for {url}. "
-                                 f"This may indicate a redirect loop. "
-                                 f"Try using a specific page URL instead of the root domain.")
-                else:
-                    logging.info(f"Non-retryable error for {url}, failing immediately: {type(e).__name__}")
-
-                # Phase 2: Immediate CDP/Selenium fallback for non-retryable errors (if enabled)
-                if fetch_mode == 'auto':
-                    return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(e), input_url, force_chrome)
-
-                # Store the exception for error reporting
-                metrics.fetch_duration = time.time() - start_time
-                metrics.final_status = "failed"
-                metrics.error_message = str(e)
-                raise e
-
-            # If this was the last attempt, don't sleep
-            if attempt == MAX_RETRIES:
-                break
+                # Single wait per attempt (backoff or classifier recommendation, whichever is longer)
+                wait_time = retry_state.next_wait(classification, retryable=should_retry)
+                if wait_time is None:
+                    logging.info(f"Stopping urllib retries for {url}: {retry_state.stop_reason}")
+                    break
 
-            # Use classifier's recommended wait time if available
-            if wait_time > 0 and attempt < MAX_RETRIES:
                 logging.info(f"Waiting {wait_time:.1f}s before retry {attempt + 1}/{MAX_RETRIES}")
-                time.sleep(wait_time)
+                with span('retry_wait'):
+                    time.sleep(wait_time)
+                attempt += 1
+    finally:
+        host_circuit_breakers.release(host)
     
     # Phase 2: All urllib retry attempts exhausted - try CDP then Selenium fallback if enabled
     if fetch_mode == 'auto':
@@ -1461,7 +1734,7 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
     metrics.fetch_duration = time.time() - start_time
     metrics.final_status = "failed"
     metrics.error_message = str(last_exception)
-    logging.error(f"All {MAX_RETRIES + 1} attempts failed for {url}, giving up")
+    logging.error(f"All {metrics.total_attempts} attempts failed for {url}, giving up")
     raise last_exception
 
 
@@ -1479,6 +1752,50 @@ def _create_empty_metrics_with_guidance() -> FetchMetrics:
     return metrics
 
 
+def _try_renderer_after_soft_failure(url: str, ua: Optional[str], timeout: int,
+                                     metrics: FetchMetrics, start_time: float,
+                                     input_url: Optional[str], force_chrome: bool,
+                                     shell_html: str, shell_metadata: dict,
+                                     reason: str) -> tuple[str, FetchMetrics, dict]:
+    """
+    Re-fetch an SPA shell through the CDP/Selenium chain.
+    urllib 返回 SPA 空壳时，改用 CDP/Selenium 渲染获取
+
+    The host is remembered so later URLs on it skip urllib, but only when the
+    rendered page is no longer a shell. If every renderer fails, the original
+    urllib document is returned unchanged and the host is not remembered.
+
+    Returns:
+        tuple[str, FetchMetrics, dict]: (html_content, fetch_metrics, url_metadata)
+    """
+    host = urllib.parse.urlparse(url).hostname
+    logging.warning(f"Soft failure for {url}: {reason}. Switching to JS-capable fetcher")
+
+    from dataclasses import replace
+    shell_metrics = replace(metrics, soft_failure_reason=reason)
+    try:
+        html, metrics, url_metadata = _try_cdp_fallback_after_urllib_failure(
+            url, ua, timeout, metrics, start_time, f"soft failure: {reason}", input_url, force_chrome
+        )
+    except Exception as e:
+        logging.warning(f"Renderer fallback raised for {url}: {e}")
+        html = ""
+
+    if not html:
+        logging.warning(f"Renderer fallback failed for {url}, keeping urllib document")
+        render_host_memo.forget(host)
+        shell_metrics.fetch_duration = time.time() - start_time
+        return shell_html, shell_metrics, shell_metadata
+
+    if score_content(html).is_soft_failure:
+        logging.info(f"Rendered page for {url} is still thin, not routing {host} to the renderer")
+        render_host_memo.forget(host)
+    else:
+        render_host_memo.record(host, reason)
+    metrics.soft_failure_reason = reason
+    return html, metrics, url_metadata
+
+
 def _try_cdp_fallback_after_urllib_failure(url: str, ua: Optional[str], timeout: int,
                                            metrics: FetchMetrics, start_time: float,
                                            urllib_error: str, input_url: str = None,
@@ -1535,6 +1852,7 @@ def _try_cdp_fallback_after_urllib_failure(url: str, ua: Optional[str], timeout:
         )
 
 
+@timed('cdp')
 def _try_cdp_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetrics, start_time: float, input_url: str = None, wait_time: float = 3.0) -> tuple[str, FetchMetrics, dict]:
     """
     Try CDP (Chrome DevTools Protocol) fetch.
@@ -1610,6 +1928,7 @@ def _try_cdp_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetr
         raise Exception(error_msg)
 
 
+@timed('selenium')
 def _try_selenium_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetrics, start_time: float, force_chrome: bool = False, input_url: str = None) -> tuple[str, FetchMetrics, dict]:
     """
     Try Selenium fetch as primary method (selenium-only mode).
@@ -2039,118 +2358,114 @@ def extract_charset_from_html(data: bytes) -> Optional[str]:
 
 def try_decode_with_fallback(data: bytes, encoding: Optional[str] = None) -> str:
     """
-    使用降级链进行解码尝试
-    
+    使用编码检测流水线解码（保留旧接口）
+
     Args:
         data: 要解码的字节数据
         encoding: 优先尝试的编码（可选）
-        
+
     Returns:
         str: 解码后的字符串
     """
-    # 中文编码降级链：GB2312 → GBK → GB18030 → UTF-8
-    fallback_encodings = ['gb2312', 'gbk', 'gb18030', 'utf-8']
-    
-    # 如果提供了特定编码，优先尝试
-    encodings_to_try = []
-    if encoding:
-        encodings_to_try.append(encoding)
-    
-    # 添加降级链中未包含的编码
-    for enc in fallback_encodings:
-        if enc != encoding:
-            encodings_to_try.append(enc)
-    
-    # 最后尝试一些其他常见编码
-    encodings_to_try.extend(['iso-8859-1', 'windows-1252'])
-    
-    for enc in encodings_to_try:
-        try:
-            decoded = data.decode(enc)
-            # 简单检查解码质量：如果包含常见的中文字符且没有明显乱码标志，认为解码成功
-            if enc in ['gb2312', 'gbk', 'gb18030']:
-                # 对于中文编码，检查是否有合理的中文字符
-                if re.search(r'[\u4e00-\u9fff]', decoded):
-                    return decoded
-            else:
-                # 对于其他编码，检查是否有明显的乱码
-                if not re.search(r'�', decoded):
-                    return decoded
-        except (UnicodeDecodeError, LookupError):
-            continue
-    
-    # 如果所有编码都失败，使用UTF-8并忽略错误
-    return data.decode('utf-8', errors='ignore')
+    return decode_html(data, encoding).text
 
 
-def smart_decode(data: bytes, response=None) -> str:
+def smart_decode(data: bytes, response=None, metrics: Optional[FetchMetrics] = None) -> str:
     """
     智能解码函数，支持多种编码检测
-    优先级：HTTP头 > HTML meta > 降级链
-    
+    优先级：BOM > HTTP头 > HTML meta > UTF-8采样校验 > 中文编码统计检测
+    编码先在有界样本上判定，整个文档只解码一次。
+
     Args:
         data: 要解码的字节数据
         response: HTTP响应对象（可选）
-        
+        metrics: 记录所用编码及其来源（可选）
+
     Returns:
         str: 解码后的字符串
     """
-    detected_encoding = None
-    
-    # 1. 从HTTP响应头提取charset
-    if response:
-        detected_encoding = extract_charset_from_headers(response)
-        if detected_encoding:
-            logging.debug(f"Detected encoding from headers: {detected_encoding}")
-    
-    # 2. 如果HTTP头没有找到，从HTML meta标签检测
-    if not detected_encoding:
-        detected_encoding = extract_charset_from_html(data)
-        if detected_encoding:
-            logging.debug(f"Detected encoding from HTML meta: {detected_encoding}")
-    
-    # 3. 使用降级链解码
+    declared = extract_charset_from_headers(response) if response else None
+
     try:
-        return try_decode_with_fallback(data, detected_encoding)
+        decoded = decode_html(data, declared)
     except Exception as e:
         logging.warning(f"Smart decode failed, falling back to UTF-8: {e}")
+        if metrics:
+            metrics.encoding, metrics.encoding_source = 'utf-8', 'error'
         return data.decode('utf-8', errors='ignore')
 
+    logging.debug(f"Decoded as {decoded.encoding} (source: {decoded.source}"
+                  f"{', with replacements' if decoded.errors_replaced else ''})")
+    if metrics:
+        metrics.encoding = decoded.encoding
+        metrics.encoding_source = decoded.source
+    return decoded.text
 
-def fetch_html_original(url: str, ua: Optional[str] = None, timeout: int = 30) -> tuple[str, FetchMetrics, str]:
+
+@timed('urllib')
+def fetch_html_original(url: str, ua: Optional[str] = None, timeout: int = 30,
+                        byte_budget: Optional[int] = None,
+                        on_head: Optional[Callable] = None) -> tuple[str, FetchMetrics, str]:
     """
     Fetch HTML using urllib with enhanced SSL error handling.
 
+    The body is streamed and decoded incrementally; the parsed <head>
+    (title, og:*, charset) is passed to ``on_head`` as soon as it arrives.
+    fetch_html_with_retry uses it to fill FetchMetrics and to evaluate
+    routing rules with head_* conditions; raising from on_head (HeadRouted)
+    stops the read.
+    正文流式读取并增量解码；<head> 到达后立即回调 on_head（用于记录标题并评估 head 路由规则）。
+
+    Args:
+        byte_budget: Maximum body bytes (default MAX_PAGE_SIZE) / 最大读取字节数
+        on_head: Callback receiving a HeadInfo / 接收 HeadInfo 的回调
+
     Returns:
         tuple[str, FetchMetrics, str]: (html_content, fetch_metrics, final_url)
                                        final_url is the URL after following redirects
+
+    Raises:
+        NonHTMLContentError: The response is not HTML (body is not buffered)
     """
     metrics = FetchMetrics(primary_method="urllib")
     ua = ua or "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0 Safari/537.36"
     req = urllib.request.Request(url, headers={"User-Agent": ua, "Accept-Language": "zh-CN,zh;q=0.9"})
     
+    r = None
     try:
         # Use unverified SSL context for sites with legacy SSL configurations
-        with urllib.request.urlopen(req, timeout=timeout, context=ssl_context_unverified) as r:
-            try:
-                data = r.read(MAX_PAGE_SIZE)  # Limit read size
-                # Check if there's more data and truncate if needed
-                remaining = r.read(1)
-                if remaining:
-                    logging.warning(f"Page truncated at {MAX_PAGE_SIZE} bytes: {url}")
-            except http_client.IncompleteRead as e:
-                logging.warning(f"Incomplete read, using partial data: {len(e.partial or b'')} bytes")
-                data = (e.partial or b"")
-            # 使用智能解码替代简单的UTF-8解码
-            html = smart_decode(data, r)
-
-            # Task-003 Phase 1: Capture final URL after redirects
-            final_url = r.geturl()
-            logging.debug(f"Task-003: Final URL after redirects: {final_url}")
+        # DNS, TCP/TLS handshake and response headers / DNS、握手与响应头
+        with span('connect'):
+            r = urllib.request.urlopen(req, timeout=timeout, context=ssl_context_unverified)
+        metrics.content_type = r.headers.get('Content-Type', '')
+        # 流式读取并增量解码（非 HTML 类型在读取正文前即中止）
+        with span('read_decode'):
+            document = read_html_stream(r, url, byte_budget or MAX_PAGE_SIZE, on_head=on_head)
+        html = document.text
+        metrics.encoding = document.encoding
+        metrics.encoding_source = document.encoding_source
+        metrics.bytes_read = document.bytes_read
+        metrics.truncated = document.truncated
+
+        # Task-003 Phase 1: Capture final URL after redirects
+        final_url = r.geturl()
+        logging.debug(f"Task-003: Final URL after redirects: {final_url}")
+
+        metrics.final_status = "success"
+        return html, metrics, final_url
+
+    except NonHTMLContentError as e:
+        # The unread response now belongs to the caller (download without refetching)
+        r = None
+        metrics.final_status = "failed"
+        metrics.error_message = str(e)
+        raise
+
+    except HeadRouted:
+        # on_head rerouted the page; the rest of the body is not needed
+        metrics.final_status = "failed"
+        raise
 
-            metrics.final_status = "success"
-            return html, metrics, final_url
-            
     except Exception as e:
         # If SSL error, provide enhanced error reporting
         if "SSL" in str(e) or "CERTIFICATE" in str(e).upper():
@@ -2165,6 +2480,10 @@ def fetch_html_original(url: str, ua: Optional[str] = None, timeout: int = 30) -
         metrics.error_message = str(e)
         raise
 
+    finally:
+        if r is not None:
+            r.close()
+
 # Public interface - using direct urllib with retry fallback
 fetch_html = fetch_html_with_retry
 fetch_html_with_metrics = fetch_html_with_retry
@@ -2388,6 +2707,7 @@ def resolve_redirects_with_get(url: str, ua: str, timeout: int, max_redirects: i
     return current_url, was_redirected
 
 
+@timed('resolve_redirects')
 def get_effective_host(url: str, ua: Optional[str] = None) -> str:
     """
     Gets the effective hostname after resolving redirects.
@@ -2419,53 +2739,37 @@ def get_effective_host(url: str, ua: Optional[str] = None) -> str:
         return urllib.parse.urlparse(url).hostname or ''
 
 
+@timed('render')
 def try_render_with_metrics(url: str, ua: Optional[str] = None, timeout_ms: int = 60000) -> tuple[Optional[str], FetchMetrics]:
     """
     Try to render page with Playwright and track metrics.
-    
+
+    Uses the shared render service so the browser is launched once per process
+    and reused across batch URLs and crawled pages.
+    使用共享渲染服务，浏览器每个进程只启动一次，批量与爬取模式共用。
+
     Returns:
         tuple[Optional[str], FetchMetrics]: (html_content, fetch_metrics)
     """
     metrics = FetchMetrics(primary_method="playwright")
-    start_time = time.time()
-    
-    try:
-        from playwright.sync_api import sync_playwright
-    except Exception as e:
-        metrics.render_duration = time.time() - start_time
+
+    if get_render_service is None or not PLAYWRIGHT_AVAILABLE:
         metrics.final_status = "failed"
-        metrics.error_message = f"Playwright not available: {e}"
+        metrics.error_message = "Playwright not available"
         return None, metrics
-        
-    html = None
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=['--no-sandbox','--disable-blink-features=AutomationControlled'])
-            ctx = browser.new_context(user_agent=ua or 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148', locale='zh-CN', viewport={'width':390,'height':844}, device_scale_factor=3)
-            page = ctx.new_page()
-            page.set_extra_http_headers({'Accept-Language':'zh-CN,zh;q=0.9'})
-            # Relaxed waiting strategy to avoid networkidle stalls
-            page.goto(url, wait_until='domcontentloaded', timeout=timeout_ms)
-            page.wait_for_load_state('load', timeout=timeout_ms)
-            page.wait_for_timeout(800)
-            try:
-                page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                page.wait_for_timeout(600)
-            except Exception:
-                pass
-            html = page.content()
-            ctx.close(); browser.close()
-            
-        metrics.render_duration = time.time() - start_time
-        metrics.final_status = "success"
-        return html, metrics
-        
-    except Exception as e:
-        metrics.render_duration = time.time() - start_time
+
+    result = get_render_service().render(url, ua=ua, timeout_ms=timeout_ms)
+    metrics.render_duration = result.duration
+    metrics.total_attempts = 1
+
+    if result.html is None:
         metrics.final_status = "failed"
-        metrics.error_message = str(e)
+        metrics.error_message = result.error
         return None, metrics
 
+    metrics.final_status = "success"
+    return result.html, metrics
+
 
 def try_render(url: str, ua: Optional[str] = None, timeout_ms: int = 60000) -> Optional[str]:
     """Legacy interface for try_render"""
@@ -3057,51 +3361,94 @@ def is_same_section(current_url: str, next_url: str) -> bool:
     return (c_parts.netloc == n_parts.netloc and 
             n_parts.path.startswith(c_parts.path.rsplit('/', 2)[0]))
 
-def process_pagination(initial_url: str, initial_html: str, parser_func, ua: str) -> list:
-    """Follow pagination links and collect all pages."""
+def iter_pagination(initial_url: str, initial_html: str, parser_func, ua: str,
+                    prefetch: int = DEFAULT_PAGINATION_PREFETCH, parser_name: Optional[str] = None):
+    """
+    Follow pagination links and yield each parsed page as soon as it is parsed.
+    跟随分页链接，逐页产出解析结果。
+
+    The next pages are fetched `prefetch` ahead on worker threads while the
+    current one is parsed, so a chain costs about one round trip per
+    `prefetch` pages instead of one per page.
+    解析当前页的同时在后台线程预取后续 prefetch 个页面。
+
+    Args:
+        initial_url: URL of the first page / 第一页 URL
+        initial_html: HTML of the first page / 第一页 HTML
+        parser_func: parser(html, url) -> (date, markdown, metadata)
+        ua: User agent string / User Agent
+        prefetch: Pages fetched ahead concurrently (0 disables) / 预取页数
+        parser_name: Name for site-specific next links (default: parser_func.__name__) / 解析器名称
+    """
+    parser_name = parser_name or getattr(parser_func, '__name__', '')
+    prefetcher = PaginationPrefetcher(lambda url: _prefetch_page(url, ua),
+                                      ahead=prefetch, normalize=normalize_url_for_dedup)
     visited = set()
-    pages = []
     current_url = initial_url
     current_html = initial_html
     depth = 0
     
-    while depth < MAX_PAGINATION_DEPTH and current_url not in visited:
-        try:
+    try:
+        while depth < MAX_PAGINATION_DEPTH and current_url not in visited:
             visited.add(current_url)
-            logging.info(f"Processing page {depth + 1}: {current_url}")
-            pages.append(parser_func(current_html, current_url))
+            next_url = find_next_url(current_html, current_url, parser_name) or find_next_page(current_html, current_url)
+            if next_url and not is_same_section(current_url, next_url):
+                logging.info("Pagination stopped: different section")
+                next_url = None
+            if next_url:
+                # Start fetching ahead before parsing this page
+                prefetcher.prefetch(pagination_chain(current_url, next_url, min(prefetch, MAX_PAGINATION_DEPTH - depth - 1)))
             
-            next_url = find_next_url(current_html, current_url, parser_func.__name__)
-            if not next_url or not is_same_section(current_url, next_url):
-                logging.info(f"Pagination stopped: {'no next URL' if not next_url else 'different section'}")
+            try:
+                logging.info(f"Processing page {depth + 1}: {current_url}")
+                page = parser_func(current_html, current_url)
+            except Exception as e:
+                logging.warning(f"Pagination stopped at depth {depth}: {e}")
+                break
+            yield page
+            
+            if not next_url:
+                logging.info("Pagination stopped: no next URL")
+                break
+            
+            try:
+                logging.info(f"Following pagination to: {next_url}")
+                current_html = prefetcher.take(next_url)
+                if current_html is None:
+                    current_html, _, _ = fetch_html(next_url, ua=ua, timeout=30)
+            except Exception as e:
+                logging.warning(f"Pagination stopped at depth {depth}: {e}")
                 break
-                
-            logging.info(f"Following pagination to: {next_url}")
-            current_html, _ = fetch_html(next_url, ua=ua, timeout=30)  # Fix: properly unpack tuple return value
             current_url = next_url
             depth += 1
-            
-        except Exception as e:
-            logging.warning(f"Pagination stopped at depth {depth}: {e}")
-            break
-    
-    return pages
+    finally:
+        prefetcher.close()
 
-def aggregate_multi_page_content(pages: list) -> tuple[str, str, dict]:
-    """Merge multiple page contents into single markdown document."""
-    if not pages:
+def process_pagination(initial_url: str, initial_html: str, parser_func, ua: str) -> list:
+    """Follow pagination links and collect all pages."""
+    return list(iter_pagination(initial_url, initial_html, parser_func, ua))
+
+def aggregate_multi_page_content(pages) -> tuple[str, str, dict]:
+    """Merge multiple page contents into single markdown document.
+    
+    Accepts any iterable of (date, content, metadata), including the
+    iter_pagination() generator; pages are merged as they arrive, so
+    fetching later pages overlaps with merging earlier ones.
+    """
+    pages = iter(pages)
+    first = next(pages, None)
+    if first is None:
         return '', '', {}
     
-    first_date, first_content, first_metadata = pages[0]
-    if len(pages) == 1:
-        return first_date, first_content, first_metadata
+    first_date, first_content, first_metadata = first
     
     # Combine all content
     all_content = [first_content]
-    all_images = list(first_metadata.get('images', []))
+    all_images = dict.fromkeys(first_metadata.get('images', []))  # ordered set
+    pages_count = 1
     
-    for i in range(1, len(pages)):
-        date, content, metadata = pages[i]
+    for date, content, metadata in pages:
+        pages_count += 1
         # Extract body content (skip header metadata lines)
         lines = content.split('\n')
         body_start = 0
@@ -3115,12 +3462,15 @@ def aggregate_multi_page_content(pages: list) -> tuple[str, str, dict]:
             all_content.append(f"\n---\n\n{body_content}")
         
         # Aggregate images
-        all_images.extend(metadata.get('images', []))
+        all_images.update(dict.fromkeys(metadata.get('images', [])))
+    
+    if pages_count == 1:
+        return first
     
     # Create combined metadata
     combined_metadata = first_metadata.copy()
-    combined_metadata['images'] = list(set(all_images))
-    combined_metadata['pages_count'] = len(pages)
+    combined_metadata['images'] = list(all_images)
+    combined_metadata['pages_count'] = pages_count
     
     return first_date, '\n'.join(all_content), combined_metadata
 
@@ -3224,7 +3574,21 @@ def resolve_url_with_context(base_url: str, href: str) -> str:
     # Default to standard urljoin for other cases
     return urllib.parse.urljoin(base_url, href)
 
-def extract_internal_links(html: str, base_url: str, enable_doc_filter: bool = False) -> dict:
+_ANCHOR_RE = re.compile(r'<a\b[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))[^>]*>(.*?)</a\s*>',
+                        re.I | re.S)
+
+def _anchor_texts(html: str) -> dict:
+    """Map each href to its longest anchor text / 链接到其最长锚文本的映射"""
+    texts = {}
+    for match in _ANCHOR_RE.finditer(html):
+        href = match.group(1) or match.group(2) or match.group(3) or ''
+        text = ' '.join(ihtml.unescape(re.sub(r'<[^>]+>', ' ', match.group(4))).split())[:200]
+        if len(text) > len(texts.get(href, '')):
+            texts[href] = text
+    return texts
+
+def extract_internal_links(html: str, base_url: str, enable_doc_filter: bool = False,
+                           anchor_texts: Optional[dict] = None) -> dict:
     """Extract all internal links from HTML content with smart subdirectory resolution.
     Returns dict mapping normalized URLs to original URLs for case-preserving fetching.
     Enhanced to support both quoted and unquoted href attributes.
@@ -3233,9 +3597,11 @@ def extract_internal_links(html: str, base_url: str, enable_doc_filter: bool = F
         html: HTML content to extract links from
         base_url: Base URL for resolving relative links
         enable_doc_filter: If True, apply is_documentation_url filter during extraction
+        anchor_texts: If given, filled with normalized URL -> anchor text
     """
     links = {}  # normalized_url -> original_url
     base_parts = urllib.parse.urlparse(base_url)
+    href_texts = _anchor_texts(html) if anchor_texts is not None else None
     
     # Support multiple href patterns for modern web compatibility
     href_patterns = [
@@ -3271,6 +3637,10 @@ def extract_internal_links(html: str, base_url: str, enable_doc_filter: bool = F
                 # Map normalized URL to original URL for case-preserving fetching
                 normalized = normalize_url_for_dedup(full_url)
                 links[normalized] = full_url
+                if href_texts is not None:
+                    text = href_texts.get(href, '')
+                    if len(text) > len(anchor_texts.get(normalized, '')):
+                        anchor_texts[normalized] = text
     
     return links
 
@@ -3458,7 +3828,8 @@ def parse_sitemap(sitemap_url: str, ua: str) -> list:
     return urls
 
 def crawl_from_sitemap(start_url: str, ua: str, max_pages: int = 1000,
-                       delay: float = 0.5, **kwargs) -> list:
+                       delay: float = 0.5, journal: Optional[CrawlJournal] = None,
+                       **kwargs) -> list:
     """
     Crawl a website using sitemap.xml as the primary URL source.
     使用 sitemap.xml 作为主要 URL 来源爬取网站。
@@ -3471,7 +3842,9 @@ def crawl_from_sitemap(start_url: str, ua: str, max_pages: int = 1000,
         ua: User agent string
         max_pages: Maximum number of pages to crawl
         delay: Delay between requests
-        **kwargs: Additional arguments to pass to crawl_site() if fallback is needed
+        journal: Checkpoint journal to record to / resume from (see crawl_site)
+        **kwargs: Additional arguments to pass to crawl_site() if fallback is needed;
+                  near_dup_distance also applies to sitemap pages
 
     Returns:
         List of (url, html, depth) tuples, same format as crawl_site()
@@ -3483,7 +3856,7 @@ def crawl_from_sitemap(start_url: str, ua: str, max_pages: int = 1000,
 
     if not sitemaps:
         logging.info("No sitemaps found, falling back to BFS crawling / 未找到sitemap，回退到BFS爬取")
-        return crawl_site(start_url, ua, max_pages=max_pages, delay=delay, **kwargs)
+        return crawl_site(start_url, ua, max_pages=max_pages, delay=delay, journal=journal, **kwargs)
 
     # Step 2: Parse all discovered sitemaps
     all_urls = []
@@ -3494,7 +3867,7 @@ def crawl_from_sitemap(start_url: str, ua: str, max_pages: int = 1000,
 
     if not all_urls:
         logging.warning("Sitemaps found but no URLs extracted, falling back to BFS / Sitemap已找到但无URL提取，回退到BFS")
-        return crawl_site(start_url, ua, max_pages=max_pages, delay=delay, **kwargs)
+        return crawl_site(start_url, ua, max_pages=max_pages, delay=delay, journal=journal, **kwargs)
 
     logging.info(f"Extracted {len(all_urls)} URLs from sitemaps / 从sitemap提取了 {len(all_urls)} 个URL")
 
@@ -3521,20 +3894,46 @@ def crawl_from_sitemap(start_url: str, ua: str, max_pages: int = 1000,
     urls_to_fetch = all_urls[:max_pages]
     logging.info(f"Will fetch {len(urls_to_fetch)} URLs (limited by max_pages={max_pages}) / 将获取 {len(urls_to_fetch)} 个URL")
 
-    # Step 5: Fetch each URL from sitemap
+    # Step 5: Fetch each URL from sitemap (pages already in the journal are not refetched)
     results = []
+    done = set()
+    near_dup_distance = kwargs.get('near_dup_distance')
+    near_dups = NearDuplicateDetector(near_dup_distance) if near_dup_distance is not None else None
+    if journal is not None:
+        for url, html, depth in journal.iter_pages():
+            results.append((url, html, depth))
+            done.add(normalize_url_for_dedup(url))
+            if near_dups is not None:
+                near_dups.add(url, html)
+        done.update(normalize_url_for_dedup(url) for url, _ in journal.state.failed)
+        done.update(normalize_url_for_dedup(url) for url, _ in journal.state.duplicates)
+        if done:
+            logging.info(f"Resuming crawl {journal.crawl_id}: {journal.state.pages} pages restored / 恢复爬取")
     for i, url_dict in enumerate(urls_to_fetch):
         url = url_dict['url']
+        if normalize_url_for_dedup(url) in done:
+            continue
 
         try:
             logging.info(f"[{i+1}/{len(urls_to_fetch)}] Fetching: {url}")
 
-            # Fetch the page
-            html = fetch_html(url, ua)
-
-            if html:
+            # Fetch the page (shared render service when --render always)
+            html = None
+            if kwargs.get('render'):
+                html, _ = try_render_with_metrics(url, ua=ua, timeout_ms=30000)
+            if html is None:
+                html, _, _ = fetch_html(url, ua)
+
+            duplicate_of = near_dups.check(url, html) if html and near_dups is not None else None
+            if duplicate_of is not None:
+                logging.warning(f"Near-duplicate skipped / 近重复页面已跳过: {url} (matches {duplicate_of})")
+                if journal is not None:
+                    journal.record_duplicate(url, 0, duplicate_of)
+            elif html:
                 # Add to results (depth=0 for sitemap-sourced URLs)
                 results.append((url, html, 0))
+                if journal is not None:
+                    journal.record_page(url, 0, html)
             else:
                 logging.warning(f"Failed to fetch: {url}")
 
@@ -3543,10 +3942,23 @@ def crawl_from_sitemap(start_url: str, ua: str, max_pages: int = 1000,
                 time.sleep(delay)
 
         except Exception as e:
+            if isinstance(e, NonHTMLContentError):
+                e.close()  # release the unread response / 释放未读取的响应
             logging.error(f"Error fetching {url}: {e}")
+            if journal is not None:
+                journal.record_failure(url, 0, str(e))
             continue
+        finally:
+            if journal is not None and journal.checkpoint_due():
+                journal.checkpoint()
+
+    if journal is not None:
+        journal.finish()
 
     logging.info(f"Sitemap crawl completed: {len(results)}/{len(urls_to_fetch)} pages fetched successfully")
+    if near_dups is not None:
+        restored = len(journal.state.duplicates) if journal is not None else 0
+        logging.info(f"Near-duplicates skipped: {near_dups.duplicates + restored} pages")
 
     return results
 
@@ -3715,76 +4127,167 @@ def extract_site_categories(url: str, html: str) -> list:
         
     return categories
 
+def _fetch_crawl_page(url: str, ua: str, render: bool = False) -> str:
+    """Fetch one crawl page, through the shared render service when asked / 获取单个爬取页面"""
+    html = None
+    if render:
+        html, _ = try_render_with_metrics(url, ua=ua, timeout_ms=30000)
+    if html is None:
+        html, _, _ = fetch_html(url, ua=ua, timeout=30)
+    return html
+
+def _prefetch_page(url: str, ua: str, render: bool = False) -> Optional[str]:
+    """
+    Speculative fetch of a pagination page that may not exist / 推测性预取可能不存在的分页页面
+
+    Pages past the end of an extrapolated chain answer 404, which says nothing
+    about the host, so this makes a single urllib attempt (or one render) and
+    records nothing in the host outcome store or the circuit breakers. Returns
+    None when the guess fails, the host's circuit is not closed, or the page
+    needs a browser; the crawl then fetches it normally if it is really linked.
+    仅尝试一次且不记录主机结果与熔断状态；失败时返回 None，由爬虫按需正常抓取。
+    """
+    if render:
+        html, _ = try_render_with_metrics(url, ua=ua, timeout_ms=30000)
+        return html
+    host = urllib.parse.urlparse(url).hostname
+    if host_circuit_breakers.state(host) != CircuitState.CLOSED or render_host_memo.needs_rendering(host):
+        return None
+    try:
+        html, _, _ = fetch_html_original(url, ua, timeout=30)
+    except NonHTMLContentError as e:
+        e.close()
+        logging.debug(f"Prefetch of {url} skipped: {e}")
+        return None
+    except Exception as e:
+        logging.debug(f"Prefetch of {url} failed: {type(e).__name__}: {e}")
+        return None
+    return None if score_content(html).is_soft_failure else html
+
 def crawl_site_by_categories(start_url: str, ua: str, categories: list, **kwargs):
     """
     Crawl site with category-first strategy for government sites.
-    
+    使用分类优先策略爬取政府网站。
+
+    All categories share one CrawlFrontier: a page linked from several
+    categories (shared articles, headers, the homepage) is fetched once, by the
+    category that reached it first, and worker threads crawl the categories in
+    parallel, weighted by category priority.
+    所有分类共享一个 CrawlFrontier：被多个分类链接的页面只抓取一次，工作线程按分类
+    优先级加权并行爬取各分类。
+
     Args:
         start_url: Starting URL
         ua: User agent string
         categories: List of category dicts from extract_site_categories()
-        **kwargs: Additional arguments passed to crawl_site()
+        **kwargs: max_depth, max_pages, delay, enable_optimizations, render,
+                  max_workers, seen_set, frontier_memory, and homepage_html
+                  (already fetched start page)
         
     Yields:
-        Iterator of (category_info, pages) tuples for progressive results
+        Iterator of (category_info, pages) tuples for progressive results,
+        in priority order
     """
     # Extract parameters for individual category crawls
-    max_depth = kwargs.get('max_depth', 3)
-    max_pages_per_category = min(kwargs.get('max_pages', 1000) // max(len(categories), 1), 100)
+    max_depth = min(kwargs.get('max_depth', 3), 2)  # Limit depth per category
+    max_pages = kwargs.get('max_pages', 1000)
+    max_pages_per_category = min(max_pages // max(len(categories), 1), 100)
     delay = kwargs.get('delay', 0.5)
     enable_optimizations = kwargs.get('enable_optimizations', True)
+    render = kwargs.get('render', False)
+    max_workers = max(1, min(kwargs.get('max_workers', CATEGORY_CRAWL_WORKERS), len(categories)))
     
     logging.info(f"Starting category-first crawl with {len(categories)} categories")
-    logging.info(f"Max {max_pages_per_category} pages per category")
-    
-    all_pages = []
-    total_crawled = 0
+    logging.info(f"Max {max_pages_per_category} pages per category, {max_workers} workers")
     
     # Sort categories by priority for crawling order
     sorted_categories = sorted(categories, key=lambda x: (-x['priority'], x['name']))
     
-    for i, category in enumerate(sorted_categories):
-        if total_crawled >= kwargs.get('max_pages', 1000):
-            break
-            
-        category_name = category['name']
-        category_url = category['url']
-        category_priority = category['priority']
-        
-        logging.info(f"[{i+1}/{len(sorted_categories)}] Crawling category '{category_name}' (priority {category_priority})")
-        
-        try:
-            # Crawl this category with limited scope
-            category_pages = crawl_site(
-                category_url,
-                ua,
-                max_depth=min(max_depth, 2),  # Limit depth per category
-                max_pages=max_pages_per_category,
-                delay=delay,
-                enable_optimizations=enable_optimizations,
-                crawl_strategy='default'  # Use default strategy for individual categories
-            )
-            
-            logging.info(f"Category '{category_name}' yielded {len(category_pages)} pages")
+    frontier = CrawlFrontier(normalize_url_for_dedup, max_pages=max_pages, min_interval=delay,
+                             seen=make_seen_set(kwargs.get('seen_set', DEFAULT_SEEN_SET)),
+                             memory_items=kwargs.get('frontier_memory', DEFAULT_FRONTIER_MEMORY))
+    if kwargs.get('homepage_html') is not None:
+        frontier.mark_seen(start_url)
+    keys = []
+    for category in sorted_categories:
+        key = frontier.add_category(category['name'], category['priority'], max_pages_per_category)
+        frontier.push(category['url'], 0, key)
+        keys.append(key)
+
+    def worker():
+        while True:
+            entry = frontier.pop()
+            if entry is None:
+                return
+            page = None
+            try:
+                logging.info(f"[{frontier.stats()['fetched'] + 1}/{max_pages}] "
+                             f"Category '{sorted_categories[entry.category]['name']}' "
+                             f"depth {entry.depth}: {entry.url}")
+                html = _fetch_crawl_page(entry.url, ua, render)
+                page = (entry.url, html, entry.depth)
+                
+                # Queue new links before completing, so the frontier is never seen drained early
+                if entry.depth < max_depth:
+                    link_mapping = extract_internal_links(html, entry.url, enable_doc_filter=enable_optimizations)
+                    doc_links = [(norm, orig) for norm, orig in link_mapping.items()
+                                 if enable_optimizations or is_documentation_url(orig)]
+                    queued = 0
+                    for normalized_link, original_link in sorted(doc_links):
+                        if frontier.push(original_link, entry.depth + 1, entry.category, normalized_link):
+                            queued += 1
+                            if queued >= 50:  # Limit per-page discoveries
+                                break
+            except NonHTMLContentError as e:
+                # PDF/image links are not pages; release the unread response
+                e.close()
+                logging.info(f"Skipped non-HTML link {entry.url}: {e.content_type or 'unknown type'}")
+                page = None
+            except Exception as e:
+                logging.warning(f"Failed to crawl {entry.url}: {e}")
+                page = None
+            finally:
+                frontier.complete(entry, page)
+
+    total_crawled = 0
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wf-category')
+    try:
+        for _ in range(max_workers):
+            executor.submit(worker)
+
+        for i, (category, key) in enumerate(zip(sorted_categories, keys)):
+            category_pages = frontier.wait_category(key)
+            logging.info(f"[{i+1}/{len(sorted_categories)}] Category '{category['name']}' "
+                         f"(priority {category['priority']}) yielded {len(category_pages)} pages")
             
             # Yield progressive results
             category_info = {
-                'name': category_name,
-                'url': category_url,
-                'priority': category_priority,
+                'name': category['name'],
+                'url': category['url'],
+                'priority': category['priority'],
                 'pages_count': len(category_pages)
             }
             
             yield (category_info, category_pages)
-            
-            all_pages.extend(category_pages)
             total_crawled += len(category_pages)
-            
-        except Exception as e:
-            logging.warning(f"Failed to crawl category '{category_name}': {e}")
-            continue
-    
-    logging.info(f"Category-first crawl completed: {total_crawled} total pages from {len(sorted_categories)} categories")
+    finally:
+        # Also reached when the consumer stops iterating early
+        frontier.close()
+        executor.shutdown(wait=True)
+    
+    stats = frontier.stats()
+    logging.info(f"Category-first crawl completed: {total_crawled} total pages from {len(sorted_categories)} categories "
+                 f"({stats['failed']} failed, {stats['duplicates_skipped']} duplicate links skipped)")
+    logging.info(f"Memory: seen-set {format_bytes(stats['seen_bytes'])} for {stats['seen']} URLs, "
+                 f"RSS {format_bytes(current_rss_bytes())}")
+
+def _report_crawl_memory(stats: dict, seen, queue) -> None:
+    """Sample process RSS into the crawl stats and log the crawl state footprint / 采样并记录爬取内存占用"""
+    rss = current_rss_bytes()
+    stats['rss_bytes'] = rss
+    stats['peak_rss_bytes'] = max(stats['peak_rss_bytes'], rss or 0)
+    logging.info(f"Memory: RSS {format_bytes(rss)}, seen-set {format_bytes(seen.memory_bytes())} "
+                 f"for {len(seen)} URLs ({seen.kind}), queue {queue.in_memory} in memory / {queue.on_disk} on disk")
 
 def crawl_site(start_url: str, ua: str, max_depth: int = 10,
                max_pages: int = 1000, delay: float = 0.5,
@@ -3796,10 +4299,25 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
                crawl_strategy: str = 'default',
                # Stage 1.3 memory optimization
                memory_efficient: bool = False,
-               page_callback = None) -> list:
+               page_callback = None,
+               render: bool = False,
+               # Compact seen-set and disk-spilling frontier
+               seen_set: str = DEFAULT_SEEN_SET,
+               frontier_memory: int = DEFAULT_FRONTIER_MEMORY,
+               # Checkpointing / resume
+               journal: Optional[CrawlJournal] = None,
+               # Near-duplicate detection
+               near_dup_distance: Optional[int] = None,
+               follow_duplicate_links: bool = True,
+               # Best-first frontier
+               crawl_order: str = DEFAULT_CRAWL_ORDER,
+               priority_config: Optional[str] = None,
+               link_scorer=None,
+               sitemap_priorities: Optional[dict] = None,
+               pagination_prefetch: int = DEFAULT_PAGINATION_PREFETCH) -> list:
     """
-    Crawl entire site using BFS algorithm.
-    使用 BFS 算法爬取整个站点。
+    Crawl entire site, best-first by default or in plain BFS order.
+    爬取整个站点，默认按最佳优先顺序，也可按 BFS 顺序。
 
     Returns list of (url, html, depth) tuples.
     返回 (url, html, depth) 元组列表。
@@ -3810,12 +4328,26 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
         max_depth: Maximum crawling depth / 最大爬取深度
         max_pages: Maximum number of pages to crawl / 最大爬取页面数
         delay: Delay between requests in seconds / 请求间隔秒数
-        follow_pagination: Follow pagination links (Task-008 Phase 1) / 跟随分页链接（Task-008 Phase 1）
+        follow_pagination: Follow "next page" links first, at the same depth (Task-008 Phase 1) / 优先跟随分页链接（同一深度）
         same_domain_only: Only crawl same domain (Task-008 Phase 1) / 仅爬取同域名（Task-008 Phase 1）
         enable_optimizations: Enable Stage 1 optimizations / 启用Stage 1优化
         crawl_strategy: Crawling strategy / 爬取策略
         memory_efficient: Enable memory optimization / 启用内存优化
         page_callback: Optional callback for streaming / 流式处理的可选回调
+        render: Render pages with the shared Playwright service / 使用共享 Playwright 服务渲染页面
+        seen_set: Seen-set kind: exact, bloom or strings (see webfetcher.crawl.seen) / 已见集合类型
+        frontier_memory: Queue entries kept in memory before spilling to disk / 队列溢出到磁盘前的内存条目数
+        journal: Checkpoint journal to record to, or to resume from when it
+                 already holds crawl state / 检查点日志，已有状态时从中恢复
+        near_dup_distance: SimHash distance (bits) under which a page counts as a
+                           near-duplicate and is not kept; None (default) disables / 近重复阈值，默认 None 不检测
+        follow_duplicate_links: Still queue links found on near-duplicate pages / 是否跟随近重复页面中的链接
+        crawl_order: 'best-first' (highest-scoring link next, see webfetcher.crawl.priority)
+                     or 'bfs' (discovery order) / 爬取顺序
+        priority_config: YAML overriding config/crawl_priority.yaml / 覆盖默认评分配置的 YAML
+        link_scorer: Callable(LinkInfo) -> float used instead of the configured scorer / 自定义评分函数
+        sitemap_priorities: Normalized URL -> sitemap <priority>, used in scoring / sitemap 优先级
+        pagination_prefetch: Pagination pages fetched ahead concurrently (0 disables) / 并发预取的分页页数
     """
     # Initialize crawl statistics
     stats = {
@@ -3824,12 +4356,43 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
         'pages_failed': 0,
         'total_size': 0,
         'start_time': time.time(),
-        'failed_urls': []  # Track failed URLs for detailed reporting
+        'failed_urls': [],  # Track failed URLs for detailed reporting
+        'rss_bytes': None,
+        'peak_rss_bytes': 0,
+        'near_duplicates': 0,  # Fetched but skipped as copies of earlier pages
+        'pagination_links': 0
     }
     
-    visited_normalized = set()  # For deduplication using normalized URLs
-    url_mapping = {}  # Maps normalized URLs to original URLs for fetching
-    queue = deque([(start_url, 0)])  # (original_url, depth) - keep original URL
+    # Normalized URLs already queued or fetched, deduplicated at enqueue time
+    seen = make_seen_set(seen_set)
+    # Content fingerprints catch the same page under different URLs
+    near_dups = NearDuplicateDetector(near_dup_distance) if near_dup_distance is not None else None
+    
+    # Best-first scores every queued link; bfs keeps discovery order
+    best_first = crawl_order == 'best-first'
+    if best_first:
+        priority = load_priority_config(priority_config)
+        queue = BestFirstQueue(link_scorer or make_link_scorer(priority), memory_items=frontier_memory,
+                               host_fairness=float(priority.get('host_fairness', 0.5)),
+                               sitemap_priorities=sitemap_priorities)
+    else:
+        queue = SpillQueue(memory_items=frontier_memory)  # (original_url, depth) - keep original URL
+    
+    def enqueue(url: str, depth: int):
+        if best_first:
+            queue.push(url, depth, normalize_url_for_dedup(url))
+        else:
+            queue.append((url, depth))
+    
+    # Every fetch, prefetches included, starts at least `delay` after the previous one
+    pacer = FetchPacer(delay)
+    
+    # Pagination chains are fetched ahead on worker threads while pages are processed
+    prefetcher = None
+    if follow_pagination and pagination_prefetch > 0:
+        prefetcher = PaginationPrefetcher(lambda url: _prefetch_page(url, ua, render),
+                                          ahead=pagination_prefetch, normalize=normalize_url_for_dedup,
+                                          pace=pacer.wait)
     
     # Stage 1.3: Memory-efficient page storage
     if memory_efficient:
@@ -3839,14 +4402,56 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
     else:
         pages = []  # Traditional full storage
     
+    def keep_page(url: str, html: str, depth: int):
+        if memory_efficient:
+            # Add to batch for processing
+            page_batch.append((url, html, depth))
+            
+            # Process batch when full
+            if len(page_batch) >= batch_size:
+                if page_callback:
+                    page_callback(page_batch.copy())  # Send copy to callback
+                # Keep only metadata for final result (no HTML content)
+                for batch_url, _, d in page_batch:
+                    pages.append((batch_url, '', d))
+                page_batch.clear()
+        else:
+            # Traditional full storage
+            pages.append((url, html, depth))
+    
+    if journal is not None and journal.state.queued:
+        # Resume: the queue is replayed into the seen-set and frontier, pages are streamed from disk
+        state = journal.state
+        pending = journal.replay_queue(seen, enqueue)
+        for url, html, depth in journal.iter_pages():
+            keep_page(url, html, depth)
+            stats['total_size'] += len(html.encode('utf-8'))
+            if near_dups is not None:
+                near_dups.add(url, html)
+        stats['pages_success'] = state.pages
+        stats['pages_failed'] = len(state.failed)
+        stats['near_duplicates'] = len(state.duplicates)
+        stats['pages_crawled'] = state.pages + len(state.failed) + len(state.duplicates)
+        stats['failed_urls'] = list(state.failed)
+        stats['start_time'] -= state.stats.get('elapsed', 0)
+        logging.info(f"Resuming crawl {journal.crawl_id}: {state.pages} pages restored, "
+                     f"{pending} URLs pending / 恢复爬取")
+    else:
+        seen.add(normalize_url_for_dedup(start_url))
+        enqueue(start_url, 0)
+        if journal is not None:
+            journal.record_queue([(start_url, 0)])
+    
     logging.info(f"Starting site crawl from {start_url}")
-    logging.info(f"Settings: max_depth={max_depth}, max_pages={max_pages}, delay={delay}s, strategy={crawl_strategy}")
+    logging.info(f"Settings: max_depth={max_depth}, max_pages={max_pages}, delay={delay}s, strategy={crawl_strategy}, "
+                 f"order={crawl_order}")
     
     # Stage 2.3: Check for government site and category-first strategy
+    # (category crawls are not journaled)
     if crawl_strategy == 'category_first':
         # First, fetch the homepage to detect government site and extract categories
         try:
-            homepage_html, _ = fetch_html(start_url, ua=ua, timeout=30)  # Fix: properly unpack tuple return value
+            homepage_html, _, _ = fetch_html(start_url, ua=ua, timeout=30)
             
             # Detect if it's a government site
             is_government = detect_government_site(start_url, homepage_html)
@@ -3858,15 +4463,20 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
                 if categories:
                     logging.info(f"Government site detected with {len(categories)} categories. Using category-first strategy.")
                     
-                    # Use category-first crawling
-                    all_category_pages = []
+                    # Use category-first crawling (the homepage counts towards max_pages)
                     crawl_params = {
                         'max_depth': max_depth,
-                        'max_pages': max_pages,
+                        'max_pages': max(max_pages - 1, 1),
                         'delay': delay,
-                        'enable_optimizations': enable_optimizations
+                        'enable_optimizations': enable_optimizations,
+                        'render': render,
+                        'homepage_html': homepage_html,
+                        'seen_set': seen_set,
+                        'frontier_memory': frontier_memory
                     }
                     
+                    # The homepage was fetched once above and is never refetched by a category
+                    all_category_pages = [(start_url, homepage_html, 0)]
                     for category_info, category_pages in crawl_site_by_categories(start_url, ua, categories, **crawl_params):
                         all_category_pages.extend(category_pages)
                         
@@ -3876,6 +4486,10 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
                     
                     # Update final statistics (simplified for category-first mode)
                     logging.info(f"Category-first crawl summary: {len(all_category_pages)} pages total")
+                    # The default path's queue and prefetcher are unused: release spill files and threads
+                    if prefetcher is not None:
+                        prefetcher.close()
+                    queue.close()
                     return all_category_pages[:max_pages]  # Ensure we don't exceed limit
                 else:
                     logging.info("Government site detected but no categories found. Falling back to default strategy.")
@@ -3886,102 +4500,159 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
             logging.warning(f"Category-first strategy failed: {e}. Falling back to default strategy.")
     
     # Default BFS crawling strategy (original logic)
-    while queue and len(visited_normalized) < max_pages:
-        current_url, depth = queue.popleft()
-        current_normalized = normalize_url_for_dedup(current_url)
-        
-        # Skip if already visited or too deep
-        if current_normalized in visited_normalized or depth > max_depth:
-            continue
+    # Ctrl-C, sys.exit() or a crash still leaves a checkpoint behind
+    try:
+        while queue and stats['pages_success'] < max_pages:
+            current_url, depth = queue.popleft()
         
-        # Rate limiting
-        if visited_normalized and delay > 0:
-            time.sleep(delay)
+            # Skip if too deep
+            if depth > max_depth:
+                continue
         
-        stats['pages_crawled'] += 1
+            stats['pages_crawled'] += 1
+            if stats['pages_crawled'] % CRAWL_MEMORY_REPORT_INTERVAL == 1:
+                _report_crawl_memory(stats, seen, queue)
         
-        try:
-            # Progress reporting: verbose logging vs progress line
-            if logging.getLogger().level <= logging.INFO:
-                # Verbose mode: full logging
-                logging.info(f"[{len(visited_normalized)+1}/{max_pages}] Crawling depth {depth}: {current_url}")
-            else:
-                # Normal mode: updating progress line on stderr
-                elapsed = time.time() - stats['start_time']
-                rate = stats['pages_success'] / (elapsed / 60) if elapsed > 0 else 0  # pages per minute
+            queued_links = []
+            try:
+                # Progress reporting: verbose logging vs progress line
+                if logging.getLogger().level <= logging.INFO:
+                    # Verbose mode: full logging
+                    logging.info(f"[{stats['pages_success']+1}/{max_pages}] Crawling depth {depth}: {current_url}")
+                else:
+                    # Normal mode: updating progress line on stderr
+                    elapsed = time.time() - stats['start_time']
+                    rate = stats['pages_success'] / (elapsed / 60) if elapsed > 0 else 0  # pages per minute
                 
-                # Progress line that overwrites itself
-                sys.stderr.write(f"\rCrawling: {len(visited_normalized)+1}/{max_pages} pages ({rate:.1f} pages/min)")
-                sys.stderr.flush()
+                    # Progress line that overwrites itself
+                    sys.stderr.write(f"\rCrawling: {stats['pages_success']+1}/{max_pages} pages ({rate:.1f} pages/min, "
+                                     f"{stats['near_duplicates']} dup, mem {format_bytes(stats['rss_bytes'])})")
+                    sys.stderr.flush()
             
-            # Fetch page using original URL (preserves case)
-            html, _ = fetch_html(current_url, ua=ua, timeout=30)  # Fix: properly unpack tuple return value
-            visited_normalized.add(current_normalized)
-            url_mapping[current_normalized] = current_url
-            
-            # Stage 1.3: Memory-efficient page handling
-            if memory_efficient:
-                # Add to batch for processing
-                page_batch.append((current_url, html, depth))
-                
-                # Process batch when full
-                if len(page_batch) >= batch_size:
-                    if page_callback:
-                        page_callback(page_batch.copy())  # Send copy to callback
-                    # Keep only metadata for final result (no HTML content)
-                    for url, _, d in page_batch:
-                        pages.append((url, '', d))
-                    page_batch.clear()
-            else:
-                # Traditional full storage
-                pages.append((current_url, html, depth))
+                # Fetch page using original URL (preserves case), unless it was prefetched
+                with span('fetch_page'):
+                    html = prefetcher.take(current_url) if prefetcher is not None else None
+                    if html is None:
+                        # Rate limiting, shared with the prefetch threads
+                        with span('delay'):
+                            pacer.wait()
+                        html = _fetch_crawl_page(current_url, ua, render)
+                stats['total_size'] += len(html.encode('utf-8'))
             
-            # Update statistics
-            stats['pages_success'] += 1
-            stats['total_size'] += len(html.encode('utf-8'))
+                # Near-duplicates are dropped before parsing and do not use up max_pages
+                with span('near_dup'):
+                    duplicate_of = near_dups.check(current_url, html) if near_dups is not None else None
+                if duplicate_of is None:
+                    keep_page(current_url, html, depth)
+                    stats['pages_success'] += 1
+                else:
+                    stats['near_duplicates'] += 1
+                    logging.warning(f"Near-duplicate skipped / 近重复页面已跳过: {current_url} (matches {duplicate_of})")
             
-            # Extract and queue new links (only if not at max depth)
-            if depth < max_depth:
-                # Stage 1.1 optimization: Enable documentation filter during link extraction
-                enable_doc_filter = enable_optimizations and crawl_strategy == 'default'
-                link_mapping = extract_internal_links(html, current_url, enable_doc_filter=enable_doc_filter)
+                # Pagination edges keep the page's depth and are fetched before other links;
+                # numbered links into the same sequence are left to the chain
+                next_page = None
+                if follow_pagination and (duplicate_of is None or follow_duplicate_links):
+                    with span('find_next_page'):
+                        next_page = find_next_page(html, current_url)
+                    if (next_page and urllib.parse.urlparse(next_page).netloc == urllib.parse.urlparse(current_url).netloc
+                            and should_crawl_url(next_page)):
+                        normalized_next = normalize_url_for_dedup(next_page)
+                        if seen.add(normalized_next):
+                            if best_first:
+                                queue.push(next_page, depth, normalized_next, pagination=True)
+                            else:
+                                queue.appendleft((next_page, depth))
+                            queued_links.append((next_page, depth))
+                            stats['pagination_links'] += 1
+                            if prefetcher is not None:
+                                chain = pagination_chain(current_url, next_page, pagination_prefetch)
+                                prefetcher.prefetch(chain[:1] + [url for url in chain[1:]
+                                                                 if normalize_url_for_dedup(url) not in seen])
+                
+                # Extract and queue new links (only if not at max depth)
+                if depth < max_depth and (duplicate_of is None or follow_duplicate_links):
+                    # Stage 1.1 optimization: Enable documentation filter during link extraction
+                    enable_doc_filter = enable_optimizations and crawl_strategy == 'default'
+                    anchors = {} if best_first else None
+                    with span('extract_links'):
+                        link_mapping = extract_internal_links(html, current_url, enable_doc_filter=enable_doc_filter,
+                                                              anchor_texts=anchors)
                 
-                # Stage 1.2 optimization: Batch process new links
-                if enable_optimizations:
-                    # Batch filtering and deduplication
-                    new_normalized_links = set(link_mapping.keys()) - visited_normalized
-                    
                     if enable_doc_filter:
                         # All links already pre-filtered for documentation
-                        doc_links = [(norm, orig) for norm, orig in link_mapping.items() 
-                                   if norm in new_normalized_links]
-                        logging.info(f"Found {len(doc_links)} new documentation links (pre-filtered)")
+                        doc_links = link_mapping.items()
                     else:
-                        # Batch apply documentation filter
-                        doc_links = [(norm, orig) for norm, orig in link_mapping.items() 
-                                   if norm in new_normalized_links and is_documentation_url(orig)]
-                        logging.info(f"Found {len(doc_links)} new documentation links")
-                    
-                    # Batch queue operations - sort and limit in one operation
-                    links_to_queue = sorted(doc_links)[:50]  # Limit per-page discoveries
-                    for normalized_link, original_link in links_to_queue:
-                        queue.append((original_link, depth + 1))
-                        
-                else:
-                    # Original non-optimized path for compatibility
-                    new_normalized_links = set(link_mapping.keys()) - visited_normalized
-                    doc_links = [(norm, orig) for norm, orig in link_mapping.items() 
-                               if norm in new_normalized_links and is_documentation_url(orig)]
-                    logging.info(f"Found {len(doc_links)} new documentation links")
-                    
-                    for normalized_link, original_link in sorted(doc_links)[:50]:
-                        queue.append((original_link, depth + 1))
+                        doc_links = [(norm, orig) for norm, orig in link_mapping.items()
+                                     if is_documentation_url(orig)]
+                
+                    queued = 0
+                    if best_first:
+                        # Queue the 50 best-scoring unseen links; links already
+                        # queued count one more in-link and move up instead
+                        candidates = []
+                        for normalized_link, original_link in sorted(doc_links):
+                            if next_page and same_sequence(original_link, next_page):
+                                continue
+                            if normalized_link in seen:
+                                queue.add_inlink(normalized_link)
+                                continue
+                            anchor = anchors.get(normalized_link, '')
+                            score = queue.score(original_link, depth + 1, anchor, 1, normalized_link)
+                            candidates.append((score, normalized_link, original_link, anchor))
+                        for score, normalized_link, original_link, anchor in heapq.nlargest(
+                                50, candidates, key=lambda candidate: candidate[0]):
+                            seen.add(normalized_link)
+                            queue.push(original_link, depth + 1, normalized_link, anchor, score)
+                            queued_links.append((original_link, depth + 1))
+                            queued += 1
+                    else:
+                        # Claim up to 50 unseen links per page in sorted order; claiming
+                        # marks them seen, so the queue never holds duplicates
+                        for normalized_link, original_link in sorted(doc_links):
+                            if next_page and same_sequence(original_link, next_page):
+                                continue
+                            if seen.add(normalized_link):
+                                queue.append((original_link, depth + 1))
+                                queued_links.append((original_link, depth + 1))
+                                queued += 1
+                                if queued >= 50:  # Limit per-page discoveries
+                                    break
+                    logging.info(f"Queued {queued} new documentation links")
             
-        except Exception as e:
-            logging.warning(f"Failed to crawl {current_url}: {e}")
-            stats['pages_failed'] += 1
-            stats['failed_urls'].append((current_url, str(e)))
-            continue
+                if journal is not None:
+                    with span('journal'):
+                        if duplicate_of is not None:
+                            journal.record_duplicate(current_url, depth, duplicate_of, queued_links)
+                        else:
+                            journal.record_page(current_url, depth, html, queued_links)
+            
+            except NonHTMLContentError as e:
+                # PDF/image links are not pages; release the unread response
+                e.close()
+                logging.info(f"Skipped non-HTML link {current_url}: {e.content_type or 'unknown type'}")
+                stats['pages_failed'] += 1
+                stats['failed_urls'].append((current_url, str(e)))
+                if journal is not None:
+                    journal.record_failure(current_url, depth, str(e), queued_links)
+            
+            except Exception as e:
+                logging.warning(f"Failed to crawl {current_url}: {e}")
+                stats['pages_failed'] += 1
+                stats['failed_urls'].append((current_url, str(e)))
+                if journal is not None:
+                    journal.record_failure(current_url, depth, str(e), queued_links)
+        
+            if journal is not None and journal.checkpoint_due():
+                journal.checkpoint(stats)
+    
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
+        if journal is not None:
+            journal.checkpoint(stats)
+    if journal is not None:
+        journal.finish(stats)
     
     # Stage 1.3: Process any remaining batch
     if memory_efficient and 'page_batch' in locals() and page_batch:
@@ -3999,11 +4670,19 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
     # Enhanced crawl summary and visibility reporting
     duration = time.time() - stats['start_time']
     size_mb = stats['total_size'] / (1024 * 1024)
-    success_rate = (stats['pages_success'] / stats['pages_crawled'] * 100) if stats['pages_crawled'] > 0 else 0
+    fetched_ok = stats['pages_success'] + stats['near_duplicates']
+    success_rate = (fetched_ok / stats['pages_crawled'] * 100) if stats['pages_crawled'] > 0 else 0
     
     # 1. Crawl quality summary (5-8 lines)
-    logging.info(f"Crawl Quality Summary: {success_rate:.1f}% success rate ({stats['pages_success']}/{stats['pages_crawled']} pages)")
+    logging.info(f"Crawl Quality Summary: {success_rate:.1f}% success rate ({fetched_ok}/{stats['pages_crawled']} pages)")
     logging.info(f"Data Retrieved: {size_mb:.1f}MB in {duration:.1f}s ({size_mb/duration:.2f} MB/s)")
+    if follow_pagination:
+        prefetched = f", {prefetcher.hits}/{prefetcher.submitted} prefetches used" if prefetcher is not None else ""
+        logging.info(f"Pagination: {stats['pagination_links']} next-page links followed{prefetched}")
+    if near_dups is not None:
+        logging.info(f"Near-duplicates skipped: {stats['near_duplicates']} pages not parsed "
+                     f"(SimHash distance <= {near_dup_distance}, "
+                     f"{near_dups.unfingerprinted} pages too short to compare)")
     
     # 2. Failed URL details in verbose mode (3-5 lines)
     if stats['failed_urls'] and logging.getLogger().level <= logging.INFO:
@@ -4014,7 +4693,7 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
             logging.info(f"  ... and {len(stats['failed_urls']) - 5} more failures")
     
     # 3. Completeness indicator (2-3 lines)
-    hit_max_pages = len(visited_normalized) >= max_pages
+    hit_max_pages = stats['pages_success'] >= max_pages
     hit_max_depth = any(depth >= max_depth for _, _, depth in pages)
     if hit_max_pages or hit_max_depth:
         limits_hit = []
@@ -4024,6 +4703,12 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
     else:
         logging.info("Crawl Status: COMPLETE - all discoverable pages crawled")
     
+    # 4. Memory footprint of the crawl state
+    _report_crawl_memory(stats, seen, queue)
+    logging.info(f"Peak RSS: {format_bytes(stats['peak_rss_bytes'] or None)}, "
+                 f"{queue.total_spilled} queue entries spilled to disk")
+    queue.close()
+    
     return pages
 
 def aggregate_crawled_site(pages: list, parser_func) -> tuple[str, str, dict]:
@@ -4053,10 +4738,12 @@ def aggregate_crawled_site(pages: list, parser_func) -> tuple[str, str, dict]:
         for url, html in by_depth[depth]:
             try:
                 # Pass is_crawling=True only to generic_to_markdown which supports it
-                if parser_func == generic_to_markdown:
-                    date, content, metadata = parser_func(html, url, 'safe', is_crawling=True)
-                else:
-                    date, content, metadata = parser_func(html, url)
+                with profile_page() as page_cost:
+                    if parser_func == generic_to_markdown:
+                        date, content, metadata = parser_func(html, url, 'safe', is_crawling=True)
+                    else:
+                        date, content, metadata = parser_func(html, url)
+                    page_cost.template = metadata.get('template_used') or getattr(parser_func, '__name__', 'unknown')
                 
                 # Extract title from content
                 title_match = re.search(r'^#\s+(.+)$', content, re.M)
@@ -4092,6 +4779,7 @@ def aggregate_crawled_site(pages: list, parser_func) -> tuple[str, str, dict]:
     return datetime.datetime.now().strftime("%Y-%m-%d"), final_content, metadata
 
 
+@timed('assets')
 def rewrite_and_download_assets(md: str, md_base: str, outdir: Path, ua: str, assets_root: str) -> str:
     # Find all http(s) images
     urls = []
@@ -4634,6 +5322,46 @@ def get_failure_filename(timestamp: str, url: str) -> str:
     return f"FAILED_{timestamp} - {sanitized_domain}"
 
 
+# The exit reports are registered once per process: wf batch calls main() once per URL
+_timings_report_registered = False
+_profile_report_registered = False
+
+
+def _start_timings() -> None:
+    """Start a fresh --timings recorder for this run / 为本次运行启用新的阶段计时"""
+    global _timings_report_registered
+    disable_timings()
+    enable_timings()
+    if not _timings_report_registered:
+        atexit.register(_print_timings)
+        _timings_report_registered = True
+
+
+def _print_timings() -> None:
+    """Print the --timings breakdown to stderr / 输出 --timings 分阶段耗时"""
+    timings = get_timings()
+    if timings is not None:
+        sys.stderr.write("\nTimings / 阶段耗时:\n" + timings.report())
+
+
+def _start_profile(mode: str, top: int, output_dir: str) -> None:
+    """Start --profile once for the whole process / 为整个进程启动一次 --profile"""
+    global _profile_report_registered
+    start_profiler(mode, top=top, output_dir=output_dir)
+    if not _profile_report_registered:
+        atexit.register(_finish_profile)
+        _profile_report_registered = True
+
+
+def _finish_profile() -> None:
+    """Stop --profile, write its files and print the report to stderr / 结束 --profile 并输出报告"""
+    profiler = stop_profiler()
+    if profiler is not None:
+        sys.stderr.write("\n" + profiler.report())
+        for path in profiler.files:
+            sys.stderr.write(f"Profile written: {path}\n")
+
+
 def main():
     ap = argparse.ArgumentParser(
         description='Fetch a URL (WeChat/XHS/generic) and save as Markdown.',
@@ -4658,14 +5386,16 @@ def main():
     ap.add_argument('--max-crawl-depth', type=int, default=10,
                     help='Maximum crawl depth for site crawling (default: 10, max: 10)')
     ap.add_argument('--max-pages', type=int, default=1000,
-                    help='Maximum pages to crawl (default: 1000, max: 1000)')
+                    help=f'Maximum pages to crawl (default: 1000, max: {MAX_CRAWL_PAGES}, raise with WF_MAX_CRAWL_PAGES)')
     ap.add_argument('--crawl-delay', type=float, default=0.5,
                     help='Delay between crawl requests in seconds (default: 0.5)')
 
     # Task-008 Phase 1: Add pagination and domain control flags
     # Task-008 Phase 1：添加分页和域名控制标志
     ap.add_argument('--follow-pagination', action='store_true',
-                    help='Follow pagination links (next page, etc.) during crawling / 爬取时跟随分页链接（下一页等）')
+                    help='Follow pagination links (rel=next, pager classes, numbered pages): merge a multi-page article, or crawl next pages first / 跟随分页链接：合并多页文章，或在爬取时优先抓取下一页')
+    ap.add_argument('--pagination-prefetch', type=int, default=DEFAULT_PAGINATION_PREFETCH,
+                    help=f'Pagination pages fetched ahead concurrently with --follow-pagination (0 disables, default: {DEFAULT_PAGINATION_PREFETCH}) / 并发预取的分页页数')
     ap.add_argument('--same-domain-only', action='store_true', default=True,
                     help='Only crawl URLs from the same domain (default: True) / 仅爬取同域名的URL（默认：True）')
 
@@ -4673,6 +5403,39 @@ def main():
     # Task-008 Phase 2：Sitemap 支持
     ap.add_argument('--use-sitemap', action='store_true',
                     help='Use sitemap.xml for site crawling (if available, falls back to BFS if not found) / 使用 sitemap.xml 进行站点爬取（如可用，未找到时回退到BFS）')
+    ap.add_argument('--seen-set', choices=SEEN_SET_KINDS, default=DEFAULT_SEEN_SET,
+                    help='URL seen-set for site crawling: exact (64-bit fingerprints, default), bloom (smallest, may skip ~0.1%% of pages), strings (full URLs) / 站点爬取的 URL 已见集合')
+    ap.add_argument('--resume', metavar='CRAWL_ID',
+                    help='Resume an interrupted site crawl from its checkpoint journal (same URL; original crawl settings are reused) / 从检查点恢复中断的站点爬取')
+    ap.add_argument('--no-checkpoint', action='store_true',
+                    help='Do not journal site crawl progress to ~/.cache/webfetcher/crawls / 不记录站点爬取检查点')
+    ap.add_argument('--frontier-memory', type=int, default=DEFAULT_FRONTIER_MEMORY,
+                    help=f'Crawl queue entries kept in memory before spilling to disk (default: {DEFAULT_FRONTIER_MEMORY}) / 爬取队列溢出到磁盘前的内存条目数')
+    ap.add_argument('--skip-near-duplicates', action='store_true',
+                    help=f'Skip crawled pages whose main text SimHash is within {DEFAULT_NEAR_DUP_DISTANCE} bits of an earlier page (off by default) / 跳过近重复页面（默认关闭）')
+    ap.add_argument('--near-dup-distance', type=int, default=None,
+                    help=f'Near-duplicate SimHash distance in bits (0-31, default: {DEFAULT_NEAR_DUP_DISTANCE}); implies --skip-near-duplicates / 近重复页面检测阈值')
+    ap.add_argument('--keep-duplicates', action='store_true',
+                    help='Keep near-duplicate pages even if detection is enabled (the default) / 保留近重复页面（默认）')
+    ap.add_argument('--skip-duplicate-links', action='store_true',
+                    help='Do not follow links found on near-duplicate pages / 不跟随近重复页面中的链接')
+    ap.add_argument('--crawl-order', choices=CRAWL_ORDERS, default=DEFAULT_CRAWL_ORDER,
+                    help='Site crawl order: best-first (most promising links first, default) or bfs (discovery order) / 站点爬取顺序')
+    ap.add_argument('--crawl-priority-config', metavar='PATH',
+                    help='YAML overriding the best-first link scoring (see config/crawl_priority.yaml) / 覆盖最佳优先评分配置的 YAML')
+
+    ap.add_argument('--parse-cache', action='store_true',
+                    help='Reuse cached parse results (~/.cache/webfetcher/parse) outside site crawls too / 单页模式也使用解析结果缓存')
+    ap.add_argument('--no-parse-cache', action='store_true',
+                    help='Always re-parse, even during site crawls (where the parse cache is on by default) / 不使用解析结果缓存')
+
+    ap.add_argument('--timings', action='store_true',
+                    help='Print a per-stage time breakdown to stderr (also embedded in --json output) / 输出分阶段耗时')
+    ap.add_argument('--profile', choices=PROFILE_MODES,
+                    help='Profile the run: cpu (cProfile + stack samples) or alloc (tracemalloc); '
+                         'writes profile-* files to the output directory / 性能分析：cpu 或 alloc')
+    ap.add_argument('--profile-top', type=int, default=DEFAULT_PROFILE_TOP, metavar='N',
+                    help=f'Functions / allocation sites listed by --profile (default: {DEFAULT_PROFILE_TOP}) / 列出的热点数量')
 
     ap.add_argument('--format', choices=['markdown', 'html', 'both'], default='markdown',
                     help='Output format: markdown (default), html, or both')
@@ -4694,6 +5457,12 @@ def main():
                     help='Skip Chrome health check (use when Chrome is known to be running)')
     
     args = ap.parse_args()
+    # One-off fetches rarely parse the same HTML twice: the disk cache is for crawls unless asked for
+    configure_parse_cache(args.crawl_site, False if args.no_parse_cache else True if args.parse_cache else None)
+    if args.timings:
+        _start_timings()
+    if args.profile:
+        _start_profile(args.profile, args.profile_top, args.outdir)
     
     # Handle shortcuts for fetch modes
     if args.cdp:
@@ -4785,6 +5554,9 @@ def main():
     elif 'dianping.com' in host:
         ua = 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1'
 
+    # Set when the static fetch found a non-HTML resource / 静态获取发现非 HTML 资源时设置
+    non_html_error = None
+
     # Site crawling mode (overrides single-page fetch)
     if args.crawl_site:
         logging.info("Site crawling mode activated / 站点爬取模式已激活")
@@ -4804,126 +5576,226 @@ def main():
             logging.error("Site crawling not supported for social media sites")
             sys.exit(1)
 
-        # Task-008 Phase 2: Choose crawling method based on --use-sitemap flag
-        if args.use_sitemap:
-            # Use sitemap-first crawling (with automatic fallback to BFS)
-            crawled_pages = crawl_from_sitemap(
-                url, ua,
-                max_pages=args.max_pages,
-                delay=args.crawl_delay,
-                # Pass additional args for fallback
-                max_depth=args.max_crawl_depth,
-                follow_pagination=args.follow_pagination,
-                same_domain_only=args.same_domain_only
-            )
-        else:
-            # Use regular BFS crawling
-            crawled_pages = crawl_site(
-                url, ua,
-                max_depth=args.max_crawl_depth,
-                max_pages=args.max_pages,
-                delay=args.crawl_delay,
-                follow_pagination=args.follow_pagination,      # Task-008 Phase 1
-                same_domain_only=args.same_domain_only        # Task-008 Phase 1
-            )
+        if args.near_dup_distance is not None and not 0 <= args.near_dup_distance < 32:
+            logging.error(f"--near-dup-distance must be between 0 and 31, got {args.near_dup_distance}")
+            sys.exit(1)
+        if args.crawl_priority_config:
+            try:
+                make_link_scorer(load_priority_config(args.crawl_priority_config))
+            except Exception as e:
+                logging.error(f"Invalid --crawl-priority-config {args.crawl_priority_config}: {e}")
+                sys.exit(1)
+
+        # Checkpoint journal: resume an interrupted crawl or start recording a new one
+        journal = None
+        try:
+            if args.resume:
+                journal = CrawlJournal.open(args.resume, normalize=normalize_url_for_dedup)
+                if normalize_url_for_dedup(journal.state.start_url) != normalize_url_for_dedup(url):
+                    logging.error(f"Crawl {args.resume} started from {journal.state.start_url}, not {url}")
+                    journal.close()
+                    sys.exit(1)
+                # A resumed crawl keeps the settings it was started with
+                for key, value in journal.state.params.items():
+                    setattr(args, key, value)
+            elif not args.no_checkpoint:
+                journal = CrawlJournal.create(url, {
+                    'max_pages': args.max_pages,
+                    'max_crawl_depth': args.max_crawl_depth,
+                    'crawl_delay': args.crawl_delay,
+                    'follow_pagination': args.follow_pagination,
+                    'pagination_prefetch': args.pagination_prefetch,
+                    'same_domain_only': args.same_domain_only,
+                    'use_sitemap': args.use_sitemap,
+                    'seen_set': args.seen_set,
+                    'frontier_memory': args.frontier_memory,
+                    'skip_near_duplicates': args.skip_near_duplicates,
+                    'near_dup_distance': args.near_dup_distance,
+                    'keep_duplicates': args.keep_duplicates,
+                    'skip_duplicate_links': args.skip_duplicate_links,
+                    'crawl_order': args.crawl_order,
+                    'crawl_priority_config': args.crawl_priority_config,
+                })
+        except (CrawlJournalError, OSError) as e:
+            if args.resume:
+                logging.error(f"Cannot resume crawl: {e}")
+                sys.exit(1)
+            logging.warning(f"Crawl checkpointing disabled: {e}")
+        if journal is not None:
+            sys.stderr.write(f"Crawl id: {journal.crawl_id} (resume with --resume {journal.crawl_id})\n")
+        # Close (and so checkpoint) the journal on every exit path, including sys.exit and errors
+        try:
+            # Near-duplicate detection drops pages, so it only runs when asked for
+            near_dup_distance = args.near_dup_distance
+            if near_dup_distance is None and getattr(args, 'skip_near_duplicates', False):
+                near_dup_distance = DEFAULT_NEAR_DUP_DISTANCE
+            if args.keep_duplicates:
+                near_dup_distance = None
+
+            # Task-008 Phase 2: Choose crawling method based on --use-sitemap flag
+            try:
+                with span('crawl'):
+                    if args.use_sitemap:
+                        # Use sitemap-first crawling (with automatic fallback to BFS)
+                        crawled_pages = crawl_from_sitemap(
+                            url, ua,
+                            max_pages=args.max_pages,
+                            delay=args.crawl_delay,
+                            # Pass additional args for fallback
+                            max_depth=args.max_crawl_depth,
+                            follow_pagination=args.follow_pagination,
+                            same_domain_only=args.same_domain_only,
+                            render=(args.render == 'always'),
+                            seen_set=args.seen_set,
+                            frontier_memory=args.frontier_memory,
+                            near_dup_distance=near_dup_distance,
+                            follow_duplicate_links=not args.skip_duplicate_links,
+                            crawl_order=args.crawl_order,
+                            priority_config=args.crawl_priority_config,
+                            pagination_prefetch=args.pagination_prefetch,
+                            journal=journal
+                        )
+                    else:
+                        # Use regular BFS crawling
+                        crawled_pages = crawl_site(
+                            url, ua,
+                            max_depth=args.max_crawl_depth,
+                            max_pages=args.max_pages,
+                            delay=args.crawl_delay,
+                            follow_pagination=args.follow_pagination,      # Task-008 Phase 1
+                            same_domain_only=args.same_domain_only,       # Task-008 Phase 1
+                            render=(args.render == 'always'),
+                            seen_set=args.seen_set,
+                            frontier_memory=args.frontier_memory,
+                            near_dup_distance=near_dup_distance,
+                            follow_duplicate_links=not args.skip_duplicate_links,
+                            crawl_order=args.crawl_order,
+                            priority_config=args.crawl_priority_config,
+                            pagination_prefetch=args.pagination_prefetch,
+                            journal=journal
+                        )
+            except KeyboardInterrupt:
+                if journal is not None:
+                    journal.close()
+                    sys.stderr.write(f"\nCrawl interrupted, progress saved. Resume with: --resume {journal.crawl_id}\n")
+                sys.exit(130)
         
-        if crawled_pages:
-            # Detect appropriate parser from first page
-            first_html = crawled_pages[0][1]
-            # Always use generic parser for crawling
-            parser_func = generic_to_markdown
-            parser_name = "Generic"
+            if crawled_pages:
+                # Detect appropriate parser from first page
+                first_html = crawled_pages[0][1]
+                # Always use generic parser for crawling
+                parser_func = generic_to_markdown
+                parser_name = "Generic"
             
-            logging.info(f"Using {parser_name} parser for site content")
+                logging.info(f"Using {parser_name} parser for site content")
             
-            # Aggregate all content
-            date_only, md, metadata = aggregate_crawled_site(crawled_pages, parser_func)
-            metadata['parser_used'] = parser_name
-            rendered = False
+                # Aggregate all content
+                with span('aggregate'):
+                    date_only, md, metadata = aggregate_crawled_site(crawled_pages, parser_func)
+                metadata['parser_used'] = parser_name
+                rendered = False
             
-            # Process and save file directly in crawl mode
-            # Title for filename comes from first heading
-            m = re.match(r'^#\s*(.+)$', md.splitlines()[0].strip())
-            title = m.group(1) if m else '未命名'
-            # Use current timestamp for filename to avoid conflicts
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H%M%S")
-            base = f"{timestamp} - {sanitize_filename(title)}"
-            path = ensure_unique_path(outdir, base)
+                # Process and save file directly in crawl mode
+                # Title for filename comes from first heading
+                m = re.match(r'^#\s*(.+)$', md.splitlines()[0].strip())
+                title = m.group(1) if m else '未命名'
+                # Use current timestamp for filename to avoid conflicts
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H%M%S")
+                base = f"{timestamp} - {sanitize_filename(title)}"
+                path = ensure_unique_path(outdir, base)
             
-            # Optionally download images and rewrite links
-            if hasattr(args, 'legacy_image_mode') and args.legacy_image_mode:
-                # Legacy behavior for backward compatibility
-                do_download_assets = args.download_assets or ('mp.weixin.qq.com' in host) or ('xiaohongshu.com' in host) or ('xhslink.com' in original_host)
-            else:
-                # New default: only download if explicitly requested
-                do_download_assets = args.download_assets
-            if do_download_assets:
-                logging.info("Starting asset downloads")
-                md_base = base  # same base as filename
-                md = rewrite_and_download_assets(md, md_base, outdir, ua, args.assets_root)
-                logging.info("Asset downloads completed")
+                # Optionally download images and rewrite links
+                if hasattr(args, 'legacy_image_mode') and args.legacy_image_mode:
+                    # Legacy behavior for backward compatibility
+                    do_download_assets = args.download_assets or ('mp.weixin.qq.com' in host) or ('xiaohongshu.com' in host) or ('xhslink.com' in original_host)
+                else:
+                    # New default: only download if explicitly requested
+                    do_download_assets = args.download_assets
+                if do_download_assets:
+                    logging.info("Starting asset downloads")
+                    md_base = base  # same base as filename
+                    md = rewrite_and_download_assets(md, md_base, outdir, ua, args.assets_root)
+                    logging.info("Asset downloads completed")
             
-            # Determine output formats needed
-            output_markdown, output_html = determine_output_format(args, url)
-
-            # Task-003 Phase 3: Create url_metadata for crawl mode
-            crawl_url_metadata = create_url_metadata(
-                input_url=input_url,
-                final_url=url,  # For crawl mode, final URL is typically the starting URL
-                fetch_mode='crawl'
-            )
+                # Determine output formats needed
+                output_markdown, output_html = determine_output_format(args, url)
+
+                # Task-003 Phase 3: Create url_metadata for crawl mode
+                crawl_url_metadata = create_url_metadata(
+                    input_url=input_url,
+                    final_url=url,  # For crawl mode, final URL is typically the starting URL
+                    fetch_mode='crawl'
+                )
 
-            # Task-003 Phase 3: Enhance markdown with dual URL section
-            md = insert_dual_url_section(md, crawl_url_metadata)
+                # Task-003 Phase 3: Enhance markdown with dual URL section
+                with span('url_format'):
+                    md = insert_dual_url_section(md, crawl_url_metadata)
+                profile_checkpoint('site aggregated')
 
-            # Write markdown file if requested
-            if output_markdown:
-                path.write_text(md, encoding='utf-8')
-                logging.info(f"Markdown file saved: {path}")
+                # Write markdown file if requested
+                if output_markdown:
+                    with span('write'):
+                        path.write_text(md, encoding='utf-8')
+                    logging.info(f"Markdown file saved: {path}")
             
-            # Write HTML file if requested
-            if output_html:
-                try:
-                    html_path = get_html_output_path(args, url, base)
-                    write_html_file(crawled_pages[0][1], html_path, url, title)  # Use first page's HTML
-                    logging.info(f"HTML file saved: {html_path}")
-                except Exception as e:
-                    logging.error(f"Failed to write HTML output: {e}")
+                # Write HTML file if requested
+                if output_html:
+                    try:
+                        html_path = get_html_output_path(args, url, base)
+                        with span('write'):
+                            write_html_file(crawled_pages[0][1], html_path, url, title)  # Use first page's HTML
+                        logging.info(f"HTML file saved: {html_path}")
+                    except Exception as e:
+                        logging.error(f"Failed to write HTML output: {e}")
             
-            # Generate JSON output if requested
-            if args.json:
-                json_data = {
-                    'url': url,
-                    'title': title,
-                    'date': f"{date_only} {datetime.datetime.now().strftime('%H:%M:%S')}",
-                    'content': md,
-                    'images': metadata.get('images', []),
-                    'metadata': {
-                        **metadata,
-                        'parser_used': parser_name,
-                        'fetch_method': 'crawl',
-                        'scraped_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                # Generate JSON output if requested
+                if args.json:
+                    json_data = {
+                        'url': url,
+                        'title': title,
+                        'date': f"{date_only} {datetime.datetime.now().strftime('%H:%M:%S')}",
+                        'content': md,
+                        'images': metadata.get('images', []),
+                        'metadata': {
+                            **metadata,
+                            'parser_used': parser_name,
+                            'fetch_method': 'crawl',
+                            'scraped_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        }
                     }
-                }
-                json_path = path.with_suffix('.json')
-                json_path.write_text(json.dumps(json_data, ensure_ascii=False, indent=2), encoding='utf-8')
-                logging.info(f"JSON data saved: {json_path}")
+                    if get_timings() is not None:
+                        json_data['metadata']['timings'] = get_timings().to_dict()
+                    json_path = path.with_suffix('.json')
+                    with span('write'):
+                        json_path.write_text(json.dumps(json_data, ensure_ascii=False, indent=2), encoding='utf-8')
+                    logging.info(f"JSON data saved: {json_path}")
             
-            # Print primary output path(s)
-            if output_markdown and output_html:
-                print(f"{path}\n{html_path}")
-            elif output_html:
-                print(str(html_path))
-            else:
-                print(str(path))
-            return  # Exit the main function after crawling is complete
+                # Print primary output path(s)
+                if output_markdown and output_html:
+                    print(f"{path}\n{html_path}")
+                elif output_html:
+                    print(str(html_path))
+                else:
+                    print(str(path))
             
-        else:
-            logging.error("No pages crawled successfully")
-            sys.exit(1)
+                # Output is safe on disk; the checkpoint journal is no longer needed
+                if journal is not None:
+                    journal.remove()
+                return  # Exit the main function after crawling is complete
+            
+            else:
+                logging.error("No pages crawled successfully")
+                # Every queued URL was tried, so there is nothing left to resume
+                if journal is not None:
+                    journal.remove()
+                sys.exit(1)
+        finally:
+            if journal is not None:
+                journal.close()
     elif args.html:
         # Local HTML file
-        html = Path(args.html).read_text(encoding='utf-8', errors='ignore')
+        with span('read_file'):
+            html = Path(args.html).read_text(encoding='utf-8', errors='ignore')
         fetch_metrics = FetchMetrics(primary_method="local_file", final_status="success")
         rendered = False
         # Create url_metadata for local file mode
@@ -4998,6 +5870,12 @@ def main():
                     print(str(failure_path))
                     sys.exit(1)
 
+            except NonHTMLContentError as e:
+                # Binary resource: the first response is streamed to disk below
+                # 非 HTML 资源：下方直接将首个响应写入磁盘
+                logging.info(f"{e}; saving as download")
+                non_html_error = e
+
             except (ChromeConnectionError, SeleniumNotAvailableError, SeleniumFetchError, SeleniumTimeoutError) as e:
                 logging.error(f"Selenium fetch failed: {e}")
                 # Phase 3 Step 1: Use structured error formatting
@@ -5045,10 +5923,33 @@ def main():
                 print(str(failure_path))
                 sys.exit(1)
 
-    # Try to download file if it's a downloadable type
     downloader = SimpleDownloader()
-    if downloader.try_download(url, ua, args.timeout, args.outdir):
-        return  # Exit early, skip HTML processing for binary files
+    if non_html_error is not None:
+        # Content-Type said binary: stream the already-open response once
+        # Content-Type 表明为二进制：直接保存首个响应，不再重复请求
+        saved_path = None
+        if non_html_error.response is not None:
+            # Name and extension come from where redirects led, not the requested URL
+            # 文件名与扩展名取自重定向后的最终 URL
+            final_url = non_html_error.response.geturl() or non_html_error.url or url
+            saved_path = downloader.save_response(
+                non_html_error.response, final_url, args.outdir,
+                non_html_error.content_type, non_html_error.content_disposition
+            )
+        elif downloader.try_download(url, ua, args.timeout, args.outdir):
+            return
+        if saved_path is None:
+            print(f"Error: {non_html_error}", file=sys.stderr)
+            sys.exit(1)
+        print(str(saved_path))
+        return
+
+    # Pages fetched by urllib were already classified by Content-Type; for
+    # browser/rendered fetches fall back to the URL extension
+    # urllib 获取的页面已按 Content-Type 判定；浏览器/渲染获取的仍按扩展名判断
+    if not (fetch_metrics and fetch_metrics.content_type):
+        if downloader.try_download(url, ua, args.timeout, args.outdir):
+            return  # Exit early, skip HTML processing for binary files
 
     # Optionally save HTML snapshot before parsing
     if args.save_html:
@@ -5064,28 +5965,40 @@ def main():
                 snapshot_path = snapshot_path / f"snapshot_{host_safe}_{ts}.html"
         try:
             snapshot_path.parent.mkdir(parents=True, exist_ok=True)
-            snapshot_path.write_text(html, encoding='utf-8')
+            with span('write'):
+                snapshot_path.write_text(html, encoding='utf-8')
             logging.info(f"HTML snapshot saved to: {snapshot_path}")
         except Exception as e:
             logging.warning(f"Failed to save HTML snapshot: {e}")
 
     # Parser selection
     # Task-003 Phase 1: Pass url_metadata to parsers
-    if 'mp.weixin.qq.com' in host:
-        logging.info("Selected parser: WeChat")
-        parser_name = "WeChat"
-        date_only, md, metadata = wechat_to_markdown(html, url, url_metadata)
-        rendered = 'wechat' in ua.lower()
-    elif 'xiaohongshu.com' in host or 'xhslink.com' in original_host:
-        logging.info("Selected parser: Xiaohongshu")
-        parser_name = "Xiaohongshu"
-        date_only, md, metadata = xhs_to_markdown(html, url, url_metadata)
-        rendered = should_render
-    else:
-        logging.info("Selected parser: Generic")
-        parser_name = "Generic"
-        date_only, md, metadata = generic_to_markdown(html, url, getattr(args, 'filter', 'safe'), is_crawling=False, url_metadata=url_metadata)
-        rendered = False
+    with span('parse'), profile_page() as parse_cost:
+        if 'mp.weixin.qq.com' in host:
+            logging.info("Selected parser: WeChat")
+            parser_name = "WeChat"
+            date_only, md, metadata = wechat_to_markdown(html, url, url_metadata)
+            rendered = 'wechat' in ua.lower()
+        elif 'xiaohongshu.com' in host or 'xhslink.com' in original_host:
+            logging.info("Selected parser: Xiaohongshu")
+            parser_name = "Xiaohongshu"
+            date_only, md, metadata = xhs_to_markdown(html, url, url_metadata)
+            rendered = should_render
+        else:
+            logging.info("Selected parser: Generic")
+            parser_name = "Generic"
+            if args.follow_pagination:
+                # Multi-page article: parse each page of the chain and merge them as they arrive
+                def parse_page(page_html, page_url):
+                    return generic_to_markdown(page_html, page_url, getattr(args, 'filter', 'safe'), is_crawling=False,
+                                               url_metadata=url_metadata if page_url == url else None)
+                date_only, md, metadata = aggregate_multi_page_content(
+                    iter_pagination(url, html, parse_page, ua, prefetch=args.pagination_prefetch,
+                                    parser_name='generic_to_markdown'))
+            else:
+                date_only, md, metadata = generic_to_markdown(html, url, getattr(args, 'filter', 'safe'), is_crawling=False, url_metadata=url_metadata)
+            rendered = False
+        parse_cost.template = metadata.get('template_used') or parser_name
 
     # Title for filename comes from first heading
     m = re.match(r'^#\s*(.+)$', md.splitlines()[0].strip())
@@ -5107,27 +6020,31 @@ def main():
         md = rewrite_and_download_assets(md, md_base, outdir, ua, args.assets_root)
         logging.info("Asset downloads completed")
     
-    # Add fetch metrics to markdown content if available
-    if fetch_metrics:
-        md = add_metrics_to_markdown(md, fetch_metrics, template_name=metadata.get('template_used'))
+    with span('url_format'):
+        # Add fetch metrics to markdown content if available
+        if fetch_metrics:
+            md = add_metrics_to_markdown(md, fetch_metrics, template_name=metadata.get('template_used'))
 
-    # Task-003 Phase 3: Enhance markdown with dual URL section
-    # url_metadata should be available from fetch_html() call
-    md = insert_dual_url_section(md, url_metadata)
+        # Task-003 Phase 3: Enhance markdown with dual URL section
+        # url_metadata should be available from fetch_html() call
+        md = insert_dual_url_section(md, url_metadata)
+    profile_checkpoint('page parsed')
 
     # Determine output formats needed
     output_markdown, output_html = determine_output_format(args, url)
 
     # Write markdown file if requested
     if output_markdown:
-        path.write_text(md, encoding='utf-8')
+        with span('write'):
+            path.write_text(md, encoding='utf-8')
         logging.info(f"Markdown file saved: {path}")
     
     # Write HTML file if requested
     if output_html:
         try:
             html_path = get_html_output_path(args, url, base)
-            write_html_file(html, html_path, url, title)
+            with span('write'):
+                write_html_file(html, html_path, url, title)
             logging.info(f"HTML file saved: {html_path}")
         except Exception as e:
             logging.error(f"Failed to write HTML output: {e}")
@@ -5151,8 +6068,11 @@ def main():
         # Add fetch metrics to JSON if available
         if fetch_metrics:
             json_data['metadata']['fetch_metrics'] = fetch_metrics.to_dict()
+        if get_timings() is not None:
+            json_data['metadata']['timings'] = get_timings().to_dict()
         json_path = path.with_suffix('.json')
-        json_path.write_text(json.dumps(json_data, ensure_ascii=False, indent=2), encoding='utf-8')
+        with span('write'):
+            json_path.write_text(json.dumps(json_data, ensure_ascii=False, indent=2), encoding='utf-8')
         logging.info(f"JSON data saved: {json_path}")
     
     # Print primary output path(s)
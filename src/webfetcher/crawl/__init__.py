@@ -0,0 +1,36 @@
+"""Site crawling building blocks (frontier, seen-sets, checkpoints, near-duplicates, priorities, pagination)."""
+from .frontier import CrawlFrontier, FetchPacer, FrontierEntry
+from .seen import (
+    FingerprintSet, ScalableBloomFilter, StringSeenSet,
+    make_seen_set, url_fingerprint, SEEN_SET_KINDS, DEFAULT_SEEN_SET
+)
+from .spill import SpillQueue, DEFAULT_FRONTIER_MEMORY
+from .memory import current_rss_bytes, format_bytes
+from .journal import CrawlJournal, CrawlJournalError, CrawlState, list_crawls, new_crawl_id, prune_crawls
+from .simhash import (
+    NearDuplicateDetector, SimHashIndex, page_fingerprint, simhash,
+    visible_text, hamming_distance, DEFAULT_NEAR_DUP_DISTANCE
+)
+from .priority import (
+    BestFirstQueue, LinkInfo, LinkScorer, load_priority_config, make_link_scorer,
+    CRAWL_ORDERS, DEFAULT_CRAWL_ORDER, DEFAULT_PRIORITY_CONFIG
+)
+from .pagination import (
+    PaginationPrefetcher, find_next_page, pagination_chain, page_number, same_sequence,
+    DEFAULT_PAGINATION_PREFETCH
+)
+
+__all__ = [
+    'CrawlFrontier', 'FetchPacer', 'FrontierEntry',
+    'FingerprintSet', 'ScalableBloomFilter', 'StringSeenSet',
+    'make_seen_set', 'url_fingerprint', 'SEEN_SET_KINDS', 'DEFAULT_SEEN_SET',
+    'SpillQueue', 'DEFAULT_FRONTIER_MEMORY',
+    'current_rss_bytes', 'format_bytes',
+    'CrawlJournal', 'CrawlJournalError', 'CrawlState', 'list_crawls', 'new_crawl_id', 'prune_crawls',
+    'NearDuplicateDetector', 'SimHashIndex', 'page_fingerprint', 'simhash',
+    'visible_text', 'hamming_distance', 'DEFAULT_NEAR_DUP_DISTANCE',
+    'BestFirstQueue', 'LinkInfo', 'LinkScorer', 'load_priority_config', 'make_link_scorer',
+    'CRAWL_ORDERS', 'DEFAULT_CRAWL_ORDER', 'DEFAULT_PRIORITY_CONFIG',
+    'PaginationPrefetcher', 'find_next_page', 'pagination_chain', 'page_number', 'same_sequence',
+    'DEFAULT_PAGINATION_PREFETCH'
+]
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Shared Crawl Frontier
+共享爬取边界（待抓取队列）
+
+One CrawlFrontier serves every sub-crawl of a category-first crawl: URLs are
+deduplicated globally (a page reachable from several categories is fetched
+once, by the category that reached it first), each category has its own queue
+and page quota, and worker threads pull work from all categories at once.
+一个 CrawlFrontier 服务于分类优先爬取的所有子爬取：URL 全局去重（多个分类共享的页面
+只由最先发现它的分类抓取一次），每个分类拥有独立队列与页面配额，工作线程同时从所有
+分类中获取任务。
+
+Scheduling is a weighted fair share: the next URL comes from the eligible
+category with the fewest pages (fetched + in flight) per unit of priority, so
+priority-3 categories get three slots for every one a priority-1 category
+gets, and ties go to the higher priority, then the earlier category.
+调度采用加权公平分配：下一个 URL 取自"已占用页面数 / 优先级"最小的可调度分类，
+同值时优先级高者、再按分类顺序。
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .seen import make_seen_set, DEFAULT_SEEN_SET
+from .spill import SpillQueue, DEFAULT_FRONTIER_MEMORY
+
+
+class FetchPacer:
+    """
+    Keeps fetch starts at least min_interval apart, across threads / 跨线程保持抓取开始的最小间隔
+
+    Slots are reserved under a lock and slept out after it, so concurrent
+    callers (crawl workers, pagination prefetch threads) line up one interval
+    apart instead of all waking at once.
+    时段在锁内预约、锁外等待，并发调用者依次间隔 min_interval 开始抓取。
+    """
+
+    def __init__(self, min_interval: float = 0.0):
+        self.min_interval = max(float(min_interval), 0.0)
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserve the next fetch slot; returns the seconds until it starts / 预约下一个时段，返回需等待秒数"""
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self.min_interval
+        return start_at - now
+
+    def wait(self) -> None:
+        """Block until this caller may start a fetch / 等待至可开始抓取"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FrontierEntry(NamedTuple):
+    """One URL handed out by CrawlFrontier.pop() / 一个待抓取 URL"""
+    url: str
+    normalized: str
+    depth: int
+    category: int
+
+
+class _CategoryQueue:
+    """Per-category queue, quota and results / 单个分类的队列、配额与结果"""
+
+    def __init__(self, key: int, name: str, priority: int, quota: Optional[int], queue: SpillQueue):
+        self.key = key
+        self.name = name
+        self.priority = max(int(priority), 1)
+        self.quota = quota
+        self.queue = queue
+        self.in_flight = 0
+        self.fetched = 0
+        self.failed = 0
+        self.pages: List[Any] = []
+
+    def has_quota(self) -> bool:
+        return self.quota is None or self.fetched + self.in_flight < self.quota
+
+    def share(self) -> float:
+        return (self.fetched + self.in_flight) / self.priority
+
+
+class CrawlFrontier:
+    """
+    Thread-safe frontier with global dedup and per-category quotas
+    线程安全的爬取边界，全局去重并按分类限额
+
+    Usage:
+        frontier = CrawlFrontier(normalize_url_for_dedup, max_pages=500, min_interval=0.5)
+        news = frontier.add_category('News', priority=2, quota=100)
+        frontier.push(news_url, 0, news)
+        # worker threads
+        while (entry := frontier.pop()) is not None:
+            try:
+                page = fetch(entry.url)
+            except Exception:
+                page = None
+            frontier.complete(entry, page)
+        # consumer
+        pages = frontier.wait_category(news)
+    """
+
+    def __init__(self, normalize: Callable[[str], str], max_pages: Optional[int] = None,
+                 min_interval: float = 0.0, seen: Any = None,
+                 memory_items: int = DEFAULT_FRONTIER_MEMORY, spill_dir: Optional[str] = None):
+        """
+        Args:
+            normalize: URL normalizer used as the dedup key / 用作去重键的 URL 规范化函数
+            max_pages: Global page budget across categories / 所有分类共享的页面总预算
+            min_interval: Minimum seconds between two fetch starts (politeness) / 两次抓取开始的最小间隔
+            seen: Seen-set from make_seen_set() (default: exact fingerprints) / 已见集合
+            memory_items: Queue entries per category kept in memory before spilling to disk / 每个分类内存队列上限
+            spill_dir: Directory for spilled queue entries / 队列溢出目录
+        """
+        self.normalize = normalize
+        self.max_pages = max_pages
+        self.min_interval = min_interval
+        self._pacer = FetchPacer(min_interval)
+        self.memory_items = memory_items
+        self.spill_dir = spill_dir
+        self._categories: List[_CategoryQueue] = []
+        self._seen = seen if seen is not None else make_seen_set(DEFAULT_SEEN_SET)
+        self._in_flight = 0
+        self._fetched = 0
+        self._duplicates = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def add_category(self, name: str, priority: int = 1, quota: Optional[int] = None) -> int:
+        """Register a category and return its key for push() / 注册分类并返回其键"""
+        with self._cond:
+            key = len(self._categories)
+            queue = SpillQueue(memory_items=self.memory_items, directory=self.spill_dir)
+            self._categories.append(_CategoryQueue(key, name, priority, quota, queue))
+            return key
+
+    def mark_seen(self, url: str) -> bool:
+        """
+        Record a URL fetched outside the frontier (e.g. the homepage) so it is never queued.
+        记录在边界之外已抓取的 URL（如首页），使其不再入队
+
+        Returns:
+            bool: False if the URL was already known
+        """
+        normalized = self.normalize(url)
+        with self._cond:
+            return self._seen.add(normalized)
+
+    def is_seen(self, normalized: str) -> bool:
+        """Whether a normalized URL was already queued or fetched / 规范化 URL 是否已入队或已抓取"""
+        with self._cond:
+            return normalized in self._seen
+
+    def push(self, url: str, depth: int, category: int, normalized: Optional[str] = None) -> bool:
+        """
+        Queue a URL for a category unless any category has already claimed it.
+        将 URL 加入分类队列，除非已被任一分类占用
+
+        Returns:
+            bool: True if queued, False for a duplicate
+        """
+        if normalized is None:
+            normalized = self.normalize(url)
+        with self._cond:
+            if not self._seen.add(normalized):
+                self._duplicates += 1
+                return False
+            self._categories[category].queue.append((url, normalized, depth))
+            self._cond.notify()
+            return True
+
+    def _budget_left(self) -> bool:
+        return self.max_pages is None or self._fetched + self._in_flight < self.max_pages
+
+    def _next_category(self) -> Optional[_CategoryQueue]:
+        if not self._budget_left():
+            return None
+        eligible = [c for c in self._categories if c.queue and c.has_quota()]
+        if not eligible:
+            return None
+        return min(eligible, key=lambda c: (c.share(), -c.priority, c.key))
+
+    def pop(self) -> Optional[FrontierEntry]:
+        """
+        Take the next URL, blocking while other workers may still discover more.
+        取出下一个 URL；若其他工作线程仍可能发现新链接则阻塞等待
+
+        Returns None once the frontier is exhausted (nothing queued and nothing
+        in flight), the page budget is spent, or close() was called.
+        Sleeps first as needed to keep min_interval between fetch starts.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                category = self._next_category()
+                if category is not None:
+                    break
+                if self._in_flight == 0:
+                    return None
+                self._cond.wait()
+
+            url, normalized, depth = category.queue.popleft()
+            category.in_flight += 1
+            self._in_flight += 1
+            delay = self._pacer.reserve()
+
+        if delay > 0:
+            time.sleep(delay)
+        return FrontierEntry(url, normalized, depth, category.key)
+
+    def complete(self, entry: FrontierEntry, page: Any = None) -> None:
+        """
+        Report the outcome of a popped entry; page=None marks a failed fetch.
+        报告已取出任务的结果；page=None 表示抓取失败（不占用配额）
+
+        Push the links discovered on the page before calling this, so that
+        waiting workers and consumers never see the frontier as drained early.
+        """
+        with self._cond:
+            category = self._categories[entry.category]
+            category.in_flight -= 1
+            self._in_flight -= 1
+            if page is None:
+                category.failed += 1
+            else:
+                category.fetched += 1
+                self._fetched += 1
+                category.pages.append(page)
+            self._cond.notify_all()
+
+    def _category_finished(self, category: _CategoryQueue) -> bool:
+        if self._closed:
+            return True
+        if category.in_flight:
+            return False
+        # Only a category's own pages feed its queue, so with nothing in flight
+        # an empty (or unschedulable) queue stays that way
+        return not category.queue or not category.has_quota() or not self._budget_left()
+
+    def wait_category(self, category: int, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Block until a category can make no further progress, then return its pages.
+        阻塞直到分类无法继续推进，返回其页面列表
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._category_finished(self._categories[category]), timeout)
+            return list(self._categories[category].pages)
+
+    def close(self) -> None:
+        """Stop handing out work; pop() returns None from now on / 停止分配任务"""
+        with self._cond:
+            self._closed = True
+            for category in self._categories:
+                category.queue.close()
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Frontier counters / 边界统计"""
+        with self._cond:
+            return {
+                'seen': len(self._seen),
+                'seen_bytes': self._seen.memory_bytes(),
+                'fetched': self._fetched,
+                'failed': sum(c.failed for c in self._categories),
+                'in_flight': self._in_flight,
+                'queued': sum(len(c.queue) for c in self._categories),
+                'queued_on_disk': sum(c.queue.on_disk for c in self._categories),
+                'duplicates_skipped': self._duplicates,
+                'categories': {c.key: {'name': c.name, 'priority': c.priority,
+                                       'fetched': c.fetched, 'quota': c.quota}
+                               for c in self._categories},
+            }
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Crawl Checkpoint Journal
+爬取检查点日志
+
+A site crawl appends everything it learns to an on-disk journal so that a run
+that dies (Ctrl-C, network drop, a parser calling sys.exit) can be resumed
+with ``--resume <crawl-id>`` without refetching a single page.
+站点爬取将进度追加写入磁盘日志，中断后可通过 --resume <crawl-id> 继续，无需重新抓取。
+
+Layout of ``~/.cache/webfetcher/crawls/<crawl-id>/``:
+    journal.jsonl  one JSON record per line, append-only
+                   start / queue / page / fail / dup / checkpoint / done
+    pages.dat      zlib-compressed page payloads, append-only; page records
+                   point into it by offset and length
+
+Records are buffered and written in batches: checkpoint() flushes the
+payloads first, then the buffered records plus a stats snapshot, and fsyncs
+both, every ``checkpoint_interval`` pages or ``checkpoint_seconds`` seconds.
+Nothing is ever rewritten, so a checkpoint costs only what changed since the
+last one; a crash loses at most the pages fetched since the last checkpoint,
+and a half-written last line is ignored on replay.
+记录先缓冲，按页数或时间间隔批量追加并 fsync；从不重写已有内容，崩溃最多丢失最后一个
+检查点之后的页面。
+
+Opening a journal only counts its records. The queue is replayed straight into
+the crawl's own seen-set and frontier (replay_queue) and pages are streamed one
+at a time (iter_pages), so resuming a large crawl never holds its whole queue
+or all page HTML in memory.
+打开日志时只统计记录；队列直接重放到爬虫的已见集合与队列，页面逐个流式读取。
+"""
+
+import datetime
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import urllib.parse
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CRAWL_DIR = Path.home() / ".cache" / "webfetcher" / "crawls"
+DEFAULT_CHECKPOINT_INTERVAL = 25   # pages between checkpoints / 检查点间隔页数
+DEFAULT_CHECKPOINT_SECONDS = 30.0  # or seconds, whichever comes first / 或间隔秒数
+
+JOURNAL_VERSION = 1
+JOURNAL_FILE = 'journal.jsonl'
+PAYLOAD_FILE = 'pages.dat'
+
+
+class CrawlJournalError(Exception):
+    """Missing, unreadable or incompatible crawl journal / 爬取日志缺失、损坏或版本不兼容"""
+
+
+@dataclass
+class CrawlState:
+    """
+    Crawl state summarised from a journal / 从日志汇总的爬取状态
+
+    queued and pages are counts only: the queue itself is replayed with
+    CrawlJournal.replay_queue() and the pages with CrawlJournal.iter_pages().
+    """
+    start_url: str
+    params: Dict[str, Any]
+    queued: int = 0
+    pages: int = 0
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+    duplicates: List[Tuple[str, str]] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+    finished: bool = False
+
+
+def new_crawl_id(start_url: str) -> str:
+    """Readable, unique-enough crawl id: <host>-<timestamp> / 生成爬取 ID"""
+    host = urllib.parse.urlparse(start_url).netloc or 'site'
+    host = re.sub(r'[^A-Za-z0-9.-]+', '_', host)
+    return f"{host}-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+
+class CrawlJournal:
+    """
+    Append-only checkpoint journal for one crawl / 单次爬取的追加式检查点日志
+
+    Usage:
+        journal = CrawlJournal.create(url, {'max_pages': 1000})
+        journal.record_queue([(url, 0)])
+        journal.record_page(url, 0, html, queued=[(link, 1), ...])
+        if journal.checkpoint_due():
+            journal.checkpoint(stats)
+        journal.finish(stats)
+
+        # later, after a crash
+        journal = CrawlJournal.open(crawl_id, normalize=normalize_url)
+        journal.replay_queue(seen, enqueue)        # pending URLs into the frontier
+        for url, html, depth in journal.iter_pages():
+            ...
+    """
+
+    def __init__(self, crawl_id: str, directory: Optional[str] = None,
+                 checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+                 checkpoint_seconds: float = DEFAULT_CHECKPOINT_SECONDS):
+        """
+        Args:
+            crawl_id: Name of the crawl directory / 爬取目录名
+            directory: Parent directory (defaults to $WF_CRAWL_DIR or ~/.cache/webfetcher/crawls)
+            checkpoint_interval: Pages between checkpoints / 检查点间隔页数
+            checkpoint_seconds: Maximum seconds between checkpoints / 检查点最大间隔秒数
+        """
+        self.crawl_id = crawl_id
+        self.path = Path(directory or os.environ.get('WF_CRAWL_DIR') or DEFAULT_CRAWL_DIR) / crawl_id
+        self.checkpoint_interval = max(int(checkpoint_interval), 1)
+        self.checkpoint_seconds = checkpoint_seconds
+        self.state: Optional[CrawlState] = None
+        self._normalize: Callable[[str], str] = lambda url: url
+        self._replay_size = 0
+        self._journal = None
+        self._payloads = None
+        self._payload_offset = 0
+        self._buffer: List[str] = []
+        self._pending_pages = 0
+        self._last_checkpoint = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Lifecycle / 生命周期
+    # ------------------------------------------------------------------
+    @classmethod
+    def create(cls, start_url: str, params: Optional[Dict[str, Any]] = None,
+               crawl_id: Optional[str] = None, **kwargs) -> 'CrawlJournal':
+        """Start a new journal for a crawl / 为新爬取创建日志"""
+        journal = cls(crawl_id or new_crawl_id(start_url), **kwargs)
+        if journal.path.exists():
+            raise CrawlJournalError(f"Crawl journal already exists: {journal.path}")
+        journal.path.mkdir(parents=True)
+        journal._open_files()
+        journal.state = CrawlState(start_url=start_url, params=dict(params or {}))
+        journal._append({'type': 'start', 'version': JOURNAL_VERSION, 'url': start_url,
+                         'params': journal.state.params, 'time': time.time()})
+        journal.checkpoint()
+        return journal
+
+    @classmethod
+    def open(cls, crawl_id: str, normalize: Optional[Callable[[str], str]] = None,
+             **kwargs) -> 'CrawlJournal':
+        """
+        Reopen a journal for resuming; its replayed state is in .state.
+        重新打开日志以继续爬取，重放结果位于 .state
+
+        Args:
+            crawl_id: Crawl id printed when the crawl started / 爬取开始时输出的 ID
+            normalize: URL normalizer used to match fetched URLs against queued ones
+        """
+        journal = cls(crawl_id, **kwargs)
+        journal_path = journal.path / JOURNAL_FILE
+        if not journal_path.exists():
+            raise CrawlJournalError(f"No crawl journal found for '{crawl_id}' in {journal.path.parent}")
+        if normalize is not None:
+            journal._normalize = normalize
+        journal.state, intact_size = journal._replay()
+        if intact_size < journal_path.stat().st_size:
+            # Drop a torn tail so new records do not land behind it
+            with open(journal_path, 'r+b') as f:
+                f.truncate(intact_size)
+        journal._replay_size = intact_size
+        journal._open_files()
+        return journal
+
+    def _open_files(self):
+        self._journal = open(self.path / JOURNAL_FILE, 'a', encoding='utf-8', newline='\n')
+        self._payloads = open(self.path / PAYLOAD_FILE, 'ab')
+        self._payload_offset = self._payloads.seek(0, 2)
+
+    def close(self) -> None:
+        """Checkpoint buffered records and close the files / 写出缓冲并关闭文件"""
+        if self._journal is None:
+            return
+        if self._buffer:
+            self.checkpoint()
+        self._journal.close()
+        self._payloads.close()
+        self._journal = self._payloads = None
+
+    def remove(self) -> None:
+        """Delete the journal once its crawl output is safely written / 输出写出后删除日志"""
+        self.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Recording / 记录
+    # ------------------------------------------------------------------
+    def _append(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+
+    def record_queue(self, items: Iterable[Tuple[str, int]]) -> None:
+        """Record seed URLs queued outside of a page record / 记录种子 URL"""
+        self._append({'type': 'queue', 'items': [list(item) for item in items]})
+
+    def record_page(self, url: str, depth: int, html: str,
+                    queued: Iterable[Tuple[str, int]] = ()) -> None:
+        """
+        Record a fetched page and the links it queued, as one atomic record.
+        以单条记录保存已抓取页面及其入队链接
+        """
+        payload = zlib.compress((html or '').encode('utf-8', 'surrogatepass'), 1)
+        self._payloads.write(payload)
+        self._append({'type': 'page', 'url': url, 'depth': depth,
+                      'offset': self._payload_offset, 'length': len(payload),
+                      'queued': [list(item) for item in queued]})
+        self._payload_offset += len(payload)
+        self._pending_pages += 1
+
+    def record_failure(self, url: str, depth: int, error: str,
+                       queued: Iterable[Tuple[str, int]] = ()) -> None:
+        """Record a URL that failed and will not be retried on resume / 记录失败 URL"""
+        self._append({'type': 'fail', 'url': url, 'depth': depth, 'error': error,
+                      'queued': [list(item) for item in queued]})
+        self._pending_pages += 1
+
+    def record_duplicate(self, url: str, depth: int, duplicate_of: str,
+                         queued: Iterable[Tuple[str, int]] = ()) -> None:
+        """Record a fetched page skipped as a near-duplicate (no payload kept) / 记录近重复页面"""
+        self._append({'type': 'dup', 'url': url, 'depth': depth, 'of': duplicate_of,
+                      'queued': [list(item) for item in queued]})
+        self._pending_pages += 1
+
+    def checkpoint_due(self) -> bool:
+        return (self._pending_pages >= self.checkpoint_interval
+                or (self._buffer and time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds))
+
+    def checkpoint(self, stats: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Append buffered records (plus a stats snapshot) and fsync.
+        追加缓冲记录与统计快照并落盘
+
+        Payloads are synced before the records that point at them.
+        """
+        if self._journal is None:
+            return
+        if stats is not None:
+            self._append({'type': 'checkpoint', 'stats': _json_stats(stats)})
+        self._payloads.flush()
+        os.fsync(self._payloads.fileno())
+        if self._buffer:
+            self._journal.write('\n'.join(self._buffer) + '\n')
+            self._buffer.clear()
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending_pages = 0
+        self._last_checkpoint = time.monotonic()
+
+    def finish(self, stats: Optional[Dict[str, Any]] = None) -> None:
+        """Mark the crawl complete; a resume then only replays it / 标记爬取完成"""
+        if stats is not None:
+            self._append({'type': 'checkpoint', 'stats': _json_stats(stats)})
+        self._append({'type': 'done', 'time': time.time()})
+        self.checkpoint()
+
+    # ------------------------------------------------------------------
+    # Replay / 重放
+    # ------------------------------------------------------------------
+    def _records(self, limit: Optional[int] = None) -> Iterable[Tuple[Dict[str, Any], int]]:
+        """
+        Stream (record, line size) pairs up to the first unreadable line.
+        逐行读取记录，遇到损坏行即停止
+        """
+        read = 0
+        with open(self.path / JOURNAL_FILE, 'rb') as journal:
+            for line_no, line in enumerate(journal, 1):
+                if limit is not None and read >= limit:
+                    return
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('incomplete line')
+                    record = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    # Torn write at the tail: everything before it is intact
+                    logger.warning(f"Crawl journal {self.crawl_id}: ignoring unreadable record at line {line_no}")
+                    return
+                read += len(line)
+                yield record, len(line)
+
+    def _replay(self) -> Tuple[CrawlState, int]:
+        """
+        Count the journal's records without loading pages or the queue;
+        also returns the size of the intact journal prefix.
+        统计日志记录（不加载页面与队列），并返回完整前缀的字节数
+        """
+        payload_path = self.path / PAYLOAD_FILE
+        payload_size = payload_path.stat().st_size if payload_path.exists() else 0
+        state = None
+        intact_size = 0
+        for record, size in self._records():
+            kind = record.get('type')
+            if kind == 'start':
+                if record.get('version') != JOURNAL_VERSION:
+                    raise CrawlJournalError(f"Unsupported crawl journal version: {record.get('version')}")
+                state = CrawlState(start_url=record['url'], params=record.get('params', {}))
+            elif state is None:
+                raise CrawlJournalError(f"Crawl journal {self.crawl_id} has no start record")
+            elif kind == 'queue':
+                state.queued += len(record['items'])
+            elif kind == 'page':
+                if record['offset'] + record['length'] > payload_size:
+                    logger.warning(f"Crawl journal {self.crawl_id}: payload missing for {record['url']}, will refetch")
+                    break
+                state.pages += 1
+            elif kind == 'fail':
+                state.failed.append((record['url'], record.get('error', '')))
+            elif kind == 'dup':
+                state.duplicates.append((record['url'], record.get('of', '')))
+            elif kind == 'checkpoint':
+                state.stats = record.get('stats', {})
+            elif kind == 'done':
+                state.finished = True
+            if kind in ('page', 'fail', 'dup'):
+                state.queued += len(record.get('queued', ()))
+            intact_size += size
+        if state is None:
+            raise CrawlJournalError(f"Crawl journal {self.crawl_id} is empty")
+        return state, intact_size
+
+    def replay_queue(self, seen, enqueue: Callable[[str, int], None]) -> int:
+        """
+        Replay the journaled queue into the crawl's seen-set and frontier.
+        将日志中的队列重放到爬虫的已见集合与队列
+
+        Fetched, failed and duplicate URLs are marked seen first, so a second
+        pass can enqueue exactly the URLs that were queued but never finished.
+        Only the seen-set (bounded, e.g. a Bloom filter) and the frontier
+        (which spills to disk) grow; nothing else is held per URL.
+
+        Args:
+            seen: Crawl seen-set keyed by normalized URL / 爬虫的已见集合
+            enqueue: Called with (url, depth) for every pending URL / 待抓取 URL 回调
+
+        Returns:
+            Number of pending URLs enqueued / 入队的待抓取 URL 数
+        """
+        normalize = self._normalize
+        for record, _ in self._records(self._replay_size):
+            if record.get('type') in ('page', 'fail', 'dup'):
+                seen.add(normalize(record['url']))
+        pending = 0
+        for record, _ in self._records(self._replay_size):
+            kind = record.get('type')
+            if kind == 'queue':
+                items = record['items']
+            elif kind in ('page', 'fail', 'dup'):
+                items = record.get('queued', ())
+            else:
+                continue
+            for url, depth in items:
+                key = normalize(url)
+                if key in seen:
+                    continue
+                seen.add(key)
+                enqueue(url, depth)
+                pending += 1
+        return pending
+
+    def iter_pages(self) -> Iterable[Tuple[str, str, int]]:
+        """
+        Stream the journaled pages as (url, html, depth), one payload at a time.
+        逐个读取日志中的页面 (url, html, depth)
+        """
+        payload_path = self.path / PAYLOAD_FILE
+        if not self.state or not self.state.pages or not payload_path.exists():
+            return
+        remaining = self.state.pages
+        with open(payload_path, 'rb') as payloads:
+            for record, _ in self._records(self._replay_size):
+                if record.get('type') != 'page':
+                    continue
+                payloads.seek(record['offset'])
+                html = zlib.decompress(payloads.read(record['length'])).decode('utf-8', 'surrogatepass')
+                yield record['url'], html, record['depth']
+                remaining -= 1
+                if not remaining:
+                    return
+
+
+def list_crawls(directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Summarise every journal under the crawl directory, newest first.
+    列出爬取目录下的所有日志（最新在前）
+
+    Each entry has crawl_id, start_url, pages, failed, finished, updated
+    (journal mtime) and size (bytes on disk); unreadable journals are listed
+    with an error instead.
+    """
+    root = Path(directory or os.environ.get('WF_CRAWL_DIR') or DEFAULT_CRAWL_DIR)
+    if not root.is_dir():
+        return []
+    crawls = []
+    for path in root.iterdir():
+        journal_path = path / JOURNAL_FILE
+        if not journal_path.is_file():
+            continue
+        entry = {'crawl_id': path.name, 'path': str(path),
+                 'updated': journal_path.stat().st_mtime,
+                 'size': sum(f.stat().st_size for f in path.iterdir() if f.is_file())}
+        try:
+            state, _ = CrawlJournal(path.name, directory=str(root))._replay()
+            entry.update(start_url=state.start_url, pages=state.pages,
+                         failed=len(state.failed), finished=state.finished)
+        except (CrawlJournalError, OSError, KeyError) as e:
+            entry['error'] = str(e)
+        crawls.append(entry)
+    crawls.sort(key=lambda entry: entry['updated'], reverse=True)
+    return crawls
+
+
+def prune_crawls(older_than_days: float = 0.0, directory: Optional[str] = None,
+                 finished_only: bool = False) -> List[str]:
+    """
+    Delete journals not updated for older_than_days; returns the removed ids.
+    删除超过指定天数未更新的日志，返回被删除的爬取 ID
+
+    Args:
+        older_than_days: Minimum age in days (0 removes every journal) / 最小天数
+        directory: Crawl directory (defaults to $WF_CRAWL_DIR or ~/.cache/webfetcher/crawls)
+        finished_only: Only remove crawls that ran to completion / 仅删除已完成的爬取
+    """
+    cutoff = time.time() - older_than_days * 86400
+    removed = []
+    for entry in list_crawls(directory):
+        if entry['updated'] > cutoff or (finished_only and not entry.get('finished')):
+            continue
+        shutil.rmtree(entry['path'], ignore_errors=True)
+        removed.append(entry['crawl_id'])
+    return removed
+
+
+def _json_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Crawl stats reduced to what survives a resume / 可跨恢复保留的统计"""
+    keep = ('pages_crawled', 'pages_success', 'pages_failed', 'total_size', 'peak_rss_bytes')
+    snapshot = {key: stats[key] for key in keep if key in stats}
+    if 'start_time' in stats:
+        snapshot['elapsed'] = time.time() - stats['start_time']
+    return snapshot
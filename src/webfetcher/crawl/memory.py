@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Crawl Memory Reporting
+爬取内存报告
+
+Resident set size of the current process without third-party dependencies:
+/proc/self/statm on Linux, peak RSS from getrusage() elsewhere, None where
+neither exists (Windows).
+无需第三方依赖获取当前进程常驻内存：Linux 读取 /proc/self/statm，其他系统用 getrusage()
+的峰值，均不可用时（Windows）返回 None。
+"""
+
+import os
+import sys
+from typing import Optional
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident memory of this process in bytes, or None / 当前进程常驻内存字节数"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+    return None
+
+
+def format_bytes(size: Optional[float]) -> str:
+    """Human-readable byte count / 可读的字节数"""
+    if size is None:
+        return 'n/a'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
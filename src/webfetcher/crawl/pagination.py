@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Pagination Detection and Prefetch
+分页检测与预取
+
+find_next_page() recognizes a page's "next page" link without knowing the
+site's generator, trying in order:
+find_next_page() 无需识别站点生成器即可找到"下一页"链接，依次尝试：
+
+1. <link rel="next"> / <a rel="next">
+2. pagination classes: next, pagination-next, md-footer-nav__link--next, ...
+   常见分页 class
+3. anchor text: Next, Next page, », 下一页, 次へ, ...
+   锚文本
+4. numbered page links: the link labelled N+1 whose URL carries page N+1
+   数字页码链接：文本为 N+1 且 URL 中页码为 N+1 的链接
+
+When consecutive pages differ only in a page number (?page=3, /page/3,
+article_3.html), pagination_chain() extrapolates the URLs further ahead so
+PaginationPrefetcher can fetch them concurrently while the current page is
+still being parsed.
+若相邻页面仅页码不同，pagination_chain() 会推算后续页面 URL，由
+PaginationPrefetcher 在解析当前页的同时并发预取。
+"""
+
+import html as ihtml
+import re
+import threading
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_PAGINATION_PREFETCH = 2  # Pages fetched ahead of the one being processed / 预取页数
+
+_LINK_TAG_RE = re.compile(r'<link\b([^>]*)>', re.I)
+_ANCHOR_RE = re.compile(r'<a\b([^>]*)>(.*?)</a\s*>', re.I | re.S)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+_TAG_RE = re.compile(r'<[^>]+>')
+_NEXT_CLASS_RE = re.compile(r'(?:^|[_-])next(?:$|[_-](?:page|link|btn|button)$)|^nextpostslink$', re.I)
+_NEXT_TEXTS = {'next', 'next page', 'next »', 'next ›', 'next >', 'next →', '»', '›', '→',
+               'older posts', 'older entries', '下一页', '下页', '下一頁', '下頁', '次へ', '次のページ', '다음'}
+_PAGE_NUMBER_RES = [
+    re.compile(r'([?&](?:page|p|pg|paged|pagenum|page_num|pn)=)(\d+)', re.I),
+    re.compile(r'(/page/)(\d+)', re.I),
+    re.compile(r'([_-])(\d+)(?=\.s?html?$)', re.I),
+]
+
+
+def _attributes(raw: str) -> Dict[str, str]:
+    return {name.lower(): ihtml.unescape(a if a is not None else b if b is not None else c)
+            for name, a, b, c in _ATTR_RE.findall(raw)}
+
+
+def _resolve(href: str, current_url: str) -> Optional[str]:
+    href = (href or '').strip()
+    if not href or href.startswith(('#', 'javascript:', 'mailto:')):
+        return None
+    full_url = urllib.parse.urljoin(current_url, href)
+    if full_url.split('#')[0] == current_url.split('#')[0]:
+        return None
+    return full_url
+
+
+def page_number(url: str) -> Optional[Tuple[int, int]]:
+    """(pattern index, page number) of a paginated URL, or None / 分页 URL 的页码"""
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path + ('?' + parts.query if parts.query else '')
+    for index, pattern in enumerate(_PAGE_NUMBER_RES):
+        match = pattern.search(target)
+        if match:
+            return index, int(match.group(2))
+    return None
+
+
+def _with_page_number(url: str, index: int, number: int) -> str:
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path + ('?' + parts.query if parts.query else '')
+    target = _PAGE_NUMBER_RES[index].sub(lambda m: m.group(1) + str(number), target, count=1)
+    path, _, query = target.partition('?')
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc, path, query, parts.fragment))
+
+
+def same_sequence(url: str, other: str) -> bool:
+    """Whether two URLs are pages of one numbered sequence / 两个 URL 是否属于同一页码序列"""
+    first, second = page_number(url), page_number(other)
+    if not first or not second or first[0] != second[0]:
+        return False
+    return _with_page_number(url, first[0], 0) == _with_page_number(other, second[0], 0)
+
+
+def find_next_page(html: str, current_url: str) -> Optional[str]:
+    """
+    URL of the next page in a paginated sequence, or None.
+    返回分页序列中下一页的 URL，未找到时返回 None
+    """
+    if not html:
+        return None
+    for match in _LINK_TAG_RE.finditer(html):
+        attrs = _attributes(match.group(1))
+        if 'next' in attrs.get('rel', '').lower().split():
+            url = _resolve(attrs.get('href'), current_url)
+            if url:
+                return url
+
+    by_class = by_text = by_number = None
+    current = page_number(current_url)
+    wanted = (current[1] if current else 1) + 1
+    for match in _ANCHOR_RE.finditer(html):
+        attrs = _attributes(match.group(1))
+        url = _resolve(attrs.get('href'), current_url)
+        if not url:
+            continue
+        if 'next' in attrs.get('rel', '').lower().split():
+            return url
+        if by_class is None:
+            names = attrs.get('class', '').split() + [attrs.get('id', '')]
+            if any(_NEXT_CLASS_RE.search(name) for name in names if name):
+                by_class = url
+                continue
+        text = ' '.join(ihtml.unescape(_TAG_RE.sub(' ', match.group(2))).split()).lower()
+        if by_text is None and (text in _NEXT_TEXTS or attrs.get('aria-label', '').strip().lower() in _NEXT_TEXTS):
+            by_text = url
+        elif by_number is None and text == str(wanted):
+            target = page_number(url)
+            if target and target[1] == wanted:
+                by_number = url
+    return by_class or by_text or by_number
+
+
+def pagination_chain(current_url: str, next_url: str, count: int) -> List[str]:
+    """
+    next_url plus the pages after it, extrapolated when the page number simply counts up.
+    返回 next_url 及其后续页面（页码递增时按规律推算），共最多 count 个
+    """
+    if count <= 0:
+        return []
+    chain = [next_url]
+    following = page_number(next_url)
+    current = page_number(current_url)
+    current_number = current[1] if current else 1
+    if following and following[1] == current_number + 1 and (current is None or current[0] == following[0]):
+        index, number = following
+        chain.extend(_with_page_number(next_url, index, number + step) for step in range(1, count))
+    return chain
+
+
+class PaginationPrefetcher:
+    """
+    Fetch upcoming pagination pages on background threads / 后台线程预取后续分页
+
+    Prefetched URLs are guesses (the chain is extrapolated past pages nobody
+    has linked yet), so fetch should be a speculative fetch that returns None
+    rather than raising or recording anything when a guess fails.
+    预取的 URL 是推测结果，fetch 应为推测抓取：失败时返回 None，不抛出也不记录。
+
+    Usage:
+        prefetcher = PaginationPrefetcher(lambda url: fetch(url), ahead=2, pace=pacer.wait)
+        prefetcher.prefetch(pagination_chain(url, next_url, 2))
+        html = prefetcher.take(next_url)   # None if it was never prefetched
+        prefetcher.close()
+    """
+
+    def __init__(self, fetch: Callable[[str], Optional[str]], ahead: int = DEFAULT_PAGINATION_PREFETCH,
+                 normalize: Optional[Callable[[str], str]] = None,
+                 pace: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            fetch: Function returning the HTML of a URL, or None (called from worker threads) / 抓取函数
+            ahead: Concurrent prefetches, and pages to fetch ahead / 并发预取数
+            normalize: URL key function, so variants of a URL share one prefetch / URL 规范化函数
+            pace: Called before every fetch, e.g. the crawl's FetchPacer.wait, so
+                  prefetches honour the crawl delay / 每次抓取前调用（如爬取的限速器）
+        """
+        self.fetch = fetch
+        self.ahead = max(int(ahead), 0)
+        self.normalize = normalize or (lambda url: url)
+        self.pace = pace
+        self.submitted = 0
+        self.hits = 0
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = (ThreadPoolExecutor(max_workers=self.ahead, thread_name_prefix='wf-prefetch')
+                          if self.ahead else None)
+
+    def prefetch(self, urls: Iterable[str]) -> None:
+        """Start fetching URLs not already prefetched / 开始预取尚未预取的 URL"""
+        if self._executor is None:
+            return
+        with self._lock:
+            for url in urls:
+                key = self.normalize(url)
+                if key in self._futures:
+                    continue
+                # Unclaimed guesses (pages past the real end) must not pile up
+                if len(self._futures) >= 4 * self.ahead and not self._evict_unclaimed():
+                    continue
+                self._futures[key] = self._executor.submit(self._fetch, url)
+                self.submitted += 1
+
+    def _fetch(self, url: str) -> Optional[str]:
+        if self.pace is not None:
+            self.pace()
+            # Closed while waiting for a slot: nobody will take the page
+            if self._executor is None:
+                return None
+        return self.fetch(url)
+
+    def _evict_unclaimed(self) -> bool:
+        for key, future in self._futures.items():
+            if future.done():
+                del self._futures[key]
+                return True
+        return False
+
+    def take(self, url: str) -> Optional[str]:
+        """
+        HTML of a prefetched URL (waiting for it if still in flight), or None.
+        取出预取结果（仍在进行时等待）；未预取或预取失败时返回 None
+
+        A fetch function that raises has its error re-raised here.
+        """
+        with self._lock:
+            future = self._futures.pop(self.normalize(url), None)
+        if future is None:
+            return None
+        html = future.result()
+        if html is not None:
+            self.hits += 1
+        return html
+
+    def close(self) -> None:
+        """Drop unclaimed prefetches and stop the workers / 丢弃未取用的预取并停止线程"""
+        if self._executor is None:
+            return
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        self._executor.shutdown(wait=False)
+        self._executor = None
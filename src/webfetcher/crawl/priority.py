@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Best-First Crawl Frontier
+最佳优先爬取边界
+
+A FIFO frontier spends a --max-pages budget on whatever was linked first
+(tag clouds, archives, pagination), so real articles deeper in the site are
+often never reached. BestFirstQueue instead hands out the highest-scoring
+queued link, scored from:
+FIFO 队列按发现顺序消耗页面预算，常被标签页、归档页占满；BestFirstQueue 改为
+优先取出得分最高的链接，评分依据：
+
+- depth from the start page / 距起始页的深度
+- URL pattern priors (articles up, tags/archives/sort orders down) / URL 模式先验
+- sitemap <priority>, when known / sitemap 优先级
+- anchor text (descriptive text up, "more"/"next" down) / 锚文本
+- in-degree: how many fetched pages link to the URL / 入链数
+- pagination: "next page" links of a paginated listing or article / 分页链接
+
+Scores of queued links are raised as more pages link to them, and a per-host
+fairness penalty keeps one host from starving the others. Weights and patterns
+come from config/crawl_priority.yaml; a custom scorer can be plugged in there.
+已入队链接的入链数增加时会提升得分；按主机的公平性惩罚避免单一主机独占预算。
+权重与模式来自 config/crawl_priority.yaml，也可在其中指定自定义评分器。
+"""
+
+import heapq
+import importlib
+import logging
+import math
+import re
+import urllib.parse
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+from .spill import SpillQueue, DEFAULT_FRONTIER_MEMORY
+
+DEFAULT_PRIORITY_CONFIG = Path(__file__).resolve().parent.parent / 'config' / 'crawl_priority.yaml'
+CRAWL_ORDERS = ('best-first', 'bfs')
+DEFAULT_CRAWL_ORDER = 'best-first'
+
+_CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af'
+_WORD_RE = re.compile(f'[{_CJK}]|[^\\W_{_CJK}]+')
+
+
+class LinkInfo(NamedTuple):
+    """Everything a scorer may use about a queued link / 评分器可用的链接信息"""
+    url: str
+    depth: int
+    anchor_text: str = ''
+    in_degree: int = 1
+    sitemap_priority: Optional[float] = None
+    pagination: bool = False
+
+
+LinkScorerFunc = Callable[[LinkInfo], float]
+
+
+def load_priority_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the default priority config, overlaid with a user file if given.
+    加载默认评分配置，并用用户文件覆盖
+
+    Top-level mappings are merged key by key; any other value (lists
+    included) replaces the default.
+    """
+    with open(DEFAULT_PRIORITY_CONFIG, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            custom = yaml.safe_load(f) or {}
+        if not isinstance(custom, dict):
+            raise ValueError(f"Crawl priority config {path} must be a mapping")
+        for key, value in custom.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key] = {**config[key], **value}
+            else:
+                config[key] = value
+    return config
+
+
+class LinkScorer:
+    """
+    Default weighted link scorer / 默认加权链接评分器
+
+    Usage:
+        scorer = LinkScorer(load_priority_config())
+        scorer(LinkInfo('https://example.com/blog/2024/05/post.html', depth=2))
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        weights = config.get('weights') or {}
+        self.depth_weight = float(weights.get('depth', -1.0))
+        self.in_degree_weight = float(weights.get('in_degree', 0.5))
+        self.sitemap_weight = float(weights.get('sitemap_priority', 2.0))
+        self.anchor_weight = float(weights.get('anchor_text', 1.0))
+        self.pagination_weight = float(weights.get('pagination', 4.0))
+        self.patterns: List[Tuple[re.Pattern, float]] = [
+            (re.compile(rule['pattern'], re.I), float(rule['score']))
+            for rule in config.get('url_patterns') or ()
+        ]
+        anchor = config.get('anchor_text') or {}
+        self.min_words = max(int(anchor.get('min_words', 4)), 1)
+        self.generic_anchors = {text.lower() for text in anchor.get('generic') or ()}
+        self.generic_score = float(anchor.get('generic_score', -1.0))
+
+    def url_prior(self, url: str) -> float:
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path + ('?' + parts.query if parts.query else '')
+        return sum(score for pattern, score in self.patterns if pattern.search(target))
+
+    def anchor_score(self, text: str) -> float:
+        text = ' '.join(text.split()).lower()
+        if not text:
+            return 0.0
+        if text in self.generic_anchors:
+            return self.generic_score
+        return min(len(_WORD_RE.findall(text)) / self.min_words, 1.0)
+
+    def __call__(self, link: LinkInfo) -> float:
+        score = self.depth_weight * link.depth + self.url_prior(link.url)
+        score += self.in_degree_weight * math.log2(1 + link.in_degree)
+        score += self.anchor_weight * self.anchor_score(link.anchor_text)
+        if link.sitemap_priority is not None:
+            score += self.sitemap_weight * (link.sitemap_priority - 0.5)
+        if link.pagination:
+            score += self.pagination_weight
+        return score
+
+
+def make_link_scorer(config: Dict[str, Any]) -> LinkScorerFunc:
+    """
+    Build the scorer named by config['scorer'] ("package.module:factory"), or LinkScorer.
+    按配置构建评分器（"包.模块:工厂函数"），未指定时使用 LinkScorer
+    """
+    spec = config.get('scorer')
+    if not spec:
+        return LinkScorer(config)
+    module_name, _, attr = str(spec).partition(':')
+    if not attr:
+        raise ValueError(f"Crawl scorer must look like 'package.module:factory', got {spec!r}")
+    factory = getattr(importlib.import_module(module_name), attr)
+    logging.info(f"Using custom crawl scorer {spec} / 使用自定义爬取评分器")
+    return factory(config)
+
+
+class _Pending:
+    """A queued link kept in memory / 内存中的待抓取链接"""
+    __slots__ = ('url', 'depth', 'anchor_text', 'pagination', 'in_degree', 'host', 'score', 'version')
+
+    def __init__(self, url: str, depth: int, anchor_text: str, pagination: bool, host: str):
+        self.url = url
+        self.depth = depth
+        self.anchor_text = anchor_text
+        self.pagination = pagination
+        self.in_degree = 1
+        self.host = host
+        self.score = 0.0
+        self.version = 0
+
+
+class BestFirstQueue:
+    """
+    Score-ordered crawl queue with per-host fairness / 按得分排序、按主机公平的爬取队列
+
+    Drop-in for the SpillQueue crawl_site uses: popleft() returns the best
+    (url, depth) instead of the oldest. Up to memory_items links are scored
+    and kept in memory; beyond that the lowest-scoring quarter is spilled to
+    disk and read back (unsorted, in batches) once memory drains.
+    可替换 crawl_site 使用的 SpillQueue：popleft() 返回得分最高的 (url, depth)。
+    内存中最多保留 memory_items 个链接，超出时将得分最低的部分溢出到磁盘。
+
+    Usage:
+        queue = BestFirstQueue(make_link_scorer(load_priority_config()))
+        queue.push(url, depth, normalized, anchor_text='Getting started')
+        queue.add_inlink(normalized)   # another page links to it
+        url, depth = queue.popleft()
+    """
+
+    def __init__(self, scorer: LinkScorerFunc, memory_items: int = DEFAULT_FRONTIER_MEMORY,
+                 directory: Optional[str] = None, host_fairness: float = 0.5,
+                 sitemap_priorities: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            scorer: Callable scoring a LinkInfo, higher first / 评分函数，越大越先
+            memory_items: Links kept in memory before spilling / 溢出前内存中保留的链接数
+            directory: Directory for the spill file / 溢出文件目录
+            host_fairness: Penalty per log2(1 + pages fetched from a host) / 主机公平性惩罚
+            sitemap_priorities: Normalized URL -> sitemap <priority> / 规范化 URL 到 sitemap 优先级
+        """
+        self.scorer = scorer
+        self.memory_items = max(int(memory_items), 1)
+        self.host_fairness = host_fairness
+        self.sitemap_priorities = sitemap_priorities or {}
+        self._pending: Dict[str, _Pending] = {}
+        self._heaps: Dict[str, List[Tuple[float, int, str, int]]] = {}
+        self._host_fetched: Counter = Counter()
+        self._seq = 0
+        self._spill = SpillQueue(memory_items=1, directory=directory)
+
+    def score(self, url: str, depth: int, anchor_text: str = '', in_degree: int = 1,
+              normalized: Optional[str] = None, pagination: bool = False) -> float:
+        """Score a link without queueing it / 仅计算链接得分"""
+        priority = self.sitemap_priorities.get(normalized) if normalized is not None else None
+        return self.scorer(LinkInfo(url, depth, anchor_text, in_degree, priority, pagination))
+
+    def push(self, url: str, depth: int, normalized: str, anchor_text: str = '',
+             score: Optional[float] = None, pagination: bool = False) -> None:
+        """
+        Queue a link; the caller has already deduplicated it against the seen-set.
+        将链接入队（调用方已通过已见集合去重）
+        """
+        entry = _Pending(url, depth, anchor_text, pagination, urllib.parse.urlsplit(url).netloc)
+        if score is None:
+            score = self.score(url, depth, anchor_text, 1, normalized, pagination)
+        entry.score = score
+        self._pending[normalized] = entry
+        self._push_heap(normalized, entry)
+        if len(self._pending) > self.memory_items:
+            self._spill_lowest()
+
+    def add_inlink(self, normalized: str) -> bool:
+        """
+        Count one more page linking to a queued URL and re-score it.
+        为已入队 URL 增加一个入链并重新评分
+
+        Returns:
+            bool: False if the URL is not queued in memory (fetched, or spilled)
+        """
+        entry = self._pending.get(normalized)
+        if entry is None:
+            return False
+        entry.in_degree += 1
+        entry.score = self.score(entry.url, entry.depth, entry.anchor_text, entry.in_degree, normalized,
+                                 entry.pagination)
+        entry.version += 1
+        self._push_heap(normalized, entry)
+        return True
+
+    def _push_heap(self, normalized: str, entry: _Pending) -> None:
+        # Older heap items of a re-scored entry stay behind and are skipped by version
+        self._seq += 1
+        heapq.heappush(self._heaps.setdefault(entry.host, []),
+                       (-entry.score, self._seq, normalized, entry.version))
+
+    def _spill_lowest(self) -> None:
+        keep = max(self.memory_items * 3 // 4, 1)
+        ranked = sorted(self._pending.items(), key=lambda item: item[1].score, reverse=True)
+        for normalized, entry in ranked[keep:]:
+            self._spill.append((entry.url, entry.depth, normalized, entry.anchor_text, entry.pagination))
+            del self._pending[normalized]
+        self._heaps = {}
+        for normalized, entry in ranked[:keep]:
+            self._push_heap(normalized, entry)
+
+    def _refill(self) -> None:
+        for _ in range(min(len(self._spill), max(self.memory_items // 2, 1))):
+            url, depth, normalized, anchor_text, pagination = self._spill.popleft()
+            self.push(url, depth, normalized, anchor_text, pagination=pagination)
+
+    def _top(self, host: str) -> Optional[Tuple[float, int, str, int]]:
+        heap = self._heaps[host]
+        while heap:
+            _, _, normalized, version = heap[0]
+            entry = self._pending.get(normalized)
+            if entry is not None and entry.version == version:
+                return heap[0]
+            heapq.heappop(heap)
+        del self._heaps[host]
+        return None
+
+    def popleft(self) -> Tuple[str, int]:
+        """Take the best (url, depth) across hosts / 取出得分最高的 (url, depth)"""
+        if not self._pending:
+            self._refill()
+        best_host, best_key = None, None
+        for host in list(self._heaps):
+            top = self._top(host)
+            if top is None:
+                continue
+            key = -top[0] - self.host_fairness * math.log2(1 + self._host_fetched[host])
+            if best_key is None or key > best_key:
+                best_host, best_key = host, key
+        if best_host is None:
+            raise IndexError('pop from an empty BestFirstQueue')
+        _, _, normalized, _ = heapq.heappop(self._heaps[best_host])
+        entry = self._pending.pop(normalized)
+        self._host_fetched[best_host] += 1
+        return entry.url, entry.depth
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._spill)
+
+    def __bool__(self) -> bool:
+        return bool(self._pending) or bool(self._spill)
+
+    @property
+    def in_memory(self) -> int:
+        return len(self._pending)
+
+    @property
+    def on_disk(self) -> int:
+        return len(self._spill)
+
+    @property
+    def total_spilled(self) -> int:
+        return self._spill.total_spilled
+
+    def close(self) -> None:
+        self._pending.clear()
+        self._heaps.clear()
+        self._spill.close()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Compact URL Seen-Sets
+紧凑型 URL 已见集合
+
+A crawl only ever asks "have I seen this normalized URL before?", so it does
+not need to keep the URL strings around. Every seen-set here has the same
+small interface (add() returns True for a new key, `in`, len(), memory_bytes())
+and crawl_site / CrawlFrontier take whichever make_seen_set() builds:
+爬取只需判断"规范化 URL 是否见过"，无需保存 URL 字符串本身。这里的已见集合接口一致，
+由 make_seen_set() 按名称创建：
+
+- exact:   64-bit URL fingerprints in an open-addressing array('Q') table,
+           13-27 bytes per URL; a false "seen" needs a 64-bit hash collision
+           精确模式：64 位指纹存于开放寻址数组，每个 URL 约 13-27 字节
+- bloom:   scalable Bloom filter, ~2 bytes per URL at the default 0.1% error
+           rate; a false positive means a page is skipped, never fetched twice
+           布隆过滤器：默认 0.1% 误判率下每个 URL 约 2 字节，误判只会跳过页面
+- strings: a plain set of the URL strings (the previous behaviour)
+           字符串模式：保存完整 URL 字符串（旧行为）
+"""
+
+import hashlib
+import math
+import sys
+from array import array
+from typing import Iterable, Union
+
+SEEN_SET_KINDS = ('exact', 'bloom', 'strings')
+DEFAULT_SEEN_SET = 'exact'
+
+
+def url_fingerprint(url: str) -> int:
+    """Non-zero 64-bit fingerprint of a (normalized) URL / URL 的非零 64 位指纹"""
+    digest = hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class FingerprintSet:
+    """
+    Exact seen-set of 64-bit URL fingerprints / 基于 64 位指纹的精确已见集合
+
+    Linear-probing hash table stored in a single array('Q'); slot value 0
+    means empty, which url_fingerprint() never returns.
+    """
+
+    kind = 'exact'
+    _MAX_LOAD = 0.6
+
+    def __init__(self, initial_capacity: int = 1024):
+        capacity = 16
+        while capacity * self._MAX_LOAD < initial_capacity:
+            capacity *= 2
+        self._slots = array('Q', bytes(8 * capacity))
+        self._mask = capacity - 1
+        self._count = 0
+
+    def _find(self, fingerprint: int) -> int:
+        """Slot holding the fingerprint, or the empty slot where it belongs"""
+        slots, mask = self._slots, self._mask
+        i = fingerprint & mask
+        while True:
+            value = slots[i]
+            if value == 0 or value == fingerprint:
+                return i
+            i = (i + 1) & mask
+
+    def add(self, url: Union[str, int]) -> bool:
+        """Add a URL (or fingerprint); False if it was already present / 添加，已存在时返回 False"""
+        fingerprint = url if isinstance(url, int) else url_fingerprint(url)
+        i = self._find(fingerprint)
+        if self._slots[i]:
+            return False
+        self._slots[i] = fingerprint
+        self._count += 1
+        if self._count > len(self._slots) * self._MAX_LOAD:
+            self._grow()
+        return True
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array('Q', bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        for fingerprint in old:
+            if fingerprint:
+                self._slots[self._find(fingerprint)] = fingerprint
+
+    def __contains__(self, url: Union[str, int]) -> bool:
+        fingerprint = url if isinstance(url, int) else url_fingerprint(url)
+        return self._slots[self._find(fingerprint)] != 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        """Stored fingerprints (not URLs) / 已存指纹"""
+        return (fingerprint for fingerprint in self._slots if fingerprint)
+
+    def update(self, urls: Iterable[Union[str, int]]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._slots)
+
+
+class _BloomSlice:
+    """Fixed-capacity Bloom filter used as one stage of ScalableBloomFilter"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.num_bits = max(64, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, fingerprint: int):
+        # Kirsch-Mitzenmacher double hashing from the two 32-bit halves
+        h1 = fingerprint & 0xFFFFFFFF
+        h2 = (fingerprint >> 32) | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, fingerprint: int) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(fingerprint))
+
+    def add(self, fingerprint: int):
+        bits = self.bits
+        for p in self._positions(fingerprint):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class ScalableBloomFilter:
+    """
+    Scalable Bloom filter seen-set / 可扩展布隆过滤器
+
+    Starts with one slice sized for initial_capacity URLs; when a slice is full
+    a new one with `growth` times the capacity and a tighter error rate is
+    added, so the overall false-positive rate stays below error_rate however
+    many URLs arrive (Almeida et al., 2007).
+    """
+
+    kind = 'bloom'
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.001,
+                 growth: int = 2, tightening: float = 0.85):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self._slices = [_BloomSlice(initial_capacity, error_rate * (1 - tightening))]
+        self._count = 0
+
+    def add(self, url: Union[str, int]) -> bool:
+        """Add a URL (or fingerprint); False if it (probably) was present / 添加，可能已存在时返回 False"""
+        fingerprint = url if isinstance(url, int) else url_fingerprint(url)
+        if any(fingerprint in s for s in self._slices):
+            return False
+        current = self._slices[-1]
+        if current.count >= current.capacity:
+            current = _BloomSlice(current.capacity * self.growth,
+                                  self.error_rate * (1 - self.tightening) * self.tightening ** len(self._slices))
+            self._slices.append(current)
+        current.add(fingerprint)
+        self._count += 1
+        return True
+
+    def __contains__(self, url: Union[str, int]) -> bool:
+        fingerprint = url if isinstance(url, int) else url_fingerprint(url)
+        return any(fingerprint in s for s in self._slices)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def update(self, urls: Iterable[Union[str, int]]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def memory_bytes(self) -> int:
+        return sum(sys.getsizeof(s.bits) for s in self._slices)
+
+
+class StringSeenSet(set):
+    """Plain set of URL strings with the seen-set interface / 保存完整字符串的已见集合"""
+
+    kind = 'strings'
+
+    def __init__(self, urls: Iterable[str] = ()):
+        super().__init__(urls)
+        self._string_bytes = sum(sys.getsizeof(u) for u in self)
+
+    def add(self, url: str) -> bool:
+        if url in self:
+            return False
+        super().add(url)
+        self._string_bytes += sys.getsizeof(url)
+        return True
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self) + self._string_bytes
+
+
+def make_seen_set(kind: str = DEFAULT_SEEN_SET, **kwargs):
+    """
+    Build a seen-set by name (see SEEN_SET_KINDS) / 按名称创建已见集合
+
+    Extra keyword arguments go to the constructor (initial_capacity, error_rate, ...).
+    """
+    if kind == 'exact':
+        return FingerprintSet(**kwargs)
+    if kind == 'bloom':
+        return ScalableBloomFilter(**kwargs)
+    if kind == 'strings':
+        return StringSeenSet()
+    raise ValueError(f"Unknown seen-set kind: {kind!r} (expected one of {', '.join(SEEN_SET_KINDS)})")
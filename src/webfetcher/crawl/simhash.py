@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Page Detection (SimHash)
+近重复页面检测（SimHash）
+
+Many sites serve one article under several URLs (print views, tracking
+parameters, mobile paths, session ids) that URL normalization cannot see
+through. The crawler therefore fingerprints what a page says rather than
+where it lives:
+许多站点以多个 URL 提供同一篇文章，URL 规范化无法识别，因此按页面内容而非地址计算指纹：
+
+1. visible_text(): main content text, with scripts, styles and page chrome
+   (nav, header, footer, aside, forms, and sidebar/widget/related/comment
+   blocks marked only by class or id) removed, so shared boilerplate does
+   not make distinct pages look alike. Pages left with less than
+   MIN_TEXT_CHARS of text are not fingerprinted at all: on those the shared
+   chrome that survived stripping would outweigh the content
+   提取正文可见文本，去除脚本、样式、导航/页眉/页脚及侧栏等公共部分；正文过短的页面不参与检测
+2. shingles: overlapping 4-token windows; CJK characters count as tokens
+   4 词滑动窗口分片，中日韩字符各自为一个词
+3. simhash(): 64-bit SimHash over the shingle hashes (Charikar, 2002)
+   基于分片哈希的 64 位 SimHash
+4. SimHashIndex: pigeonhole banding (Manku et al., 2007). With a Hamming
+   threshold k the fingerprint is cut into k + 1 bands, and two fingerprints
+   within distance k agree exactly on at least one band, so a lookup only
+   compares against pages sharing a band
+   鸽巢分段索引：阈值 k 时切分为 k+1 段，距离不超过 k 的指纹至少有一段完全相同
+
+Detection drops fetched pages, so crawls only run it when asked
+(--skip-near-duplicates or --near-dup-distance).
+检测会丢弃页面，因此仅在显式启用时运行。
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import lxml.html
+from lxml import etree
+
+DEFAULT_NEAR_DUP_DISTANCE = 3   # Hamming distance on 64 bits / 64 位汉明距离阈值
+SHINGLE_SIZE = 4
+MIN_SHINGLES = 16               # Shorter pages are too small to fingerprint reliably / 过短页面不参与检测
+MIN_TEXT_CHARS = 400            # Main text (excluding whitespace) needed to fingerprint / 参与检测所需的最少正文字符数
+
+_BOILERPLATE_TAGS = ('script', 'style', 'noscript', 'template', 'nav', 'header',
+                     'footer', 'aside', 'form', 'iframe', 'svg')
+# Page chrome that only a class or id gives away / 仅能通过 class 或 id 识别的页面公共部分
+# (class/id tokens that start with the word: "sidebar-left", "related-posts", not "has-sidebar")
+_CHROME_XPATH = ("//body//*[re:test(concat(' ', @class, ' ', @id, ' '), "
+                 "'\\s(sidebar|side-bar|widgets?|related|recommend\\w*|comments?|breadcrumbs?|menu|navbar)[\\s_-]', 'i')]")
+_RE_NS = {'re': 'http://exslt.org/regular-expressions'}
+_CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af'
+_TOKEN_RE = re.compile(f'[{_CJK}]|[^\\W_{_CJK}]+')
+_XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+_BIT_COUNTS = [[(value >> bit) & 1 for bit in range(8)] for value in range(256)]
+
+
+def visible_text(html: str) -> str:
+    """Main visible text of a page, without boilerplate / 页面正文可见文本"""
+    if not html:
+        return ''
+    try:
+        # lxml refuses str input that carries an encoding declaration
+        root = lxml.html.fromstring(_XML_DECLARATION_RE.sub('', html, count=1))
+    except (etree.ParserError, ValueError):
+        return ''
+    etree.strip_elements(root, *_BOILERPLATE_TAGS, with_tail=False)
+    for element in root.xpath(_CHROME_XPATH, namespaces=_RE_NS):
+        if element.getparent() is not None:
+            element.drop_tree()
+    for xpath in ('//main', '//article', "//*[@role='main']"):
+        found = root.xpath(xpath)
+        if found:
+            root = found[0]
+            break
+    return root.text_content()
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> List[bytes]:
+    """8-byte hashes of the distinct token shingles of a text / 文本分片哈希（去重）"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < size:
+        return []
+    shingles = {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return [hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest() for s in shingles]
+
+
+def simhash(hashes: List[bytes]) -> int:
+    """
+    64-bit SimHash of a list of 8-byte hashes / 64 位 SimHash
+
+    Bit votes are tallied per byte position with Counter (one C-level pass per
+    byte) and expanded through a 256-entry table, instead of looping over 64
+    bits for every shingle.
+    """
+    counts = [0] * 64
+    for position in range(8):
+        for value, n in Counter(h[position] for h in hashes).items():
+            bits = _BIT_COUNTS[value]
+            base = position * 8
+            for bit in range(8):
+                if bits[bit]:
+                    counts[base + bit] += n
+    half = len(hashes) / 2
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def page_fingerprint(html: str) -> Optional[int]:
+    """SimHash of a page's visible text, or None if the page is too short / 页面指纹"""
+    text = visible_text(html)
+    if len(''.join(text.split())) < MIN_TEXT_CHARS:
+        return None
+    hashes = shingle_hashes(text)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    return simhash(hashes)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class SimHashIndex:
+    """
+    Banded SimHash index for Hamming-distance lookups / 分段 SimHash 索引
+
+    Usage:
+        index = SimHashIndex(max_distance=3)
+        index.add(fingerprint, 'https://example.com/a')
+        index.find(other_fingerprint)   # 'https://example.com/a' if within 3 bits
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_NEAR_DUP_DISTANCE):
+        if not 0 <= max_distance < 32:
+            raise ValueError(f"max_distance must be between 0 and 31, got {max_distance}")
+        self.max_distance = max_distance
+        num_bands = max_distance + 1
+        edges = [round(i * 64 / num_bands) for i in range(num_bands + 1)]
+        self._bands = [(start, (1 << (end - start)) - 1) for start, end in zip(edges, edges[1:])]
+        self._tables: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in self._bands]
+        self._count = 0
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """Key of an indexed fingerprint within max_distance, or None / 查找近似指纹"""
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for candidate, key in table.get((fingerprint >> shift) & mask, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return key
+        return None
+
+    def add(self, fingerprint: int, key: str) -> None:
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault((fingerprint >> shift) & mask, []).append((fingerprint, key))
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class NearDuplicateDetector:
+    """
+    Thread-safe page-level near-duplicate filter for crawls / 爬取用近重复页面过滤器
+
+    check() fingerprints a fetched page and returns the URL of an earlier page
+    it duplicates, or None after indexing it as a new original.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_NEAR_DUP_DISTANCE):
+        self.index = SimHashIndex(max_distance)
+        self.duplicates = 0
+        self.unfingerprinted = 0  # Pages too short to fingerprint / 过短未检测的页面
+        self._lock = threading.Lock()
+
+    def check(self, url: str, html: str) -> Optional[str]:
+        """URL of the page this one nearly duplicates, or None / 返回重复的原页面 URL"""
+        fingerprint = page_fingerprint(html)
+        with self._lock:
+            if fingerprint is None:
+                self.unfingerprinted += 1
+                return None
+            original = self.index.find(fingerprint)
+            if original is not None:
+                self.duplicates += 1
+                return original
+            self.index.add(fingerprint, url)
+            return None
+
+    def add(self, url: str, html: str) -> None:
+        """Index a page known to be an original (e.g. restored on resume) / 登记原始页面"""
+        fingerprint = page_fingerprint(html)
+        if fingerprint is not None:
+            with self._lock:
+                self.index.add(fingerprint, url)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Disk-Spilling Crawl Queue
+可溢出到磁盘的爬取队列
+
+SpillQueue is a FIFO with the deque methods the crawlers use (append,
+popleft, len, truth value). Up to `memory_items` entries live in memory;
+beyond that, new entries are appended as JSON lines to an anonymous temporary
+file and read back in batches once the in-memory part drains, so FIFO order is
+kept and a million-URL frontier costs a few hundred KB of RAM.
+SpillQueue 是先进先出队列，内存中最多保留 memory_items 个条目，其余以 JSON 行追加到
+匿名临时文件，待内存部分取空后分批读回，保持 FIFO 顺序。
+
+Entries must be JSON-serializable; tuples come back as tuples.
+条目必须可 JSON 序列化；元组读回后仍为元组。
+"""
+
+import json
+import tempfile
+from collections import deque
+from typing import Any, Iterable, Optional
+
+DEFAULT_FRONTIER_MEMORY = 100_000  # Queue entries kept in memory before spilling
+
+
+class SpillQueue:
+    """FIFO queue that spills its tail to a temporary file / 尾部溢出到临时文件的 FIFO 队列"""
+
+    def __init__(self, items: Iterable[Any] = (), memory_items: int = DEFAULT_FRONTIER_MEMORY,
+                 directory: Optional[str] = None):
+        """
+        Args:
+            items: Initial entries / 初始条目
+            memory_items: Entries kept in memory before spilling / 溢出前内存中保留的条目数
+            directory: Directory for the spill file (default: system temp dir) / 溢出文件目录
+        """
+        self.memory_items = max(int(memory_items), 1)
+        self.directory = directory
+        self._head = deque()
+        self._file = None
+        self._read_pos = 0
+        self._spilled = 0  # Entries in the file not yet read back
+        self.total_spilled = 0
+        for item in items:
+            self.append(item)
+
+    def append(self, item: Any) -> None:
+        # Once anything is on disk, new entries must queue behind it
+        if not self._spilled and len(self._head) < self.memory_items:
+            self._head.append(item)
+            return
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(mode='w+b', prefix='wf-frontier-', dir=self.directory)
+        self._file.seek(0, 2)
+        self._file.write(json.dumps(item, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._spilled += 1
+        self.total_spilled += 1
+
+    def appendleft(self, item: Any) -> None:
+        """Put an entry at the front; front entries stay in memory / 插入队首（始终保留在内存中）"""
+        self._head.appendleft(item)
+
+    def popleft(self) -> Any:
+        if not self._head:
+            if not self._spilled:
+                raise IndexError('pop from an empty SpillQueue')
+            self._refill()
+        return self._head.popleft()
+
+    def _refill(self):
+        self._file.seek(self._read_pos)
+        batch = min(self._spilled, max(self.memory_items // 2, 1))
+        for _ in range(batch):
+            item = json.loads(self._file.readline())
+            self._head.append(tuple(item) if isinstance(item, list) else item)
+        self._spilled -= batch
+        if self._spilled:
+            self._read_pos = self._file.tell()
+        else:
+            # Drained: start the file over instead of letting it grow
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_pos = 0
+
+    def __len__(self) -> int:
+        return len(self._head) + self._spilled
+
+    def __bool__(self) -> bool:
+        return bool(self._head) or self._spilled > 0
+
+    @property
+    def in_memory(self) -> int:
+        return len(self._head)
+
+    @property
+    def on_disk(self) -> int:
+        return self._spilled
+
+    def close(self) -> None:
+        """Drop the spill file / 删除溢出文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._head.clear()
+        self._spilled = 0
+        self._read_pos = 0
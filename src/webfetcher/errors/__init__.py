@@ -6,7 +6,11 @@ from .handler import (
 )
 from .classifier import UnifiedErrorClassifier
 from .types import ErrorType, ErrorClassification
-from .cache import ErrorCache
+from .cache import ErrorCache, SQLiteCacheBackend
+from .retry_policy import (
+    RetryPolicy, RetryState,
+    HostCircuitBreakers, CircuitState, CircuitOpenError
+)
 
 __all__ = [
     'ChromeDebugError', 'ChromePortConflictError',
@@ -14,5 +18,7 @@ __all__ = [
     'ChromeLaunchError', 'ChromeErrorMessages',
     'UnifiedErrorClassifier',
     'ErrorType', 'ErrorClassification',
-    'ErrorCache'
+    'ErrorCache', 'SQLiteCacheBackend',
+    'RetryPolicy', 'RetryState',
+    'HostCircuitBreakers', 'CircuitState', 'CircuitOpenError'
 ]
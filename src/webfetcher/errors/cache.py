@@ -6,17 +6,39 @@ Error Classification Cache with TTL Support
 Implements LRU cache with time-based expiration to prevent repeated
 classification of the same errors.
 实现带时间过期的LRU缓存，防止对相同错误的重复分类。
+
+Keys are built from a normalized error signature (exception type, HTTP
+status or message with URLs, addresses and long numbers masked) scoped to
+the host, so one DNS or SSL failure classifies every URL on that host. An
+optional SQLite backend lets several processes (e.g. parallel batch
+workers) share entries.
+缓存键由归一化的错误签名与主机组成；可选的 SQLite 后端支持多进程共享。
 """
 
-import hashlib
+import json
+import os
+import re
+import sqlite3
 import time
 import threading
 from collections import OrderedDict
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
 import logging
 
-from webfetcher.errors.types import ErrorClassification
+from webfetcher.errors.types import ErrorClassification, ErrorType
+
+# Messages are normalized before becoming part of a key / 生成键前归一化错误信息
+# Status codes and errnos (1-3 digits) stay: the pattern classifier tells 404 from 500 from 429 by them
+# 保留状态码与 errno（1-3 位数字），模式分类依赖它们区分 404/500/429
+_URL_RE = re.compile(r'\w+://\S+')
+_NUMBER_RE = re.compile(r'\b0x[0-9a-fA-F]+\b|\b\d{1,3}(?:\.\d{1,3}){3}\b|\d{4,}')
+_SIGNATURE_MAX_LEN = 160
+
+# Cleanup expired entries every N puts (amortized) / 每 N 次写入清理一次过期条目
+DEFAULT_CLEANUP_INTERVAL = 256
 
 @dataclass
 class CacheEntry:
@@ -29,6 +51,76 @@ class CacheEntry:
         """Check if entry has expired / 检查条目是否过期"""
         return time.time() > (self.timestamp + self.ttl)
 
+
+class SQLiteCacheBackend:
+    """
+    Shared on-disk backend for ErrorCache / ErrorCache 的共享磁盘后端
+
+    One SQLite file (WAL mode) that several processes can read and write
+    concurrently. Entries store the classification as JSON with an absolute
+    expiry time.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file / SQLite 数据库文件路径
+        """
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS error_cache ("
+            "cache_key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, cache_key: str) -> Optional[Tuple[ErrorClassification, float]]:
+        """Return (classification, expires_at) or None / 读取条目"""
+        row = self._connection().execute(
+            "SELECT payload, expires_at FROM error_cache WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        data = json.loads(row[0])
+        data['error_type'] = ErrorType(data['error_type'])
+        return ErrorClassification(**data), row[1]
+
+    def put(self, cache_key: str, classification: ErrorClassification, expires_at: float) -> None:
+        """Insert or replace an entry / 写入条目"""
+        data = asdict(classification)
+        data['error_type'] = classification.error_type.value
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO error_cache (cache_key, payload, expires_at) VALUES (?, ?, ?)",
+            (cache_key, json.dumps(data), expires_at)
+        )
+        conn.commit()
+
+    def cleanup_expired(self) -> int:
+        """Delete expired rows / 删除过期条目"""
+        conn = self._connection()
+        removed = conn.execute("DELETE FROM error_cache WHERE expires_at < ?", (time.time(),)).rowcount
+        conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM error_cache")
+        conn.commit()
+
 @dataclass
 class CacheMetrics:
     """Cache performance metrics / 缓存性能指标"""
@@ -50,20 +142,47 @@ class ErrorCache:
     带TTL支持的线程安全LRU缓存，用于错误分类
     """
 
-    def __init__(self, max_size: int = 1000):
+    def __init__(self, max_size: int = 1000, backend: Optional[SQLiteCacheBackend] = None,
+                 cleanup_interval: int = DEFAULT_CLEANUP_INTERVAL):
         """
         Initialize cache
 
         Args:
             max_size: Maximum number of entries (default: 1000)
+            backend: Optional shared backend consulted on local misses / 可选共享后端
+            cleanup_interval: Purge expired entries every N puts / 每 N 次写入清理过期条目
         """
         self.max_size = max_size
+        self.backend = backend
+        self.cleanup_interval = max(1, cleanup_interval)
         self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self.lock = threading.Lock()
         self.metrics = CacheMetrics()
         self.logger = logging.getLogger(__name__)
+        self._puts_since_cleanup = 0
+
+    @staticmethod
+    def error_signature(error: Exception) -> str:
+        """
+        Normalized error signature, independent of the URL
+        与 URL 无关的归一化错误签名
 
-    def generate_cache_key(self, error: Exception, url: str) -> str:
+        HTTP errors reduce to their status code; other messages have URLs,
+        IP addresses, hex literals and long numbers (ports, byte counts)
+        masked. Status codes and errnos are kept.
+        """
+        error_type = type(error).__name__
+        if isinstance(error, HTTPError):
+            return f"{error_type}:{error.code}"
+        if isinstance(error, URLError):
+            reason = error.reason
+            detail = f"{type(reason).__name__}:{reason}"
+        else:
+            detail = str(error)
+        detail = _NUMBER_RE.sub('0', _URL_RE.sub('<url>', detail))
+        return f"{error_type}:{detail[:_SIGNATURE_MAX_LEN]}"
+
+    def generate_cache_key(self, error: Exception, url: str, scope: str = 'host') -> str:
         """
         Generate cache key from error and URL
         从错误和URL生成缓存键
@@ -71,14 +190,16 @@ class ErrorCache:
         Args:
             error: The exception
             url: The URL that caused the error
+            scope: 'host' (signature per host, default) or 'signature' (global)
 
         Returns:
-            MD5 hash of error signature
+            Plain string key "<host>|<signature>"
         """
-        error_type = type(error).__name__
-        error_msg = str(error)[:200]  # Truncate long messages
-        signature = f"{error_type}:{error_msg}:{url}"
-        return hashlib.md5(signature.encode()).hexdigest()
+        signature = self.error_signature(error)
+        if scope == 'signature':
+            return f"*|{signature}"
+        host = (urlparse(url).hostname or '') if url else ''
+        return f"{host}|{signature}"
 
     def get(self, cache_key: str) -> Optional[ErrorClassification]:
         """
@@ -95,15 +216,19 @@ class ErrorCache:
             self.metrics.total_requests += 1
 
             if cache_key not in self.cache:
+                shared = self._get_from_backend(cache_key)
+                if shared is not None:
+                    self.metrics.cache_hits += 1
+                    return shared
                 self.metrics.cache_misses += 1
-                self.logger.debug(f"Cache miss for key: {cache_key[:8]}...")
+                self.logger.debug(f"Cache miss for key: {cache_key[:40]}")
                 return None
 
             entry = self.cache[cache_key]
 
             # Check if expired
             if entry.is_expired():
-                self.logger.debug(f"Cache entry expired for key: {cache_key[:8]}...")
+                self.logger.debug(f"Cache entry expired for key: {cache_key[:40]}")
                 del self.cache[cache_key]
                 self.metrics.cache_misses += 1
                 return None
@@ -111,9 +236,34 @@ class ErrorCache:
             # Move to end (LRU)
             self.cache.move_to_end(cache_key)
             self.metrics.cache_hits += 1
-            self.logger.debug(f"Cache hit for key: {cache_key[:8]}...")
+            self.logger.debug(f"Cache hit for key: {cache_key[:40]}")
             return entry.classification
 
+    def _get_from_backend(self, cache_key: str) -> Optional[ErrorClassification]:
+        """Look up the shared backend and populate the local LRU (lock held)."""
+        if self.backend is None:
+            return None
+        try:
+            found = self.backend.get(cache_key)
+        except Exception as e:
+            self.logger.debug(f"Shared error cache lookup failed: {e}")
+            return None
+        if found is None:
+            return None
+        classification, expires_at = found
+        ttl = max(1, int(expires_at - time.time()))
+        self._store_locked(cache_key, CacheEntry(classification=classification, timestamp=time.time(), ttl=ttl))
+        return classification
+
+    def _store_locked(self, cache_key: str, entry: CacheEntry) -> None:
+        """Insert into the local LRU, evicting the oldest entry if full (lock held)."""
+        if cache_key not in self.cache and len(self.cache) >= self.max_size:
+            evicted_key, _ = self.cache.popitem(last=False)
+            self.metrics.evictions += 1
+            self.logger.debug(f"Evicted cache entry: {evicted_key[:40]}")
+        self.cache[cache_key] = entry
+        self.cache.move_to_end(cache_key)
+
     def put(self, cache_key: str, classification: ErrorClassification, ttl: Optional[int] = None):
         """
         Store classification in cache with TTL
@@ -136,21 +286,28 @@ class ErrorCache:
                 ttl=ttl
             )
 
-            # Check if we need to evict
-            if cache_key not in self.cache and len(self.cache) >= self.max_size:
-                # Evict oldest entry (LRU)
-                evicted_key, _ = self.cache.popitem(last=False)
-                self.metrics.evictions += 1
-                self.logger.debug(f"Evicted cache entry: {evicted_key[:8]}...")
+            # Amortized expiry: purge once every cleanup_interval puts
+            self._puts_since_cleanup += 1
+            if self._puts_since_cleanup >= self.cleanup_interval:
+                self._puts_since_cleanup = 0
+                self._cleanup_expired_locked()
+
+            # Store entry (evicts LRU entry when full)
+            self._store_locked(cache_key, entry)
+            self.logger.debug(f"Cached classification for key: {cache_key[:40]} (TTL: {ttl}s)")
 
-            # Store entry
-            self.cache[cache_key] = entry
-            self.logger.debug(f"Cached classification for key: {cache_key[:8]}... (TTL: {ttl}s)")
+            if self.backend is not None:
+                try:
+                    self.backend.put(cache_key, classification, entry.timestamp + ttl)
+                except Exception as e:
+                    self.logger.debug(f"Shared error cache write failed: {e}")
 
     def clear(self):
         """Clear all cache entries / 清除所有缓存条目"""
         with self.lock:
             self.cache.clear()
+            if self.backend is not None:
+                self.backend.clear()
             self.logger.info("Cache cleared")
 
     def get_metrics(self) -> CacheMetrics:
@@ -172,15 +329,26 @@ class ErrorCache:
             Number of entries removed
         """
         with self.lock:
-            expired_keys = [
-                key for key, entry in self.cache.items()
-                if entry.is_expired()
-            ]
-
-            for key in expired_keys:
-                del self.cache[key]
-
-            if expired_keys:
-                self.logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
-
-            return len(expired_keys)
+            removed = self._cleanup_expired_locked()
+            if self.backend is not None:
+                try:
+                    self.backend.cleanup_expired()
+                except Exception as e:
+                    self.logger.debug(f"Shared error cache cleanup failed: {e}")
+            return removed
+
+    def _cleanup_expired_locked(self) -> int:
+        """Remove expired local entries (lock held)."""
+        now = time.time()
+        expired_keys = [
+            key for key, entry in self.cache.items()
+            if now > entry.timestamp + entry.ttl
+        ]
+
+        for key in expired_keys:
+            del self.cache[key]
+
+        if expired_keys:
+            self.logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+
+        return len(expired_keys)
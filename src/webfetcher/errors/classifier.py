@@ -7,6 +7,7 @@ Provides intelligent error classification with pattern matching for web fetching
 为网络抓取操作提供基于模式匹配的智能错误分类。
 """
 
+import os
 import re
 import logging
 from typing import Dict, List, Tuple, Optional
@@ -17,7 +18,7 @@ from webfetcher.errors.types import ErrorType, ErrorClassification
 
 # Phase 2: Import error cache
 try:
-    from webfetcher.errors.cache import ErrorCache
+    from webfetcher.errors.cache import ErrorCache, SQLiteCacheBackend
     CACHE_AVAILABLE = True
 except ImportError:
     CACHE_AVAILABLE = False
@@ -39,11 +40,22 @@ class UnifiedErrorClassifier:
         self._compile_patterns()
 
         # Phase 2: Initialize cache
-        self.cache: Optional[ErrorCache] = ErrorCache(max_size=1000) if CACHE_AVAILABLE else None
+        # WF_ERROR_CACHE_DB points parallel workers at one shared SQLite cache
+        # WF_ERROR_CACHE_DB 指向共享 SQLite 缓存，供并行进程共享分类结果
+        self.cache: Optional[ErrorCache] = None
+        if CACHE_AVAILABLE:
+            backend = None
+            shared_path = os.environ.get('WF_ERROR_CACHE_DB')
+            if shared_path:
+                try:
+                    backend = SQLiteCacheBackend(shared_path)
+                except Exception as e:
+                    logging.warning(f"Shared error cache disabled ({shared_path}): {e}")
+            self.cache = ErrorCache(max_size=1000, backend=backend)
 
         logging.debug("UnifiedErrorClassifier initialized with compiled patterns")
         if self.cache:
-            logging.debug("Error cache enabled (max_size=1000)")
+            logging.debug(f"Error cache enabled (max_size=1000, shared={self.cache.backend is not None})")
 
     def _init_patterns(self):
         """Initialize error detection patterns / 初始化错误检测模式"""
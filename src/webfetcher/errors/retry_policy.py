@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Retry Policy and Per-Host Circuit Breakers
+重试策略与主机级熔断器
+
+RetryPolicy turns an ErrorClassification into exactly one wait per attempt,
+bounded by a jittered exponential backoff, the classifier's retry budget and a
+total deadline per URL.
+RetryPolicy 将错误分类结果转换为每次尝试唯一的一次等待，受指数退避、分类器重试预算
+与单 URL 总时限约束。
+
+HostCircuitBreakers tracks consecutive host-level failures so crawls and
+batches stop hammering dead hosts (closed -> open -> half-open -> closed).
+HostCircuitBreakers 统计主机级连续失败，使爬取与批量任务不再反复请求失效主机。
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional
+
+from webfetcher.errors.types import ErrorClassification
+
+
+class RetryPolicy:
+    """
+    Unified retry policy / 统一重试策略
+
+    Usage:
+        state = policy.start()
+        while True:
+            try:
+                return fetch(timeout=state.attempt_timeout(30))
+            except Exception as e:
+                wait = state.next_wait(classifier.classify_error(e, url))
+                if wait is None:
+                    raise
+                time.sleep(wait)
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 30.0, jitter: float = 0.2,
+                 deadline: float = 120.0):
+        """
+        Args:
+            max_retries: Upper bound on retries (attempts = retries + 1) / 最大重试次数
+            base_delay: First backoff step in seconds (1s, 2s, 4s, ...) / 基础退避秒数
+            max_delay: Cap for a single wait / 单次等待上限
+            jitter: Proportional jitter, e.g. 0.2 = +/-20% / 抖动比例
+            deadline: Total seconds allowed per URL, including waits / 单 URL 总时限
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+
+    def start(self) -> 'RetryState':
+        """Begin retrying one URL / 开始一个 URL 的重试周期"""
+        return RetryState(self, time.monotonic() + self.deadline)
+
+    def backoff(self, retry_index: int) -> float:
+        """Jittered exponential backoff for the n-th retry (0-based) / 带抖动的指数退避"""
+        delay = min(self.max_delay, self.base_delay * (2 ** retry_index))
+        if self.jitter > 0:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(0.0, delay)
+
+
+class RetryState:
+    """Per-URL retry bookkeeping created by RetryPolicy.start() / 单 URL 重试状态"""
+
+    def __init__(self, policy: RetryPolicy, deadline_at: float):
+        self.policy = policy
+        self.deadline_at = deadline_at
+        self.retries = 0
+        self.total_wait = 0.0
+        self.stop_reason: Optional[str] = None
+
+    def remaining(self) -> float:
+        """Seconds left before the URL deadline / 剩余时限"""
+        return max(0.0, self.deadline_at - time.monotonic())
+
+    def attempt_timeout(self, timeout: float) -> float:
+        """Clamp a network timeout to the remaining deadline / 将网络超时限制在剩余时限内"""
+        return max(1.0, min(timeout, self.remaining()))
+
+    def next_wait(self, classification: Optional[ErrorClassification] = None,
+                  retryable: bool = True) -> Optional[float]:
+        """
+        Decide whether to retry and how long to wait first.
+        决定是否重试以及重试前的等待时间
+
+        Args:
+            classification: Classifier result for the last error (optional)
+            retryable: Legacy retry verdict used when no classification is given
+
+        Returns:
+            Optional[float]: Seconds to sleep before the next attempt, or None to stop
+                             (stop_reason explains why)
+        """
+        max_retries = self.policy.max_retries
+        if classification is not None:
+            if not classification.should_retry:
+                self.stop_reason = "not retryable"
+                return None
+            max_retries = min(max_retries, classification.max_retries)
+        elif not retryable:
+            self.stop_reason = "not retryable"
+            return None
+
+        if self.retries >= max_retries:
+            self.stop_reason = f"retry budget exhausted ({self.retries}/{max_retries})"
+            return None
+
+        wait = self.policy.backoff(self.retries)
+        if classification is not None and classification.recommended_wait > wait:
+            wait = min(self.policy.max_delay, classification.recommended_wait)
+
+        # Waiting past the deadline (plus a minimal attempt) is pointless
+        if wait + 1.0 > self.remaining():
+            self.stop_reason = f"deadline reached ({self.policy.deadline:.0f}s)"
+            return None
+
+        self.retries += 1
+        self.total_wait += wait
+        return wait
+
+
+class CircuitState(Enum):
+    """Circuit breaker states / 熔断器状态"""
+    CLOSED = "closed"        # Requests flow normally
+    OPEN = "open"            # Host considered dead; skip it
+    HALF_OPEN = "half_open"  # One trial request allowed
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host's circuit is open / 主机熔断时抛出"""
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}: skipping for another {retry_in:.0f}s")
+
+
+@dataclass
+class _HostCircuit:
+    state: CircuitState = CircuitState.CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    trial_in_flight: bool = False
+    trial_thread: int = 0
+    total_failures: int = 0
+    total_successes: int = 0
+
+
+class HostCircuitBreakers:
+    """
+    Per-host circuit breakers / 主机级熔断器集合
+
+    After ``failure_threshold`` consecutive host-level failures the circuit
+    opens and requests to the host are refused for ``recovery_timeout``
+    seconds. Then a single trial request is let through (half-open): success
+    closes the circuit, failure re-opens it. Callers release() the trial on
+    every exit path so a trial that recorded neither cannot block the host.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _HostCircuit] = {}
+
+    def _circuit(self, host: str) -> _HostCircuit:
+        return self._circuits.setdefault((host or '').lower(), _HostCircuit())
+
+    def allow(self, host: str) -> bool:
+        """
+        Whether a request to the host may proceed / 是否允许请求该主机
+
+        Moves an open circuit to half-open once the recovery timeout passed.
+        """
+        if not host:
+            return True
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == CircuitState.CLOSED:
+                return True
+            if circuit.state == CircuitState.OPEN:
+                if time.monotonic() - circuit.opened_at < self.recovery_timeout:
+                    return False
+                circuit.state = CircuitState.HALF_OPEN
+                circuit.trial_in_flight = False
+            # Half-open: exactly one trial at a time
+            if circuit.trial_in_flight:
+                return False
+            circuit.trial_in_flight = True
+            circuit.trial_thread = threading.get_ident()
+            return True
+
+    def release(self, host: str) -> None:
+        """
+        End this thread's half-open trial if it recorded no outcome.
+        释放本线程未记录结果的半开试探请求
+        """
+        if not host:
+            return
+        with self._lock:
+            circuit = self._circuits.get(host.lower())
+            if circuit is not None and circuit.trial_in_flight and \
+                    circuit.trial_thread == threading.get_ident():
+                circuit.trial_in_flight = False
+
+    def retry_in(self, host: str) -> float:
+        """Seconds until an open circuit admits a trial / 距离半开状态的秒数"""
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state != CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (time.monotonic() - circuit.opened_at))
+
+    def record_success(self, host: str) -> None:
+        """Close the circuit / 记录成功并闭合熔断器"""
+        if not host:
+            return
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.state = CircuitState.CLOSED
+            circuit.consecutive_failures = 0
+            circuit.trial_in_flight = False
+            circuit.total_successes += 1
+
+    def record_failure(self, host: str) -> CircuitState:
+        """
+        Record a host-level failure / 记录主机级失败
+
+        Returns:
+            CircuitState: State after recording (OPEN means stop calling the host)
+        """
+        if not host:
+            return CircuitState.CLOSED
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.consecutive_failures += 1
+            circuit.total_failures += 1
+            circuit.trial_in_flight = False
+            if circuit.state == CircuitState.HALF_OPEN or \
+                    circuit.consecutive_failures >= self.failure_threshold:
+                circuit.state = CircuitState.OPEN
+                circuit.opened_at = time.monotonic()
+            return circuit.state
+
+    def state(self, host: str) -> CircuitState:
+        """Current state for the host / 当前状态"""
+        with self._lock:
+            return self._circuit(host).state
+
+    def reset(self, host: Optional[str] = None) -> None:
+        """Reset one host or all circuits / 重置熔断器"""
+        with self._lock:
+            if host is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(host.lower(), None)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-host circuit summary / 各主机熔断统计"""
+        with self._lock:
+            return {
+                host: {
+                    'state': circuit.state.value,
+                    'consecutive_failures': circuit.consecutive_failures,
+                    'total_failures': circuit.total_failures,
+                    'total_successes': circuit.total_successes,
+                }
+                for host, circuit in self._circuits.items()
+            }
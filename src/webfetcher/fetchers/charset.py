@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Fast Charset Detection
+快速字符集检测
+
+Decides the encoding of a fetched body before decoding it, so the whole
+document is decoded exactly once:
+
+1. BOM (UTF-8 / UTF-16)
+2. Declared charset (HTTP header, then <meta> in the first 8KB), verified
+   against a sample
+3. Strict incremental UTF-8 validation of a bounded sample
+4. Statistical GB (GB2312/GBK/GB18030) vs Big5 detector on a bounded prefix
+5. windows-1252 as the byte-preserving last resort
+
+先判定编码再解码，整个文档只解码一次：BOM → 声明的编码（响应头 / meta）→
+UTF-8 严格采样校验 → 有界前缀上的中文编码统计检测 → windows-1252。
+"""
+import codecs
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Bytes inspected by the sniffing stages / 检测阶段读取的字节数
+SAMPLE_BYTES = 64 * 1024
+CJK_SAMPLE_BYTES = 16 * 1024
+META_SCAN_BYTES = 8192
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# GB2312 and GBK are decoded as GB18030, their strict superset: pages that
+# declare gb2312 routinely contain GBK-only characters.
+# GB2312/GBK 统一按超集 GB18030 解码（声明 gb2312 的页面常含 GBK 字符）
+_ENCODING_ALIASES = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'x-gbk': 'gb18030',
+    'gb_2312-80': 'gb18030',
+    'utf8': 'utf-8',
+    'big5-hkscs': 'big5hkscs',
+    'iso-8859-1': 'windows-1252',
+    'latin1': 'windows-1252',
+    'ascii': 'windows-1252',
+    'us-ascii': 'windows-1252',
+}
+
+_HEADER_CHARSET_RE = re.compile(rb'charset\s*=\s*["\']?([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(
+    rb'<meta[^>]+charset\s*=\s*["\']?([A-Za-z0-9_.:-]+)', re.IGNORECASE
+)
+
+# Double-byte pair patterns for the statistical detector / 双字节统计模式
+# GB2312 level-1/2 hanzi: lead B0-F7, trail A1-FE
+_GB_COMMON_RE = re.compile(rb'[\xb0-\xf7][\xa1-\xfe]')
+# Big5 frequent hanzi: lead A4-C6 / C9-F9, trail 40-7E or A1-FE
+_BIG5_RE = re.compile(rb'[\xa4-\xc6\xc9-\xf9](?:[\x40-\x7e]|[\xa1-\xfe])')
+_HIGH_BYTES = bytes(range(0x80, 0x100))
+
+
+@dataclass
+class CharsetResult:
+    """编码检测结果"""
+    encoding: str
+    source: str  # bom/header/meta/utf8-sample/ascii/cjk-statistics/fallback
+    confidence: float = 1.0
+
+
+@dataclass
+class DecodedDocument:
+    """解码结果"""
+    text: str
+    encoding: str
+    source: str
+    errors_replaced: bool = False
+
+
+def normalize_encoding(name: Optional[str]) -> Optional[str]:
+    """
+    Map a declared charset to the codec used for decoding, or None if unknown.
+    将声明的编码名映射为实际解码用的编解码器名，无法识别时返回 None
+    """
+    if not name:
+        return None
+    name = name.strip().strip('"\'').lower()
+    name = _ENCODING_ALIASES.get(name, name)
+    try:
+        codecs.lookup(name)
+    except LookupError:
+        return None
+    return name
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Charset parameter of a Content-Type header / 从 Content-Type 提取 charset"""
+    if not content_type:
+        return None
+    match = _HEADER_CHARSET_RE.search(content_type.encode('latin-1', errors='ignore'))
+    return match.group(1).decode('ascii').lower() if match else None
+
+
+def charset_from_meta(data: bytes) -> Optional[str]:
+    """Charset declared by <meta> in the first 8KB / 从前 8KB 的 meta 标签提取 charset"""
+    match = _META_CHARSET_RE.search(data[:META_SCAN_BYTES])
+    return match.group(1).decode('ascii').lower() if match else None
+
+
+def _is_utf8_sample(sample: bytes, final: bool) -> bool:
+    """Strict UTF-8 check; a multi-byte sequence cut at the sample end is fine."""
+    decoder = codecs.getincrementaldecoder('utf-8')('strict')
+    try:
+        decoder.decode(sample, final=final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _sample_decodes(sample: bytes, encoding: str, final: bool) -> bool:
+    """Whether a sample decodes strictly with the given codec."""
+    try:
+        codecs.getincrementaldecoder(encoding)('strict').decode(sample, final=final)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def detect_cjk(sample: bytes, at_eof: bool = True) -> Optional[CharsetResult]:
+    """
+    Statistical GB vs Big5 guess over a bounded prefix.
+    在有界前缀上统计判断 GB 系列或 Big5
+
+    Counts double-byte pairs that fall in each encoding's frequent-hanzi
+    block relative to all high bytes; the encoding whose pairs explain more
+    of the high bytes wins. With ``at_eof=False`` a character cut at the end
+    of the sample does not disqualify an encoding.
+    """
+    sample = sample[:CJK_SAMPLE_BYTES]
+    high = len(sample) - len(sample.translate(None, _HIGH_BYTES))
+    if not high:
+        return None
+    gb_score = 2 * len(_GB_COMMON_RE.findall(sample)) / high
+    big5_score = 2 * len(_BIG5_RE.findall(sample)) / high
+
+    final = at_eof and len(sample) < CJK_SAMPLE_BYTES
+    candidates = sorted(
+        (('gb18030', gb_score), ('big5', big5_score)),
+        key=lambda item: item[1], reverse=True
+    )
+    for encoding, score in candidates:
+        if score >= 0.5 and _sample_decodes(sample, encoding, final):
+            return CharsetResult(encoding, 'cjk-statistics', round(min(score, 1.0), 3))
+    return None
+
+
+def detect_charset(data: bytes, declared: Optional[str] = None,
+                   at_eof: bool = True) -> CharsetResult:
+    """
+    Detect the encoding of an HTML body without decoding all of it.
+    检测 HTML 字节流的编码（不解码整个文档）
+
+    Args:
+        data: Raw body, or the first bytes of a stream / 原始字节（或流的开头部分）
+        declared: Charset from the HTTP Content-Type header, if any / 响应头声明的编码
+        at_eof: False when more bytes follow ``data`` (streaming) / 是否已到流末尾
+
+    Returns:
+        CharsetResult: codec name plus the stage that decided it
+    """
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return CharsetResult(encoding, 'bom')
+
+    sample = data[:SAMPLE_BYTES]
+    final = at_eof and len(data) <= SAMPLE_BYTES
+
+    # Declared charsets win when the sample agrees with them
+    for source, name in (('header', declared), ('meta', charset_from_meta(data))):
+        encoding = normalize_encoding(name)
+        if encoding and _sample_decodes(sample, encoding, final):
+            return CharsetResult(encoding, source)
+
+    if sample.isascii():
+        # Nothing to tell apart in the sample; UTF-8 is the ASCII-compatible default
+        return CharsetResult('utf-8', 'ascii', 0.5)
+
+    if _is_utf8_sample(sample, final):
+        return CharsetResult('utf-8', 'utf8-sample')
+
+    cjk = detect_cjk(sample)
+    if cjk:
+        return cjk
+
+    return CharsetResult('windows-1252', 'fallback', 0.1)
+
+
+def decode_html(data: bytes, declared: Optional[str] = None) -> DecodedDocument:
+    """
+    Detect the charset and decode the body once.
+    检测编码并对整个文档只解码一次
+
+    If the body turns out to be invalid past the sample, the detector runs
+    once more on the bytes around the failure (an ASCII head followed by GBK
+    text is common); otherwise undecodable bytes are replaced.
+    若采样之后出现非法字节，则在出错位置附近再检测一次，仍失败时以替换字符解码。
+    """
+    result = detect_charset(data, declared)
+    try:
+        return DecodedDocument(data.decode(result.encoding), result.encoding, result.source)
+    except UnicodeDecodeError as e:
+        if result.source in ('ascii', 'utf8-sample'):
+            cjk = detect_cjk(data[e.start:e.start + CJK_SAMPLE_BYTES])
+            if cjk:
+                try:
+                    return DecodedDocument(data.decode(cjk.encoding), cjk.encoding, cjk.source)
+                except UnicodeDecodeError:
+                    pass
+        return DecodedDocument(data.decode(result.encoding, errors='replace'),
+                               result.encoding, result.source, errors_replaced=True)
+
+
+class IncrementalHTMLDecoder:
+    """
+    Streaming counterpart of decode_html / decode_html 的流式版本
+
+    Buffers the first SAMPLE_BYTES to detect the charset (less when a BOM or
+    a declared charset settles it early), then decodes each chunk as it
+    arrives so the raw body never has to be held in memory.
+    When a later chunk is invalid for the detected codec, an all-ASCII
+    prefix lets the decoder switch to the CJK guess for the remainder;
+    otherwise undecodable bytes are replaced.
+
+    Usage:
+        decoder = IncrementalHTMLDecoder(declared='utf-8')
+        parts = [decoder.feed(chunk) for chunk in chunks]
+        parts.append(decoder.finish())
+    """
+
+    def __init__(self, declared: Optional[str] = None):
+        self.declared = declared
+        self.encoding: Optional[str] = None
+        self.source: Optional[str] = None
+        self.errors_replaced = False
+        self._pending = bytearray()
+        self._decoder = None
+        self._ascii_so_far = True
+
+    def _start(self, at_eof: bool) -> str:
+        result = detect_charset(bytes(self._pending), self.declared, at_eof=at_eof)
+        self.encoding, self.source = result.encoding, result.source
+        self._decoder = codecs.getincrementaldecoder(self.encoding)('strict')
+        data = bytes(self._pending)
+        self._pending = bytearray()
+        return self._decode(data, at_eof)
+
+    def _decode(self, data: bytes, final: bool) -> str:
+        pending, _ = self._decoder.getstate()
+        try:
+            text = self._decoder.decode(data, final=final)
+        except UnicodeDecodeError as e:
+            failed = pending + data
+            # Guess from the bytes at the failure, not the (ASCII) start of the buffer
+            cjk = detect_cjk(failed[e.start:e.start + CJK_SAMPLE_BYTES], at_eof=final) if (
+                self._ascii_so_far and self.source in ('ascii', 'utf8-sample')) else None
+            if cjk:
+                self.encoding, self.source = cjk.encoding, cjk.source
+                self._decoder = codecs.getincrementaldecoder(cjk.encoding)('replace')
+            else:
+                self._decoder = codecs.getincrementaldecoder(self.encoding)('replace')
+            self.errors_replaced = self.errors_replaced or cjk is None
+            text = self._decoder.decode(failed, final=final)
+        if self._ascii_so_far and not text.isascii():
+            self._ascii_so_far = False
+        return text
+
+    def _declared_early(self) -> bool:
+        """A BOM or a declared charset lets decoding start before the full sample."""
+        if self.declared or any(self._pending.startswith(bom) for bom, _ in _BOMS):
+            return True
+        return charset_from_meta(bytes(self._pending)) is not None
+
+    def feed(self, chunk: bytes) -> str:
+        """Decode the next chunk; returns '' while the sample is buffered / 解码下一块"""
+        if self._decoder is None:
+            self._pending += chunk
+            if len(self._pending) < SAMPLE_BYTES and not self._declared_early():
+                return ''
+            return self._start(at_eof=False)
+        return self._decode(chunk, final=False)
+
+    def finish(self) -> str:
+        """Flush the remaining bytes at end of stream / 流结束时输出剩余内容"""
+        if self._decoder is None:
+            return self._start(at_eof=True)
+        return self._decode(b'', final=True)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Content Sufficiency Scorer
+内容充分性评分（SPA 空壳 / 软失败检测）
+
+urllib can return ``200 OK`` for a single page application whose body is just
+``<div id="root"></div>`` plus scripts. Parsing that yields an empty Markdown
+file. This module scores a fetched document in a single regex pass over the
+markup (visible text vs. markup vs. script bytes, known SPA mount points) so
+the fetch pipeline can treat such responses as soft failures and go straight
+to a JavaScript-capable fetcher. Only executable ``<script>`` elements count
+as script, and script-based rules need at least one of them, so small static
+pages with inline CSS are never flagged.
+
+urllib 对 SPA 页面可能返回 200 但正文为空。本模块对 HTML 做一次正则扫描，
+统计可见文本、标记与脚本字节并识别常见 SPA 挂载点，用于判断"软失败"。
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Visible text below this many characters is considered "thin" / 可见文本下限
+MIN_TEXT_CHARS = 200
+
+# Script share of the document above which a thin page is treated as a shell
+# 脚本字节占比超过该值且文本稀少时视为空壳
+SCRIPT_RATIO_THRESHOLD = 0.5
+
+# Documents smaller than this (after stripping) with scripts are shells
+# 去空白后小于该字节数且含脚本的文档视为空壳
+TINY_DOCUMENT_BYTES = 500
+
+# <script type=...> values that are data, not code (JSON-LD, templates, ...)
+# 以下 type 之外的非 JS 类型（JSON-LD、模板等）不算作脚本
+_JS_SCRIPT_TYPES = frozenset({
+    '', 'module', 'text/javascript', 'application/javascript', 'text/ecmascript',
+    'application/ecmascript', 'application/x-javascript', 'text/jsx', 'text/babel',
+})
+
+# One tokenizer pass: raw-text elements are consumed whole, other tags singly
+_TOKEN_RE = re.compile(
+    r'<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>'
+    r'|<!--.*?-->'
+    r'|<[^>]*>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Empty mount points used by React/Vue/Next/Nuxt/Angular/Quasar and friends
+_SPA_ROOT_RE = re.compile(
+    r'<(?:div|main|section)\b[^>]*\bid\s*=\s*["\']?'
+    r'(root|app|__next|__nuxt|q-app|svelte|ember-app|main-app)["\'\s>]'
+    r'[^>]*>\s*(?:<!--.*?-->\s*)*</(?:div|main|section)>'
+    r'|<app-root\b[^>]*>\s*</app-root>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+_JS_REQUIRED_RE = re.compile(
+    r'enable\s+javascript|javascript\s+(?:is\s+)?(?:required|disabled)|启用\s*javascript|开启\s*javascript',
+    re.IGNORECASE,
+)
+
+_SCRIPT_TYPE_RE = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]*)', re.IGNORECASE)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_ENTITY_RE = re.compile(r'&(?:#\d+|#x[0-9a-f]+|\w+);', re.IGNORECASE)
+
+
+@dataclass
+class SufficiencyReport:
+    """内容充分性评估结果"""
+    text_chars: int = 0
+    markup_bytes: int = 0
+    script_bytes: int = 0
+    scripts: int = 0
+    total_bytes: int = 0
+    spa_root: Optional[str] = None
+    js_required_notice: bool = False
+    is_soft_failure: bool = False
+    reason: str = ""
+
+    @property
+    def text_ratio(self) -> float:
+        """Visible text / total document size / 可见文本占比"""
+        return self.text_chars / self.total_bytes if self.total_bytes else 0.0
+
+    @property
+    def script_ratio(self) -> float:
+        """Script bytes / total document size / 脚本占比"""
+        return self.script_bytes / self.total_bytes if self.total_bytes else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'text_chars': self.text_chars,
+            'script_bytes': self.script_bytes,
+            'scripts': self.scripts,
+            'total_bytes': self.total_bytes,
+            'text_ratio': round(self.text_ratio, 4),
+            'script_ratio': round(self.script_ratio, 4),
+            'spa_root': self.spa_root,
+            'is_soft_failure': self.is_soft_failure,
+            'reason': self.reason,
+        }
+
+
+def score_content(html: str, stop_when_sufficient: bool = True) -> SufficiencyReport:
+    """
+    Score whether a fetched document carries real content.
+    评估抓取到的文档是否包含实际内容
+
+    Walks the markup once: executable <script> elements count as script
+    bytes, every other tag (including style/noscript/template bodies and
+    JSON-LD) as markup, and the gaps between tokens as visible text
+    (whitespace collapsed, entities counted as one char).
+
+    Args:
+        html: Decoded HTML document / 已解码的 HTML
+        stop_when_sufficient: Stop scanning once enough visible text was seen
+                              (counters are then partial) / 文本充足即提前结束
+
+    Returns:
+        SufficiencyReport: counters plus the soft-failure verdict
+    """
+    report = SufficiencyReport(total_bytes=len(html or ''))
+    if not html or not html.strip():
+        report.is_soft_failure = True
+        report.reason = "empty document"
+        return report
+
+    text_chars = 0
+    pos = 0
+    for match in _TOKEN_RE.finditer(html):
+        start, end = match.span()
+        if start > pos:
+            text_chars += _visible_length(html[pos:start])
+            if stop_when_sufficient and text_chars >= MIN_TEXT_CHARS:
+                report.text_chars = text_chars
+                return report
+        raw_tag = (match.group(1) or '').lower()
+        if raw_tag == 'script' and _is_executable_script(match.group(0)):
+            report.script_bytes += end - start
+            report.scripts += 1
+        else:
+            report.markup_bytes += end - start
+            if raw_tag == 'noscript' and _JS_REQUIRED_RE.search(match.group(0)):
+                report.js_required_notice = True
+        pos = end
+    if pos < len(html):
+        text_chars += _visible_length(html[pos:])
+    report.text_chars = text_chars
+
+    spa_match = _SPA_ROOT_RE.search(html)
+    if spa_match:
+        report.spa_root = spa_match.group(1) or 'app-root'
+
+    # Verdict: only thin pages can be shells; rich pages are always accepted
+    if text_chars >= MIN_TEXT_CHARS:
+        return report
+
+    # Script-based rules need a real script; a static page with CSS is not a shell
+    has_scripts = report.scripts > 0
+    if report.spa_root:
+        report.is_soft_failure = True
+        report.reason = f"empty SPA mount point #{report.spa_root} with {text_chars} text chars"
+    elif report.js_required_notice:
+        report.is_soft_failure = True
+        report.reason = "page requires JavaScript (noscript notice)"
+    elif has_scripts and report.script_ratio >= SCRIPT_RATIO_THRESHOLD:
+        report.is_soft_failure = True
+        report.reason = f"script-dominated page ({report.script_ratio:.0%} script, {text_chars} text chars)"
+    elif has_scripts and len(html.strip()) < TINY_DOCUMENT_BYTES:
+        report.is_soft_failure = True
+        report.reason = f"tiny scripted document ({len(html.strip())} bytes)"
+
+    return report
+
+
+def _is_executable_script(element: str) -> bool:
+    """True for JavaScript <script> elements, False for JSON-LD, templates etc."""
+    open_tag = element[:element.find('>') + 1]
+    match = _SCRIPT_TYPE_RE.search(open_tag)
+    if not match:
+        return True
+    return match.group(1).lower().split(';')[0].strip() in _JS_SCRIPT_TYPES
+
+
+def _visible_length(segment: str) -> int:
+    """Length of a text segment as it would render (whitespace collapsed)."""
+    collapsed = _WHITESPACE_RE.sub(' ', segment).strip()
+    if not collapsed:
+        return 0
+    if '&' in collapsed:
+        collapsed = _ENTITY_RE.sub('x', collapsed)
+    return len(collapsed)
+
+
+class RenderHostMemo:
+    """
+    Hosts that served SPA shells in this process.
+    本进程中返回过 SPA 空壳的主机记录
+
+    Later URLs on a recorded host skip urllib and go straight to the
+    renderer. Thread-safe; lives for the process (shared by ``wf batch``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, str] = {}
+
+    def record(self, host: str, reason: str) -> None:
+        if not host:
+            return
+        with self._lock:
+            self._hosts[host.lower()] = reason
+
+    def needs_rendering(self, host: str) -> Optional[str]:
+        """Return the recorded reason if the host needs rendering, else None."""
+        if not host:
+            return None
+        with self._lock:
+            return self._hosts.get(host.lower())
+
+    def forget(self, host: str) -> None:
+        with self._lock:
+            self._hosts.pop((host or '').lower(), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+    def snapshot(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._hosts)
+
+
+render_host_memo = RenderHostMemo()
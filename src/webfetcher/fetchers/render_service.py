@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Playwright Render Service
+可复用的 Playwright 无头渲染服务
+
+One Chromium instance is launched lazily and reused for every render in the
+process (``wf batch`` and crawl modes run in-process, so they share it).
+Playwright's sync API only works on the thread that started it, so every
+render runs on one dedicated render thread; callers on any thread (crawl
+pools, pagination prefetchers) submit jobs to it and wait for the result.
+Browser contexts are pooled per user agent with a bounded LRU, heavy assets
+are blocked at the network layer, and readiness is decided by load events
+instead of fixed sleeps.
+
+进程内只启动一次 Chromium；所有渲染都在专用渲染线程中执行，
+其他线程通过队列提交任务并等待结果。按 UA 复用浏览器上下文（有界 LRU 池），
+在网络层拦截图片/媒体/字体等重资源，并以事件代替固定等待时间判断页面就绪。
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 检查 Playwright 是否可用
+try:
+    from playwright.sync_api import sync_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    sync_playwright = None
+    PLAYWRIGHT_AVAILABLE = False
+
+DEFAULT_MOBILE_UA = (
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 '
+    '(KHTML, like Gecko) Mobile/15E148'
+)
+
+# Resource types aborted before they hit the network / 在网络层拦截的资源类型
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+
+# Upper bound for the post-load network-idle wait / 加载完成后等待网络空闲的上限
+NETWORK_IDLE_TIMEOUT_MS = 2000
+
+
+class RenderServiceError(Exception):
+    """Render service error / 渲染服务错误"""
+    pass
+
+
+@dataclass
+class RenderResult:
+    """渲染结果"""
+    html: Optional[str]
+    final_url: str
+    duration: float = 0.0
+    browser_launched: bool = False
+    error: Optional[str] = None
+
+
+class RenderService:
+    """
+    Shared headless Chromium renderer.
+    共享的无头 Chromium 渲染器
+
+    Playwright's sync API is bound to the thread that started it, so the
+    browser is owned by a dedicated render thread and render() hands jobs to
+    it through a queue. Renders therefore run one at a time; the pool exists
+    to avoid re-creating contexts and pages, not to render in parallel.
+    Playwright 同步 API 绑定启动线程，因此浏览器由专用渲染线程持有，
+    render() 通过队列把任务交给它串行执行；上下文池用于避免重复创建 context/page。
+    """
+
+    def __init__(self, max_contexts: int = 4, block_resources: bool = True,
+                 headless: bool = True):
+        """
+        Args:
+            max_contexts: Maximum pooled browser contexts (one per UA) / 上下文池上限
+            block_resources: Abort image/media/font requests / 是否拦截重资源
+            headless: Launch Chromium headless / 是否无头启动
+        """
+        self.max_contexts = max(1, max_contexts)
+        self.block_resources = block_resources
+        self.headless = headless
+
+        self._lock = threading.Lock()
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._playwright = None
+        self._browser = None
+        # ua -> (context, page), ordered by recency
+        self._contexts: "OrderedDict[str, tuple]" = OrderedDict()
+        self.renders = 0
+        self.browser_launches = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle / 生命周期
+    # ------------------------------------------------------------------
+    def _ensure_browser(self) -> bool:
+        """Launch Chromium if needed. Returns True when a launch happened."""
+        if self._browser is not None and self._browser.is_connected():
+            return False
+
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RenderServiceError("Playwright not available. Install with: pip install playwright")
+
+        # Browser crashed or was never started: drop stale state
+        self._reset()
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(
+            headless=self.headless,
+            args=['--no-sandbox', '--disable-blink-features=AutomationControlled']
+        )
+        self.browser_launches += 1
+        logger.info("Render service: Chromium launched")
+        return True
+
+    def _reset(self) -> None:
+        """Release every pooled resource without raising."""
+        for context, _ in self._contexts.values():
+            try:
+                context.close()
+            except Exception:
+                pass
+        self._contexts.clear()
+
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def _worker(self) -> None:
+        """Render thread: owns Playwright and runs queued jobs / 渲染线程"""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, func, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        if self._browser is not None:
+            logger.debug(f"Render service closing after {self.renders} renders")
+        self._reset()
+
+    def _submit(self, func, *args):
+        """Run func on the render thread and wait for its result / 在渲染线程上执行"""
+        if threading.current_thread() is self._thread:
+            return func(*args)
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name='wf-render', daemon=True)
+                self._thread.start()
+            self._jobs.put((future, func, args))
+        return future.result()
+
+    def close(self) -> None:
+        """Shut down the browser and the render thread / 关闭浏览器和渲染线程"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None or not thread.is_alive():
+                return
+            self._jobs.put(None)
+        thread.join()
+
+    # ------------------------------------------------------------------
+    # Context pool / 上下文池
+    # ------------------------------------------------------------------
+    def _route_handler(self, route):
+        """Abort heavy resources, continue everything else."""
+        try:
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+                route.abort()
+            else:
+                route.continue_()
+        except Exception:
+            # Page may have navigated away; nothing to do
+            pass
+
+    def _acquire_page(self, ua: str):
+        """Return a pooled page for the UA, creating the context on demand."""
+        entry = self._contexts.get(ua)
+        if entry is not None:
+            context, page = entry
+            if page.is_closed():
+                page = context.new_page()
+                page.set_extra_http_headers({'Accept-Language': 'zh-CN,zh;q=0.9'})
+                self._contexts[ua] = (context, page)
+            self._contexts.move_to_end(ua)
+            return page
+
+        # Evict least recently used context when the pool is full
+        while len(self._contexts) >= self.max_contexts:
+            _, (old_context, _) = self._contexts.popitem(last=False)
+            try:
+                old_context.close()
+            except Exception:
+                pass
+
+        context = self._browser.new_context(
+            user_agent=ua, locale='zh-CN',
+            viewport={'width': 390, 'height': 844}, device_scale_factor=3
+        )
+        if self.block_resources:
+            context.route('**/*', self._route_handler)
+        page = context.new_page()
+        page.set_extra_http_headers({'Accept-Language': 'zh-CN,zh;q=0.9'})
+        self._contexts[ua] = (context, page)
+        return page
+
+    def _discard_page(self, ua: str) -> None:
+        """Drop a context whose page ended in an unknown state."""
+        entry = self._contexts.pop(ua, None)
+        if entry is not None:
+            try:
+                entry[0].close()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Rendering / 渲染
+    # ------------------------------------------------------------------
+    def _wait_until_ready(self, page, timeout_ms: int) -> None:
+        """
+        Event-based readiness: load event, then a capped network-idle wait,
+        then one scroll to trigger lazy content and another capped idle wait.
+        """
+        page.wait_for_load_state('load', timeout=timeout_ms)
+        idle_ms = min(NETWORK_IDLE_TIMEOUT_MS, timeout_ms)
+        try:
+            page.wait_for_load_state('networkidle', timeout=idle_ms)
+        except Exception:
+            # Long-polling pages never go idle; the DOM is already loaded
+            pass
+        try:
+            page.evaluate('window.scrollTo(0, document.body ? document.body.scrollHeight : 0)')
+            page.wait_for_load_state('networkidle', timeout=idle_ms)
+        except Exception:
+            pass
+
+    def render(self, url: str, ua: Optional[str] = None, timeout_ms: int = 60000) -> RenderResult:
+        """
+        Render a URL and return the resulting DOM.
+        渲染 URL 并返回最终 DOM
+
+        Args:
+            url: URL to render / 目标 URL
+            ua: User agent (defaults to a mobile Safari UA) / User Agent
+            timeout_ms: Navigation timeout in milliseconds / 导航超时（毫秒）
+
+        Returns:
+            RenderResult: html is None on failure, with error set
+        """
+        return self._submit(self._render, url, ua or DEFAULT_MOBILE_UA, timeout_ms, time.time())
+
+    def _render(self, url: str, ua: str, timeout_ms: int, start_time: float) -> RenderResult:
+        """render() body; runs on the render thread / 在渲染线程上执行的渲染逻辑"""
+        launched = False
+        try:
+            launched = self._ensure_browser()
+            page = self._acquire_page(ua)
+            page.goto(url, wait_until='domcontentloaded', timeout=timeout_ms)
+            self._wait_until_ready(page, timeout_ms)
+            html = page.content()
+            final_url = page.url
+            self.renders += 1
+            # Leave the page blank so timers and sockets of this site stop
+            try:
+                page.goto('about:blank', timeout=timeout_ms)
+            except Exception:
+                self._discard_page(ua)
+            return RenderResult(html=html, final_url=final_url,
+                                duration=time.time() - start_time,
+                                browser_launched=launched)
+        except Exception as e:
+            logger.warning(f"Render failed for {url}: {e}")
+            self._discard_page(ua)
+            if self._browser is not None and not self._browser.is_connected():
+                self._reset()
+            return RenderResult(html=None, final_url=url,
+                                duration=time.time() - start_time,
+                                browser_launched=launched, error=str(e))
+
+    def get_stats(self) -> dict:
+        """Service statistics / 服务统计"""
+        return {
+            'renders': self.renders,
+            'browser_launches': self.browser_launches,
+            'pooled_contexts': len(self._contexts),
+            'max_contexts': self.max_contexts,
+            'block_resources': self.block_resources,
+        }
+
+
+_render_service: Optional[RenderService] = None
+_render_service_lock = threading.Lock()
+
+
+def get_render_service() -> RenderService:
+    """
+    Return the process-wide render service, creating it on first use.
+    获取进程级共享渲染服务（首次调用时创建）
+    """
+    global _render_service
+    with _render_service_lock:
+        if _render_service is None:
+            _render_service = RenderService()
+            atexit.register(_render_service.close)
+        return _render_service
+
+
+def shutdown_render_service() -> None:
+    """Close the shared render service if it was started / 关闭共享渲染服务"""
+    global _render_service
+    with _render_service_lock:
+        if _render_service is not None:
+            _render_service.close()
+            _render_service = None
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML Reader
+流式 HTML 读取
+
+Reads an HTTP response in chunks instead of one ``read(MAX_PAGE_SIZE)``:
+the body is decoded incrementally (no second full-size copy), the
+``<head>`` section is parsed and handed to a callback as soon as it has
+arrived, reading stops at a configurable byte budget, and responses whose
+Content-Type is not HTML are refused before any body bytes are buffered.
+
+分块读取 HTTP 响应：增量解码（不再保留完整字节副本），<head> 到达后立即解析并回调，
+按可配置字节预算截断，并在读取正文前拒绝非 HTML 的 Content-Type。
+"""
+import html as html_lib
+import logging
+import re
+from dataclasses import dataclass, field
+from http import client as http_client
+from typing import Callable, Dict, Optional
+
+from webfetcher.fetchers.charset import IncrementalHTMLDecoder, charset_from_content_type
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Give up looking for </head> after this many decoded characters / 查找 </head> 的上限
+HEAD_SCAN_LIMIT = 256 * 1024
+
+_HEAD_END_RE = re.compile(r'</head\s*>|<body[\s>]', re.IGNORECASE)
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+_META_RE = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+
+
+class NonHTMLContentError(Exception):
+    """
+    Raised when a response is not an HTML document / 响应不是 HTML 文档时抛出
+
+    Carries the response headers that matter for handling it as a download
+    and, when raised by fetch_html_original, the still-open response whose
+    body has not been read, so the caller can stream it to disk without a
+    second request (and must ``close()`` it otherwise).
+    携带下载所需的响应头；由 fetch_html_original 抛出时还携带尚未读取正文的响应，
+    调用方可直接写入磁盘而无需再次请求（不使用时需调用 close()）。
+    """
+
+    def __init__(self, url: str, content_type: str,
+                 content_disposition: Optional[str] = None,
+                 content_length: Optional[int] = None,
+                 response=None):
+        self.url = url
+        self.content_type = content_type
+        self.content_disposition = content_disposition
+        self.content_length = content_length
+        self.response = response
+        super().__init__(f"Not an HTML document ({content_type or 'unknown type'}): {url}")
+
+    def close(self) -> None:
+        """Release the attached response / 释放附带的响应"""
+        if self.response is not None:
+            try:
+                self.response.close()
+            except Exception:
+                pass
+            self.response = None
+
+
+@dataclass
+class HeadInfo:
+    """<head> 元数据"""
+    title: Optional[str] = None
+    charset: Optional[str] = None
+    # name/property -> content (og:*, description, keywords, ...)
+    meta: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def open_graph(self) -> Dict[str, str]:
+        """og:* properties / Open Graph 属性"""
+        return {k: v for k, v in self.meta.items() if k.startswith('og:')}
+
+
+@dataclass
+class StreamedDocument:
+    """流式读取结果"""
+    text: str
+    encoding: Optional[str]
+    encoding_source: Optional[str]
+    bytes_read: int = 0
+    truncated: bool = False
+    head: Optional[HeadInfo] = None
+
+
+HTML_CONTENT_TYPES = frozenset({'text/html', 'application/xhtml+xml'})
+
+
+def is_html_content_type(content_type: Optional[str]) -> bool:
+    """
+    Whether a Content-Type can be parsed as a page / Content-Type 是否可作为网页解析
+
+    Only HTML types are pages; a missing header is accepted (the body is
+    sniffed instead). Everything else (PDF, images, archives, plain text,
+    JSON, XML...) is a download.
+    """
+    if not content_type:
+        return True
+    mime = content_type.split(';', 1)[0].strip().lower()
+    return not mime or mime in HTML_CONTENT_TYPES
+
+
+def parse_head(head_html: str) -> HeadInfo:
+    """
+    Parse title, charset and meta name/property pairs from a <head> fragment.
+    从 <head> 片段中解析标题、编码及 meta 属性
+    """
+    info = HeadInfo()
+    title_match = _TITLE_RE.search(head_html)
+    if title_match:
+        info.title = html_lib.unescape(' '.join(title_match.group(1).split())) or None
+
+    for tag in _META_RE.findall(head_html):
+        attrs = {
+            name.lower(): html_lib.unescape(double or single or bare)
+            for name, double, single, bare in _ATTR_RE.findall(tag)
+        }
+        if 'charset' in attrs and not info.charset:
+            info.charset = attrs['charset'].lower()
+        key = (attrs.get('property') or attrs.get('name') or '').lower()
+        if key and 'content' in attrs:
+            info.meta.setdefault(key, attrs['content'])
+    return info
+
+
+def read_html_stream(response, url: str = '', byte_budget: int = 10 * 1024 * 1024,
+                     on_head: Optional[Callable[[HeadInfo], None]] = None,
+                     chunk_size: int = CHUNK_SIZE) -> StreamedDocument:
+    """
+    Read and decode an HTML response chunk by chunk.
+    分块读取并解码 HTML 响应
+
+    Args:
+        response: urllib response (anything with ``read(n)`` and ``headers``)
+        url: URL for log and error messages / 用于日志与异常信息
+        byte_budget: Maximum body bytes to read / 最大读取字节数
+        on_head: Called once with the parsed <head> as soon as it is complete
+        chunk_size: Bytes per read / 每次读取字节数
+
+    Returns:
+        StreamedDocument
+
+    Raises:
+        NonHTMLContentError: Content-Type is not HTML (nothing is read; the
+                             response is attached and left open)
+    """
+    headers = response.headers
+    content_type = headers.get('Content-Type', '')
+    if not is_html_content_type(content_type):
+        length = headers.get('Content-Length')
+        raise NonHTMLContentError(
+            url, content_type,
+            content_disposition=headers.get('Content-Disposition'),
+            content_length=int(length) if length and length.isdigit() else None,
+            response=response
+        )
+
+    decoder = IncrementalHTMLDecoder(charset_from_content_type(content_type))
+    parts = []
+    head_buffer = []
+    head_scanned = 0
+    head: Optional[HeadInfo] = None
+    head_done = False
+    bytes_read = 0
+    truncated = False
+
+    while bytes_read < byte_budget:
+        try:
+            chunk = response.read(min(chunk_size, byte_budget - bytes_read))
+        except http_client.IncompleteRead as e:
+            logger.warning(f"Incomplete read, using partial data: {len(e.partial or b'')} bytes")
+            chunk = e.partial or b''
+            bytes_read += len(chunk)
+            parts.append(decoder.feed(chunk))
+            break
+        if not chunk:
+            break
+        bytes_read += len(chunk)
+        text = decoder.feed(chunk)
+        parts.append(text)
+
+        # Surface <head> as soon as it is complete / <head> 完整后立即回调
+        if not head_done and text:
+            head_buffer.append(text)
+            head_scanned += len(text)
+            joined = ''.join(head_buffer)
+            end = _HEAD_END_RE.search(joined)
+            if end:
+                head = parse_head(joined[:end.start()])
+                head_done = True
+                head_buffer = []
+                if on_head:
+                    on_head(head)
+            elif head_scanned > HEAD_SCAN_LIMIT:
+                head_done = True
+                head_buffer = []
+    else:
+        # Budget exhausted: check whether the document continues
+        try:
+            truncated = bool(response.read(1))
+        except http_client.IncompleteRead:
+            truncated = True
+        if truncated:
+            logger.warning(f"Page truncated at {byte_budget} bytes: {url}")
+
+    parts.append(decoder.finish())
+    text = ''.join(parts)
+
+    if not head_done:
+        end = _HEAD_END_RE.search(text, 0, HEAD_SCAN_LIMIT)
+        head = parse_head(text[:end.start()] if end else text[:HEAD_SCAN_LIMIT])
+        if on_head:
+            on_head(head)
+
+    return StreamedDocument(
+        text=text,
+        encoding=decoder.encoding,
+        encoding_source=decoder.source,
+        bytes_read=bytes_read,
+        truncated=truncated,
+        head=head,
+    )
@@ -4,9 +4,14 @@ from .parser import (
     wechat_to_markdown,
     generic_to_markdown
 )
+from .cache import ParseCache, configure_parse_cache, get_parse_cache, set_parse_cache_enabled
 
 __all__ = [
     'xhs_to_markdown',
     'wechat_to_markdown',
-    'generic_to_markdown'
+    'generic_to_markdown',
+    'ParseCache',
+    'configure_parse_cache',
+    'get_parse_cache',
+    'set_parse_cache_enabled'
 ]
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Parse Result Cache
+解析结果缓存
+
+Parsing is deterministic for a given page, so parse results are kept on disk
+and reused when the same HTML is parsed again: re-runs with --html, crawl
+re-aggregation, or re-rendering to another --format.
+同一页面的解析结果是确定的，因此将解析结果缓存到磁盘，在重复解析相同 HTML 时
+（--html 重跑、爬取结果重新聚合、更换输出格式）直接复用。
+
+An entry is keyed by:
+缓存键由以下部分组成：
+
+- the SHA-256 of the HTML / HTML 内容哈希
+- the source URL (the markdown embeds it and resolves relative links against it)
+  来源 URL（Markdown 中包含该 URL，相对链接也据此解析）
+- the template selected for the URL: name, version and file mtime, so editing
+  a template invalidates its entries. The lookup goes through the shared
+  template parser (webfetcher.parsing.engine.template_parser), which
+  re-stats the template files at most once per second
+  URL 匹配的模板名称、版本与文件修改时间（复用共享模板解析器，每秒最多检查一次模板文件）
+- the parser name, filter level and crawl mode / 解析器、过滤级别与爬取模式
+- PARSER_VERSION, bumped whenever parser output changes / 解析器版本
+
+Entries live under $WF_PARSE_CACHE_DIR (default ~/.cache/webfetcher/parse) as
+zlib-compressed JSON and are pruned oldest-first past
+$WF_PARSE_CACHE_MAX_MB (default 256).
+缓存以 zlib 压缩的 JSON 存储，超出容量上限时按最旧优先清理。
+
+A one-off fetch almost never parses the same HTML twice, so the command line
+uses the cache for site crawls only (resumed and repeated crawls re-parse
+identical pages); --parse-cache / --no-parse-cache or WF_PARSE_CACHE=1/0
+override that. Library callers get no cache unless WF_PARSE_CACHE=1 or
+set_parse_cache_enabled(True).
+单页抓取几乎不会重复解析同一 HTML，因此命令行默认仅在站点爬取时使用缓存；
+可用 --parse-cache / --no-parse-cache 或 WF_PARSE_CACHE=1/0 覆盖。
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "webfetcher" / "parse"
+DEFAULT_MAX_MB = 256
+
+# Bump when a parser change alters output for unchanged HTML and templates
+# 解析器输出发生变化（HTML 与模板不变）时递增
+PARSER_VERSION = "3.5.0-1"
+
+PRUNE_EVERY = 200  # Writes between size checks / 每写入多少条检查一次容量
+
+_FETCH_TIME_RE = re.compile(r'(抓取时间\**: )\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+
+ParseResult = Tuple[str, str, Dict[str, Any]]
+
+
+class ParseCache:
+    """
+    On-disk cache of (date, markdown, metadata) parse results / 解析结果磁盘缓存
+
+    Usage:
+        cache = ParseCache()
+        key = cache.key('generic', html, url, filter_level='safe')
+        result = cache.get(key)
+        if result is None:
+            result = parse(html, url)
+            cache.put(key, result)
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 template_dir: Optional[str] = None):
+        """
+        Args:
+            directory: Cache directory (defaults to $WF_PARSE_CACHE_DIR or ~/.cache/webfetcher/parse)
+                       缓存目录
+            max_bytes: Size cap before pruning (defaults to $WF_PARSE_CACHE_MAX_MB MB)
+                       缓存容量上限
+            template_dir: Parser template directory used for invalidation (defaults to the
+                          bundled templates) / 模板目录
+        """
+        from .engine.template_parser import get_shared_template_parser
+        self.directory = Path(directory or os.environ.get('WF_PARSE_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            try:
+                max_bytes = int(float(os.environ.get('WF_PARSE_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+            except ValueError:
+                max_bytes = DEFAULT_MAX_MB * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.templates = get_shared_template_parser(template_dir)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def key(self, parser: str, html: str, url: str, filter_level: str = 'safe',
+            is_crawling: bool = False) -> Optional[str]:
+        """
+        Cache key for one parse, or None when it cannot be computed.
+        计算缓存键，无法计算时返回 None
+        """
+        try:
+            template = self.templates.template_signature(url)
+        except Exception as e:
+            logger.debug(f"Parse cache disabled for {url}: {e}")
+            return None
+        html_hash = hashlib.sha256(html.encode('utf-8', 'surrogatepass')).hexdigest()
+        parts = [PARSER_VERSION, parser, html_hash, url, template, filter_level or '', str(bool(is_crawling))]
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.z"
+
+    def get(self, key: Optional[str]) -> Optional[ParseResult]:
+        """Cached result for key, or None / 读取缓存结果"""
+        if not key:
+            return None
+        path = self._path(key)
+        try:
+            payload = json.loads(zlib.decompress(path.read_bytes()).decode('utf-8'))
+            date_only, markdown, metadata = payload['date'], payload['markdown'], payload['metadata']
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.debug(f"Discarding unreadable parse cache entry {path}: {e}")
+            self.misses += 1
+            return None
+        # The fetch time line reports when this run fetched the page, not when it was cached
+        now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        markdown = _FETCH_TIME_RE.sub(lambda m: m.group(1) + now, markdown, count=1)
+        self.hits += 1
+        return date_only, markdown, metadata
+
+    def put(self, key: Optional[str], result: ParseResult) -> None:
+        """Store a parse result; failures are logged and ignored / 写入缓存，失败时忽略"""
+        if not key:
+            return
+        date_only, markdown, metadata = result
+        try:
+            data = json.dumps({'date': date_only, 'markdown': markdown, 'metadata': metadata},
+                              ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Parse result not cacheable: {e}")
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(zlib.compress(data.encode('utf-8'), 6))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Failed to write parse cache entry {path}: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 1
+        if prune:
+            self.prune()
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Delete the oldest entries until the cache fits max_bytes; returns entries removed.
+        按最旧优先删除条目直至容量不超过上限，返回删除数量
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*.json.z"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Delete every entry; returns entries removed / 清空缓存"""
+        return self.prune(0)
+
+
+def _env_setting() -> Optional[bool]:
+    """WF_PARSE_CACHE as True/False, or None when unset / 读取 WF_PARSE_CACHE"""
+    value = os.environ.get('WF_PARSE_CACHE', '').strip().lower()
+    if not value:
+        return None
+    return value not in ('0', 'false', 'no', 'off')
+
+
+_cache: Optional[ParseCache] = None
+_enabled = bool(_env_setting())
+
+
+def set_parse_cache_enabled(enabled: bool) -> None:
+    """Turn the shared parse cache on or off / 开关共享解析缓存"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def configure_parse_cache(crawling: bool, enabled: Optional[bool] = None) -> bool:
+    """
+    Apply the command-line policy and return whether the cache is on.
+    按命令行策略开关缓存：显式参数 > WF_PARSE_CACHE > 仅站点爬取时启用
+
+    Args:
+        crawling: Whether this run is a site crawl / 是否为站点爬取
+        enabled: --parse-cache (True) / --no-parse-cache (False), or None
+    """
+    if enabled is None:
+        enabled = _env_setting()
+    if enabled is None:
+        enabled = crawling
+    set_parse_cache_enabled(enabled)
+    return _enabled
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """Shared ParseCache, or None when disabled / 返回共享缓存，禁用时返回 None"""
+    global _cache
+    if not _enabled:
+        return None
+    if _cache is None:
+        _cache = ParseCache()
+    return _cache
@@ -0,0 +1,568 @@
+"""Tree-walking HTML to Markdown emitter.
+
+Converts an already-parsed lxml tree to Markdown without serializing it back
+to HTML and re-tokenizing it with html2text's HTMLParser. The emitter keeps
+html2text's formatting rules (the configuration TemplateParser has always
+used: inline links, no wrapping, internal ``#`` links dropped) so output
+matches the previous pipeline, and folds in what used to be separate passes:
+
+- lazy images: ``data-src`` is used when ``src`` is missing
+- base64 images: ``data:image/...`` sources are never emitted
+- whitespace cleanup: trailing spaces are stripped per line and blank-line
+  runs are collapsed while writing, instead of regex/replace loops afterwards
+
+Output is written into a list buffer and joined once.
+
+基于已解析 lxml 树的 HTML→Markdown 转换器：沿用 html2text 的格式规则，
+内置懒加载图片、base64 图片与空白清理，输出写入列表缓冲区后一次拼接。
+"""
+
+import re
+import string
+from typing import List, Optional
+from urllib.parse import urljoin
+
+from html2text.utils import escape_md, escape_md_section, hn
+from lxml import etree
+
+# Serialized text would carry these as entity references, which the
+# HTMLParser-based converter saw as separate, unescaped data chunks.
+_ENTITY_SPLIT_RE = re.compile(r'([&<>])')
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRESSED_FOLLOW_RE = re.compile(r'[^][(){}\s.!?]')
+_ABSOLUTE_URL_RE = re.compile(r'^[a-zA-Z+]+://')
+_DATA_IMAGE_RE = re.compile(r'data:image/[^\s)]+')
+# Text escape_md_section could change: backslashes, or a digit/+/- opening a line
+_ESCAPE_HINT_RE = re.compile(r'\\|^\s*[\d+-]', re.MULTILINE)
+
+# Subtrees that never produce output / 不产生输出的子树
+_QUIET_TAGS = frozenset({'head', 'style', 'script'})
+# Elements libxml2 serializes without an end tag / libxml2 序列化时无结束标签的元素
+_VOID_TAGS = frozenset({
+    'area', 'base', 'basefont', 'br', 'col', 'frame', 'hr', 'img', 'input',
+    'isindex', 'link', 'meta', 'param',
+})
+_NO_AUTOLINK_BRACKET_TAGS = frozenset({'p', 'div', 'style', 'dl', 'dt'})
+
+
+class _ListState:
+    __slots__ = ('name', 'num')
+
+    def __init__(self, name: str, num: int):
+        self.name = name
+        self.num = num
+
+
+class MarkdownEmitter:
+    """
+    Convert an lxml element tree to Markdown.
+
+    One instance converts one tree; use :func:`tree_to_markdown` for the
+    common case.
+
+    Example:
+        root = lxml.html.fragment_fromstring(html, create_parent='div')
+        markdown = MarkdownEmitter(base_url=url).convert(root)
+    """
+
+    def __init__(self, base_url: str = ''):
+        """
+        Args:
+            base_url: Base for relative link and image URLs ('' keeps them as is)
+        """
+        self.base_url = base_url
+
+        # Line buffer: finished lines go to _parts, the open line to _line
+        self._parts: List[str] = []
+        self._line: List[str] = []
+        self._blank_pending = False
+        self._last_was_nl = False
+
+        self._p_p = 0  # newlines to write before the next output
+        self._start = True
+        self._space = False
+        self._br_toggle = ''
+        self._quiet = 0
+
+        self._astack: List[Optional[dict]] = []
+        self._maybe_automatic_link: Optional[str] = None
+        self._empty_link = False
+        self._lists: List[_ListState] = []
+        self._last_was_list = False
+        self._list_code_indent = ''
+        self._blockquote = 0
+        self._pre = False
+        self._startpre = False
+        self._code = False
+        self._quote = False
+        self._inheader = False
+        self._stressed = False
+        self._preceding_stressed = False
+        self._preceding_data = ''
+        self._current_tag = ''
+
+        self._split_next_td = False
+        self._td_count = 0
+        self._table_start = False
+
+        self._abbr_title: Optional[str] = None
+        self._abbr_data: Optional[str] = None
+        self._abbr_list = {}
+
+        self._handlers = {
+            'p': self._tag_paragraph, 'div': self._tag_paragraph,
+            'br': self._tag_br, 'hr': self._tag_hr,
+            'blockquote': self._tag_blockquote,
+            'em': self._tag_emphasis, 'i': self._tag_emphasis, 'u': self._tag_emphasis,
+            'strong': self._tag_strong, 'b': self._tag_strong,
+            'del': self._tag_strike, 'strike': self._tag_strike, 's': self._tag_strike,
+            'kbd': self._tag_code, 'code': self._tag_code, 'tt': self._tag_code,
+            'abbr': self._tag_abbr, 'q': self._tag_q,
+            'a': self._tag_a, 'img': self._tag_img,
+            'dl': self._tag_definition, 'dt': self._tag_definition, 'dd': self._tag_definition,
+            'ol': self._tag_list, 'ul': self._tag_list, 'li': self._tag_li,
+            'table': self._tag_table, 'tr': self._tag_tr,
+            'td': self._tag_cell, 'th': self._tag_cell,
+            'pre': self._tag_pre,
+        }
+        for level in range(1, 10):
+            self._handlers[f'h{level}'] = self._tag_heading
+
+    # ------------------------------------------------------------------
+    # Public API
+
+    def convert(self, root) -> str:
+        """
+        Walk ``root`` (included) and return the Markdown text.
+
+        Trailing whitespace is stripped from every line and runs of blank
+        lines are collapsed to one; leading and trailing blank lines are dropped.
+        """
+        self._walk(root)
+        # End of document
+        if self._p_p == 0:
+            self._p_p = 1
+        self._o('', force='end')
+        self._flush_line()
+        return ''.join(self._parts)
+
+    # ------------------------------------------------------------------
+    # Tree walk
+
+    def _walk(self, root) -> None:
+        walker = etree.iterwalk(root, events=('start', 'end', 'comment', 'pi'))
+        for event, element in walker:
+            if event == 'start':
+                tag = element.tag.lower()
+                if tag in _QUIET_TAGS:
+                    walker.skip_subtree()
+                    continue
+                self._handle_tag(tag, element.attrib, True)
+                if element.text:
+                    self._text(element.text)
+                continue
+
+            if event == 'end':
+                tag = element.tag.lower()
+                if tag not in _VOID_TAGS and tag not in _QUIET_TAGS:
+                    self._handle_tag(tag, {}, False)
+            # Comments and processing instructions only contribute their tail
+            if element.tail and element is not root:
+                self._text(element.tail)
+
+    def _text(self, text: str) -> None:
+        if '&' in text or '<' in text or '>' in text:
+            for piece in _ENTITY_SPLIT_RE.split(text):
+                if not piece:
+                    continue
+                self._handle_data(piece, entity_char=piece in '&<>')
+        else:
+            self._handle_data(text)
+
+    # ------------------------------------------------------------------
+    # Output buffer
+
+    def _write(self, s: str) -> None:
+        if not s:
+            return
+        self._last_was_nl = s[-1] == '\n'
+        if '\n' not in s:
+            self._line.append(s)
+            return
+        lines = s.split('\n')
+        self._line.append(lines[0])
+        for line in lines[1:]:
+            self._flush_line()
+            if line:
+                self._line.append(line)
+
+    def _flush_line(self) -> None:
+        line = ''.join(self._line).rstrip()
+        self._line = []
+        if not line:
+            self._blank_pending = bool(self._parts)
+            return
+        if self._parts:
+            self._parts.append('\n\n' if self._blank_pending else '\n')
+        self._parts.append(line)
+        self._blank_pending = False
+
+    def _o(self, data: str, puredata: bool = False, force=False) -> None:
+        """Deal with indentation and whitespace (html2text ``o``)."""
+        if self._abbr_data is not None:
+            self._abbr_data += data
+        if self._quiet:
+            return
+
+        if puredata and not self._pre:
+            data = _WHITESPACE_RE.sub(' ', data)
+            if data and data[0] == ' ':
+                self._space = True
+                data = data[1:]
+        if not data and not force:
+            return
+
+        if self._startpre:
+            if not data.startswith('\n') and not data.startswith('\r\n'):
+                data = '\n' + data
+
+        bq = '>' * self._blockquote
+        if not (force and data and data[0] == '>') and self._blockquote:
+            bq += ' '
+
+        if self._pre:
+            if self._lists:
+                bq += self._list_code_indent
+            bq += '    '
+            data = data.replace('\n', '\n' + bq)
+
+        if self._startpre:
+            self._startpre = False
+            if self._lists:
+                data = data.lstrip('\n' + bq)
+
+        if self._start:
+            self._space = False
+            self._p_p = 0
+            self._start = False
+
+        if force == 'end':
+            self._p_p = 0
+            self._write('\n')
+            self._space = False
+
+        if self._p_p:
+            self._write((self._br_toggle + '\n' + bq) * self._p_p)
+            self._space = False
+            self._br_toggle = ''
+
+        if self._space:
+            if not self._last_was_nl:
+                self._write(' ')
+            self._space = False
+
+        if self._abbr_list and force == 'end':
+            for abbr, definition in self._abbr_list.items():
+                self._write('  *[' + abbr + ']: ' + definition + '\n')
+
+        self._p_p = 0
+        self._write(data)
+
+    def _p(self) -> None:
+        self._p_p = 2
+
+    def _pbr(self) -> None:
+        if self._p_p == 0:
+            self._p_p = 1
+
+    def _soft_br(self) -> None:
+        self._pbr()
+        self._br_toggle = '  '
+
+    # ------------------------------------------------------------------
+    # Content handlers
+
+    def _handle_data(self, data: str, entity_char: bool = False) -> None:
+        if self._stressed:
+            data = data.strip()
+            self._stressed = False
+            self._preceding_stressed = True
+        elif self._preceding_stressed:
+            if (_STRESSED_FOLLOW_RE.match(data[0])
+                    and not hn(self._current_tag)
+                    and self._current_tag not in ('a', 'code', 'pre')):
+                data = ' ' + data
+            self._preceding_stressed = False
+
+        if self._maybe_automatic_link is not None:
+            href = self._maybe_automatic_link
+            if href == data and _ABSOLUTE_URL_RE.match(href):
+                self._o('<' + data + '>')
+                self._empty_link = False
+                return
+            self._o('[')
+            self._maybe_automatic_link = None
+            self._empty_link = False
+
+        if not self._code and not self._pre and not entity_char:
+            if _ESCAPE_HINT_RE.search(data):
+                data = escape_md_section(data)
+            if 'data:image/' in data:
+                # Inline base64 payloads are never useful in Markdown
+                data = _DATA_IMAGE_RE.sub('', data)
+        self._preceding_data = data
+        self._o(data, puredata=True)
+
+    def _link_url(self, link: str, title: str = '') -> None:
+        url = urljoin(self.base_url, link) if self.base_url else link
+        if url.startswith('data:image/'):
+            url = ''
+        title = ' "{}"'.format(title) if title.strip() else ''
+        self._o(']({url}{title})'.format(url=escape_md(url), title=title))
+
+    def _handle_tag(self, tag: str, attrs, start: bool) -> None:
+        self._current_tag = tag
+
+        # First thing inside the anchor is another tag that produces output
+        if (start and self._maybe_automatic_link is not None
+                and tag not in _NO_AUTOLINK_BRACKET_TAGS and tag != 'img'):
+            self._o('[')
+            self._maybe_automatic_link = None
+            self._empty_link = False
+
+        handler = self._handlers.get(tag)
+        if handler is not None and handler(tag, attrs, start):
+            return  # closing heading: list state is left alone
+        if tag not in ('ol', 'ul'):
+            self._last_was_list = False
+
+    def _tag_heading(self, tag: str, attrs, start: bool) -> bool:
+        level = hn(tag)
+        if self._astack:
+            # Heading inside a link name (incorrect but found in the wild)
+            if start:
+                self._inheader = True
+                if self._line and self._line[-1] == '[':
+                    self._line.pop()
+                    self._space = False
+                    self._o(level * '#' + ' ')
+                    self._o('[')
+                return False
+            self._p_p = 0
+            self._inheader = False
+            return True
+        self._p()
+        if start:
+            self._inheader = True
+            self._o(level * '#' + ' ')
+            return False
+        self._inheader = False
+        return True
+
+    def _tag_paragraph(self, tag: str, attrs, start: bool) -> None:
+        if not self._astack and not self._split_next_td:
+            self._p()
+
+    def _tag_br(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            self._o('  \n> ' if self._blockquote > 0 else '  \n')
+
+    def _tag_hr(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            self._p()
+            self._o('* * *')
+            self._p()
+
+    def _tag_blockquote(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            self._p()
+            self._o('> ', force=True)
+            self._start = True
+            self._blockquote += 1
+        else:
+            self._blockquote -= 1
+            self._p()
+
+    def _tag_emphasis(self, tag: str, attrs, start: bool) -> None:
+        # Separate from a preceding alphanumeric so the marks render
+        if (start and self._preceding_data
+                and self._preceding_data[-1] not in string.whitespace
+                and self._preceding_data[-1] not in string.punctuation):
+            emphasis = ' _'
+            self._preceding_data += ' '
+        else:
+            emphasis = '_'
+        self._o(emphasis)
+        if start:
+            self._stressed = True
+
+    def _tag_strong(self, tag: str, attrs, start: bool) -> None:
+        if start and self._preceding_data and self._preceding_data[-1] == '*':
+            strong = ' **'
+            self._preceding_data += ' '
+        else:
+            strong = '**'
+        self._o(strong)
+        if start:
+            self._stressed = True
+
+    def _tag_strike(self, tag: str, attrs, start: bool) -> None:
+        if start and self._preceding_data and self._preceding_data[-1] == '~':
+            strike = ' ~~'
+            self._preceding_data += ' '
+        else:
+            strike = '~~'
+        self._o(strike)
+        if start:
+            self._stressed = True
+
+    def _tag_code(self, tag: str, attrs, start: bool) -> None:
+        if not self._pre:
+            self._o('`')
+            self._code = not self._code
+
+    def _tag_abbr(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            self._abbr_title = attrs.get('title')
+            self._abbr_data = ''
+        else:
+            if self._abbr_title is not None:
+                self._abbr_list[self._abbr_data] = self._abbr_title
+                self._abbr_title = None
+            self._abbr_data = None
+
+    def _tag_q(self, tag: str, attrs, start: bool) -> None:
+        self._o('"')
+        self._quote = not self._quote
+
+    def _tag_a(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            href = attrs.get('href')
+            if href is not None and not href.startswith('#'):
+                self._astack.append(attrs)
+                self._maybe_automatic_link = href
+                self._empty_link = True
+            else:
+                self._astack.append(None)
+        elif self._astack:
+            a = self._astack.pop()
+            if self._maybe_automatic_link and not self._empty_link:
+                self._maybe_automatic_link = None
+            elif a is not None:
+                if self._empty_link:
+                    self._o('[')
+                    self._empty_link = False
+                    self._maybe_automatic_link = None
+                self._p_p = 0
+                self._link_url(a['href'], escape_md(a.get('title') or ''))
+
+    def _tag_img(self, tag: str, attrs, start: bool) -> None:
+        if not start:
+            return
+        # Lazy-loaded images keep the real URL in data-src
+        src = attrs.get('src') or attrs.get('data-src')
+        if not src or src.startswith('data:'):
+            return
+        alt = attrs.get('alt') or ''
+        if self._maybe_automatic_link is not None:
+            self._o('[')
+            self._maybe_automatic_link = None
+            self._empty_link = False
+        self._o('![' + escape_md(alt) + ']')
+        url = urljoin(self.base_url, src) if self.base_url else src
+        self._o('(' + escape_md(url) + ')')
+
+    def _tag_definition(self, tag: str, attrs, start: bool) -> None:
+        if tag == 'dl':
+            if start:
+                self._p()
+        elif tag == 'dt':
+            if not start:
+                self._pbr()
+        elif start:
+            self._o('    ')
+        else:
+            self._pbr()
+
+    def _tag_list(self, tag: str, attrs, start: bool) -> None:
+        if not self._lists and not self._last_was_list:
+            self._p()
+        if start:
+            num = 0
+            if 'start' in attrs:
+                try:
+                    num = int(attrs['start']) - 1
+                except ValueError:
+                    pass
+            self._lists.append(_ListState(tag, num))
+        elif self._lists:
+            self._lists.pop()
+            if not self._lists:
+                self._o('\n')
+        self._last_was_list = True
+
+    def _tag_li(self, tag: str, attrs, start: bool) -> None:
+        self._list_code_indent = ''
+        self._pbr()
+        if not start:
+            return
+        li = self._lists[-1] if self._lists else _ListState('ul', 0)
+        # Two spaces per level; three under an ordered list
+        parent_list = None
+        for item in self._lists:
+            self._list_code_indent += '   ' if parent_list == 'ol' else '  '
+            parent_list = item.name
+        self._o(self._list_code_indent)
+        if li.name == 'ul':
+            self._list_code_indent += '  '
+            self._o('* ')
+        else:
+            li.num += 1
+            self._list_code_indent += '   '
+            self._o(str(li.num) + '. ')
+        self._start = True
+
+    def _tag_table(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            self._table_start = True
+
+    def _tag_cell(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            if self._split_next_td:
+                self._o('| ')
+            self._split_next_td = True
+            self._td_count += 1
+
+    def _tag_tr(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            self._td_count = 0
+            return
+        self._split_next_td = False
+        self._soft_br()
+        if self._table_start:
+            # Underline the first row as the header
+            self._o('|'.join(['---'] * self._td_count))
+            self._soft_br()
+            self._table_start = False
+
+    def _tag_pre(self, tag: str, attrs, start: bool) -> None:
+        if start:
+            self._startpre = True
+            self._pre = True
+        else:
+            self._pre = False
+        self._p()
+
+def tree_to_markdown(root, base_url: str = '') -> str:
+    """
+    Convert an lxml element (and its subtree) to Markdown.
+    将 lxml 元素及其子树转换为 Markdown
+
+    Args:
+        root: lxml element, e.g. from ``lxml.html.fragment_fromstring``
+        base_url: Base for relative link and image URLs
+
+    Returns:
+        str: Markdown without trailing spaces or repeated blank lines
+    """
+    return MarkdownEmitter(base_url).convert(root)
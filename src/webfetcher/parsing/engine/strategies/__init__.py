@@ -10,7 +10,9 @@ from .base_strategy import (
     ExtractionStrategy,
     StrategyError,
     SelectionError,
-    ExtractionError
+    ExtractionError,
+    FieldMatch,
+    SelectorCache
 )
 from .css_strategy import CSSStrategy
 from .xpath_strategy import XPathStrategy
@@ -21,6 +23,8 @@ __all__ = [
     'StrategyError',
     'SelectionError',
     'ExtractionError',
+    'FieldMatch',
+    'SelectorCache',
     'CSSStrategy',
     'XPathStrategy',
     'TextPatternStrategy',
@@ -6,12 +6,16 @@ It provides the interface contract for extracting content from HTML using differ
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Any, Callable, Dict, Hashable, Mapping, NamedTuple, Optional, List, Sequence
 import logging
+import threading
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# Compiled selectors kept per strategy class (all bundled templates use a few hundred)
+DEFAULT_SELECTOR_CACHE_SIZE = 1024
+
 
 # Custom Exceptions
 class StrategyError(Exception):
@@ -29,6 +33,113 @@ class ExtractionError(StrategyError):
     pass
 
 
+_MISSING = object()
+
+
+class FieldMatch(NamedTuple):
+    """Result of one field in extract_many(): the value and the fallback that produced it."""
+    value: str
+    selector: str
+    index: int  # position of the matching selector in the field's fallback list
+
+
+class _Rejected:
+    """Cache entry for a selector that failed to compile."""
+
+    __slots__ = ('message',)
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+class SelectorCache:
+    """
+    Bounded cache of compiled selectors.
+
+    One cache is shared by all instances of a strategy class, so parsers
+    created per page reuse the selectors compiled when the templates were
+    first loaded. Invalid selectors are remembered as well: looking one up
+    again raises SelectionError without recompiling it.
+
+    Lookups are a plain dict read (no lock); when the cache is full the
+    oldest entries are evicted first, as in the re module's pattern cache.
+
+    Example:
+        cache = SelectorCache(maxsize=256)
+        compiled = cache.get_or_compile("//h1", etree.XPath, "//h1")
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_SELECTOR_CACHE_SIZE):
+        """
+        Initialize selector cache.
+
+        Args:
+            maxsize: Maximum number of compiled selectors to keep
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compile(self, key: Hashable, compile_func: Callable[..., Any], *args) -> Any:
+        """
+        Return the compiled selector for key, compiling it on first use.
+
+        Args:
+            key: Cache key (the selector plus anything that changes its compilation)
+            compile_func: Called with *args on a cache miss
+            *args: Arguments for compile_func
+
+        Returns:
+            Any: Compiled selector object
+
+        Raises:
+            SelectionError: If the selector is invalid (now or when first compiled)
+        """
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            try:
+                entry = compile_func(*args)
+            except SelectionError as e:
+                entry = _Rejected(str(e))
+            with self._lock:
+                self._entries[key] = entry
+                while len(self._entries) > self.maxsize:
+                    del self._entries[next(iter(self._entries))]
+        else:
+            self.hits += 1
+
+        if entry.__class__ is _Rejected:
+            raise SelectionError(entry.message)
+        return entry
+
+    def clear(self) -> None:
+        """Drop all compiled selectors and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """
+        Cache statistics (hit/miss counts are approximate under threads).
+
+        Returns:
+            Dict[str, int]: hits, misses, size and maxsize
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class ExtractionStrategy(ABC):
     """
     Abstract base class for all content extraction strategies.
@@ -57,6 +168,14 @@ class ExtractionStrategy(ABC):
                 return [e.get_text(strip=True) for e in elements]
     """
 
+    # Compiled selectors; each subclass gets its own cache (see __init_subclass__)
+    _selector_cache: SelectorCache = SelectorCache()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '_selector_cache' not in cls.__dict__:
+            cls._selector_cache = SelectorCache()
+
     def __init__(self):
         """Initialize extraction strategy."""
         self._name = self.__class__.__name__
@@ -152,6 +271,140 @@ class ExtractionStrategy(ABC):
             "Override extract_all_attributes() to implement this feature."
         )
 
+    def parse_document(self, content: str) -> Any:
+        """
+        Parse content into the document form the strategy queries.
+
+        Default implementation returns the content unchanged (text-based
+        strategies). Subclasses that query a tree return the parsed tree.
+
+        Args:
+            content: HTML or text content
+
+        Returns:
+            Any: Parsed document, reusable across extract_from_document() calls
+
+        Raises:
+            StrategyError: If content cannot be parsed
+        """
+        return content
+
+    def extract_from_document(self, document: Any, selector: str) -> Optional[str]:
+        """
+        Extract the first match from an already-parsed document.
+
+        Default implementation delegates to extract() (valid when
+        parse_document() returns the content itself).
+
+        Args:
+            document: Result of parse_document()
+            selector: Selector expression
+
+        Returns:
+            Optional[str]: Extracted content, or None if not found
+
+        Raises:
+            SelectionError: If selector is invalid or malformed
+        """
+        return self.extract(document, selector)
+
+    def extract_many(
+        self, document: Any, fields: Mapping[str, Sequence[str]]
+    ) -> Dict[str, FieldMatch]:
+        """
+        Extract several fields, each with ordered selector fallbacks, in one call.
+
+        The document is parsed once (if given as a string) and shared by all
+        fields. For each field the first selector that yields a non-blank
+        value wins; invalid selectors are skipped like non-matching ones.
+
+        Args:
+            document: Content string or result of parse_document()
+            fields: Field name -> selector fallbacks, in priority order
+
+        Returns:
+            Dict[str, FieldMatch]: Matched fields (fields without a match are absent)
+
+        Raises:
+            StrategyError: If the document cannot be parsed
+
+        Example:
+            >>> strategy.extract_many(html, {
+            ...     'title': ["meta[property='og:title']@content", "h1"],
+            ...     'author': ["meta[name='author']@content", ".byline"],
+            ... })
+            {'title': FieldMatch(value='Hello', selector="meta[property='og:title']@content", index=0)}
+        """
+        if isinstance(document, str):
+            document = self.parse_document(document)
+
+        results = {}
+        for field_name, selectors in fields.items():
+            for index, selector in enumerate(selectors):
+                try:
+                    value = self.extract_from_document(document, selector)
+                except SelectionError as e:
+                    logger.debug(f"Field '{field_name}': skipping selector '{selector}': {e}")
+                    continue
+                if value and value.strip():
+                    results[field_name] = FieldMatch(value, selector, index)
+                    break
+        return results
+
+    def compile_selector(self, selector: str) -> Any:
+        """
+        Return the compiled form of a selector, using the class-wide cache.
+
+        Templates precompile every selector when they are loaded, so at
+        extraction time this is a dictionary lookup. Invalid selectors are
+        rejected here (and stay rejected without being recompiled).
+
+        Args:
+            selector: Selector expression
+
+        Returns:
+            Any: Strategy-specific compiled selector
+
+        Raises:
+            SelectionError: If selector is invalid or malformed
+        """
+        return self._selector_cache.get_or_compile(selector, self._compile_selector, selector)
+
+    def _compile_selector(self, selector: str) -> Any:
+        """
+        Compile a selector (called on cache misses).
+
+        Default implementation only validates the selector and returns it
+        stripped. Subclasses override this to build their compiled objects.
+
+        Args:
+            selector: Selector expression
+
+        Returns:
+            Any: Compiled selector
+
+        Raises:
+            SelectionError: If selector is invalid
+        """
+        if not self.validate_selector(selector):
+            raise SelectionError(f"Invalid selector: '{selector}'")
+        return selector.strip()
+
+    @classmethod
+    def selector_cache_info(cls) -> Dict[str, int]:
+        """
+        Statistics of this strategy's compiled-selector cache.
+
+        Returns:
+            Dict[str, int]: hits, misses, size and maxsize
+        """
+        return cls._selector_cache.info()
+
+    @classmethod
+    def clear_selector_cache(cls) -> None:
+        """Drop this strategy's compiled selectors (e.g. after templates change)."""
+        cls._selector_cache.clear()
+
     def validate_selector(self, selector: str) -> bool:
         """
         Validate selector syntax (optional).
@@ -4,21 +4,38 @@ This module implements the ExtractionStrategy interface using CSS selectors
 and BeautifulSoup for HTML parsing and element selection.
 """
 
-from typing import Optional, List
+from typing import Dict, Mapping, NamedTuple, Optional, List, Sequence, Tuple
 import logging
 from bs4 import BeautifulSoup, Tag
 import re
+import soupsieve
 
 from .base_strategy import (
     ExtractionStrategy,
     StrategyError,
     SelectionError,
-    ExtractionError
+    ExtractionError,
+    FieldMatch
 )
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# "meta[name='author']" style selectors answered from a per-document meta index
+# ('type' is excluded: its values match case-insensitively)
+_META_SELECTOR_RE = re.compile(
+    r"""^meta\[\s*([\w:-]+)\s*=\s*(?:'([^'\\]*)'|"([^"\\]*)"|([\w:.-]+))\s*\]$""",
+    re.IGNORECASE
+)
+
+
+class CompiledCSS(NamedTuple):
+    """Compiled form of a "selector@attribute" string."""
+    matcher: soupsieve.SoupSieve
+    attribute: Optional[str]
+    # (attribute, value) for plain meta[attr=value] selectors, else None
+    meta_key: Optional[Tuple[str, str]]
+
 
 class CSSStrategy(ExtractionStrategy):
     """
@@ -29,6 +46,8 @@ class CSSStrategy(ExtractionStrategy):
     - Standard CSS selectors (tag, class, id, attribute selectors)
     - Attribute extraction using @attribute syntax (e.g., "a@href", "img@src")
     - Multiple element extraction with extract_all()
+    - Precompiled selectors (soupsieve matchers cached per selector string)
+    - Batched extraction with extract_many() (meta tags indexed once per document)
     - Robust error handling with logging
 
     Example:
@@ -79,6 +98,36 @@ class CSSStrategy(ExtractionStrategy):
             return css_selector, attribute
         return selector.strip(), None
 
+    def _compile_selector(self, selector: str) -> CompiledCSS:
+        """
+        Compile "selector@attribute" into a soupsieve matcher.
+
+        Args:
+            selector: Selector string (may include @attribute)
+
+        Returns:
+            CompiledCSS: Matcher, attribute name (or None) and meta index key
+
+        Raises:
+            SelectionError: If the CSS selector is invalid
+        """
+        if not self.validate_selector(selector):
+            raise SelectionError(f"Invalid selector: '{selector}'")
+
+        css_selector, attribute = self._parse_selector(selector)
+        try:
+            matcher = soupsieve.compile(css_selector)
+        except soupsieve.SelectorSyntaxError as e:
+            logger.warning(f"Invalid CSS selector '{css_selector}': {e}")
+            raise SelectionError(f"Invalid selector '{selector}': {e}")
+
+        meta_key = None
+        meta = _META_SELECTOR_RE.match(css_selector)
+        if meta and meta.group(1).lower() != 'type':
+            value = next(v for v in meta.group(2, 3, 4) if v is not None)
+            meta_key = (meta.group(1).lower(), value)
+        return CompiledCSS(matcher, attribute, meta_key)
+
     def _parse_html(self, content: str) -> BeautifulSoup:
         """
         Parse HTML content into BeautifulSoup object.
@@ -163,32 +212,13 @@ class CSSStrategy(ExtractionStrategy):
             '/page'
         """
         try:
-            # Validate selector
-            if not self.validate_selector(selector):
-                raise SelectionError(f"Invalid selector: '{selector}'")
-
-            # Parse selector
-            css_selector, attribute = self._parse_selector(selector)
+            # Validate and compile selector (cached)
+            compiled = self.compile_selector(selector)
 
             # Parse HTML
             soup = self._parse_html(content)
 
-            # Find first matching element
-            element = soup.select_one(css_selector)
-
-            if element is None:
-                logger.debug(f"No element found for selector: '{css_selector}'")
-                return None
-
-            # Extract text or attribute
-            if attribute:
-                result = self._extract_attr(element, attribute)
-                logger.debug(f"Extracted attribute '{attribute}': '{result[:50]}...'")
-            else:
-                result = self._extract_text(element)
-                logger.debug(f"Extracted text: '{result[:50]}...'")
-
-            return result if result else None
+            return self._select_value(soup, compiled, selector)
 
         except (StrategyError, SelectionError):
             # Re-raise our custom exceptions
@@ -199,6 +229,154 @@ class CSSStrategy(ExtractionStrategy):
             # Don't raise - return None to allow graceful degradation
             return None
 
+    def _select_value(self, soup: BeautifulSoup, compiled: CompiledCSS, selector: str,
+                      meta_index: Optional[Dict[Tuple[str, str], Tag]] = None) -> Optional[str]:
+        """
+        Text or attribute of the first element matching a compiled selector.
+
+        Args:
+            soup: Parsed document
+            compiled: Result of compile_selector()
+            selector: Original selector string (for logging)
+            meta_index: Optional result of _index_meta() for meta selectors
+
+        Returns:
+            Optional[str]: Extracted content, or None if not found
+        """
+        # Find first matching element
+        if meta_index is not None and compiled.meta_key is not None:
+            element = meta_index.get(compiled.meta_key)
+        else:
+            element = compiled.matcher.select_one(soup)
+
+        if element is None:
+            logger.debug(f"No element found for selector: '{selector}'")
+            return None
+
+        # Extract text or attribute
+        if compiled.attribute:
+            result = self._extract_attr(element, compiled.attribute)
+            logger.debug(f"Extracted attribute '{compiled.attribute}': '{result[:50]}...'")
+        else:
+            result = self._extract_text(element)
+            logger.debug(f"Extracted text: '{result[:50]}...'")
+
+        return result if result else None
+
+    def _index_meta(self, soup: BeautifulSoup) -> Dict[Tuple[str, str], Tag]:
+        """
+        Index <meta> tags by (attribute, value), first tag in document order wins.
+
+        Answers every "meta[name='x']" / "meta[property='og:x']" selector of
+        a document with a dictionary lookup instead of a tree query.
+
+        Args:
+            soup: Parsed document
+
+        Returns:
+            Dict[Tuple[str, str], Tag]: (attribute name, value) -> meta tag
+        """
+        index = {}
+        for meta in soup.find_all('meta'):
+            for name, value in meta.attrs.items():
+                if isinstance(value, str):
+                    index.setdefault((name, value), meta)
+                    # CSS "=" matching is anchored with "$", which also accepts one trailing newline
+                    if value.endswith('\n'):
+                        index.setdefault((name, value[:-1]), meta)
+        return index
+
+    def parse_document(self, content: str) -> BeautifulSoup:
+        """
+        Parse HTML once for extract_from_document() / extract_many().
+
+        Args:
+            content: HTML string to parse
+
+        Returns:
+            BeautifulSoup: Parsed HTML tree
+
+        Raises:
+            StrategyError: If HTML parsing fails
+        """
+        return self._parse_html(content)
+
+    def extract_from_document(self, document: BeautifulSoup, selector: str) -> Optional[str]:
+        """
+        Extract first matching element from an already-parsed document.
+
+        Args:
+            document: BeautifulSoup tree from parse_document()
+            selector: CSS selector (with optional @attribute)
+
+        Returns:
+            Optional[str]: Extracted content, or None if not found
+
+        Raises:
+            SelectionError: If selector is invalid
+        """
+        try:
+            return self._select_value(document, self.compile_selector(selector), selector)
+
+        except SelectionError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Extraction failed for selector '{selector}': {e}")
+            return None
+
+    def extract_many(
+        self, document, fields: Mapping[str, Sequence[str]]
+    ) -> Dict[str, FieldMatch]:
+        """
+        Extract several fields with selector fallbacks from one parsed document.
+
+        The HTML is parsed once; meta selectors of the form
+        "meta[attr='value']@content" are answered from a meta-tag index built
+        once per call, so meta-driven fields cost a dictionary lookup.
+
+        Args:
+            document: HTML string or BeautifulSoup tree from parse_document()
+            fields: Field name -> selector fallbacks, in priority order
+
+        Returns:
+            Dict[str, FieldMatch]: Matched fields (fields without a match are absent)
+
+        Raises:
+            StrategyError: If the document cannot be parsed
+
+        Example:
+            >>> strategy = CSSStrategy()
+            >>> html = '<meta property="og:title" content="OG"><h1>H1</h1><p class="by">Ann</p>'
+            >>> matches = strategy.extract_many(html, {
+            ...     'title': ["meta[property='og:title']@content", "h1"],
+            ...     'author': ["meta[name='author']@content", "p.by"],
+            ... })
+            >>> matches['title'].value, matches['author'].index
+            ('OG', 1)
+        """
+        soup = self._parse_html(document) if isinstance(document, str) else document
+        meta_index = None
+
+        results = {}
+        for field_name, selectors in fields.items():
+            for index, selector in enumerate(selectors):
+                try:
+                    compiled = self.compile_selector(selector)
+                    if compiled.meta_key is not None and meta_index is None:
+                        meta_index = self._index_meta(soup)
+                    value = self._select_value(soup, compiled, selector, meta_index)
+                except SelectionError as e:
+                    logger.debug(f"Field '{field_name}': skipping selector '{selector}': {e}")
+                    continue
+                except Exception as e:
+                    logger.error(f"Extraction failed for selector '{selector}': {e}")
+                    continue
+                if value and value.strip():
+                    results[field_name] = FieldMatch(value, selector, index)
+                    break
+        return results
+
     def extract_all(self, content: str, selector: str) -> List[str]:
         """
         Extract all matching elements from content using CSS selector.
@@ -229,21 +407,17 @@ class CSSStrategy(ExtractionStrategy):
             ['/1', '/2']
         """
         try:
-            # Validate selector
-            if not self.validate_selector(selector):
-                raise SelectionError(f"Invalid selector: '{selector}'")
-
-            # Parse selector
-            css_selector, attribute = self._parse_selector(selector)
+            # Validate and compile selector (cached)
+            matcher, attribute, _ = self.compile_selector(selector)
 
             # Parse HTML
             soup = self._parse_html(content)
 
             # Find all matching elements
-            elements = soup.select(css_selector)
+            elements = matcher.select(soup)
 
             if not elements:
-                logger.debug(f"No elements found for selector: '{css_selector}'")
+                logger.debug(f"No elements found for selector: '{selector}'")
                 return []
 
             # Extract text or attributes
@@ -257,7 +431,7 @@ class CSSStrategy(ExtractionStrategy):
                 if value:  # Only include non-empty values
                     results.append(value)
 
-            logger.debug(f"Extracted {len(results)} elements for selector '{css_selector}'")
+            logger.debug(f"Extracted {len(results)} elements for selector '{selector}'")
             return results
 
         except (StrategyError, SelectionError):
@@ -30,6 +30,7 @@ class TextPatternStrategy(ExtractionStrategy):
     - Multiple match extraction with extract_all()
     - Multiline matching with MULTILINE and DOTALL flags
     - Named and numbered capture groups
+    - Compiled patterns cached per (pattern, flags)
     - Robust error handling with logging
 
     Example:
@@ -59,29 +60,64 @@ class TextPatternStrategy(ExtractionStrategy):
         self.default_flags = flags
         logger.debug(f"TextPatternStrategy initialized with flags: {flags}")
 
-    def _compile_pattern(self, pattern: str, flags: Optional[int] = None) -> Pattern:
+    def compile_selector(self, selector: str, flags: Optional[int] = None) -> Pattern:
         """
-        Compile regex pattern with flags.
+        Return the compiled regex for a pattern, using the class-wide cache.
 
         Args:
-            pattern: Regular expression pattern
+            selector: Regular expression pattern
             flags: Optional regex flags (uses default_flags if not specified)
 
         Returns:
             Pattern: Compiled regex pattern
 
+        Raises:
+            SelectionError: If the pattern is invalid
+        """
+        use_flags = flags if flags is not None else self.default_flags
+        return self._selector_cache.get_or_compile(
+            (selector, use_flags), self._compile_selector, selector, use_flags
+        )
+
+    def _compile_selector(self, selector: str, flags: int = 0) -> Pattern:
+        """
+        Compile regex pattern with flags (called on cache misses).
+
+        Args:
+            selector: Regular expression pattern
+            flags: Regex flags
+
+        Returns:
+            Pattern: Compiled regex pattern
+
         Raises:
             SelectionError: If pattern compilation fails
         """
+        if not super().validate_selector(selector):
+            raise SelectionError(f"Invalid regex pattern: '{selector}'")
         try:
-            use_flags = flags if flags is not None else self.default_flags
-            compiled = re.compile(pattern, use_flags)
-            return compiled
+            return re.compile(selector, flags)
 
         except re.error as e:
-            logger.error(f"Invalid regex pattern '{pattern}': {e}")
+            logger.error(f"Invalid regex pattern '{selector}': {e}")
             raise SelectionError(f"Invalid regex pattern: {e}")
 
+    def _compile_pattern(self, pattern: str, flags: Optional[int] = None) -> Pattern:
+        """
+        Compile regex pattern with flags.
+
+        Args:
+            pattern: Regular expression pattern
+            flags: Optional regex flags (uses default_flags if not specified)
+
+        Returns:
+            Pattern: Compiled regex pattern (cached)
+
+        Raises:
+            SelectionError: If pattern compilation fails
+        """
+        return self.compile_selector(pattern, flags)
+
     def _extract_from_match(self, match: re.Match) -> str:
         """
         Extract text from regex match object.
@@ -146,10 +182,6 @@ class TextPatternStrategy(ExtractionStrategy):
             'user@example.com'
         """
         try:
-            # Validate selector
-            if not self.validate_selector(selector):
-                raise SelectionError(f"Invalid regex pattern: '{selector}'")
-
             # Validate content
             if content is None:
                 raise StrategyError("Content is None")
@@ -161,7 +193,7 @@ class TextPatternStrategy(ExtractionStrategy):
             if ignore_case:
                 flags |= re.IGNORECASE
 
-            # Compile pattern
+            # Validate and compile pattern (cached)
             pattern = self._compile_pattern(selector, flags)
 
             # Search for match
@@ -223,10 +255,6 @@ class TextPatternStrategy(ExtractionStrategy):
             ['alice@ex.com', 'bob@ex.com']
         """
         try:
-            # Validate selector
-            if not self.validate_selector(selector):
-                raise SelectionError(f"Invalid regex pattern: '{selector}'")
-
             # Validate content
             if content is None:
                 raise StrategyError("Content is None")
@@ -238,7 +266,7 @@ class TextPatternStrategy(ExtractionStrategy):
             if ignore_case:
                 flags |= re.IGNORECASE
 
-            # Compile pattern
+            # Validate and compile pattern (cached)
             pattern = self._compile_pattern(selector, flags)
 
             # Find all matches
@@ -300,7 +328,7 @@ class TextPatternStrategy(ExtractionStrategy):
             if ignore_case:
                 flags |= re.IGNORECASE
 
-            # Compile pattern
+            # Validate and compile pattern (cached)
             pattern = self._compile_pattern(selector, flags)
 
             # Search for match
@@ -357,7 +385,7 @@ class TextPatternStrategy(ExtractionStrategy):
             if ignore_case:
                 flags |= re.IGNORECASE
 
-            # Compile pattern
+            # Validate and compile pattern (cached)
             pattern = self._compile_pattern(selector, flags)
 
             # Find all matches
@@ -6,6 +6,7 @@ and lxml for HTML parsing and element selection.
 
 from typing import Optional, List
 import logging
+import re
 from lxml import html, etree
 from lxml.html import HtmlElement
 
@@ -19,6 +20,8 @@ from .base_strategy import (
 # Setup logger
 logger = logging.getLogger(__name__)
 
+_ATTRIBUTE_XPATH_RE = re.compile(r'/@[\w-]+\s*$')
+
 
 class XPathStrategy(ExtractionStrategy):
     """
@@ -31,6 +34,7 @@ class XPathStrategy(ExtractionStrategy):
     - Text extraction using /text() (explicit) or default text_content()
     - Multiple element extraction with extract_all()
     - Namespace handling
+    - Precompiled expressions (etree.XPath objects cached per expression)
     - Robust error handling with logging
 
     Example:
@@ -82,6 +86,27 @@ class XPathStrategy(ExtractionStrategy):
             logger.error(f"Unexpected error during HTML parsing: {e}")
             raise StrategyError(f"HTML parsing failed: {e}")
 
+    def _compile_selector(self, selector: str) -> etree.XPath:
+        """
+        Compile an XPath expression.
+
+        Args:
+            selector: XPath expression
+
+        Returns:
+            etree.XPath: Compiled expression, callable on a tree
+
+        Raises:
+            SelectionError: If the expression is invalid
+        """
+        if not self.validate_selector(selector):
+            raise SelectionError(f"Invalid XPath expression: '{selector}'")
+        try:
+            return etree.XPath(selector)
+        except etree.XPathSyntaxError as e:
+            logger.warning(f"Invalid XPath expression '{selector}': {e}")
+            raise SelectionError(f"Invalid XPath expression '{selector}': {e}")
+
     def _is_attribute_xpath(self, xpath_expr: str) -> bool:
         """
         Check if XPath expression ends with attribute selector.
@@ -99,8 +124,7 @@ class XPathStrategy(ExtractionStrategy):
             bool: True if expression selects an attribute
         """
         # Check if XPath ends with /@attribute
-        import re
-        return bool(re.search(r'/@[\w-]+\s*$', xpath_expr.strip()))
+        return bool(_ATTRIBUTE_XPATH_RE.search(xpath_expr.strip()))
 
     def _is_text_xpath(self, xpath_expr: str) -> bool:
         """
@@ -177,40 +201,93 @@ class XPathStrategy(ExtractionStrategy):
             '/page'
         """
         try:
-            # Validate selector
-            if not self.validate_selector(selector):
-                raise SelectionError(f"Invalid XPath expression: '{selector}'")
+            # Validate and compile expression (cached)
+            xpath = self.compile_selector(selector)
 
             # Parse HTML
             tree = self._parse_html(content)
 
-            # Apply XPath expression
-            results = tree.xpath(selector)
+            return self._first_value(tree, xpath, selector)
 
-            if not results:
-                logger.debug(f"No element found for XPath: '{selector}'")
-                return None
+        except etree.XPathEvalError as e:
+            logger.error(f"Invalid XPath expression '{selector}': {e}")
+            raise SelectionError(f"Invalid XPath expression: {e}")
+
+        except (StrategyError, SelectionError):
+            # Re-raise our custom exceptions
+            raise
+
+        except Exception as e:
+            logger.error(f"Extraction failed for XPath '{selector}': {e}")
+            # Don't raise - return None to allow graceful degradation
+            return None
+
+    def _first_value(self, tree: HtmlElement, xpath: etree.XPath, selector: str) -> Optional[str]:
+        """
+        Text of the first result of a compiled expression.
+
+        Args:
+            tree: Parsed document
+            xpath: Compiled expression
+            selector: Original expression (for logging)
+
+        Returns:
+            Optional[str]: Extracted text, or None if not found
+        """
+        # Apply XPath expression
+        results = xpath(tree)
+
+        if not results:
+            logger.debug(f"No element found for XPath: '{selector}'")
+            return None
+
+        # Extract text from first result
+        text = self._extract_text(results[0])
+        logger.debug(f"Extracted text: '{text[:50]}...'")
+
+        return text if text else None
+
+    def parse_document(self, content: str) -> HtmlElement:
+        """
+        Parse HTML once for extract_from_document() / extract_many().
 
-            # Get first result
-            first_result = results[0]
+        Args:
+            content: HTML string to parse
 
-            # Extract text
-            text = self._extract_text(first_result)
-            logger.debug(f"Extracted text: '{text[:50]}...'")
+        Returns:
+            HtmlElement: Parsed HTML tree
 
-            return text if text else None
+        Raises:
+            StrategyError: If HTML parsing fails
+        """
+        return self._parse_html(content)
+
+    def extract_from_document(self, document: HtmlElement, selector: str) -> Optional[str]:
+        """
+        Extract first match from an already-parsed document.
+
+        Args:
+            document: lxml tree from parse_document()
+            selector: XPath expression
+
+        Returns:
+            Optional[str]: Extracted content, or None if not found
+
+        Raises:
+            SelectionError: If XPath expression is invalid
+        """
+        try:
+            return self._first_value(document, self.compile_selector(selector), selector)
 
         except etree.XPathEvalError as e:
             logger.error(f"Invalid XPath expression '{selector}': {e}")
             raise SelectionError(f"Invalid XPath expression: {e}")
 
-        except (StrategyError, SelectionError):
-            # Re-raise our custom exceptions
+        except SelectionError:
             raise
 
         except Exception as e:
             logger.error(f"Extraction failed for XPath '{selector}': {e}")
-            # Don't raise - return None to allow graceful degradation
             return None
 
     def extract_all(self, content: str, selector: str) -> List[str]:
@@ -244,15 +321,14 @@ class XPathStrategy(ExtractionStrategy):
             ['/1', '/2']
         """
         try:
-            # Validate selector
-            if not self.validate_selector(selector):
-                raise SelectionError(f"Invalid XPath expression: '{selector}'")
+            # Validate and compile expression (cached)
+            xpath = self.compile_selector(selector)
 
             # Parse HTML
             tree = self._parse_html(content)
 
             # Apply XPath expression
-            results = tree.xpath(selector)
+            results = xpath(tree)
 
             if not results:
                 logger.debug(f"No elements found for XPath: '{selector}'")
@@ -1,10 +1,67 @@
-"""Template loading and matching engine."""
+"""Template loading and matching engine.
+
+Templates are matched to URLs through an index built at load time:
+
+- exact hosts (``example.com``) live in a hash table
+- wildcards (``*.example.com``, which also covers ``example.com``) live in a
+  trie keyed by reversed host labels, so ``*.news.cn`` matches
+  ``www.news.cn`` but not ``evilnews.cn``
+- a pattern may carry a path prefix (``example.com/blog/``) that restricts it
+  to URLs under that path
+
+When several rules match, the most specific host wins (exact, then the
+longest wildcard suffix), then the longest path prefix, then the template's
+``priority``, then load order. Matches are memoized per host.
+"""
 import yaml
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from urllib.parse import urlparse
 from .utils.validators import TemplateValidator
 
+# Hosts whose candidate rules are memoized / 按主机缓存匹配结果的上限
+DEFAULT_MEMO_SIZE = 4096
+
+FALLBACK_TEMPLATE_NAME = 'Generic Web Template'
+
+
+class _DomainRule:
+    """One domain pattern of one template."""
+    __slots__ = ('template_name', 'path_prefix', 'rank')
+
+    def __init__(self, template_name: str, path_prefix: str, rank: Tuple):
+        self.template_name = template_name
+        self.path_prefix = path_prefix
+        self.rank = rank
+
+    def matches_path(self, path: str) -> bool:
+        return not self.path_prefix or path.startswith(self.path_prefix)
+
+
+class _SuffixTrieNode:
+    """Node of the reversed-label trie for ``*.domain`` patterns."""
+    __slots__ = ('children', 'rules')
+
+    def __init__(self):
+        self.children: Dict[str, '_SuffixTrieNode'] = {}
+        self.rules: List[_DomainRule] = []
+
+
+def _split_pattern(pattern: str) -> Tuple[str, str]:
+    """Split ``host/path`` into a lower-case host and a path prefix ('' if none)."""
+    pattern = pattern.strip()
+    if '/' in pattern:
+        host, path = pattern.split('/', 1)
+        return host.lower().rstrip('.'), '/' + path
+    return pattern.lower().rstrip('.'), ''
+
+
+def _url_host_and_path(url: str) -> Tuple[str, str]:
+    """Lower-case host without port or trailing dot, and the URL path."""
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').rstrip('.')
+    return host, parsed.path or '/'
+
 
 class TemplateLoader:
     """Loads and manages parser templates."""
@@ -19,11 +76,16 @@ class TemplateLoader:
         self.template_dir = Path(template_dir)
         self.validator = TemplateValidator()
         self._templates = {}  # Cache loaded templates
+        self._exact_hosts: Dict[str, List[_DomainRule]] = {}
+        self._wildcards = _SuffixTrieNode()
+        self._host_memo: Dict[str, List[_DomainRule]] = {}
+        self.memo_size = DEFAULT_MEMO_SIZE
         self._load_all_templates()
 
     def _load_all_templates(self):
         """Scan and load all template files."""
         if not self.template_dir.exists():
+            self._build_index()
             return
 
         # Find all YAML files in templates directory
@@ -37,6 +99,8 @@ class TemplateLoader:
             except Exception as e:
                 print(f"Warning: Failed to load {template_path}: {e}")
 
+        self._build_index()
+
     def _load_template_file(self, path: Path):
         """Load a single template file."""
         with open(path, 'r', encoding='utf-8') as f:
@@ -54,6 +118,64 @@ class TemplateLoader:
             'path': str(path)
         }
 
+    def _build_index(self):
+        """Index every template's domain patterns / 为所有模板的域名模式建立索引"""
+        self._exact_hosts = {}
+        self._wildcards = _SuffixTrieNode()
+        self._host_memo = {}
+
+        for order, (name, info) in enumerate(self._templates.items()):
+            template = info['template']
+            try:
+                priority = int(template.get('priority', 0))
+            except (TypeError, ValueError):
+                priority = 0
+
+            for pattern in template.get('domains', []) or []:
+                if not isinstance(pattern, str):
+                    continue
+                host, path_prefix = _split_pattern(pattern)
+                if not host or host == '*':
+                    continue  # Universal templates are the fallback
+                if host.startswith('*.'):
+                    labels = [label for label in host[2:].split('.') if label]
+                    if not labels:
+                        continue
+                    specificity = (1, len(labels))
+                    node = self._wildcards
+                    for label in reversed(labels):
+                        node = node.children.setdefault(label, _SuffixTrieNode())
+                    target = node.rules
+                else:
+                    specificity = (2, host.count('.') + 1)
+                    target = self._exact_hosts.setdefault(host, [])
+                rank = (specificity, len(path_prefix), priority, -order)
+                target.append(_DomainRule(name, path_prefix, rank))
+
+    def _rules_for_host(self, host: str) -> List[_DomainRule]:
+        """
+        All rules matching a host, best first (memoized per host).
+        匹配主机的全部规则（按优先顺序，按主机缓存）
+        """
+        rules = self._host_memo.get(host)
+        if rules is not None:
+            return rules
+
+        rules = list(self._exact_hosts.get(host, ()))
+        node = self._wildcards
+        for label in reversed(host.split('.')):
+            node = node.children.get(label)
+            if node is None:
+                break
+            rules.extend(node.rules)
+        rules.sort(key=lambda rule: rule.rank, reverse=True)
+
+        if len(self._host_memo) >= self.memo_size:
+            # Drop the oldest host / 淘汰最早缓存的主机
+            del self._host_memo[next(iter(self._host_memo))]
+        self._host_memo[host] = rules
+        return rules
+
     def get_template_for_url(self, url: str) -> Optional[Dict]:
         """
         Find the best matching template for a URL.
@@ -64,31 +186,14 @@ class TemplateLoader:
         Returns:
             Template dict or None
         """
-        # Parse URL to get domain
-        parsed = urlparse(url)
-        domain = parsed.netloc
-
-        # Try exact domain match first
-        for name, info in self._templates.items():
-            template = info['template']
-            domains = template.get('domains', [])
-
-            # Check exact match
-            if domain in domains:
-                return template
-
-            # Check wildcard match
-            for pattern in domains:
-                if pattern == '*':  # Universal match
-                    continue
-                if pattern.startswith('*.'):
-                    # Wildcard subdomain match
-                    base = pattern[2:]  # Remove *.
-                    if domain.endswith(base):
-                        return template
+        host, path = _url_host_and_path(url)
+        if host:
+            for rule in self._rules_for_host(host):
+                if rule.matches_path(path):
+                    return self._templates[rule.template_name]['template']
 
         # Fallback to generic template
-        return self.get_template_by_name('Generic Web Template')
+        return self.get_template_by_name(FALLBACK_TEMPLATE_NAME)
 
     def get_template_by_name(self, name: str) -> Optional[Dict]:
         """Get template by name."""
@@ -5,18 +5,51 @@ from web pages. It integrates with the TemplateLoader to match URLs to templates
 and extract structured data based on template rules.
 """
 
-from typing import Dict, Any, Optional, List
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
 import html2text
-from lxml import etree
+import lxml.html
 from .base_parser import (
     BaseParser,
     ParseResult,
     ParserError,
-    ExtractionError,
     TemplateNotFoundError
 )
 from .template_loader import TemplateLoader
-from .strategies import CSSStrategy, XPathStrategy, TextPatternStrategy
+from .strategies import CSSStrategy, XPathStrategy, TextPatternStrategy, SelectionError
+from .markdown_emitter import tree_to_markdown
+from webfetcher.utils.url_formatter import normalize_media_url
+from webfetcher.utils.timing import span, timed
+
+# lxml's CSS support needs the optional cssselect package
+try:
+    from lxml.cssselect import CSSSelector
+    CSSSELECT_AVAILABLE = True
+except ImportError:
+    CSSSelector = None
+    CSSSELECT_AVAILABLE = False
+
+
+DEFAULT_TEMPLATE_DIR = Path(__file__).parent / 'templates'
+
+# Seconds between checks of the template files' mtimes / 模板文件变更检查间隔（秒）
+TEMPLATE_CHECK_INTERVAL = 1.0
+
+
+@lru_cache(maxsize=256)
+def _lxml_css_selector(selector: str):
+    """Compiled lxml CSSSelector for a removal rule (cached)."""
+    return CSSSelector(selector)
+
+
+# Always removed before Markdown conversion (especially important for XHS)
+_STRIP_TAGS = frozenset({'script', 'style', 'noscript'})
+_TABLE_CELL_TAGS = frozenset({'th', 'td'})
+_FORM_INPUT_TYPES = frozenset({'radio', 'checkbox'})
 
 
 class TemplateParser(BaseParser):
@@ -38,7 +71,8 @@ class TemplateParser(BaseParser):
     Attributes:
         template_loader: TemplateLoader instance for template management
         current_template: Currently active template (None until parse is called)
-        template_cache: Cache of loaded templates by URL pattern
+        rejected_selectors: (template, field, selector, reason) for every
+                            selector that failed to compile at load time
     """
 
     def __init__(self, template_dir: Optional[str] = None):
@@ -64,9 +98,12 @@ class TemplateParser(BaseParser):
         except Exception as e:
             raise ParserError(f"Failed to initialize template loader: {e}")
 
-        # Current template and cache
+        # Current template
         self.current_template: Optional[Dict[str, Any]] = None
-        self.template_cache: Dict[str, Dict[str, Any]] = {}
+
+        # Documents parsed from the page being processed, one per strategy
+        self._documents: Dict[str, Any] = {}
+        self._document_source: Optional[str] = None
 
         # Initialize extraction strategies
         self.strategies = {
@@ -75,18 +112,92 @@ class TemplateParser(BaseParser):
             'text': TextPatternStrategy()
         }
 
+        # Compile all template selectors up front (cached per strategy class)
+        self.rejected_selectors: List[tuple] = []
+        self._precompile_selectors()
+
         # Initialize HTML to Markdown converter
         self.html_converter = html2text.HTML2Text()
         self.html_converter.ignore_links = False
         self.html_converter.ignore_images = False
         self.html_converter.body_width = 0  # No wrapping
 
+    def _template_selectors(self, template: Dict[str, Any]):
+        """
+        Yield (field, selector, strategy_type) for every selector a template uses,
+        in the form the extraction methods pass to their strategy.
+        """
+        selectors = template.get('selectors') or {}
+        if not isinstance(selectors, dict):
+            return
+
+        fields = [(name, config) for name, config in selectors.items() if name != 'metadata']
+        if isinstance(selectors.get('metadata'), dict):
+            fields += [(f"metadata.{name}", config) for name, config in selectors['metadata'].items()]
+
+        for field_name, config in fields:
+            if field_name == 'content':
+                # _extract_html: CSS only
+                for selector, strategy_type, _ in self._normalize_selector_config(config):
+                    if strategy_type == 'css':
+                        yield field_name, selector, 'css'
+            elif field_name in ('images', 'videos'):
+                # _extract_list: always CSS
+                for selector, _, _ in self._normalize_selector_config(config):
+                    yield field_name, selector, 'css'
+            else:
+                for _, full_selector, strategy_type, _ in self._iter_field_selectors(config):
+                    yield field_name, full_selector, strategy_type
+
+    def _precompile_selectors(self) -> None:
+        """
+        Compile every selector of every loaded template.
+
+        Compiled selectors are kept in the strategies' class-wide caches, so
+        extraction (and parsers created later) only look them up. Invalid
+        selectors are rejected here and recorded in ``rejected_selectors``;
+        the cache remembers them, so extraction skips them without retrying.
+        """
+        self.rejected_selectors = []
+        # Fallback used by _extract_title
+        self.strategies['css'].compile_selector('title')
+
+        for name in self.template_loader.list_templates():
+            template = self.template_loader.get_template_by_name(name) or {}
+            try:
+                for field_name, selector, strategy_type in self._template_selectors(template):
+                    strategy = self.strategies.get(strategy_type, self.strategies['css'])
+                    try:
+                        strategy.compile_selector(selector)
+                    except SelectionError as e:
+                        self.rejected_selectors.append((name, field_name, selector, str(e)))
+
+                post_processing = template.get('post_processing') or {}
+                for rule in post_processing.get('remove_elements', []):
+                    if not isinstance(rule, dict) or rule.get('strategy', 'css') != 'css':
+                        continue
+                    selector = rule.get('selector')
+                    if not selector:
+                        continue
+                    try:
+                        if CSSSELECT_AVAILABLE:
+                            _lxml_css_selector(selector)
+                        else:
+                            self.strategies['css'].compile_selector(selector)
+                    except Exception as e:
+                        self.rejected_selectors.append((name, 'remove_elements', selector, str(e)))
+            except Exception as e:
+                self.logger.warning(f"Could not precompile selectors of template '{name}': {e}")
+
+        for name, field_name, selector, reason in self.rejected_selectors:
+            self.logger.debug(f"Template '{name}': rejected selector '{selector}' for {field_name}: {reason}")
+
     def get_template_for_url(self, url: str) -> Dict[str, Any]:
         """
         Get matching template for URL.
 
-        This method finds and caches the best matching template for the given URL.
-        It uses the TemplateLoader's matching logic and caches results.
+        Matching uses the TemplateLoader's host index, which memoizes results
+        per host, so repeated URLs from a crawl cost a dictionary lookup.
 
         Args:
             url: URL to find template for
@@ -97,18 +208,11 @@ class TemplateParser(BaseParser):
         Raises:
             TemplateNotFoundError: If no suitable template is found
         """
-        # Check cache first
-        if url in self.template_cache:
-            return self.template_cache[url]
-
-        # Find template
         template = self.template_loader.get_template_for_url(url)
 
         if template is None:
             raise TemplateNotFoundError(f"No template found for URL: {url}")
 
-        # Cache and return
-        self.template_cache[url] = template
         return template
 
     def _detect_strategy(self, selector: str) -> str:
@@ -172,77 +276,146 @@ class TemplateParser(BaseParser):
 
         return selectors
 
-    def _extract_field(self, content: str, field_config: Any) -> Optional[str]:
+    def _iter_field_selectors(self, field_config: Any):
         """
-        Extract a field using configured selectors with fallback support.
+        Yield (selector, full_selector, strategy_type, post_process) in fallback order.
+
+        ``full_selector`` is what the strategy receives: meta tags get
+        ``@content`` (or their configured attribute) appended.
         """
-        # Process list of dicts with full config (including post_process)
+        # List of dicts with full config (including post_process)
         if isinstance(field_config, list):
             for item in field_config:
-                if isinstance(item, dict):
-                    selector = item.get('selector', '').strip()
-                    strategy_type = item.get('strategy', 'css')
-                    attribute = item.get('attribute')
-                    post_process = item.get('post_process', [])
-
-                    if not selector:
-                        continue
-
-                    try:
-                        # Build full selector with attribute if needed
-                        if attribute and selector.startswith('meta['):
-                            full_selector = f"{selector}@{attribute}"
-                        elif selector.startswith('meta[') and '@' not in selector:
-                            full_selector = selector + '@content'
-                        else:
-                            full_selector = selector
-
-                        # Get strategy
-                        strategy = self.strategies.get(strategy_type, self.strategies['css'])
-
-                        # Extract using strategy
-                        result = strategy.extract(content, full_selector)
+                if not isinstance(item, dict):
+                    continue
+                selector = item.get('selector', '').strip()
+                if not selector:
+                    continue
 
-                        # Apply post-processing if result found
-                        if result and result.strip():
-                            result = self._apply_post_process(result, post_process)
-                            if result and result.strip():
-                                return result.strip()
+                # Build full selector with attribute if needed
+                attribute = item.get('attribute')
+                if attribute and selector.startswith('meta['):
+                    full_selector = f"{selector}@{attribute}"
+                elif selector.startswith('meta[') and '@' not in selector:
+                    full_selector = selector + '@content'
+                else:
+                    full_selector = selector
 
-                    except Exception as e:
-                        self.logger.debug(f"Selector '{selector}' (strategy: {strategy_type}) failed: {e}")
-                        continue
+                yield selector, full_selector, item.get('strategy', 'css'), item.get('post_process', [])
 
         # Fallback to original normalization for simple configs
         else:
-            selectors = self._normalize_selector_config(field_config)
+            for selector, strategy_type, _ in self._normalize_selector_config(field_config):
+                # Auto-append @content for meta tags if not specified
+                if selector.startswith('meta[') and '@' not in selector:
+                    full_selector = selector + '@content'
+                else:
+                    full_selector = selector
+                yield selector, full_selector, strategy_type, []
 
-            if not selectors:
-                return None
+    def _strategy_key(self, strategy_type: str) -> str:
+        """Registered strategy name (unknown strategies fall back to CSS)."""
+        return strategy_type if strategy_type in self.strategies else 'css'
 
-            # Try each selector in order until one succeeds
-            for selector, strategy_type, _ in selectors:
-                try:
-                    # Auto-append @content for meta tags if not specified
-                    if selector.startswith('meta[') and '@' not in selector:
-                        selector = selector + '@content'
+    def _parsed_document(self, strategy_type: str, content: str) -> Any:
+        """
+        Parse content once per strategy for the page being processed.
 
-                    # Get strategy
-                    strategy = self.strategies.get(strategy_type, self.strategies['css'])
+        Every field of a page shares the same BeautifulSoup / lxml tree;
+        the cache is dropped when parse() finishes or the content changes.
+        """
+        if content is not self._document_source:
+            self._documents = {}
+            self._document_source = content
+        document = self._documents.get(strategy_type)
+        if document is None:
+            document = self.strategies[strategy_type].parse_document(content)
+            self._documents[strategy_type] = document
+        return document
+
+    def _release_documents(self) -> None:
+        """Drop the parsed documents of the last page."""
+        self._documents = {}
+        self._document_source = None
+
+    def _extract_fields(self, content: str, field_configs: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Extract several fields with fallback support in batched strategy calls.
 
-                    # Extract using strategy
-                    result = strategy.extract(content, selector)
+        Each field's fallbacks are tried in order. Consecutive fallbacks of
+        the same strategy form a run; the current runs of all fields are
+        evaluated with one ``extract_many`` call per strategy on a shared
+        parsed document. A match whose post-processing leaves nothing
+        resumes with the next fallback, as does a run without any match.
 
-                    # Return first non-empty result
-                    if result and result.strip():
-                        return result.strip()
+        Args:
+            content: HTML content
+            field_configs: Field name -> field configuration (any supported format)
 
+        Returns:
+            Dict[str, str]: Field name -> extracted value (unmatched fields are absent)
+        """
+        candidates = {}
+        for field_name, config in field_configs.items():
+            options = [(selector, full_selector, self._strategy_key(strategy_type), post_process)
+                       for selector, full_selector, strategy_type, post_process
+                       in self._iter_field_selectors(config)]
+            if options:
+                candidates[field_name] = options
+        positions = dict.fromkeys(candidates, 0)
+
+        results = {}
+        while positions:
+            # Current run (same-strategy fallbacks) of every unresolved field, grouped by strategy
+            batches: Dict[str, Dict[str, tuple]] = {}
+            for field_name, start in positions.items():
+                options = candidates[field_name]
+                strategy_type = options[start][2]
+                end = start
+                while end < len(options) and options[end][2] == strategy_type:
+                    end += 1
+                batches.setdefault(strategy_type, {})[field_name] = (start, end)
+
+            for strategy_type, runs in batches.items():
+                try:
+                    document = self._parsed_document(strategy_type, content)
+                    matches = self.strategies[strategy_type].extract_many(document, {
+                        field_name: [option[1] for option in candidates[field_name][start:end]]
+                        for field_name, (start, end) in runs.items()
+                    })
                 except Exception as e:
-                    # Log and continue to next selector
-                    self.logger.debug(f"Selector '{selector}' (strategy: {strategy_type}) failed: {e}")
-                    continue
+                    self.logger.debug(f"Batched extraction (strategy: {strategy_type}) failed: {e}")
+                    matches = {}
+
+                for field_name, (start, end) in runs.items():
+                    match = matches.get(field_name)
+                    next_position = end
+                    if match is not None:
+                        selector, _, _, post_process = candidates[field_name][start + match.index]
+                        try:
+                            value = self._apply_post_process(match.value, post_process)
+                        except Exception as e:
+                            self.logger.debug(f"Post-processing of '{selector}' failed: {e}")
+                            value = None
+                        if value and value.strip():
+                            results[field_name] = value.strip()
+                            del positions[field_name]
+                            continue
+                        next_position = start + match.index + 1
 
-        return None
+                    if next_position < len(candidates[field_name]):
+                        positions[field_name] = next_position
+                    else:
+                        del positions[field_name]
+
+        # Keep the configured field order
+        return {field_name: results[field_name] for field_name in field_configs if field_name in results}
+
+    def _extract_field(self, content: str, field_config: Any) -> Optional[str]:
+        """
+        Extract a field using configured selectors with fallback support.
+        """
+        return self._extract_fields(content, {'value': field_config}).get('value')
 
     def _apply_post_process(self, value: str, post_process: list) -> str:
         """
@@ -308,6 +481,7 @@ class TemplateParser(BaseParser):
 
         return result
 
+    @timed('template')
     def parse(self, content: str, url: str) -> ParseResult:
         """
         Parse content using template rules.
@@ -334,7 +508,8 @@ class TemplateParser(BaseParser):
             self.current_url = url
 
             # Get template for this URL
-            self.current_template = self.get_template_for_url(url)
+            with span('match'):
+                self.current_template = self.get_template_for_url(url)
 
             # Create result with template info
             result = ParseResult(
@@ -344,9 +519,14 @@ class TemplateParser(BaseParser):
 
             # Extract content using template
             # NOTE: This is Phase 2.1 framework - actual extraction in Phase 2.2
-            result.title = self._extract_title(content, url)
-            result.content = self._extract_content(content, url)
-            result.metadata = self._extract_metadata(content, url)
+            try:
+                with span('title'):
+                    result.title = self._extract_title(content, url)
+                result.content = self._extract_content(content, url)
+                with span('metadata'):
+                    result.metadata = self._extract_metadata(content, url)
+            finally:
+                self._release_documents()
 
             result.success = True
             return result
@@ -417,7 +597,8 @@ class TemplateParser(BaseParser):
             selectors = self.current_template['selectors']
             if 'content' in selectors:
                 # Extract HTML by finding the element and getting its inner HTML
-                html_content = self._extract_html(content, selectors['content'])
+                with span('select'):
+                    html_content = self._extract_html(content, selectors['content'])
 
         # If no content extracted, return empty string
         if not html_content:
@@ -436,115 +617,24 @@ class TemplateParser(BaseParser):
 
         # Pre-process HTML to handle lazy-loaded images and remove unwanted elements
         # This is needed for WeChat and other sites that use lazy loading
+        root = None
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            # Remove script, style, and noscript tags (especially important for XHS)
-            for tag in soup.find_all(['script', 'style', 'noscript']):
-                tag.decompose()
-
-            # Apply post_processing.remove_elements rules from template
-            if self.current_template and 'post_processing' in self.current_template:
-                remove_elements = self.current_template['post_processing'].get('remove_elements', [])
-                for remove_rule in remove_elements:
-                    if not isinstance(remove_rule, dict):
-                        continue
-
-                    selector = remove_rule.get('selector', '')
-                    strategy = remove_rule.get('strategy', 'css')
-
-                    if not selector:
-                        continue
-
-                    try:
-                        # Currently only support CSS selector strategy for removal
-                        if strategy == 'css':
-                            elements_to_remove = soup.select(selector)
-                            for element in elements_to_remove:
-                                element.decompose()
-                            if elements_to_remove:
-                                self.logger.debug(f"Removed {len(elements_to_remove)} elements matching '{selector}'")
-                        elif strategy == 'tag':
-                            # Tag strategy: remove all tags of given type
-                            for tag in soup.find_all(selector):
-                                tag.decompose()
-                    except Exception as e:
-                        self.logger.debug(f"Failed to remove elements with selector '{selector}': {e}")
-
-            # Find all img tags with data-src attribute
-            for img in soup.find_all('img'):
-                data_src = img.get('data-src')
-                if data_src and not img.get('src'):
-                    # Copy data-src to src so html2text can pick it up
-                    img['src'] = data_src
-
-            # Normalize all image src URLs to absolute URLs
-            from webfetcher.core import normalize_media_url
-            for img in soup.find_all('img'):
-                src = img.get('src')
-                if src:
-                    # Normalize URL using base URL from self.current_url
-                    normalized_src = normalize_media_url(src, url)
-                    img['src'] = normalized_src
-
-            # Normalize all link href URLs to absolute URLs (fix relative links like /search?...)
-            for link in soup.find_all('a'):
-                href = link.get('href')
-                if href:
-                    # Normalize URL using base URL
-                    normalized_href = normalize_media_url(href, url)
-                    link['href'] = normalized_href
-
-            # Enhanced table handling for better markdown conversion
-            tables_found = soup.find_all('table')
-            for table in tables_found:
-                # Fix 1: Replace <br> in table headers with space
-                # This prevents headers from splitting across multiple lines
-                for th in table.find_all('th'):
-                    for br in th.find_all('br'):
-                        br.replace_with(' ')
-
-                for td in table.find_all('td'):
-                    # Fix 2: Replace <br> in table cells
-                    for br in td.find_all('br'):
-                        br.replace_with(' ')
-
-                    # Fix 3: Replace empty cells with radio/checkbox inputs with placeholder
-                    # Check if cell contains only form inputs and whitespace
-                    inputs = td.find_all('input', type=['radio', 'checkbox'])
-                    if inputs:
-                        # Get cell text without the input tags
-                        cell_text = td.get_text(strip=True)
-                        # If cell is essentially empty (only whitespace/nbsp), add placeholder
-                        if not cell_text or cell_text.replace('\xa0', '').strip() == '':
-                            # Clear the cell and add a simple placeholder
-                            td.clear()
-                            td.string = '[ ]'
-
-            # Update html_content with processed version
-            html_content = str(soup)
+            with span('preprocess'):
+                root = self._preprocess_tree(html_content, url)
+                if root is None:
+                    html_content = self._preprocess_html_bs4(html_content, url)
         except Exception as e:
             self.logger.debug(f"HTML pre-processing failed: {e}, continuing with original HTML")
 
         # Convert HTML to Markdown
         try:
             # Note: Google Search Template is handled earlier before post-processing
-            markdown = self.html_converter.handle(html_content)
-
-            # Post-processing: Remove base64 data URLs from markdown
-            # This catches any that slipped through BeautifulSoup processing
-            import re
-            # Remove markdown image syntax with data URLs: ![alt](data:image/...)
-            markdown = re.sub(r'!\[([^\]]*)\]\(data:image/[^)]+\)', r'', markdown)
-            # Remove any standalone data:image URLs
-            markdown = re.sub(r'data:image/[^\s)]+', '', markdown)
-
-            # Clean up excessive whitespace
-            markdown = '\n'.join(line.rstrip() for line in markdown.split('\n'))
-            # Remove multiple consecutive blank lines
-            while '\n\n\n' in markdown:
-                markdown = markdown.replace('\n\n\n', '\n\n')
+            with span('markdown'):
+                if root is not None:
+                    # Walk the pre-processed tree directly (no re-serialization)
+                    markdown = tree_to_markdown(root)
+                else:
+                    markdown = self._html2text_markdown(html_content)
 
             # Apply markdown post-processing from template
             if self.current_template and 'post_processing' in self.current_template:
@@ -557,6 +647,215 @@ class TemplateParser(BaseParser):
             # Return raw HTML as fallback
             return html_content
 
+    def _html2text_markdown(self, html_content: str) -> str:
+        """
+        Convert serialized HTML with html2text plus the regex cleanup passes.
+
+        Only used when no lxml tree is available (BeautifulSoup
+        pre-processing, or HTML lxml could not pre-process); the tree
+        emitter produces the same output without these passes.
+        """
+        import re
+        markdown = self.html_converter.handle(html_content)
+
+        # Post-processing: Remove base64 data URLs from markdown
+        # Remove markdown image syntax with data URLs: ![alt](data:image/...)
+        markdown = re.sub(r'!\[([^\]]*)\]\(data:image/[^)]+\)', r'', markdown)
+        # Remove any standalone data:image URLs
+        markdown = re.sub(r'data:image/[^\s)]+', '', markdown)
+
+        # Clean up excessive whitespace
+        markdown = '\n'.join(line.rstrip() for line in markdown.split('\n'))
+        # Remove multiple consecutive blank lines
+        while '\n\n\n' in markdown:
+            markdown = markdown.replace('\n\n\n', '\n\n')
+        return markdown
+
+    def _preprocess_tree(self, html_content: str, url: str):
+        """
+        Parse extracted content HTML and prepare it for Markdown conversion.
+
+        Single traversal of an lxml tree that, in place, drops script/style/
+        noscript and template ``remove_elements`` matches, promotes lazy
+        ``data-src`` images, absolutizes image and link URLs, and flattens
+        tables (``<br>`` in cells, radio/checkbox-only cells).
+
+        Args:
+            html_content: Extracted content HTML
+            url: Source URL (base for relative URLs)
+
+        Returns:
+            The processed lxml root (a wrapper ``<div>``), or None when the
+            template has CSS removal rules but cssselect is not installed
+            (use _preprocess_html_bs4 instead)
+        """
+        remove_tags = set(_STRIP_TAGS)
+        css_rules = []
+        if self.current_template and 'post_processing' in self.current_template:
+            for remove_rule in self.current_template['post_processing'].get('remove_elements', []):
+                if not isinstance(remove_rule, dict) or not remove_rule.get('selector'):
+                    continue
+                if remove_rule.get('strategy', 'css') == 'tag':
+                    remove_tags.add(remove_rule['selector'].lower())
+                elif remove_rule.get('strategy', 'css') == 'css':
+                    css_rules.append(remove_rule['selector'])
+
+        if css_rules and not CSSSELECT_AVAILABLE:
+            return None
+
+        root = lxml.html.fragment_fromstring(html_content, create_parent='div')
+
+        # CSS removals are resolved up front into an identity set
+        removed = set()
+        for selector in css_rules:
+            try:
+                matches = _lxml_css_selector(selector)(root)
+                removed.update(matches)
+                if matches:
+                    self.logger.debug(f"Removed {len(matches)} elements matching '{selector}'")
+            except Exception as e:
+                self.logger.debug(f"Failed to remove elements with selector '{selector}': {e}")
+
+        # (element, inside a table cell)
+        stack = [(child, False) for child in reversed(root)]
+        while stack:
+            element, in_cell = stack.pop()
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue  # comments, processing instructions
+            tag = tag.lower()
+
+            if tag in remove_tags or element in removed:
+                element.drop_tree()  # keeps the tail text
+                continue
+
+            if tag == 'img':
+                data_src = element.get('data-src')
+                if data_src and not element.get('src'):
+                    # Copy data-src to src so it is normalized below
+                    element.set('src', data_src)
+                src = element.get('src')
+                if src:
+                    element.set('src', normalize_media_url(src, url))
+            elif tag == 'a':
+                href = element.get('href')
+                if href:
+                    # Normalize relative links like /search?...
+                    element.set('href', normalize_media_url(href, url))
+            elif tag == 'br' and in_cell:
+                # Keep table headers and cells on one Markdown row
+                _replace_with_text(element, ' ')
+                continue
+            elif tag == 'td' and self._is_empty_choice_cell(element):
+                # Radio/checkbox-only cell becomes a placeholder
+                for child in list(element):
+                    element.remove(child)
+                element.text = '[ ]'
+                continue
+
+            in_cell = in_cell or tag in _TABLE_CELL_TAGS
+            stack.extend((child, in_cell) for child in reversed(element))
+
+        return root
+
+    @staticmethod
+    def _is_empty_choice_cell(td) -> bool:
+        """Whether a cell holds radio/checkbox inputs and no visible text."""
+        has_choice = any((el.get('type') or '').lower() in _FORM_INPUT_TYPES
+                         for el in td.iter('input'))
+        if not has_choice:
+            return False
+        return td.text_content().replace('\xa0', '').strip() == ''
+
+    def _preprocess_html_bs4(self, html_content: str, url: str) -> str:
+        """BeautifulSoup variant of _preprocess_tree (CSS removals without cssselect)."""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        # Remove script, style, and noscript tags (especially important for XHS)
+        for tag in soup.find_all(['script', 'style', 'noscript']):
+            tag.decompose()
+
+        # Apply post_processing.remove_elements rules from template
+        if self.current_template and 'post_processing' in self.current_template:
+            remove_elements = self.current_template['post_processing'].get('remove_elements', [])
+            for remove_rule in remove_elements:
+                if not isinstance(remove_rule, dict):
+                    continue
+
+                selector = remove_rule.get('selector', '')
+                strategy = remove_rule.get('strategy', 'css')
+
+                if not selector:
+                    continue
+
+                try:
+                    # Currently only support CSS selector strategy for removal
+                    if strategy == 'css':
+                        matcher = self.strategies['css'].compile_selector(selector).matcher
+                        elements_to_remove = matcher.select(soup)
+                        for element in elements_to_remove:
+                            element.decompose()
+                        if elements_to_remove:
+                            self.logger.debug(f"Removed {len(elements_to_remove)} elements matching '{selector}'")
+                    elif strategy == 'tag':
+                        # Tag strategy: remove all tags of given type
+                        for tag in soup.find_all(selector):
+                            tag.decompose()
+                except Exception as e:
+                    self.logger.debug(f"Failed to remove elements with selector '{selector}': {e}")
+
+        # Find all img tags with data-src attribute
+        for img in soup.find_all('img'):
+            data_src = img.get('data-src')
+            if data_src and not img.get('src'):
+                # Copy data-src to src so html2text can pick it up
+                img['src'] = data_src
+
+        # Normalize all image src URLs to absolute URLs
+        for img in soup.find_all('img'):
+            src = img.get('src')
+            if src:
+                # Normalize URL using base URL from self.current_url
+                normalized_src = normalize_media_url(src, url)
+                img['src'] = normalized_src
+
+        # Normalize all link href URLs to absolute URLs (fix relative links like /search?...)
+        for link in soup.find_all('a'):
+            href = link.get('href')
+            if href:
+                # Normalize URL using base URL
+                normalized_href = normalize_media_url(href, url)
+                link['href'] = normalized_href
+
+        # Enhanced table handling for better markdown conversion
+        tables_found = soup.find_all('table')
+        for table in tables_found:
+            # Fix 1: Replace <br> in table headers with space
+            # This prevents headers from splitting across multiple lines
+            for th in table.find_all('th'):
+                for br in th.find_all('br'):
+                    br.replace_with(' ')
+
+            for td in table.find_all('td'):
+                # Fix 2: Replace <br> in table cells
+                for br in td.find_all('br'):
+                    br.replace_with(' ')
+
+                # Fix 3: Replace empty cells with radio/checkbox inputs with placeholder
+                # Check if cell contains only form inputs and whitespace
+                inputs = td.find_all('input', type=['radio', 'checkbox'])
+                if inputs:
+                    # Get cell text without the input tags
+                    cell_text = td.get_text(strip=True)
+                    # If cell is essentially empty (only whitespace/nbsp), add placeholder
+                    if not cell_text or cell_text.replace('\xa0', '').strip() == '':
+                        # Clear the cell and add a simple placeholder
+                        td.clear()
+                        td.string = '[ ]'
+
+        return str(soup)
+
     def _extract_html(self, content: str, selector_config: Any) -> Optional[str]:
         """
         Extract HTML content (not text) from elements.
@@ -573,8 +872,6 @@ class TemplateParser(BaseParser):
         Returns:
             Optional[str]: Extracted HTML or None if not found
         """
-        from bs4 import BeautifulSoup
-
         # Normalize configuration to list of (selector, strategy, options) tuples
         selectors = self._normalize_selector_config(selector_config)
 
@@ -589,19 +886,21 @@ class TemplateParser(BaseParser):
                     self.logger.debug(f"HTML extraction only supports CSS selectors, got: {strategy_type}")
                     continue
 
-                # Parse HTML
-                soup = BeautifulSoup(content, 'html.parser')
+                matcher = self.strategies['css'].compile_selector(selector).matcher
+
+                # Parsed HTML shared with the other fields of this page
+                soup = self._parsed_document('css', content)
 
                 # Check if multiple matches are requested
                 if options.get('multiple'):
                     # Find all elements
-                    elements = soup.select(selector)
+                    elements = matcher.select(soup)
                     if elements:
                         # Join all found elements
                         return "\n".join(str(el) for el in elements)
                 else:
                     # Find element using CSS selector (default behavior)
-                    element = soup.select_one(selector)
+                    element = matcher.select_one(soup)
                     if element:
                         # Return inner HTML (all children as HTML string)
                         return str(element)
@@ -624,7 +923,6 @@ class TemplateParser(BaseParser):
             List[str]: List of extracted values (validated URLs or text)
         """
         from bs4 import BeautifulSoup
-        import re
 
         results = []
 
@@ -654,6 +952,9 @@ class TemplateParser(BaseParser):
             self.logger.debug(f"HTML preprocessing failed in _extract_list: {e}")
             preprocessed_content = content
 
+        # Parse preprocessed HTML once for all selectors
+        soup = BeautifulSoup(preprocessed_content, 'html.parser')
+
         # Process each configuration item
         for selector, strategy_type, options in selectors:
             attribute = options.get('attribute')
@@ -663,12 +964,11 @@ class TemplateParser(BaseParser):
                 continue
 
             try:
-                # Parse preprocessed HTML
-                soup = BeautifulSoup(preprocessed_content, 'html.parser')
+                matcher = self.strategies['css'].compile_selector(selector).matcher
 
                 # Find all matching elements
                 # List extraction inherently implies multiple matches, so we always use select()
-                elements = soup.select(selector)
+                elements = matcher.select(soup)
 
                 for element in elements:
                     value = None
@@ -696,7 +996,6 @@ class TemplateParser(BaseParser):
 
         # Normalize media URLs if we have a current URL
         if hasattr(self, 'current_url') and self.current_url:
-            from webfetcher.core import normalize_media_url
             results = [normalize_media_url(url, self.current_url) for url in results]
 
         return results
@@ -787,18 +1086,26 @@ class TemplateParser(BaseParser):
         # Extract metadata fields from template
         if self.current_template and 'selectors' in self.current_template:
             selectors = self.current_template['selectors']
+            metadata_fields = selectors.get('metadata')
+            if not isinstance(metadata_fields, dict):
+                metadata_fields = {}
+
+            # All single-value fields in one batched pass over the page
+            field_configs = {f"metadata.{name}": config for name, config in metadata_fields.items()}
+            for field_name in ('author', 'date'):
+                if field_name in selectors:
+                    field_configs[field_name] = selectors[field_name]
+            try:
+                values = self._extract_fields(content, field_configs)
+            except Exception as e:
+                self.logger.debug(f"Failed to extract metadata fields: {e}")
+                values = {}
 
             # Extract from selectors.metadata dict if exists
-            if 'metadata' in selectors and isinstance(selectors['metadata'], dict):
-                # Extract each metadata field
-                for field_name, field_selector in selectors['metadata'].items():
-                    try:
-                        value = self._extract_field(content, field_selector)
-                        if value:
-                            metadata[field_name] = value
-                    except Exception as e:
-                        self.logger.debug(f"Failed to extract metadata field '{field_name}': {e}")
-                        continue
+            for field_name in metadata_fields:
+                value = values.get(f"metadata.{field_name}")
+                if value:
+                    metadata[field_name] = value
 
             # Also extract top-level selector fields for compatibility
             # (author, date, images, videos, etc.)
@@ -817,8 +1124,8 @@ class TemplateParser(BaseParser):
                             if videos:
                                 metadata['videos'] = videos
                         else:
-                            # Single value fields
-                            value = self._extract_field(content, selectors[field_name])
+                            # Single value fields (extracted in the batch above)
+                            value = values.get(field_name)
                             if value:
                                 metadata[field_name] = value
                     except Exception as e:
@@ -881,7 +1188,8 @@ class TemplateParser(BaseParser):
                 'template_matching',
                 'url_pattern_matching',
                 'fallback_to_generic',
-                'template_caching'
+                'template_caching',
+                'precompiled_selectors'
             ]
         }
 
@@ -899,8 +1207,121 @@ class TemplateParser(BaseParser):
         Reload all templates from disk.
 
         This is useful when templates are updated during runtime.
-        Clears the template cache and reinitializes the loader.
+        Rebuilds the loader's domain index (and its per-host memo) and
+        precompiles the reloaded selectors.
         """
-        self.template_cache.clear()
         self.current_template = None
         self.template_loader._load_all_templates()
+        self._precompile_selectors()
+
+
+def _replace_with_text(element, text: str) -> None:
+    """Replace an lxml element by plain text, keeping its tail."""
+    replacement = text + (element.tail or '')
+    previous = element.getprevious()
+    parent = element.getparent()
+    if previous is not None:
+        previous.tail = (previous.tail or '') + replacement
+    else:
+        parent.text = (parent.text or '') + replacement
+    parent.remove(element)
+
+
+def template_dir_stamp(template_dir) -> Tuple:
+    """(path, mtime_ns, size) of every template file, sorted / 模板目录的文件指纹"""
+    stamp = []
+    for path in sorted(Path(template_dir).rglob('*.yaml')):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        stamp.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+class SharedTemplateParser:
+    """
+    One TemplateParser per template directory, shared by every parse in the process.
+    进程内共享的模板解析器（每个模板目录一个）
+
+    The loader's host index and per-host memo and the precompiled selectors
+    survive across pages. Template files are re-stat'ed at most every
+    TEMPLATE_CHECK_INTERVAL seconds and the templates are reloaded only when
+    one changed. TemplateParser keeps per-page state, so parse() holds a lock.
+    """
+
+    def __init__(self, template_dir, check_interval: float = TEMPLATE_CHECK_INTERVAL):
+        self.template_dir = str(template_dir)
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._parser: Optional[TemplateParser] = None
+        self._stamp: Tuple = ()
+        self._checked = 0.0
+        self._lock = threading.RLock()
+
+    def refresh(self) -> TemplateParser:
+        """Load the templates, or reload them if a file changed / 按需加载或重新加载模板"""
+        with self._lock:
+            now = time.monotonic()
+            if self._parser is not None and now - self._checked < self.check_interval:
+                return self._parser
+            self._checked = now
+            stamp = template_dir_stamp(self.template_dir)
+            if self._parser is None:
+                self._parser = TemplateParser(template_dir=self.template_dir)
+                self._stamp = stamp
+            elif stamp != self._stamp:
+                self._parser.reload_templates()
+                self._stamp = stamp
+                self.reloads += 1
+            return self._parser
+
+    @property
+    def stamp(self) -> Tuple:
+        """Template file fingerprint the loaded templates correspond to / 当前模板指纹"""
+        with self._lock:
+            self.refresh()
+            return self._stamp
+
+    @property
+    def loader(self) -> TemplateLoader:
+        return self.refresh().template_loader
+
+    def template_signature(self, url: str) -> str:
+        """
+        'name|version|mtime' of the template selected for url, or 'none'.
+        URL 所用模板的签名（名称|版本|文件修改时间）
+
+        Used by the parse cache, so editing a template invalidates its entries.
+        """
+        with self._lock:
+            loader = self.refresh().template_loader
+            template = loader.get_template_for_url(url)
+            if not template:
+                return 'none'
+            name = template.get('name', '')
+            path = (loader._templates.get(name) or {}).get('path')
+            mtime = next((mtime for file, mtime, _ in self._stamp if file == path), 0)
+            return f"{name}|{template.get('version', '')}|{mtime}"
+
+    def parse(self, html: str, url: str) -> ParseResult:
+        """Parse with the shared parser / 使用共享解析器解析"""
+        with self._lock:
+            return self.refresh().parse(html, url)
+
+
+_shared_parsers: Dict[str, SharedTemplateParser] = {}
+_shared_parsers_lock = threading.Lock()
+
+
+def get_shared_template_parser(template_dir=None) -> SharedTemplateParser:
+    """
+    Process-wide SharedTemplateParser for a template directory.
+    获取模板目录对应的进程级共享解析器
+    """
+    key = os.path.abspath(str(template_dir or DEFAULT_TEMPLATE_DIR))
+    with _shared_parsers_lock:
+        shared = _shared_parsers.get(key)
+        if shared is None:
+            shared = _shared_parsers[key] = SharedTemplateParser(key)
+        return shared
@@ -26,6 +26,7 @@ import time
 
 # Task-003 Phase 4: Import URL formatter utilities for consistent URL formatting
 from webfetcher.utils.url_formatter import format_url_as_markdown, replace_urls_with_markdown
+from webfetcher.utils.timing import span
 
 # BeautifulSoup import and availability flag
 try:
@@ -1319,7 +1320,8 @@ def generic_to_markdown(html: str, url: str, filter_level: str = 'safe', is_craw
         tuple[str, str, dict]: (date_only, markdown_content, metadata)
     """
     # 1. Page type detection
-    page_type = detect_page_type(html, url, is_crawling)
+    with span('page_type'):
+        page_type = detect_page_type(html, url, is_crawling)
     
     if page_type == PageType.LIST_INDEX:
         # Handle list pages
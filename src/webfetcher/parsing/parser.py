@@ -40,6 +40,8 @@ from webfetcher.parsing.templates import (
     wechat_to_markdown as wechat_to_markdown_migrated,
     generic_to_markdown as generic_to_markdown_migrated
 )
+from webfetcher.parsing.cache import get_parse_cache
+from webfetcher.utils.timing import span
 
 def get_beautifulsoup_parser():
     """
@@ -1011,7 +1013,23 @@ def generic_to_markdown(html: str, url: str, filter_level: str = 'safe', is_craw
 
     Returns:
         tuple: (date_only, markdown_content, metadata)
+
+    Results are reused from the parse cache when the same HTML, URL and
+    template were parsed before (see webfetcher.parsing.cache).
     """
+    cache = get_parse_cache()
+    key = cached = None
+    if cache is not None:
+        with span('parse_cache'):
+            key = cache.key('generic', html, url, filter_level, is_crawling)
+            cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Parse cache hit for {url}")
+        return cached
+
     logger.info("Phase 3.5: Routing Generic parser to template-based implementation")
     # Task-003 Phase 1: Pass url_metadata to migrated template-based parser
-    return generic_to_markdown_migrated(html, url, filter_level, is_crawling, url_metadata=url_metadata)
+    result = generic_to_markdown_migrated(html, url, filter_level, is_crawling, url_metadata=url_metadata)
+    if key:
+        cache.put(key, result)
+    return result
@@ -22,6 +22,8 @@ from typing import Optional, List, Dict, Set, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from webfetcher.utils.timing import span
+
 # Import existing utilities and classes from parsers_legacy
 # These will be reused during migration
 from webfetcher.parsing.legacy import (
@@ -75,7 +77,7 @@ def xhs_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[str
     """
     try:
         # Import template-based parsing engine
-        from .engine.template_parser import TemplateParser
+        from .engine.template_parser import get_shared_template_parser
         from .engine.template_loader import TemplateLoader
         import os
 
@@ -84,7 +86,10 @@ def xhs_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[str
             os.path.dirname(__file__),
             'engine', 'templates'
         )
-        parser = TemplateParser(template_dir=template_dir)
+        with span('template_load'):
+            # Shared across pages; reloaded only when a template file changes
+            parser = get_shared_template_parser(template_dir)
+            parser.refresh()
 
         # Parse using template engine
         result = parser.parse(html, url)
@@ -214,7 +219,7 @@ def wechat_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[
     """
     try:
         # Import template-based parsing engine
-        from .engine.template_parser import TemplateParser
+        from .engine.template_parser import get_shared_template_parser
         from .engine.template_loader import TemplateLoader
         import os
 
@@ -223,7 +228,10 @@ def wechat_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[
             os.path.dirname(__file__),
             'engine', 'templates'
         )
-        parser = TemplateParser(template_dir=template_dir)
+        with span('template_load'):
+            # Shared across pages; reloaded only when a template file changes
+            parser = get_shared_template_parser(template_dir)
+            parser.refresh()
 
         # Parse using template engine
         result = parser.parse(html, url)
@@ -293,7 +301,7 @@ def generic_to_markdown(html: str, url: str, filter_level: str = 'safe', is_craw
     """
     try:
         # Phase 3.5: Try template-based parsing first
-        from .engine.template_parser import TemplateParser
+        from .engine.template_parser import get_shared_template_parser
         from .engine.template_loader import TemplateLoader
         import os
 
@@ -302,8 +310,10 @@ def generic_to_markdown(html: str, url: str, filter_level: str = 'safe', is_craw
             os.path.dirname(__file__),
             'engine', 'templates'
         )
-        parser = TemplateParser(template_dir=template_dir)
-        parser.reload_templates()  # Force reload to get updated generic.yaml v2.1.0
+        with span('template_load'):
+            # Shared across pages; reloaded only when a template file changes
+            parser = get_shared_template_parser(template_dir)
+            parser.refresh()
 
         # Parse using template engine (will auto-select based on URL domain)
         result = parser.parse(html, url)
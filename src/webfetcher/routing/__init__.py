@@ -6,12 +6,14 @@ Provides configuration-driven routing for fetcher selection.
 
 from .config_loader import ConfigLoader, ConfigurationError
 from .engine import RoutingEngine, RoutingDecision
+from .host_outcomes import HostOutcomeStore, FetcherOutcome, LearnedRoute
 from .matchers import (
     BaseMatcher,
     DomainMatcher,
     DomainListMatcher,
     PatternMatcher,
     AlwaysMatcher,
+    HeadMatcher,
     CompositeMatcher,
     create_matcher
 )
@@ -22,11 +24,15 @@ __all__ = [
     "ConfigurationError",
     "RoutingEngine",
     "RoutingDecision",
+    "HostOutcomeStore",
+    "FetcherOutcome",
+    "LearnedRoute",
     "BaseMatcher",
     "DomainMatcher",
     "DomainListMatcher",
     "PatternMatcher",
     "AlwaysMatcher",
+    "HeadMatcher",
     "CompositeMatcher",
     "create_matcher"
 ]
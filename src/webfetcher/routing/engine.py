@@ -10,9 +10,17 @@ import threading
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 from functools import lru_cache
+from urllib.parse import urlparse
 
 from .config_loader import ConfigLoader
-from .matchers import create_matcher
+from .matchers import create_matcher, HeadMatcher
+from .host_outcomes import HostOutcomeStore
+
+# Learned routes are consulted ahead of static rules below this priority;
+# rules at or above it (global.pinned_rule_priority) are operator-pinned
+# 优先级不低于该值的静态规则视为人工固定，优先于学习到的路由
+DEFAULT_PINNED_RULE_PRIORITY = 95
+LEARNED_ROUTE_PRIORITY = DEFAULT_PINNED_RULE_PRIORITY - 1
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +49,8 @@ class RoutingEngine:
     Main routing engine that evaluates rules and selects fetcher.
 
     Features:
+        - Learned per-host routes (HostOutcomeStore) ahead of static rules,
+          except rules pinned at or above global.pinned_rule_priority
         - Priority-based rule evaluation
         - LRU caching for performance
         - Thread-safe hot reload
@@ -52,20 +62,26 @@ class RoutingEngine:
         print(f"Use {decision.fetcher} because: {decision.reason}")
     """
 
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None,
+                 outcome_store: Optional[HostOutcomeStore] = None):
         """
         Initialize routing engine.
 
         Args:
             config_path: Path to routing.yaml (optional, uses default if not provided)
+            outcome_store: Learned host outcomes consulted before static rules (optional)
         """
         self.config_loader = ConfigLoader(config_path)
+        self.outcome_store = outcome_store
         self._lock = threading.RLock()
         self._compiled_rules: List[Tuple[dict, Any]] = []
+        # Rules with head_* conditions, evaluated by evaluate_head()
+        self._head_rules: List[Tuple[dict, Any]] = []
         self._stats = {
             'total_evaluations': 0,
             'cache_hits': 0,
             'cache_misses': 0,
+            'learned_hits': 0,
             'last_reload': time.time()
         }
 
@@ -83,6 +99,7 @@ class RoutingEngine:
             try:
                 rules = self.config_loader.get_rules()
                 self._compiled_rules = []
+                self._head_rules = []
 
                 for rule in rules:
                     # Only include enabled rules
@@ -95,12 +112,54 @@ class RoutingEngine:
 
                     # Store rule with its compiled matcher
                     self._compiled_rules.append((rule, matcher))
+                    if any(key in conditions for key in HeadMatcher.HEAD_CONDITIONS):
+                        self._head_rules.append((rule, matcher))
 
                 logger.info(f"Compiled {len(self._compiled_rules)} routing rules")
 
             except Exception as e:
                 logger.error(f"Failed to compile rules: {e}")
                 self._compiled_rules = []
+                self._head_rules = []
+
+    @property
+    def has_head_rules(self) -> bool:
+        """Whether any enabled rule matches on <head> content."""
+        return bool(self._head_rules)
+
+    def evaluate_head(self, url: str, head: Any) -> Optional[RoutingDecision]:
+        """
+        Evaluate rules with head_* conditions once the page's <head> arrived.
+
+        Args:
+            url: URL being fetched
+            head: fetchers.streaming.HeadInfo parsed from the response
+
+        Returns:
+            Decision of the highest-priority matching head rule, or None
+        """
+        with self._lock:
+            rules = list(self._head_rules)
+        context = {'head': head}
+        for rule, matcher in rules:
+            try:
+                if matcher.matches(url, context):
+                    action = rule['action']
+                    decision = RoutingDecision(
+                        fetcher=action['fetcher'],
+                        rule_name=rule['name'],
+                        priority=rule['priority'],
+                        reason=action.get('reason', 'No reason provided'),
+                        cached=False
+                    )
+                    logger.info(
+                        f"Head routing decision for {url}: {decision.fetcher} "
+                        f"(rule: {decision.rule_name}, priority: {decision.priority})"
+                    )
+                    return decision
+            except Exception as e:
+                logger.warning(f"Error evaluating head rule '{rule['name']}': {e}")
+        return None
 
     def evaluate(self, url: str, context: Optional[Dict[str, Any]] = None) -> RoutingDecision:
         """
@@ -130,8 +189,19 @@ class RoutingEngine:
 
             self._stats['cache_misses'] += 1
 
+            # Pinned rules win; learned routes come before the remaining rules
+            pinned_priority = self.config_loader.get_global_settings().get(
+                'pinned_rule_priority', DEFAULT_PINNED_RULE_PRIORITY)
+            learned_checked = False
+
             # Evaluate rules in priority order (already sorted by ConfigLoader)
             for rule, matcher in self._compiled_rules:
+                if not learned_checked and rule['priority'] < pinned_priority:
+                    learned_checked = True
+                    learned_decision = self._check_learned_route(url)
+                    if learned_decision:
+                        self._stats['learned_hits'] += 1
+                        return learned_decision
                 try:
                     if matcher.matches(url, context):
                         # Rule matched! Create decision
@@ -159,6 +229,12 @@ class RoutingEngine:
                     logger.warning(f"Error evaluating rule '{rule['name']}': {e}")
                     continue
 
+            if not learned_checked:
+                learned_decision = self._check_learned_route(url)
+                if learned_decision:
+                    self._stats['learned_hits'] += 1
+                    return learned_decision
+
             # No rule matched - use default fetcher
             default_fetcher = self.config_loader.get_global_settings().get('default_fetcher', 'urllib')
             decision = RoutingDecision(
@@ -172,6 +248,39 @@ class RoutingEngine:
             logger.info(f"No matching rule for {url}, using default: {default_fetcher}")
             return decision
 
+    def _check_learned_route(self, url: str) -> Optional[RoutingDecision]:
+        """
+        Consult the host outcome store for a learned route.
+
+        Args:
+            url: URL to route
+
+        Returns:
+            Decision for a learned browser fetcher, or None
+        """
+        if self.outcome_store is None:
+            return None
+
+        try:
+            host = urlparse(url).hostname
+            route = self.outcome_store.recommend(host)
+        except Exception as e:
+            logger.warning(f"Learned route lookup failed for {url}: {e}")
+            return None
+
+        if route is None:
+            return None
+
+        decision = RoutingDecision(
+            fetcher=route.fetcher,
+            rule_name=f"learned:{route.host}",
+            priority=LEARNED_ROUTE_PRIORITY,
+            reason=route.reason,
+            cached=False
+        )
+        logger.info(f"Learned routing decision for {url}: {decision.fetcher} ({decision.reason})")
+        return decision
+
     def _check_cache(self, url: str, context: Optional[Dict[str, Any]]) -> Optional[RoutingDecision]:
         """
         Check if routing decision is cached.
@@ -0,0 +1,328 @@
+"""
+Host Outcome Store for Web Fetcher
+
+Persists which fetcher worked for each host so the routing engine can skip
+the urllib retry ladder on hosts that consistently need a browser.
+记录每个主机各获取器的成功/失败情况并持久化，供路由引擎跳过注定失败的 urllib 重试。
+
+Counts decay exponentially (half-life ``DEFAULT_HALF_LIFE``) so stale
+evidence fades, and a learned route is periodically ignored so the cheaper
+urllib path gets re-probed.
+计数按半衰期指数衰减；学习到的路由会定期让位给 urllib 以重新探测。
+
+Records only mark the store dirty; it is written at most every
+``SAVE_INTERVAL`` seconds and at exit. Each save merges with the file on
+disk (newest attempt wins per host and fetcher) and replaces it through a
+per-process temp file, so parallel ``wf`` processes do not clobber each
+other's evidence.
+记录只标记为脏数据，最多每 SAVE_INTERVAL 秒及退出时写盘；写盘前与磁盘内容合并，
+并通过进程独立的临时文件原子替换，避免并行进程互相覆盖。
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = Path.home() / ".cache" / "webfetcher" / "host_outcomes.json"
+
+# Cheapest first; learned routes only ever point at a browser fetcher
+FETCHER_COST_ORDER = ('urllib', 'cdp', 'selenium')
+LEARNABLE_FETCHERS = ('cdp', 'selenium')
+
+DEFAULT_HALF_LIFE = 7 * 86400        # evidence halves every 7 days / 证据 7 天衰减一半
+DEFAULT_REPROBE_INTERVAL = 86400     # retry urllib once a day / 每天重新探测一次 urllib
+MIN_URLLIB_FAILURES = 1.5            # ~two recent urllib failures before learning / 学习前所需的 urllib 失败数
+MIN_BROWSER_SUCCESSES = 0.5         # decayed browser successes needed / 浏览器获取器所需成功数
+MIN_SUCCESS_RATE = 0.5
+MAX_HOSTS = 2000
+SAVE_INTERVAL = 30.0                 # seconds between autosaves / 自动保存间隔（秒）
+
+STORE_VERSION = 1
+
+
+@dataclass
+class FetcherOutcome:
+    """
+    Decayed outcome counters for one fetcher on one host.
+    单个主机上某获取器的（衰减）统计
+    """
+    successes: float = 0.0
+    failures: float = 0.0
+    avg_latency: float = 0.0
+    last_attempt: float = 0.0
+    last_success: float = 0.0
+    updated: float = 0.0
+    failure_classes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def success_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.successes / total if total else 0.0
+
+    def decay(self, now: float, half_life: float) -> None:
+        """Apply exponential decay since the last update / 按时间衰减计数"""
+        if self.updated and half_life > 0 and now > self.updated:
+            factor = 0.5 ** ((now - self.updated) / half_life)
+            self.successes *= factor
+            self.failures *= factor
+        self.updated = now
+
+
+@dataclass
+class LearnedRoute:
+    """A fetcher recommendation derived from past outcomes / 基于历史结果的路由建议"""
+    host: str
+    fetcher: str
+    reason: str
+    success_rate: float
+
+
+class HostOutcomeStore:
+    """
+    Persisted per-host fetcher outcomes.
+    持久化的主机级获取器结果存储
+
+    Usage:
+        store = HostOutcomeStore()
+        store.record("example.com", "urllib", success=False, error_class="ssl_config")
+        store.record("example.com", "cdp", success=True, latency=2.1)
+        route = store.recommend("example.com")   # LearnedRoute(fetcher='cdp', ...) once learned
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 half_life: float = DEFAULT_HALF_LIFE,
+                 reprobe_interval: float = DEFAULT_REPROBE_INTERVAL,
+                 autosave: bool = True):
+        """
+        Args:
+            path: JSON file (defaults to $WF_HOST_OUTCOMES_FILE or ~/.cache/webfetcher/host_outcomes.json)
+            half_life: Seconds after which counts are halved / 计数衰减半衰期（秒）
+            reprobe_interval: Seconds between urllib re-probes on learned hosts / 重新探测间隔（秒）
+            autosave: Write the file at most every SAVE_INTERVAL seconds and at exit
+                      / 定期及退出时自动写盘
+        """
+        self.path = Path(path or os.environ.get('WF_HOST_OUTCOMES_FILE') or DEFAULT_STORE_PATH)
+        self.half_life = half_life
+        self.reprobe_interval = reprobe_interval
+        self.autosave = autosave
+        self._lock = threading.RLock()
+        self._hosts: Optional[Dict[str, Dict[str, FetcherOutcome]]] = None
+        self._dirty = False
+        self._last_save = time.time()
+        # Hosts reset in this process: older entries on disk must not come back
+        self._reset_at: Dict[str, float] = {}
+        self._cleared_at = 0.0
+        if autosave:
+            atexit.register(self.flush)
+
+    # ------------------------------------------------------------------
+    # Persistence / 持久化
+    # ------------------------------------------------------------------
+    def _read_file(self) -> Dict[str, Dict[str, FetcherOutcome]]:
+        """Hosts stored on disk; empty when missing or unreadable / 读取磁盘内容"""
+        hosts: Dict[str, Dict[str, FetcherOutcome]] = {}
+        try:
+            if self.path.exists():
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+                if data.get('version') == STORE_VERSION:
+                    for host, fetchers in data.get('hosts', {}).items():
+                        hosts[host] = {
+                            name: FetcherOutcome(**values)
+                            for name, values in fetchers.items()
+                        }
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable host outcome store {self.path}: {e}")
+            return {}
+        return hosts
+
+    def _load(self) -> Dict[str, Dict[str, FetcherOutcome]]:
+        if self._hosts is None:
+            self._hosts = self._read_file()
+        return self._hosts
+
+    def _merge_from_disk(self, hosts: Dict[str, Dict[str, FetcherOutcome]]) -> None:
+        """Adopt entries other processes recorded more recently / 合并其他进程的新记录"""
+        for host, fetchers in self._read_file().items():
+            reset_at = max(self._cleared_at, self._reset_at.get(host, 0.0))
+            for name, theirs in fetchers.items():
+                if theirs.last_attempt <= reset_at:
+                    continue
+                ours = hosts.get(host, {}).get(name)
+                if ours is None or theirs.last_attempt > ours.last_attempt:
+                    hosts.setdefault(host, {})[name] = theirs
+
+    def flush(self) -> None:
+        """Save if anything was recorded since the last save / 有未保存记录时写盘"""
+        if self._dirty:
+            self.save()
+
+    def save(self) -> None:
+        """Merge with the file on disk and atomically replace it / 合并后原子写入磁盘"""
+        with self._lock:
+            hosts = self._load()
+            self._merge_from_disk(hosts)
+            self._prune(hosts)
+            self._dirty = False
+            self._last_save = time.time()
+            payload = {
+                'version': STORE_VERSION,
+                'hosts': {
+                    host: {name: asdict(outcome) for name, outcome in fetchers.items()}
+                    for host, fetchers in hosts.items()
+                }
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_text(json.dumps(payload, ensure_ascii=False, separators=(',', ':')),
+                                    encoding='utf-8')
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Failed to save host outcome store {self.path}: {e}")
+
+    def _prune(self, hosts: Dict[str, Dict[str, FetcherOutcome]]) -> None:
+        """Drop least recently updated hosts beyond MAX_HOSTS."""
+        if len(hosts) <= MAX_HOSTS:
+            return
+        by_age = sorted(hosts, key=lambda h: max(o.updated for o in hosts[h].values()))
+        for host in by_age[:len(hosts) - MAX_HOSTS]:
+            del hosts[host]
+
+    # ------------------------------------------------------------------
+    # Recording / 记录
+    # ------------------------------------------------------------------
+    def record(self, host: str, fetcher: str, success: bool,
+               latency: float = 0.0, error_class: Optional[str] = None) -> None:
+        """
+        Record one fetch attempt outcome.
+        记录一次获取结果
+
+        Args:
+            host: Hostname / 主机名
+            fetcher: Fetcher name (urllib, cdp, selenium, manual_chrome)
+            success: Whether the fetcher produced usable content / 是否成功
+            latency: Wall time in seconds / 耗时（秒）
+            error_class: Failure class (e.g. ErrorType value, "soft_failure") / 失败类型
+        """
+        if not host or not fetcher:
+            return
+        host = host.lower()
+        now = time.time()
+
+        with self._lock:
+            hosts = self._load()
+            outcome = hosts.setdefault(host, {}).setdefault(fetcher, FetcherOutcome())
+            outcome.decay(now, self.half_life)
+            outcome.last_attempt = now
+            if success:
+                outcome.successes += 1
+                outcome.last_success = now
+                if latency > 0:
+                    # EWMA keeps the figure responsive without storing samples
+                    outcome.avg_latency = latency if not outcome.avg_latency else \
+                        0.7 * outcome.avg_latency + 0.3 * latency
+            else:
+                outcome.failures += 1
+                if error_class:
+                    outcome.failure_classes[error_class] = outcome.failure_classes.get(error_class, 0) + 1
+            self._prune(hosts)
+            self._dirty = True
+            if self.autosave and now - self._last_save >= SAVE_INTERVAL:
+                self.save()
+
+    # ------------------------------------------------------------------
+    # Querying / 查询
+    # ------------------------------------------------------------------
+    def recommend(self, host: str) -> Optional[LearnedRoute]:
+        """
+        Return a learned browser route for the host, or None to use the normal chain.
+        返回学习到的路由；返回 None 表示走常规 urllib 优先流程
+
+        None is returned when urllib has not failed often enough, when no
+        browser fetcher has a good success record, or when urllib is due for
+        a re-probe.
+        """
+        if not host:
+            return None
+        host = host.lower()
+        now = time.time()
+
+        with self._lock:
+            fetchers = self._load().get(host)
+            if not fetchers:
+                return None
+
+            for outcome in fetchers.values():
+                outcome.decay(now, self.half_life)
+
+            urllib_outcome = fetchers.get('urllib')
+            if urllib_outcome is None:
+                return None
+            if urllib_outcome.failures < MIN_URLLIB_FAILURES or \
+                    urllib_outcome.successes >= urllib_outcome.failures:
+                return None
+
+            if now - urllib_outcome.last_attempt >= self.reprobe_interval:
+                logger.info(f"Learned route for {host} is due for a urllib re-probe")
+                return None
+
+            for name in LEARNABLE_FETCHERS:
+                outcome = fetchers.get(name)
+                if outcome and outcome.successes >= MIN_BROWSER_SUCCESSES and outcome.success_rate >= MIN_SUCCESS_RATE:
+                    classes = ', '.join(sorted(urllib_outcome.failure_classes)) or 'unknown'
+                    return LearnedRoute(
+                        host=host,
+                        fetcher=name,
+                        reason=(f"urllib failed {urllib_outcome.failures:.1f}x ({classes}); "
+                                f"{name} success rate {outcome.success_rate:.0%}"),
+                        success_rate=outcome.success_rate
+                    )
+            return None
+
+    def get_host(self, host: str) -> Dict[str, FetcherOutcome]:
+        """Outcomes recorded for one host / 获取单个主机的记录"""
+        with self._lock:
+            return dict(self._load().get((host or '').lower(), {}))
+
+    def list_hosts(self) -> List[str]:
+        """All recorded hosts, most recently updated first / 所有已记录主机"""
+        with self._lock:
+            hosts = self._load()
+            return sorted(hosts, key=lambda h: -max(o.updated for o in hosts[h].values()))
+
+    def reset(self, host: Optional[str] = None) -> int:
+        """
+        Forget one host, or everything when host is None.
+        重置单个主机或全部记录
+
+        Returns:
+            int: Number of hosts removed
+        """
+        with self._lock:
+            hosts = self._load()
+            now = time.time()
+            if host is None:
+                removed = len(hosts)
+                hosts.clear()
+                self._cleared_at = now
+            else:
+                removed = 1 if hosts.pop(host.lower(), None) is not None else 0
+                self._reset_at[host.lower()] = now
+            self.save()
+            return removed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot for display / 导出快照"""
+        with self._lock:
+            return {
+                host: {name: asdict(outcome) for name, outcome in fetchers.items()}
+                for host, fetchers in self._load().items()
+            }
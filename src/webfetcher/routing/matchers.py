@@ -134,6 +134,53 @@ class AlwaysMatcher(BaseMatcher):
         return True
 
 
+class HeadMatcher(BaseMatcher):
+    """
+    Matches on the page's <head>, available once urllib has streamed it.
+
+    Conditions:
+        head_title: regex searched in the <title>
+        head_meta: {meta name/property: regex searched in its content}
+
+    Only matches when the context carries a ``head`` (fetchers.streaming.HeadInfo),
+    so URL-only evaluation never selects a head rule.
+    """
+
+    HEAD_CONDITIONS = ('head_title', 'head_meta')
+
+    def __init__(self, title: Optional[str] = None, meta: Optional[Dict[str, str]] = None):
+        """
+        Initialize head matcher.
+
+        Args:
+            title: Regex for the page title
+            meta: Meta name/property -> regex for its content
+        """
+        self.title = self._compile(title) if title else None
+        self.meta = {name.lower(): self._compile(pattern) for name, pattern in (meta or {}).items()}
+
+    @staticmethod
+    def _compile(pattern: str):
+        try:
+            return re.compile(pattern)
+        except re.error as e:
+            logger.error(f"Invalid regex pattern '{pattern}': {e}")
+            return re.compile(r'(?!.*)')
+
+    def matches(self, url: str, context: Optional[Dict[str, Any]] = None) -> bool:
+        """Check the streamed <head> against title/meta patterns."""
+        head = (context or {}).get('head')
+        if head is None:
+            return False
+        if self.title is not None and not self.title.search(head.title or ''):
+            return False
+        for name, regex in self.meta.items():
+            content = head.meta.get(name)
+            if content is None or not regex.search(content):
+                return False
+        return True
+
+
 class CompositeMatcher(BaseMatcher):
     """
     Combines multiple matchers with AND logic.
@@ -170,6 +217,7 @@ def create_matcher(conditions: Dict[str, Any]) -> BaseMatcher:
         {"domain_list": ["a.com", "b.com"]} -> DomainListMatcher
         {"url_pattern": ".*\\.pdf$"} -> PatternMatcher
         {"always": true} -> AlwaysMatcher
+        {"head_meta": {"generator": "^Nuxt"}} -> HeadMatcher
     """
     matchers = []
 
@@ -185,6 +233,10 @@ def create_matcher(conditions: Dict[str, Any]) -> BaseMatcher:
     if 'url_pattern' in conditions:
         matchers.append(PatternMatcher(conditions['url_pattern']))
 
+    # <head> conditions, evaluated once urllib has streamed the head
+    if any(key in conditions for key in HeadMatcher.HEAD_CONDITIONS):
+        matchers.append(HeadMatcher(conditions.get('head_title'), conditions.get('head_meta')))
+
     # Always condition (for default rules)
     if conditions.get('always', False):
         return AlwaysMatcher()
@@ -1,4 +1,8 @@
 """Utility functions."""
-from .url_formatter import insert_dual_url_section
+from .url_formatter import insert_dual_url_section, normalize_media_url
+from .timing import Timings, span, timed, enable_timings, disable_timings, get_timings
+from .profiling import Profiler, start_profiler, stop_profiler, get_profiler, profile_page, profile_checkpoint
 
-__all__ = ['insert_dual_url_section']
+__all__ = ['insert_dual_url_section', 'normalize_media_url',
+           'Timings', 'span', 'timed', 'enable_timings', 'disable_timings', 'get_timings',
+           'Profiler', 'start_profiler', 'stop_profiler', 'get_profiler', 'profile_page', 'profile_checkpoint']
@@ -0,0 +1,368 @@
+"""
+Built-in Profiling (wf --profile cpu|alloc)
+内置性能分析
+
+cpu
+    Runs the pipeline under cProfile and, alongside it, a stack sampler that
+    records every thread's stack every few milliseconds. Writes the pstats
+    file (``python -m pstats``, snakeviz) and the samples as collapsed stacks
+    (flamegraph.pl, speedscope), and prints the top functions by own time.
+    cProfile 记录主线程的函数耗时，采样器记录所有线程（含预取线程）的调用栈。
+
+alloc
+    Runs the pipeline under tracemalloc. Writes the memory live at the
+    fullest checkpoint as collapsed stacks weighted by bytes, and prints the
+    top allocation sites and the peak traced memory. tracemalloc's overhead
+    grows with the frames kept per allocation, so stacks are cut to
+    $WF_PROFILE_ALLOC_FRAMES frames (default 10); cut stacks start at a
+    "[truncated]" frame in the collapsed file.
+    使用 tracemalloc 记录内存分配，输出分配热点与峰值；保留的栈帧数越多开销越大，
+    可通过 WF_PROFILE_ALLOC_FRAMES 调整（默认 10）。
+
+Either mode also attributes parse cost to the template that handled each
+page (wall and CPU time; allocations in alloc mode), which in crawl mode
+adds up every page of the site.
+两种模式都会按模板统计每个页面的解析开销，爬取模式下汇总全站页面。
+
+Files are written to the output directory as profile-<timestamp>-<mode>.*
+文件写入输出目录，命名为 profile-<时间>-<模式>.*
+"""
+
+import cProfile
+import datetime
+import linecache
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROFILE_MODES = ('cpu', 'alloc')
+DEFAULT_PROFILE_TOP = 20
+SAMPLE_INTERVAL = 0.005  # Stack sampling period (s) / 调用栈采样间隔
+ALLOC_FRAMES = 10        # Frames kept per allocation traceback / 每个分配保留的栈帧数
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+
+class StackSampler:
+    """
+    Periodically sample every thread's stack into collapsed-stack counts.
+    定期采样所有线程的调用栈，按折叠栈计数
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='wf-profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f'thread-{ident}').replace(';', ','))
+                self.counts[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class TemplateCost:
+    __slots__ = ('pages', 'wall', 'cpu', 'alloc_peak', 'alloc_net')
+
+    def __init__(self):
+        self.pages = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.alloc_peak = 0
+        self.alloc_net = 0
+
+
+class _PageCost:
+    """Measures one page parse; set .template before leaving / 记录单个页面的解析开销"""
+
+    def __init__(self, profiler: 'Profiler'):
+        self.profiler = profiler
+        self.template = None
+
+    def __enter__(self):
+        self._tracing = tracemalloc.is_tracing()
+        if self._tracing:
+            self._memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak = net = 0
+        if self._tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            peak, net = peak - self._memory, current - self._memory
+        self.profiler._add_page(self.template or 'unknown', wall, cpu, peak, net)
+        return False
+
+
+class _NullPage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_PAGE = _NullPage()
+
+
+class Profiler:
+    """
+    One profiling run / 一次性能分析
+
+    Usage:
+        profiler = Profiler('cpu', output_dir='output').start()
+        ...
+        profiler.stop()
+        print(profiler.report())
+    """
+
+    def __init__(self, mode: str, top: int = DEFAULT_PROFILE_TOP, output_dir: str = '.'):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r} (expected one of {', '.join(PROFILE_MODES)})")
+        self.mode = mode
+        self.top = top
+        self.output_dir = Path(output_dir)
+        self.templates: Dict[str, TemplateCost] = {}
+        self.files: List[Path] = []
+        self._lock = threading.Lock()
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._snapshot = None
+        self._snapshot_label = None
+        self._snapshot_size = -1
+        self._peak = 0
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> 'Profiler':
+        self._started = time.perf_counter()
+        if self.mode == 'cpu':
+            self._sampler = StackSampler()
+            self._sampler.start()
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            tracemalloc.start(int(os.environ.get('WF_PROFILE_ALLOC_FRAMES', ALLOC_FRAMES)))
+        return self
+
+    def checkpoint(self, label: str) -> None:
+        """
+        Keep a snapshot of live memory if it is the fullest so far (alloc mode).
+        若当前内存为目前最多，则保存快照（alloc 模式）
+        """
+        if self.mode != 'alloc' or not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self._peak = max(self._peak, peak)
+        if current > self._snapshot_size:
+            self._snapshot = tracemalloc.take_snapshot()
+            self._snapshot_label = label
+            self._snapshot_size = current
+
+    def page(self) -> _PageCost:
+        return _PageCost(self)
+
+    def _add_page(self, template: str, wall: float, cpu: float, peak: int, net: int) -> None:
+        with self._lock:
+            cost = self.templates.get(template)
+            if cost is None:
+                cost = self.templates[template] = TemplateCost()
+            cost.pages += 1
+            cost.wall += wall
+            cost.cpu += cpu
+            cost.alloc_peak = max(cost.alloc_peak, peak)
+            cost.alloc_net += net
+
+    def stop(self) -> List[Path]:
+        """Stop profiling and write the output files / 停止分析并写出文件"""
+        self.duration = time.perf_counter() - self._started
+        base = f"profile-{datetime.datetime.now().strftime('%Y-%m-%d-%H%M%S')}-{self.mode}"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == 'cpu':
+            self._profile.disable()
+            self._sampler.stop()
+            prof_path = self.output_dir / f"{base}.prof"
+            self._profile.dump_stats(str(prof_path))
+            collapsed_path = self.output_dir / f"{base}.collapsed"
+            self._sampler.write(collapsed_path)
+            self.files += [prof_path, collapsed_path]
+        else:
+            self.checkpoint('end of run')
+            tracemalloc.stop()
+            collapsed_path = self.output_dir / f"{base}.collapsed"
+            self._write_alloc_stacks(collapsed_path)
+            self.files.append(collapsed_path)
+        report_path = self.output_dir / f"{base}.txt"
+        report_path.write_text(self.report(), encoding='utf-8')
+        self.files.append(report_path)
+        return self.files
+
+    def _snapshot_filtered(self):
+        return self._snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    def _write_alloc_stacks(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            if self._snapshot is None:
+                return
+            # Grouped from the raw traces: statistics() drops total_nframe, which tells cut stacks apart
+            sizes: Counter = Counter()
+            for trace in self._snapshot_filtered().traces:
+                # Traceback frames run oldest to newest, as collapsed stacks expect
+                frames = [f"{os.path.basename(frame.filename)}:{frame.lineno}".replace(';', ',')
+                          for frame in trace.traceback]
+                if (trace.traceback.total_nframe or 0) > len(frames):
+                    frames.insert(0, '[truncated]')
+                sizes[';'.join(frames)] += trace.size
+            for stack, size in sizes.most_common():
+                f.write(f"{stack} {size}\n")
+
+    def report(self) -> str:
+        """Top functions or allocation sites plus per-template costs / 热点函数或分配点及按模板开销"""
+        lines = [f"Profile ({self.mode}, {self.duration:.2f}s)"]
+        if self.mode == 'cpu' and self._profile is not None:
+            lines += self._cpu_lines()
+        elif self.mode == 'alloc':
+            lines += self._alloc_lines()
+        if self.templates:
+            lines += ['', 'Parse cost per template / 按模板统计的解析开销:',
+                      f"{'template':<32} {'pages':>6} {'wall':>10} {'cpu':>10} {'ms/page':>8}"
+                      + (f" {'peak':>10} {'retained':>10}" if self.mode == 'alloc' else '')]
+            for name, cost in sorted(self.templates.items(), key=lambda item: -item[1].wall):
+                line = (f"{name[:32]:<32} {cost.pages:>6} {cost.wall:>9.3f}s {cost.cpu:>9.3f}s "
+                        f"{cost.wall / cost.pages * 1000:>8.1f}")
+                if self.mode == 'alloc':
+                    line += f" {_format_size(cost.alloc_peak):>10} {_format_size(cost.alloc_net):>10}"
+                lines.append(line)
+        return '\n'.join(lines) + '\n'
+
+    def _cpu_lines(self) -> List[str]:
+        stats = pstats.Stats(self._profile)
+        total = sum(entry[2] for entry in stats.stats.values())
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:self.top]
+        lines = [f"Top {len(rows)} functions by own time (of {total:.2f}s profiled in the main thread):",
+                 f"{'calls':>9} {'own':>9} {'cumul':>9}  function"]
+        for (filename, lineno, name), (_, calls, own, cumulative, _) in rows:
+            where = f"{os.path.basename(filename)}:{lineno}" if filename != '~' else 'builtin'
+            lines.append(f"{calls:>9} {own:>8.3f}s {cumulative:>8.3f}s  {name} ({where})")
+        if self._sampler is not None:
+            lines.append(f"{self._sampler.samples} stack samples every {SAMPLE_INTERVAL * 1000:.0f}ms (all threads)")
+        return lines
+
+    def _alloc_lines(self) -> List[str]:
+        if self._snapshot is None:
+            return ['No allocation snapshot was taken']
+        stats = self._snapshot_filtered().statistics('lineno')[:self.top]
+        lines = [f"Peak traced memory: {_format_size(self._peak)}",
+                 f"Top {len(stats)} allocation sites live at {self._snapshot_label} "
+                 f"({_format_size(self._snapshot_size)} traced):",
+                 f"{'size':>10} {'blocks':>8}  location"]
+        for stat in stats:
+            frame = stat.traceback[0]
+            source = linecache.getline(frame.filename, frame.lineno).strip()
+            lines.append(f"{_format_size(stat.size):>10} {stat.count:>8}  "
+                         f"{os.path.basename(frame.filename)}:{frame.lineno}  {source[:60]}")
+        return lines
+
+
+def _format_size(size: int) -> str:
+    value = float(size)
+    for unit in ('B', 'KB', 'MB'):
+        if abs(value) < 1024:
+            return f"{value:.0f}{unit}" if unit == 'B' else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GB"
+
+
+_profiler: Optional[Profiler] = None
+
+
+def start_profiler(mode: str, top: int = DEFAULT_PROFILE_TOP, output_dir: str = '.') -> Profiler:
+    """Start the process-wide profiler (wf --profile) / 启动全局分析器"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(mode, top, output_dir).start()
+    return _profiler
+
+
+def stop_profiler() -> Optional[Profiler]:
+    """Stop the profiler and write its files; returns it / 停止分析器并写出文件"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def profile_page():
+    """
+    Context manager attributing a page parse to a template; set .template inside.
+    按模板记录页面解析开销的上下文管理器（在其中设置 .template）
+
+        with profile_page() as page:
+            date, md, metadata = parser(html, url)
+            page.template = metadata.get('template_used')
+    """
+    profiler = _profiler
+    if profiler is None:
+        return _NULL_PAGE
+    return profiler.page()
+
+
+def profile_checkpoint(label: str) -> None:
+    """Offer a memory snapshot point to the alloc profiler / 向 alloc 分析器提供快照时机"""
+    profiler = _profiler
+    if profiler is not None:
+        profiler.checkpoint(label)
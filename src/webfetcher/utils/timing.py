@@ -0,0 +1,208 @@
+"""
+Stage Timings
+阶段耗时统计
+
+A span/timer API for finding where a fetch spends its time:
+
+    from webfetcher.utils.timing import span, timed
+
+    with span('fetch'):
+        ...
+
+    @timed('parse.template')
+    def parse(...): ...
+
+Spans nest per thread, so a span opened inside another is reported under it,
+and repeated spans with the same path are aggregated (calls, total, self time,
+min, max). Recording is off until enable_timings() is called (wf --timings);
+while off, span() returns a shared no-op context manager and timed()
+functions call straight through, so instrumented code pays one global lookup.
+通过 enable_timings()（wf --timings）开启；关闭时 span() 返回共享的空上下文管理器，
+几乎没有开销。
+"""
+
+import functools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _NullSpan:
+    """Context manager used while timings are off / 关闭时使用的空上下文管理器"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _SpanStat:
+    __slots__ = ('calls', 'total', 'child', 'min', 'max')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.child = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+
+class _Span:
+    __slots__ = ('timings', 'name', 'path', 'start', 'child')
+
+    def __init__(self, timings: 'Timings', name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        stack = self.timings._stack()
+        self.path = (stack[-1].path if stack else ()) + (self.name,)
+        self.child = 0.0
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.timings._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child += elapsed
+        self.timings._add(self.path, elapsed, self.child)
+        return False
+
+
+class Timings:
+    """
+    Aggregated span timings of one run / 一次运行的阶段耗时汇总
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stats: Dict[Tuple[str, ...], _SpanStat] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[_Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, path: Tuple[str, ...], elapsed: float, child: float) -> None:
+        with self._lock:
+            stat = self._stats.get(path)
+            if stat is None:
+                stat = self._stats[path] = _SpanStat()
+            stat.calls += 1
+            stat.total += elapsed
+            stat.child += child
+            stat.min = min(stat.min, elapsed)
+            stat.max = max(stat.max, elapsed)
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    @property
+    def wall(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _ordered(self) -> List[Tuple[Tuple[str, ...], _SpanStat]]:
+        """Depth-first, siblings by total time / 深度优先，同级按总耗时排序"""
+        with self._lock:
+            items = list(self._stats.items())
+        children: Dict[Tuple[str, ...], list] = {}
+        for path, stat in items:
+            children.setdefault(path[:-1], []).append((path, stat))
+        ordered = []
+
+        def visit(parent):
+            for path, stat in sorted(children.get(parent, ()), key=lambda item: -item[1].total):
+                ordered.append((path, stat))
+                visit(path)
+        visit(())
+        # Spans whose parent was never closed (e.g. interrupted) still get listed
+        listed = {path for path, _ in ordered}
+        ordered += [(path, stat) for path, stat in items if path not in listed]
+        return ordered
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable breakdown / 可 JSON 序列化的耗时明细"""
+        wall = self.wall
+        return {
+            'wall_s': round(wall, 6),
+            'spans': [{
+                'name': path[-1],
+                'path': '/'.join(path),
+                'calls': stat.calls,
+                'total_s': round(stat.total, 6),
+                'self_s': round(max(stat.total - stat.child, 0.0), 6),
+                'min_s': round(stat.min, 6),
+                'max_s': round(stat.max, 6),
+            } for path, stat in self._ordered()],
+        }
+
+    def report(self) -> str:
+        """Per-stage table for --timings / --timings 输出的分阶段耗时表"""
+        wall = self.wall
+        lines = [f"{'stage':<36} {'calls':>6} {'total':>10} {'self':>10} {'%wall':>6}"]
+        for path, stat in self._ordered():
+            label = '  ' * (len(path) - 1) + path[-1]
+            share = stat.total / wall * 100 if wall else 0.0
+            lines.append(f"{label:<36} {stat.calls:>6} {stat.total * 1000:>8.1f}ms "
+                         f"{max(stat.total - stat.child, 0.0) * 1000:>8.1f}ms {share:>5.1f}%")
+        lines.append(f"{'wall':<36} {'':>6} {wall * 1000:>8.1f}ms")
+        return '\n'.join(lines) + '\n'
+
+
+_timings: Optional[Timings] = None
+
+
+def enable_timings() -> Timings:
+    """Start recording spans; returns the recorder / 开始记录耗时"""
+    global _timings
+    if _timings is None:
+        _timings = Timings()
+    return _timings
+
+
+def disable_timings() -> Optional[Timings]:
+    """Stop recording; returns what was recorded / 停止记录并返回已记录的耗时"""
+    global _timings
+    timings, _timings = _timings, None
+    return timings
+
+
+def get_timings() -> Optional[Timings]:
+    """The active recorder, or None when timings are off / 当前记录器，关闭时为 None"""
+    return _timings
+
+
+def span(name: str):
+    """
+    Context manager timing a stage; a no-op while timings are off.
+    记录一个阶段的耗时；关闭时为空操作
+    """
+    timings = _timings
+    if timings is None:
+        return _NULL_SPAN
+    return _Span(timings, name)
+
+
+def timed(name: str):
+    """Decorator recording every call of a function as a span / 将函数调用记录为阶段的装饰器"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _timings
+            if timings is None:
+                return func(*args, **kwargs)
+            with _Span(timings, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -11,8 +11,9 @@ Version: 1.0
 
 import re
 import logging
+from bisect import bisect_right
 from typing import Optional, List, Tuple
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urljoin
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -144,6 +145,48 @@ def normalize_url_for_display(url: str) -> str:
     return url
 
 
+def normalize_media_url(u: str, base_url: str = None) -> str:
+    """
+    Normalize media URL to absolute URL.
+
+    Args:
+        u: Media URL (can be absolute, protocol-relative, or relative)
+        base_url: Base URL to resolve relative URLs against
+
+    Returns:
+        Normalized absolute URL
+    """
+    if not u:
+        return u
+    u = u.strip()
+
+    # Already absolute URL (http:// or https://)
+    if u.startswith(('http://', 'https://')):
+        return u
+
+    # Protocol-relative URL (//example.com/image.jpg)
+    if u.startswith('//'):
+        return 'https:' + u
+
+    # Absolute path (/path/to/image.jpg)
+    if u.startswith('/'):
+        if base_url:
+            # Extract domain from base_url
+            parsed = urlparse(base_url)
+            return f"{parsed.scheme}://{parsed.netloc}{u}"
+        else:
+            # Fallback to https: prefix for protocol-relative
+            return 'https:' + u
+
+    # Relative path (image.jpg or path/image.jpg)
+    if base_url:
+        # Use urljoin to properly handle relative paths
+        return urljoin(base_url, u)
+    else:
+        # No base URL provided, return as-is
+        return u
+
+
 # ================================================================================
 # URL Detection Functions
 # ================================================================================
@@ -206,6 +249,47 @@ def detect_urls_in_text(text: str) -> List[Tuple[str, int, int]]:
 # Code Block Protection Functions
 # ================================================================================
 
+# Compiled once; finditer over the whole document yields every code span
+_INLINE_CODE_RE = re.compile(CODE_BLOCK_PATTERNS['inline'])
+_FENCED_CODE_RE = re.compile(CODE_BLOCK_PATTERNS['fenced'], re.DOTALL)
+_INDENTED_CODE_RE = re.compile(CODE_BLOCK_PATTERNS['indented'], re.MULTILINE)
+
+
+def _code_block_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Find all code regions in text in a single tokenization pass.
+
+    Inline, fenced and indented code are matched independently (as before)
+    and their union is returned as sorted, non-overlapping half-open
+    (start, end) spans.
+
+    Args:
+        text: Full text
+
+    Returns:
+        Sorted list of merged (start, end) spans
+    """
+    spans = [m.span() for m in _INLINE_CODE_RE.finditer(text)]
+    spans.extend(m.span() for m in _FENCED_CODE_RE.finditer(text))
+    spans.extend(m.span() for m in _INDENTED_CODE_RE.finditer(text))
+    spans.sort()
+
+    merged: List[Tuple[int, int]] = []
+    for span_start, span_end in spans:
+        if merged and span_start <= merged[-1][1]:
+            if span_end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], span_end)
+        else:
+            merged.append((span_start, span_end))
+    return merged
+
+
+def _in_spans(span_starts: List[int], spans: List[Tuple[int, int]], position: int) -> bool:
+    """Whether position falls inside one of the merged spans (binary search)."""
+    index = bisect_right(span_starts, position) - 1
+    return index >= 0 and position < spans[index][1]
+
+
 def _is_in_code_block(text: str, position: int) -> bool:
     """
     Check if a position in text is inside a code block.
@@ -217,34 +301,8 @@ def _is_in_code_block(text: str, position: int) -> bool:
     Returns:
         True if position is within a code block, False otherwise
     """
-    # Check inline code blocks
-    inline_pattern = re.compile(CODE_BLOCK_PATTERNS['inline'])
-    for match in inline_pattern.finditer(text):
-        if match.start() <= position < match.end():
-            logger.debug(f"Task-003 Phase 2: Position {position} is in inline code block")
-            return True
-
-    # Check fenced code blocks
-    fenced_pattern = re.compile(CODE_BLOCK_PATTERNS['fenced'], re.DOTALL)
-    for match in fenced_pattern.finditer(text):
-        if match.start() <= position < match.end():
-            logger.debug(f"Task-003 Phase 2: Position {position} is in fenced code block")
-            return True
-
-    # Check indented code blocks (per line basis)
-    lines = text.split('\n')
-    current_pos = 0
-    for line in lines:
-        line_end = current_pos + len(line)
-        if current_pos <= position < line_end:
-            # Check if this line is indented code
-            if re.match(CODE_BLOCK_PATTERNS['indented'], line):
-                logger.debug(f"Task-003 Phase 2: Position {position} is in indented code block")
-                return True
-            break
-        current_pos = line_end + 1  # +1 for newline
-
-    return False
+    spans = _code_block_spans(text)
+    return _in_spans([span[0] for span in spans], spans, position)
 
 
 def _is_existing_markdown_link(text: str, url_start: int) -> bool:
@@ -313,25 +371,47 @@ def replace_urls_with_markdown(text: str, preserve_code_blocks: bool = True) ->
 
     logger.info(f"Task-003 Phase 2: Found {len(urls)} URL(s) to process")
 
-    # Process URLs in reverse order to maintain position accuracy
-    result = text
+    spans = _code_block_spans(text) if preserve_code_blocks else []
+    span_starts = [span[0] for span in spans]
+
+    # Walk URLs in reverse so the link check sees exactly what it saw when the
+    # text was rewritten in place; output pieces are collected back to front
+    # and joined once.
+    pieces: List[str] = []
+    cursor = len(text)   # text[cursor:] has been emitted into pieces
+    ahead = ''           # first characters of the emitted text after cursor
     for url, start, end in reversed(urls):
         # Skip if in code block
-        if preserve_code_blocks and _is_in_code_block(result, start):
+        if spans and _in_spans(span_starts, spans, start):
             logger.debug(f"Task-003 Phase 2: Skipping URL in code block: {url}")
             continue
 
-        # Skip if already a markdown link
-        if _is_existing_markdown_link(result, start):
+        # Skip URLs that are a link's text ([url](...)) or an autolink (<url>)
+        before, after = text[start - 1:start], text[end:end + 2]
+        if (before == '[' and after == '](') or (before == '<' and after[:1] == '>'):
+            logger.debug(f"Task-003 Phase 2: Skipping linked URL text: {url}")
+            continue
+
+        # Skip if already a markdown link (looks 100 chars back, 10 ahead)
+        window_start = max(0, start - 100)
+        window = text[window_start:min(start + 10, cursor)]
+        if start + 10 > cursor:
+            window += ahead[:start + 10 - cursor]
+        if _is_existing_markdown_link(window, start - window_start):
             logger.debug(f"Task-003 Phase 2: Skipping existing markdown link: {url}")
             continue
 
         # Replace with markdown link
         markdown_link = format_url_as_markdown(url)
-        result = result[:start] + markdown_link + result[end:]
+        pieces.append(text[end:cursor])
+        pieces.append(markdown_link)
+        ahead = (markdown_link + text[end:min(cursor, end + 10)] + ahead)[:10]
+        cursor = start
         logger.debug(f"Task-003 Phase 2: Replaced '{url}' with '{markdown_link}'")
 
-    return result
+    pieces.append(text[:cursor])
+    pieces.reverse()
+    return ''.join(pieces)
 
 
 # ================================================================================
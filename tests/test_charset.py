@@ -0,0 +1,84 @@
+"""Charset detection: BOMs, declared charsets, CJK statistics and incremental decoding."""
+import codecs
+
+import pytest
+
+from webfetcher.fetchers.charset import (
+    SAMPLE_BYTES, IncrementalHTMLDecoder, decode_html, detect_charset, normalize_encoding,
+)
+
+ZH_SIMPLIFIED = '政府信息公开目录，关于进一步加强网络安全管理工作的通知。' * 20
+ZH_TRADITIONAL = '這是一篇關於臺灣歷史與文化發展的長篇報導內容。' * 20
+
+
+def _page(text, head=''):
+    return f'<html><head>{head}<title>t</title></head><body><p>{text}</p></body></html>'
+
+
+def test_bom_wins_over_declared_charsets():
+    body = codecs.BOM_UTF8 + _page(ZH_SIMPLIFIED, '<meta charset="gbk">').encode('utf-8')
+    assert detect_charset(body, declared='gbk').encoding == 'utf-8-sig'
+    assert detect_charset(body).source == 'bom'
+    utf16 = _page('hello').encode('utf-16')
+    assert detect_charset(utf16, declared='utf-8').encoding == 'utf-16'
+    assert decode_html(body).text.startswith('<html>')
+
+
+def test_declared_charset_is_used_when_the_sample_agrees():
+    body = _page(ZH_SIMPLIFIED).encode('gbk')
+    result = detect_charset(body, declared='gb2312')
+    assert (result.encoding, result.source) == ('gb18030', 'header')
+    meta = _page(ZH_SIMPLIFIED, '<meta http-equiv="Content-Type" content="text/html; charset=GBK">').encode('gbk')
+    assert detect_charset(meta).source == 'meta'
+
+
+def test_wrong_declarations_fall_through_to_the_sample():
+    body = _page(ZH_SIMPLIFIED, '<meta charset="utf-8">').encode('gbk')
+    result = detect_charset(body, declared='utf-8')
+    assert (result.encoding, result.source) == ('gb18030', 'cjk-statistics')
+    assert detect_charset(_page(ZH_SIMPLIFIED).encode('utf-8'), declared='big5').source == 'utf8-sample'
+    assert normalize_encoding('no-such-charset') is None
+
+
+def test_big5_is_told_apart_from_gbk():
+    assert detect_charset(_page(ZH_TRADITIONAL).encode('big5')).encoding == 'big5'
+    assert detect_charset(_page(ZH_SIMPLIFIED).encode('gbk')).encoding == 'gb18030'
+
+
+@pytest.mark.parametrize('encoding', ['gbk', 'big5'])
+def test_cjk_after_an_ascii_head_is_not_replaced(encoding):
+    text = ZH_SIMPLIFIED if encoding == 'gbk' else ZH_TRADITIONAL
+    body = _page(text, '<script>' + 'var x = 1;' * (SAMPLE_BYTES // 10 + 1) + '</script>').encode(encoding)
+    assert detect_charset(body).source == 'ascii'
+    document = decode_html(body)
+    assert text in document.text and not document.errors_replaced
+    assert document.source == 'cjk-statistics'
+
+
+def _stream(body, chunk_size, declared=None):
+    decoder = IncrementalHTMLDecoder(declared)
+    parts = [decoder.feed(body[i:i + chunk_size]) for i in range(0, len(body), chunk_size)]
+    parts.append(decoder.finish())
+    return ''.join(parts), decoder
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 4096])
+def test_multibyte_sequences_split_across_chunks(chunk_size):
+    page = _page(ZH_SIMPLIFIED + ' 😀')
+    text, decoder = _stream(page.encode('utf-8'), chunk_size, declared='utf-8')
+    assert text == page and not decoder.errors_replaced
+    text, decoder = _stream(_page(ZH_SIMPLIFIED).encode('gbk'), chunk_size, declared='gbk')
+    assert text == _page(ZH_SIMPLIFIED) and decoder.encoding == 'gb18030'
+
+
+def test_streaming_switches_to_cjk_after_an_ascii_head():
+    page = _page(ZH_SIMPLIFIED, '<style>' + 'p{margin:0}' * (SAMPLE_BYTES // 11 + 1) + '</style>')
+    text, decoder = _stream(page.encode('gbk'), 1000)
+    assert text == page
+    assert (decoder.encoding, decoder.source, decoder.errors_replaced) == ('gb18030', 'cjk-statistics', False)
+
+
+def test_undecodable_bytes_are_replaced_and_flagged():
+    body = _page('caf\xe9 ' * 10).encode('utf-8') + b'\xff\xfe\xfa'
+    text, decoder = _stream(body, 64, declared='utf-8')
+    assert decoder.errors_replaced and '�' in text
@@ -0,0 +1,46 @@
+"""ContentFilter golden output at every filter level."""
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from webfetcher.core import ContentFilter
+
+GOLDEN = Path(__file__).parent / 'golden' / 'content_filter'
+PAGE = (GOLDEN / 'page.html').read_text(encoding='utf-8')
+
+
+def _filter(level):
+    content_filter = ContentFilter(level)
+    soup = content_filter.filter_content(BeautifulSoup(PAGE, 'html.parser'))
+    return content_filter, str(soup)
+
+
+@pytest.mark.parametrize('level', ['safe', 'moderate', 'aggressive'])
+def test_output_matches_the_golden_file(level):
+    _, output = _filter(level)
+    assert output == (GOLDEN / f'{level}.html').read_text(encoding='utf-8')
+
+
+def test_stats_count_removals_per_category():
+    content_filter, _ = _filter('moderate')
+    assert content_filter.get_filter_stats() == {
+        'script/style': 3, 'hidden': 1, 'hidden class': 2, 'ad': 4, 'navigation': 4,
+    }
+
+
+def test_removed_elements_is_still_available():
+    content_filter, _ = _filter('safe')
+    removed = content_filter.removed_elements
+    assert len(removed) == 10 and removed[:2] == ['script/style: style', 'script/style: script']
+    assert sorted(removed) == sorted(
+        ['script/style: style', 'script/style: script', 'script/style: noscript', 'hidden: div',
+         'hidden class: span', 'hidden class: div'] + ['ad: div'] * 4)
+    aggressive, _ = _filter('aggressive')
+    assert aggressive.get_filter_stats()['metadata'] == 2
+    assert not any(item.startswith('metadata') for item in aggressive.removed_elements)
+
+
+def test_unknown_level_leaves_the_page_alone():
+    content_filter, output = _filter('none')
+    assert output == str(BeautifulSoup(PAGE, 'html.parser')) and content_filter.removed_elements == []
@@ -0,0 +1,123 @@
+"""Soft-failure scoring and the render host memo."""
+import pytest
+
+from webfetcher import core
+from webfetcher.fetchers.content_sufficiency import RenderHostMemo, render_host_memo, score_content
+
+EXAMPLE_COM = """<!doctype html>
+<html>
+<head>
+    <title>Example Domain</title>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <style type="text/css">
+    body { background-color: #f0f0f2; margin: 0; padding: 0;
+        font-family: -apple-system, system-ui, BlinkMacSystemFont, "Segoe UI", "Open Sans", "Helvetica Neue", Helvetica, Arial, sans-serif; }
+    div { width: 600px; margin: 5em auto; padding: 2em; background-color: #fdfdff;
+        border-radius: 0.5em; box-shadow: 2px 3px 7px 2px rgba(0,0,0,0.02); }
+    a:link, a:visited { color: #38488f; text-decoration: none; }
+    @media (max-width: 700px) { div { margin: 0 auto; width: auto; } }
+    </style>
+</head>
+<body>
+<div>
+    <h1>Example Domain</h1>
+    <p>This domain is for use in illustrative examples in documents. You may use this
+    domain in literature without prior coordination or asking for permission.</p>
+    <p><a href="https://www.iana.org/domains/example">More information...</a></p>
+</div>
+</body>
+</html>
+"""
+
+RICH_TEXT = '<p>' + 'Plenty of readable article text. ' * 20 + '</p>'
+
+
+def test_static_page_with_inline_css_is_not_a_soft_failure():
+    report = score_content(EXAMPLE_COM)
+    assert report.text_chars < 250
+    assert report.scripts == 0
+    assert report.script_bytes == 0
+    assert not report.is_soft_failure
+
+
+def test_tiny_static_page_is_not_a_soft_failure():
+    html = '<html><head><style>p{color:red}</style></head><body><p>Hi</p></body></html>'
+    assert not score_content(html).is_soft_failure
+
+
+def test_json_ld_does_not_count_as_script():
+    html = ('<html><head><script type="application/ld+json">' + '{"a": 1}' * 200
+            + '</script></head><body><p>Short note</p></body></html>')
+    report = score_content(html)
+    assert report.scripts == 0
+    assert not report.is_soft_failure
+
+
+def test_empty_spa_mount_point_is_a_soft_failure():
+    html = '<html><body><div id="root"></div><script src="/app.js"></script></body></html>'
+    report = score_content(html)
+    assert report.is_soft_failure
+    assert report.spa_root == 'root'
+
+
+def test_script_dominated_page_is_a_soft_failure():
+    html = ('<html><body><p>Loading</p><script>' + 'var x = 1;' * 200
+            + '</script></body></html>')
+    report = score_content(html)
+    assert report.scripts == 1
+    assert report.is_soft_failure
+    assert 'script-dominated' in report.reason
+
+
+def test_rich_page_with_scripts_is_accepted():
+    html = '<html><body>' + RICH_TEXT + '<script>' + 'var x = 1;' * 500 + '</script></body></html>'
+    assert not score_content(html).is_soft_failure
+
+
+def test_empty_document_is_a_soft_failure():
+    assert score_content('   ').is_soft_failure
+
+
+def test_memo_record_and_forget():
+    memo = RenderHostMemo()
+    memo.record('Example.COM', 'shell')
+    assert memo.needs_rendering('example.com') == 'shell'
+    memo.forget('example.com')
+    assert memo.needs_rendering('example.com') is None
+
+
+@pytest.fixture
+def clean_memo():
+    render_host_memo.clear()
+    yield render_host_memo
+    render_host_memo.clear()
+
+
+def _soft_failure_with_renderer(monkeypatch, rendered_html):
+    def fake_fallback(url, ua, timeout, metrics, start_time, error, input_url=None, force_chrome=False):
+        return rendered_html, metrics, {'final_url': url}
+
+    monkeypatch.setattr(core, '_try_cdp_fallback_after_urllib_failure', fake_fallback)
+    shell = '<div id="root"></div><script src="/app.js"></script>'
+    return core._try_renderer_after_soft_failure(
+        'https://spa.example/page', None, 10, core.FetchMetrics(), 0.0, None, False,
+        shell, {'final_url': 'https://spa.example/page'}, 'empty SPA mount point')
+
+
+def test_host_is_remembered_only_when_rendering_helps(monkeypatch, clean_memo):
+    html, metrics, _ = _soft_failure_with_renderer(monkeypatch, '<html><body>' + RICH_TEXT + '</body></html>')
+    assert 'Plenty of readable' in html
+    assert clean_memo.needs_rendering('spa.example') == 'empty SPA mount point'
+
+
+def test_host_is_not_remembered_when_renderer_fails(monkeypatch, clean_memo):
+    clean_memo.record('spa.example', 'earlier shell')
+    html, metrics, _ = _soft_failure_with_renderer(monkeypatch, '')
+    assert 'id="root"' in html
+    assert clean_memo.needs_rendering('spa.example') is None
+
+
+def test_host_is_not_remembered_when_rendered_page_is_still_thin(monkeypatch, clean_memo):
+    _soft_failure_with_renderer(monkeypatch, '<div id="root"></div><script src="/app.js"></script>')
+    assert clean_memo.needs_rendering('spa.example') is None
@@ -0,0 +1,83 @@
+"""Non-HTML responses: routed to the downloader, released when a crawl skips them."""
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from webfetcher import core
+from webfetcher.fetchers.streaming import NonHTMLContentError, read_html_stream
+
+PDF = b'%PDF-1.4\n' + b'0' * 4096
+
+
+class _Response(io.BytesIO):
+    def __init__(self, body, content_type):
+        super().__init__(body)
+        self.headers = {'Content-Type': content_type, 'Content-Length': str(len(body))}
+
+
+def test_binary_response_is_handed_over_unread():
+    response = _Response(PDF, 'application/pdf')
+    with pytest.raises(NonHTMLContentError) as info:
+        read_html_stream(response, 'https://files.example/report.pdf')
+    error = info.value
+    assert error.response is response and response.tell() == 0
+    assert (error.content_type, error.content_length) == ('application/pdf', len(PDF))
+    error.close()
+    assert response.closed and error.response is None
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/latest':
+                self.send_response(302)
+                self.send_header('Location', '/files/annual-report.pdf')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/pdf')
+            self.send_header('Content-Length', str(len(PDF)))
+            self.end_headers()
+            self.wfile.write(PDF)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_redirected_download_is_named_after_the_final_url(monkeypatch, server, tmp_path, capsys):
+    monkeypatch.setattr(core, 'host_outcome_store', None)
+    monkeypatch.setattr('sys.argv', ['wf', f'{server}/latest', '-o', str(tmp_path), '--urllib'])
+    core.main()
+    saved = tmp_path / 'annual-report.pdf'
+    assert saved.read_bytes() == PDF
+    assert str(saved) in capsys.readouterr().out
+
+
+def test_crawl_closes_skipped_binary_responses(monkeypatch):
+    responses = []
+    page = '<html><body><p>' + 'Index text. ' * 40 + '</p><a href="/report.pdf">PDF</a></body></html>'
+
+    def fetch(url, ua, render=False):
+        if url.endswith('.pdf'):
+            response = _Response(PDF, 'application/pdf')
+            responses.append(response)
+            raise NonHTMLContentError(url, 'application/pdf', response=response)
+        return page
+
+    monkeypatch.setattr(core, '_fetch_crawl_page', fetch)
+    monkeypatch.setattr(core, 'should_crawl_url', lambda url: True)
+    monkeypatch.setattr(core, 'is_documentation_url', lambda url: True)
+    pages = core.crawl_site('https://docs.example/', 'test-agent', max_depth=1, max_pages=10, delay=0,
+                            crawl_order='bfs', enable_optimizations=False)
+    assert [url for url, _, _ in pages] == ['https://docs.example/']
+    assert responses and all(response.closed for response in responses)
@@ -0,0 +1,86 @@
+"""Error classification cache: signatures, amortized expiry and the shared SQLite backend."""
+from urllib.error import HTTPError, URLError
+
+from webfetcher.errors.cache import ErrorCache, SQLiteCacheBackend
+from webfetcher.errors.classifier import UnifiedErrorClassifier
+from webfetcher.errors.types import ErrorClassification, ErrorType
+
+URL = 'https://site.example/page'
+
+
+def _classification(error_type=ErrorType.TEMPORARY):
+    return ErrorClassification(error_type=error_type, should_retry=True, recommended_wait=1.0,
+                               max_retries=3, fallback_method=None, reason='test', confidence=0.9)
+
+
+def test_status_codes_and_errnos_stay_in_the_signature():
+    cache = ErrorCache()
+    keys = {cache.generate_cache_key(Exception(f'HTTP Error {code}'), URL) for code in (404, 429, 500)}
+    assert len(keys) == 3
+    assert ErrorCache.error_signature(URLError(ConnectionRefusedError(111, 'Connection refused'))) \
+        != ErrorCache.error_signature(URLError(ConnectionRefusedError(110, 'Connection refused')))
+    assert ErrorCache.error_signature(HTTPError(URL, 503, 'Unavailable', {}, None)) == 'HTTPError:503'
+
+
+def test_urls_addresses_and_long_numbers_are_masked():
+    first = Exception('Read timed out after 30000 ms fetching https://site.example/a from 10.0.0.12 (0x7f3a)')
+    second = Exception('Read timed out after 45000 ms fetching https://site.example/b from 10.0.0.99 (0x7f3b)')
+    assert ErrorCache.error_signature(first) == ErrorCache.error_signature(second)
+    cache = ErrorCache()
+    assert cache.generate_cache_key(first, URL) != cache.generate_cache_key(first, 'https://other.example/')
+    assert cache.generate_cache_key(first, URL, scope='signature').startswith('*|')
+
+
+def test_cached_404_does_not_hide_a_later_500_on_the_same_host():
+    classifier = UnifiedErrorClassifier()
+    assert classifier.classify_error(Exception('HTTP Error 404'), URL).error_type == ErrorType.PERMANENT
+    assert classifier.classify_error(Exception('HTTP Error 500'), URL).error_type == ErrorType.TEMPORARY
+    assert classifier.classify_error(Exception('HTTP Error 429'), URL).error_type == ErrorType.RATE_LIMIT
+
+
+def test_expired_entries_are_purged_every_interval():
+    cache = ErrorCache(cleanup_interval=3)
+    cache.put('a', _classification(), ttl=60)
+    cache.put('b', _classification(), ttl=60)
+    for entry in cache.cache.values():
+        entry.timestamp -= 120
+    assert set(cache.cache) == {'a', 'b'}
+    cache.put('c', _classification(), ttl=60)
+    assert set(cache.cache) == {'c'}
+    assert cache.get('a') is None
+
+
+def test_lru_evicts_the_oldest_entry():
+    cache = ErrorCache(max_size=2)
+    for key in 'abc':
+        cache.put(key, _classification())
+    assert list(cache.cache) == ['b', 'c'] and cache.get_metrics().evictions == 1
+
+
+def test_sqlite_backend_is_shared_between_caches(tmp_path):
+    path = str(tmp_path / 'errors.db')
+    writer = ErrorCache(backend=SQLiteCacheBackend(path))
+    reader = ErrorCache(backend=SQLiteCacheBackend(path))
+    writer.put('site.example|Exception:HTTP Error 404', _classification(ErrorType.PERMANENT), ttl=60)
+    shared = reader.get('site.example|Exception:HTTP Error 404')
+    assert shared is not None and shared.error_type == ErrorType.PERMANENT
+    assert 'site.example|Exception:HTTP Error 404' in reader.cache
+    assert reader.get_metrics().cache_hits == 1
+
+
+def test_sqlite_backend_ignores_and_removes_expired_rows(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'errors.db'))
+    backend.put('stale', _classification(), expires_at=0.0)
+    assert backend.get('stale') is None
+    assert backend.cleanup_expired() == 1
+
+
+def test_environment_selects_the_shared_backend(tmp_path, monkeypatch):
+    path = tmp_path / 'shared' / 'errors.db'
+    monkeypatch.setenv('WF_ERROR_CACHE_DB', str(path))
+    classifier = UnifiedErrorClassifier()
+    assert classifier.cache.backend is not None and path.exists()
+    classifier.classify_error(Exception('HTTP Error 404'), URL)
+    other = UnifiedErrorClassifier()
+    key = other.cache.generate_cache_key(Exception('HTTP Error 404'), URL)
+    assert other.cache.get(key).error_type == ErrorType.PERMANENT
@@ -0,0 +1,115 @@
+"""Shared crawl frontier: quotas, weighted fair share, dedup and blocking waits."""
+import threading
+import time
+
+from webfetcher.crawl import CrawlFrontier
+
+
+def _frontier(**kwargs):
+    return CrawlFrontier(lambda url: url.rstrip('/').lower(), **kwargs)
+
+
+def _fill(frontier, key, prefix, count):
+    for n in range(count):
+        frontier.push(f'https://site.example/{prefix}/{n}', 1, key)
+
+
+def _drain(frontier, limit=100, fail=()):
+    order = []
+    while len(order) < limit:
+        entry = frontier.pop()
+        if entry is None:
+            break
+        order.append(entry)
+        frontier.complete(entry, None if entry.url in fail else entry.url)
+    return order
+
+
+def test_category_quota_stops_handing_out_its_urls():
+    frontier = _frontier()
+    news = frontier.add_category('News', quota=2)
+    _fill(frontier, news, 'news', 5)
+    # Failed fetches do not use up the quota
+    order = _drain(frontier, fail={'https://site.example/news/0'})
+    assert [entry.url.rsplit('/', 1)[1] for entry in order] == ['0', '1', '2']
+    assert frontier.stats()['categories'][news]['fetched'] == 2
+    assert frontier.stats()['queued'] == 2
+    frontier.close()
+
+
+def test_global_page_budget_spans_categories():
+    frontier = _frontier(max_pages=3)
+    for name in ('a', 'b'):
+        _fill(frontier, frontier.add_category(name), name, 4)
+    assert len(_drain(frontier)) == 3
+    frontier.close()
+
+
+def test_higher_priority_categories_get_a_weighted_share():
+    frontier = _frontier()
+    high = frontier.add_category('Policy', priority=3)
+    low = frontier.add_category('About', priority=1)
+    _fill(frontier, high, 'policy', 20)
+    _fill(frontier, low, 'about', 20)
+    order = [entry.category for entry in _drain(frontier, limit=8)]
+    assert order == [high, low, high, high, high, low, high, high]
+    frontier.close()
+
+
+def test_a_url_is_claimed_by_the_first_category_only():
+    frontier = _frontier()
+    news = frontier.add_category('News')
+    policy = frontier.add_category('Policy')
+    frontier.mark_seen('https://site.example/')
+    assert frontier.push('https://site.example/shared', 1, news)
+    assert not frontier.push('https://SITE.example/shared/', 1, policy)
+    assert not frontier.push('https://site.example', 0, policy)
+    assert frontier.is_seen('https://site.example/shared')
+    assert [entry.category for entry in _drain(frontier)] == [news]
+    assert frontier.stats()['duplicates_skipped'] == 2
+    frontier.close()
+
+
+def test_wait_category_returns_once_workers_drain_it():
+    frontier = _frontier()
+    news = frontier.add_category('News')
+    frontier.push('https://site.example/news', 0, news)
+    results = {}
+
+    def worker():
+        while (entry := frontier.pop()) is not None:
+            time.sleep(0.01)
+            if entry.depth < 2:
+                frontier.push(f'{entry.url}/{entry.depth + 1}', entry.depth + 1, news)
+            frontier.complete(entry, entry.url)
+
+    def consumer():
+        results['pages'] = frontier.wait_category(news, timeout=5)
+
+    waiting = threading.Thread(target=consumer)
+    waiting.start()
+    workers = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in workers:
+        thread.start()
+    for thread in workers + [waiting]:
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    assert results['pages'] == ['https://site.example/news', 'https://site.example/news/1',
+                                'https://site.example/news/1/2']
+    frontier.close()
+
+
+def test_close_releases_blocked_workers():
+    frontier = _frontier()
+    key = frontier.add_category('News')
+    frontier.push('https://site.example/news', 0, key)
+    entry = frontier.pop()
+    popped = []
+    blocked = threading.Thread(target=lambda: popped.append(frontier.pop()))
+    blocked.start()
+    time.sleep(0.05)
+    assert blocked.is_alive()
+    frontier.close()
+    blocked.join(timeout=5)
+    assert popped == [None]
+    frontier.complete(entry, entry.url)
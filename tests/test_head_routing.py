@@ -0,0 +1,143 @@
+"""Streamed <head> parsing and head-based routing."""
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from webfetcher import core
+from webfetcher.fetchers.streaming import HeadInfo, parse_head, read_html_stream
+from webfetcher.routing.engine import RoutingEngine
+from webfetcher.routing.matchers import HeadMatcher
+
+HEAD = ('<head><meta charset="utf-8"><title>Shell &amp; App</title>'
+        '<meta name="generator" content="Flutter 3.1">'
+        '<meta property="og:title" content="The App"></head>')
+PAGE = ('<!DOCTYPE html><html>' + HEAD + '<body>'
+        + '<p>Readable server-rendered text for the article body.</p>' * 20 + '</body></html>').encode('utf-8')
+
+
+class _Response(io.BytesIO):
+    def __init__(self, body, content_type='text/html; charset=utf-8'):
+        super().__init__(body)
+        self.headers = {'Content-Type': content_type}
+
+    def geturl(self):
+        return 'https://app.example/'
+
+
+def test_parse_head_reads_title_charset_and_meta():
+    head = parse_head(HEAD)
+    assert head.title == 'Shell & App'
+    assert head.charset == 'utf-8'
+    assert head.meta['generator'] == 'Flutter 3.1'
+    assert head.open_graph == {'og:title': 'The App'}
+
+
+def test_on_head_fires_before_the_body_is_read():
+    seen = []
+
+    def on_head(head):
+        seen.append(head.title)
+        raise RuntimeError('stop')
+
+    response = _Response(PAGE + b'<p>x</p>' * 200000)
+    with pytest.raises(RuntimeError):
+        read_html_stream(response, 'https://app.example/', on_head=on_head)
+    assert seen == ['Shell & App']
+    assert response.tell() < len(response.getvalue())
+
+
+def test_head_matcher_needs_a_head_in_context():
+    matcher = HeadMatcher(meta={'generator': '^Flutter'})
+    assert not matcher.matches('https://app.example/')
+    assert matcher.matches('https://app.example/', {'head': parse_head(HEAD)})
+    assert not matcher.matches('https://app.example/', {'head': HeadInfo(title='x')})
+
+
+ROUTING_YAML = """
+version: "1.0"
+global:
+  default_fetcher: urllib
+rules:
+  - name: "Flutter shells"
+    priority: 40
+    enabled: true
+    conditions:
+      head_meta:
+        generator: "^Flutter"
+    action:
+      fetcher: "cdp"
+      reason: "client-rendered"
+  - name: "Default"
+    priority: 1
+    enabled: true
+    conditions:
+      always: true
+    action:
+      fetcher: "urllib"
+      reason: "static"
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    config = tmp_path / 'routing.yaml'
+    config.write_text(ROUTING_YAML)
+    return RoutingEngine(str(config))
+
+
+def test_head_rules_do_not_match_on_the_url_alone(engine):
+    assert engine.has_head_rules
+    assert engine.evaluate('https://app.example/').rule_name == 'Default'
+    decision = engine.evaluate_head('https://app.example/', parse_head(HEAD))
+    assert decision.fetcher == 'cdp' and decision.rule_name == 'Flutter shells'
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}/'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_head_rule_reroutes_the_fetch_to_a_browser(monkeypatch, engine, server):
+    rendered = []
+
+    def fake_chain(url, ua, timeout, metrics, start_time, error, input_url=None, force_chrome=False):
+        rendered.append(error)
+        metrics.fallback_method = 'cdp'
+        metrics.final_status = 'success'
+        return '<html><body>rendered</body></html>', metrics, {'final_url': url}
+
+    monkeypatch.setattr(core, 'routing_engine', engine)
+    monkeypatch.setattr(core, 'host_outcome_store', None)
+    monkeypatch.setattr(core, '_try_cdp_fallback_after_urllib_failure', fake_chain)
+    html, metrics, _ = core.fetch_html_with_retry(server, fetch_mode='auto')
+    assert html == '<html><body>rendered</body></html>'
+    assert metrics.head_route == 'Flutter shells'
+    assert metrics.page_title == 'Shell & App'
+    assert rendered and 'Flutter shells' in rendered[0]
+
+
+def test_head_metadata_is_kept_in_metrics(monkeypatch, server):
+    monkeypatch.setattr(core, 'host_outcome_store', None)
+    html, metrics, _ = core.fetch_html_with_retry(server, fetch_mode='urllib')
+    assert 'Readable server-rendered text' in html
+    assert metrics.page_title == 'Shell & App'
+    assert metrics.open_graph == {'og:title': 'The App'}
+    assert metrics.to_dict()['head_route'] is None
@@ -0,0 +1,139 @@
+"""Host outcome store persistence and learned routes in the routing engine."""
+import json
+import time
+
+import pytest
+
+from webfetcher.routing import host_outcomes
+from webfetcher.routing.engine import RoutingEngine
+from webfetcher.routing.host_outcomes import HostOutcomeStore
+
+
+def _learn(store, host='spa.example'):
+    store.record(host, 'urllib', success=False, error_class='soft_failure')
+    store.record(host, 'urllib', success=False, error_class='soft_failure')
+    store.record(host, 'cdp', success=True, latency=1.0)
+
+
+def test_route_is_learned_after_urllib_keeps_failing(tmp_path):
+    store = HostOutcomeStore(tmp_path / 'outcomes.json', autosave=False)
+    _learn(store)
+    route = store.recommend('spa.example')
+    assert route is not None and route.fetcher == 'cdp'
+    assert store.recommend('other.example') is None
+
+
+def test_records_are_not_written_on_every_fetch(tmp_path):
+    path = tmp_path / 'outcomes.json'
+    store = HostOutcomeStore(path)
+    _learn(store)
+    assert not path.exists()
+    store.flush()
+    assert 'spa.example' in json.loads(path.read_text())['hosts']
+
+
+def test_autosave_after_interval(tmp_path, monkeypatch):
+    path = tmp_path / 'outcomes.json'
+    store = HostOutcomeStore(path)
+    store.record('a.example', 'urllib', success=True)
+    assert not path.exists()
+    monkeypatch.setattr(host_outcomes, 'SAVE_INTERVAL', 0.0)
+    store.record('a.example', 'urllib', success=True)
+    assert path.exists()
+
+
+def test_save_merges_with_other_processes(tmp_path):
+    path = tmp_path / 'outcomes.json'
+    first = HostOutcomeStore(path, autosave=False)
+    second = HostOutcomeStore(path, autosave=False)
+    first.record('a.example', 'urllib', success=True)
+    second.record('b.example', 'urllib', success=True)
+    first.save()
+    second.save()
+    hosts = json.loads(path.read_text())['hosts']
+    assert set(hosts) == {'a.example', 'b.example'}
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_newest_attempt_wins_when_merging(tmp_path):
+    path = tmp_path / 'outcomes.json'
+    first = HostOutcomeStore(path, autosave=False)
+    first.record('a.example', 'urllib', success=True)
+    first.save()
+    second = HostOutcomeStore(path, autosave=False)
+    time.sleep(0.01)
+    second.record('a.example', 'urllib', success=False)
+    second.save()
+    first.save()
+    outcome = HostOutcomeStore(path, autosave=False).get_host('a.example')['urllib']
+    assert outcome.failures == pytest.approx(1.0, abs=0.01)
+
+
+def test_reset_host_is_not_resurrected_from_disk(tmp_path):
+    path = tmp_path / 'outcomes.json'
+    store = HostOutcomeStore(path, autosave=False)
+    _learn(store)
+    store.save()
+    assert store.reset('spa.example') == 1
+    assert HostOutcomeStore(path, autosave=False).get_host('spa.example') == {}
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / 'outcomes.json'
+    path.write_text('{not json')
+    store = HostOutcomeStore(path, autosave=False)
+    assert store.list_hosts() == []
+    store.record('a.example', 'urllib', success=True)
+    store.save()
+    assert 'a.example' in json.loads(path.read_text())['hosts']
+
+
+ROUTING_YAML = """
+version: "1.0"
+global:
+  default_fetcher: urllib
+  pinned_rule_priority: 95
+rules:
+  - name: "Pinned anti-bot"
+    priority: 100
+    enabled: true
+    conditions:
+      domain: "pinned.example"
+    action:
+      fetcher: "manual_chrome"
+      reason: "operator pinned"
+  - name: "Static site"
+    priority: 90
+    enabled: true
+    conditions:
+      domain: "static.example"
+    action:
+      fetcher: "urllib"
+      reason: "static"
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    config = tmp_path / 'routing.yaml'
+    config.write_text(ROUTING_YAML)
+    store = HostOutcomeStore(tmp_path / 'outcomes.json', autosave=False)
+    for host in ('pinned.example', 'static.example', 'unknown.example'):
+        _learn(store, host)
+    return RoutingEngine(str(config), outcome_store=store)
+
+
+def test_pinned_rule_beats_learned_route(engine):
+    decision = engine.evaluate('https://pinned.example/page')
+    assert decision.fetcher == 'manual_chrome'
+    assert decision.rule_name == 'Pinned anti-bot'
+
+
+def test_learned_route_beats_unpinned_rule(engine):
+    decision = engine.evaluate('https://static.example/page')
+    assert decision.fetcher == 'cdp'
+    assert decision.rule_name == 'learned:static.example'
+
+
+def test_learned_route_applies_when_no_rule_matches(engine):
+    assert engine.evaluate('https://unknown.example/').fetcher == 'cdp'
@@ -0,0 +1,108 @@
+"""Crawl checkpoint journal: streaming replay, torn tails and pruning."""
+import os
+import time
+
+import pytest
+
+from webfetcher.crawl import CrawlJournal, CrawlJournalError, SpillQueue, list_crawls, make_seen_set, prune_crawls
+
+
+def _crawl(tmp_path, crawl_id='site-1'):
+    journal = CrawlJournal.create('https://site.example/', {'max_pages': 10},
+                                  crawl_id=crawl_id, directory=str(tmp_path))
+    journal.record_queue([('https://site.example/', 0)])
+    journal.record_page('https://site.example/', 0, '<p>home</p>',
+                        queued=[('https://site.example/a', 1), ('https://site.example/b', 1),
+                                ('https://site.example/c', 1)])
+    journal.record_page('https://site.example/a', 1, '<p>页面 a</p>', queued=[('https://site.example/b', 2)])
+    journal.record_failure('https://site.example/b', 1, 'HTTP 500')
+    journal.checkpoint({'pages_crawled': 3, 'start_time': time.time() - 5})
+    return journal
+
+
+def test_open_counts_records_without_loading_them(tmp_path):
+    _crawl(tmp_path).close()
+    journal = CrawlJournal.open('site-1', directory=str(tmp_path))
+    state = journal.state
+    assert (state.pages, state.queued) == (2, 5)
+    assert state.failed == [('https://site.example/b', 'HTTP 500')]
+    assert state.stats['pages_crawled'] == 3 and not state.finished
+    journal.close()
+
+
+def test_replay_queue_fills_the_seen_set_and_frontier(tmp_path):
+    _crawl(tmp_path).close()
+    journal = CrawlJournal.open('site-1', directory=str(tmp_path))
+    seen = make_seen_set('bloom')
+    queue = SpillQueue(memory_items=1)
+    assert journal.replay_queue(seen, lambda url, depth: queue.append((url, depth))) == 1
+    assert queue.popleft() == ('https://site.example/c', 1)
+    assert not queue
+    assert 'https://site.example/b' in seen and 'https://site.example/c' in seen
+    queue.close()
+    journal.close()
+
+
+def test_pages_are_streamed_from_the_payload_file(tmp_path):
+    _crawl(tmp_path).close()
+    journal = CrawlJournal.open('site-1', directory=str(tmp_path))
+    pages = journal.iter_pages()
+    assert next(pages) == ('https://site.example/', '<p>home</p>', 0)
+    assert next(pages) == ('https://site.example/a', '<p>页面 a</p>', 1)
+    assert next(pages, None) is None
+    # Pages recorded after reopening are not part of the replay
+    journal.record_page('https://site.example/c', 1, '<p>c</p>')
+    journal.checkpoint()
+    assert len(list(journal.iter_pages())) == 2
+    journal.close()
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    _crawl(tmp_path).close()
+    with open(tmp_path / 'site-1' / 'journal.jsonl', 'a') as f:
+        f.write('{"type":"page","url":"https://site.example/c"')
+    journal = CrawlJournal.open('site-1', directory=str(tmp_path))
+    assert journal.state.pages == 2
+    journal.close()
+    assert (tmp_path / 'site-1' / 'journal.jsonl').read_bytes().endswith(b'\n')
+
+
+def test_list_and_prune(tmp_path):
+    _crawl(tmp_path, 'old').close()
+    fresh = _crawl(tmp_path, 'fresh')
+    fresh.finish()
+    fresh.close()
+    stale = time.time() - 10 * 86400
+    os.utime(tmp_path / 'old' / 'journal.jsonl', (stale, stale))
+    crawls = {entry['crawl_id']: entry for entry in list_crawls(str(tmp_path))}
+    assert crawls['fresh']['finished'] and not crawls['old']['finished']
+    assert crawls['old']['pages'] == 2 and crawls['old']['size'] > 0
+    assert prune_crawls(7, directory=str(tmp_path)) == ['old']
+    assert [entry['crawl_id'] for entry in list_crawls(str(tmp_path))] == ['fresh']
+    assert prune_crawls(0, directory=str(tmp_path), finished_only=True) == ['fresh']
+
+
+def test_create_refuses_to_overwrite(tmp_path):
+    _crawl(tmp_path).close()
+    with pytest.raises(CrawlJournalError):
+        CrawlJournal.create('https://site.example/', crawl_id='site-1', directory=str(tmp_path))
+
+
+def test_crawl_site_resumes_only_the_pending_urls(tmp_path, monkeypatch):
+    from webfetcher import core
+
+    _crawl(tmp_path).close()
+    journal = CrawlJournal.open('site-1', directory=str(tmp_path), normalize=core.normalize_url_for_dedup)
+    fetched = []
+
+    def fake_fetch(url, ua, render=False):
+        fetched.append(url)
+        return '<html><body><p>' + 'Page c text. ' * 40 + '</p></body></html>'
+
+    monkeypatch.setattr(core, '_fetch_crawl_page', fake_fetch)
+    pages = core.crawl_site('https://site.example/', 'test-agent', max_depth=2, max_pages=10, delay=0,
+                            near_dup_distance=None, journal=journal)
+    assert fetched == ['https://site.example/c']
+    assert [url for url, _, _ in pages] == ['https://site.example/', 'https://site.example/a',
+                                            'https://site.example/c']
+    journal.close()
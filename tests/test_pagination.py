@@ -0,0 +1,136 @@
+"""Pagination detection, prefetching and crawl pacing."""
+import threading
+import time
+import urllib.error
+
+import pytest
+
+from webfetcher import core
+from webfetcher.crawl import FetchPacer, PaginationPrefetcher, find_next_page, pagination_chain
+from webfetcher.errors.retry_policy import CircuitState, HostCircuitBreakers
+from webfetcher.routing.host_outcomes import HostOutcomeStore
+
+
+def test_next_page_links_are_found():
+    assert find_next_page('<link rel="next" href="?page=2">', 'https://blog.example/list') \
+        == 'https://blog.example/list?page=2'
+    assert find_next_page('<a href="/p/3.html">下一页</a>', 'https://blog.example/p/2.html') \
+        == 'https://blog.example/p/3.html'
+    assert find_next_page('<a href="/list?page=3">3</a>', 'https://blog.example/list?page=2') \
+        == 'https://blog.example/list?page=3'
+    assert find_next_page('<a href="/about">About</a>', 'https://blog.example/list') is None
+
+
+def test_chain_is_extrapolated_only_for_counting_urls():
+    assert pagination_chain('https://blog.example/list?page=2', 'https://blog.example/list?page=3', 3) == [
+        'https://blog.example/list?page=3', 'https://blog.example/list?page=4', 'https://blog.example/list?page=5']
+    assert pagination_chain('https://blog.example/a', 'https://blog.example/b', 3) == ['https://blog.example/b']
+
+
+def test_pacer_spaces_fetch_starts_across_threads():
+    pacer = FetchPacer(0.05)
+    starts = []
+    lock = threading.Lock()
+
+    def fetch():
+        pacer.wait()
+        with lock:
+            starts.append(time.monotonic())
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    starts.sort()
+    assert all(b - a >= 0.04 for a, b in zip(starts, starts[1:]))
+
+
+def test_prefetcher_paces_fetches_and_ignores_failed_guesses():
+    paced = []
+    prefetcher = PaginationPrefetcher(lambda url: None if url.endswith('3') else f'<p>{url}</p>',
+                                      ahead=2, pace=lambda: paced.append(1))
+    prefetcher.prefetch(['https://blog.example/list?page=2', 'https://blog.example/list?page=3'])
+    assert prefetcher.take('https://blog.example/list?page=2') == '<p>https://blog.example/list?page=2</p>'
+    assert prefetcher.take('https://blog.example/list?page=3') is None
+    assert prefetcher.take('https://blog.example/list?page=4') is None
+    assert (prefetcher.submitted, prefetcher.hits, len(paced)) == (2, 1, 2)
+    prefetcher.close()
+
+
+@pytest.fixture
+def isolated_host_state(tmp_path, monkeypatch):
+    store = HostOutcomeStore(tmp_path / 'outcomes.json', autosave=False)
+    breakers = HostCircuitBreakers(failure_threshold=1)
+    monkeypatch.setattr(core, 'host_outcome_store', store)
+    monkeypatch.setattr(core, 'host_circuit_breakers', breakers)
+    return store, breakers
+
+
+def test_speculative_404_is_not_recorded(monkeypatch, isolated_host_state):
+    store, breakers = isolated_host_state
+
+    def missing(url, ua=None, timeout=30, **kwargs):
+        raise urllib.error.HTTPError(url, 404, 'Not Found', {}, None)
+
+    monkeypatch.setattr(core, 'fetch_html_original', missing)
+    assert core._prefetch_page('https://blog.example/list?page=9', 'test-agent') is None
+    assert store.list_hosts() == []
+    assert breakers.state('blog.example') == CircuitState.CLOSED
+
+
+def test_speculative_fetch_skips_hosts_with_an_open_circuit(monkeypatch, isolated_host_state):
+    _, breakers = isolated_host_state
+    breakers.record_failure('blog.example')
+    monkeypatch.setattr(core, 'fetch_html_original', lambda *args, **kwargs: pytest.fail('fetched'))
+    assert core._prefetch_page('https://blog.example/list?page=2', 'test-agent') is None
+
+
+def _listing(page):
+    links = f'<a rel="next" href="/list?page={page + 1}">Next</a>' if page < 4 else ''
+    return f'<html><body><p>{"Listing entry text. " * 30}</p>{links}</body></html>'
+
+
+def test_crawl_delay_applies_to_prefetches(monkeypatch):
+    starts = []
+    lock = threading.Lock()
+
+    def fetch(url, ua, render=False):
+        with lock:
+            starts.append(time.monotonic())
+        return _listing(int(url.rsplit('=', 1)[1]))
+
+    monkeypatch.setattr(core, '_fetch_crawl_page', fetch)
+    monkeypatch.setattr(core, '_prefetch_page', fetch)
+    pages = core.crawl_site('https://blog.example/list?page=1', 'test-agent', max_depth=0, max_pages=10,
+                            delay=0.05, follow_pagination=True, pagination_prefetch=3)
+    assert len(pages) == 4
+    starts.sort()
+    assert all(b - a >= 0.04 for a, b in zip(starts, starts[1:]))
+
+
+def test_category_first_crawl_releases_the_default_queue_and_prefetcher(monkeypatch):
+    closed = []
+
+    class TrackedPrefetcher(core.PaginationPrefetcher):
+        def close(self):
+            closed.append('prefetcher')
+            super().close()
+
+    class TrackedQueue(core.SpillQueue):
+        def close(self):
+            closed.append('queue')
+            super().close()
+
+    category = {'name': 'News', 'url': 'https://gov.example/news', 'priority': 3}
+    monkeypatch.setattr(core, 'PaginationPrefetcher', TrackedPrefetcher)
+    monkeypatch.setattr(core, 'SpillQueue', TrackedQueue)
+    monkeypatch.setattr(core, 'fetch_html', lambda url, ua=None, timeout=30: ('<html></html>', None, {}))
+    monkeypatch.setattr(core, 'detect_government_site', lambda url, html: True)
+    monkeypatch.setattr(core, 'extract_site_categories', lambda url, html: [category])
+    monkeypatch.setattr(core, 'crawl_site_by_categories',
+                        lambda start_url, ua, categories, **kwargs: iter([(category, [(category['url'], '<p/>', 1)])]))
+    pages = core.crawl_site('https://gov.example/', 'test-agent', max_pages=10, delay=0, crawl_order='bfs',
+                            crawl_strategy='category_first', follow_pagination=True, pagination_prefetch=2)
+    assert [url for url, _, _ in pages] == ['https://gov.example/', 'https://gov.example/news']
+    assert sorted(closed) == ['prefetcher', 'queue']
@@ -0,0 +1,94 @@
+"""Parse result cache: keys, template invalidation and the enable policy."""
+import os
+import shutil
+
+import pytest
+
+from webfetcher.parsing import cache as parse_cache
+from webfetcher.parsing.cache import ParseCache, configure_parse_cache, get_parse_cache
+from webfetcher.parsing.engine import template_parser
+from webfetcher.parsing.engine.template_parser import DEFAULT_TEMPLATE_DIR
+
+HTML = '<html><head><title>Note</title></head><body><article><p>Cached body text.</p></article></body></html>'
+URL = 'https://blog.example/post'
+RESULT = ('2026-10-19', '# Note\n\n- 抓取时间: 2026-01-01 00:00:00\n\nCached body text.', {'title': 'Note'})
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    target = tmp_path / 'templates'
+    shutil.copytree(DEFAULT_TEMPLATE_DIR, target)
+    return target
+
+
+@pytest.fixture
+def cache(tmp_path, template_dir):
+    return ParseCache(directory=str(tmp_path / 'parse'), template_dir=str(template_dir))
+
+
+def test_round_trip_refreshes_the_fetch_time(cache):
+    key = cache.key('generic', HTML, URL)
+    assert cache.get(key) is None
+    cache.put(key, RESULT)
+    date_only, markdown, metadata = cache.get(key)
+    assert (date_only, metadata) == (RESULT[0], RESULT[2])
+    assert '2026-01-01 00:00:00' not in markdown and 'Cached body text.' in markdown
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_html_url_and_options(cache):
+    key = cache.key('generic', HTML, URL)
+    assert key == cache.key('generic', HTML, URL)
+    assert key != cache.key('generic', HTML + ' ', URL)
+    assert key != cache.key('generic', HTML, URL + '?x=1')
+    assert key != cache.key('generic', HTML, URL, filter_level='none')
+    assert key != cache.key('generic', HTML, URL, is_crawling=True)
+
+
+def test_editing_the_selected_template_changes_the_key(cache, template_dir):
+    cache.templates.check_interval = 0.0
+    key = cache.key('generic', HTML, URL)
+    for path in template_dir.rglob('*.yaml'):
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.key('generic', HTML, URL) != key
+
+
+def test_template_files_are_not_scanned_on_every_key(cache, monkeypatch):
+    calls = []
+    original = template_parser.template_dir_stamp
+    monkeypatch.setattr(template_parser, 'template_dir_stamp', lambda d: calls.append(d) or original(d))
+    cache.templates.check_interval = 3600.0
+    for n in range(5):
+        cache.key('generic', HTML, f'{URL}/{n}')
+    assert len(calls) <= 1
+
+
+def test_prune_removes_oldest_entries(cache):
+    for n in range(3):
+        cache.put(cache.key('generic', HTML, f'{URL}/{n}'), RESULT)
+    assert cache.prune(0) == 3
+    assert cache.get(cache.key('generic', HTML, f'{URL}/0')) is None
+
+
+@pytest.fixture
+def restore_policy(monkeypatch):
+    monkeypatch.delenv('WF_PARSE_CACHE', raising=False)
+    enabled = parse_cache._enabled
+    yield monkeypatch
+    parse_cache.set_parse_cache_enabled(enabled)
+
+
+def test_cache_is_on_for_crawls_only_by_default(restore_policy):
+    assert not configure_parse_cache(crawling=False)
+    assert get_parse_cache() is None
+    assert configure_parse_cache(crawling=True)
+    assert configure_parse_cache(crawling=False, enabled=True)
+    assert not configure_parse_cache(crawling=True, enabled=False)
+
+
+def test_environment_overrides_the_default(restore_policy):
+    restore_policy.setenv('WF_PARSE_CACHE', '1')
+    assert configure_parse_cache(crawling=False)
+    restore_policy.setenv('WF_PARSE_CACHE', '0')
+    assert not configure_parse_cache(crawling=True)
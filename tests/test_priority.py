@@ -0,0 +1,82 @@
+"""Best-first crawl queue and link scoring."""
+import pytest
+
+from webfetcher.crawl import BestFirstQueue, LinkInfo, LinkScorer, load_priority_config, make_link_scorer
+
+
+@pytest.fixture(scope='module')
+def scorer():
+    return LinkScorer(load_priority_config())
+
+
+def test_articles_outrank_tag_pages(scorer):
+    article = scorer(LinkInfo('https://blog.example/blog/2024/05/launch.html', depth=2,
+                              anchor_text='How we launched the new service'))
+    tag = scorer(LinkInfo('https://blog.example/tag/news/', depth=1, anchor_text='news'))
+    assert article > tag
+
+
+def test_generic_anchor_and_depth_lower_the_score(scorer):
+    url = 'https://blog.example/posts/launch'
+    assert scorer(LinkInfo(url, 1, 'Launch notes for version two')) > scorer(LinkInfo(url, 1, 'read more'))
+    assert scorer(LinkInfo(url, 1)) > scorer(LinkInfo(url, 3))
+    assert scorer(LinkInfo(url, 1, pagination=True)) > scorer(LinkInfo(url, 1))
+
+
+def test_user_config_overrides_weights(tmp_path):
+    custom = tmp_path / 'priority.yaml'
+    custom.write_text('weights:\n  depth: -5.0\n')
+    config = load_priority_config(str(custom))
+    assert config['weights']['depth'] == -5.0
+    assert config['weights']['in_degree'] == 0.5
+    assert isinstance(make_link_scorer(config), LinkScorer)
+
+
+def test_custom_scorer_spec_must_name_a_factory():
+    with pytest.raises(ValueError):
+        make_link_scorer({'scorer': 'webfetcher.crawl.priority'})
+
+
+def _queue(**kwargs):
+    return BestFirstQueue(lambda link: -link.depth + link.in_degree, **kwargs)
+
+
+def test_best_link_is_popped_first():
+    queue = _queue(host_fairness=0.0)
+    queue.push('https://a.example/deep', 3, 'deep')
+    queue.push('https://a.example/top', 1, 'top')
+    assert queue.popleft() == ('https://a.example/top', 1)
+    assert queue.popleft() == ('https://a.example/deep', 3)
+    assert not queue
+    with pytest.raises(IndexError):
+        queue.popleft()
+
+
+def test_inlinks_raise_a_queued_link():
+    queue = _queue(host_fairness=0.0)
+    queue.push('https://a.example/one', 1, 'one')
+    queue.push('https://a.example/two', 1, 'two')
+    for _ in range(3):
+        assert queue.add_inlink('two')
+    assert not queue.add_inlink('missing')
+    assert queue.popleft()[0] == 'https://a.example/two'
+
+
+def test_host_fairness_interleaves_hosts():
+    queue = _queue(host_fairness=10.0)
+    for n in range(3):
+        queue.push(f'https://a.example/{n}', 1, f'a{n}')
+    queue.push('https://b.example/0', 2, 'b0')
+    hosts = [queue.popleft()[0].split('/')[2] for _ in range(2)]
+    assert hosts == ['a.example', 'b.example']
+
+
+def test_lowest_scores_spill_to_disk_and_come_back(tmp_path):
+    queue = _queue(memory_items=4, directory=str(tmp_path), host_fairness=0.0)
+    for depth in range(10):
+        queue.push(f'https://a.example/{depth}', depth, f'k{depth}')
+    assert queue.on_disk > 0 and queue.in_memory <= 4
+    depths = [queue.popleft()[1] for _ in range(10)]
+    assert depths[:3] == [0, 1, 2]
+    assert sorted(depths) == list(range(10))
+    queue.close()
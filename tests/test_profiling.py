@@ -0,0 +1,17 @@
+"""wf --profile: one profiler and one exit report per process."""
+from webfetcher import core
+from webfetcher.utils.profiling import get_profiler, stop_profiler
+
+
+def test_repeated_runs_share_one_profiler_and_exit_report(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(core.atexit, 'register', registered.append)
+    monkeypatch.setattr(core, '_profile_report_registered', False)
+    try:
+        core._start_profile('cpu', 5, str(tmp_path))
+        profiler = get_profiler()
+        core._start_profile('cpu', 5, str(tmp_path))
+        assert get_profiler() is profiler
+        assert registered == [core._finish_profile]
+    finally:
+        stop_profiler()
@@ -0,0 +1,83 @@
+"""RenderService runs every render on its own render thread."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from webfetcher.fetchers import render_service
+from webfetcher.fetchers.render_service import RenderResult, RenderService
+
+
+def _recording_service():
+    service = RenderService()
+    threads = []
+
+    def fake_render(url, ua, timeout_ms, start_time):
+        threads.append(threading.get_ident())
+        return RenderResult(html=f'<html>{url}</html>', final_url=url)
+
+    service._render = fake_render
+    return service, threads
+
+
+def test_renders_from_pool_threads_run_on_one_render_thread():
+    service, threads = _recording_service()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda n: service.render(f'https://example.com/{n}'), range(12)))
+        assert [r.final_url for r in results] == [f'https://example.com/{n}' for n in range(12)]
+        assert len(set(threads)) == 1
+        assert threads[0] == service._thread.ident
+        assert service._thread.name == 'wf-render'
+    finally:
+        service.close()
+
+
+def test_render_thread_outlives_the_thread_that_started_it():
+    service, threads = _recording_service()
+    try:
+        starter = threading.Thread(target=service.render, args=('https://example.com/a',))
+        starter.start()
+        starter.join()
+        assert service.render('https://example.com/b').html == '<html>https://example.com/b</html>'
+        assert len(set(threads)) == 1
+    finally:
+        service.close()
+
+
+def test_close_stops_the_render_thread_and_render_restarts_it():
+    service, threads = _recording_service()
+    service.render('https://example.com/a')
+    first = service._thread
+    service.close()
+    assert not first.is_alive()
+    service.render('https://example.com/b')
+    assert service._thread is not first
+    service.close()
+
+
+def test_exceptions_propagate_to_the_caller():
+    service = RenderService()
+
+    def broken(*args):
+        raise ValueError('boom')
+
+    service._render = broken
+    try:
+        try:
+            service.render('https://example.com/')
+        except ValueError as e:
+            assert str(e) == 'boom'
+        else:
+            raise AssertionError('expected ValueError')
+    finally:
+        service.close()
+
+
+def test_missing_playwright_returns_an_error_result(monkeypatch):
+    monkeypatch.setattr(render_service, 'PLAYWRIGHT_AVAILABLE', False)
+    service = RenderService()
+    try:
+        result = service.render('https://example.com/')
+        assert result.html is None
+        assert 'Playwright not available' in result.error
+    finally:
+        service.close()
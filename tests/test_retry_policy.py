@@ -0,0 +1,88 @@
+"""Retry policy and per-host circuit breakers."""
+import threading
+
+import pytest
+
+from webfetcher import core
+from webfetcher.errors.retry_policy import CircuitState, HostCircuitBreakers, RetryPolicy
+from webfetcher.fetchers.streaming import NonHTMLContentError
+
+
+def _open_then_half_open(breakers, host='down.example'):
+    for _ in range(breakers.failure_threshold):
+        breakers.record_failure(host)
+    assert breakers.state(host) == CircuitState.OPEN
+    assert not breakers.allow(host)
+    breakers.recovery_timeout = 0.0
+    assert breakers.allow(host)
+    assert breakers.state(host) == CircuitState.HALF_OPEN
+
+
+def test_backoff_is_bounded_by_retry_budget():
+    state = RetryPolicy(max_retries=2, base_delay=0.01, jitter=0.0).start()
+    assert state.next_wait(None, retryable=True) is not None
+    assert state.next_wait(None, retryable=True) is not None
+    assert state.next_wait(None, retryable=True) is None
+    assert 'budget' in state.stop_reason
+
+
+def test_half_open_allows_a_single_trial():
+    breakers = HostCircuitBreakers(failure_threshold=2, recovery_timeout=60.0)
+    _open_then_half_open(breakers)
+    assert not breakers.allow('down.example')
+    breakers.record_success('down.example')
+    assert breakers.state('down.example') == CircuitState.CLOSED
+    assert breakers.allow('down.example')
+
+
+def test_failed_trial_reopens_the_circuit():
+    breakers = HostCircuitBreakers(failure_threshold=2)
+    _open_then_half_open(breakers)
+    assert breakers.record_failure('down.example') == CircuitState.OPEN
+
+
+def test_release_frees_a_trial_that_recorded_nothing():
+    breakers = HostCircuitBreakers(failure_threshold=2)
+    _open_then_half_open(breakers)
+    breakers.release('down.example')
+    assert breakers.allow('down.example')
+
+
+def test_release_from_another_thread_keeps_the_trial():
+    breakers = HostCircuitBreakers(failure_threshold=2)
+    _open_then_half_open(breakers)
+    other = threading.Thread(target=breakers.release, args=('down.example',))
+    other.start()
+    other.join()
+    assert not breakers.allow('down.example')
+
+
+@pytest.fixture
+def half_open_host(monkeypatch):
+    breakers = HostCircuitBreakers(failure_threshold=2)
+    monkeypatch.setattr(core, 'host_circuit_breakers', breakers)
+    for _ in range(2):
+        breakers.record_failure('files.example')
+    breakers.recovery_timeout = 0.0
+    return breakers
+
+
+def test_non_html_response_closes_a_half_open_circuit(monkeypatch, half_open_host):
+    def non_html(url, ua=None, timeout=30, **kwargs):
+        raise NonHTMLContentError(url, 'application/pdf')
+
+    monkeypatch.setattr(core, 'fetch_html_original', non_html)
+    with pytest.raises(NonHTMLContentError):
+        core.fetch_html_with_retry('https://files.example/report.pdf', fetch_mode='urllib')
+    assert half_open_host.state('files.example') == CircuitState.CLOSED
+    assert half_open_host.allow('files.example')
+
+
+def test_unexpected_exit_releases_the_trial(monkeypatch, half_open_host):
+    def interrupted(url, ua=None, timeout=30, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(core, 'fetch_html_original', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        core.fetch_html_with_retry('https://files.example/page', fetch_mode='urllib')
+    assert half_open_host.allow('files.example')
@@ -0,0 +1,86 @@
+"""Compact seen-sets and the disk-spilling crawl queue."""
+import pytest
+
+from webfetcher.crawl import SpillQueue, make_seen_set
+from webfetcher.crawl.seen import FingerprintSet, ScalableBloomFilter, url_fingerprint
+
+
+def _urls(count, prefix='page'):
+    return [f'https://site.example/{prefix}/{n}' for n in range(count)]
+
+
+def test_fingerprint_set_grows_without_losing_members():
+    seen = FingerprintSet(initial_capacity=8)
+    initial_slots = len(seen._slots)
+    urls = _urls(5000)
+    assert all(seen.add(url) for url in urls)
+    assert len(seen._slots) > initial_slots
+    assert len(seen) == 5000 <= len(seen._slots) * FingerprintSet._MAX_LOAD
+    assert all(url in seen for url in urls)
+    assert not any(seen.add(url) for url in urls)
+    assert sorted(seen) == sorted(url_fingerprint(url) for url in urls)
+    assert not any(url in seen for url in _urls(1000, 'other'))
+
+
+def test_bloom_false_positive_rate_at_capacity():
+    bloom = ScalableBloomFilter(initial_capacity=10_000, error_rate=0.01)
+    bloom.update(_urls(10_000))
+    assert len(bloom._slices) == 1
+    false_positives = sum(url in bloom for url in _urls(20_000, 'other'))
+    assert false_positives / 20_000 <= 0.01
+
+
+def test_bloom_filter_scales_past_capacity_without_false_negatives():
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+    urls = _urls(5000)
+    added = sum(bloom.add(url) for url in urls)
+    assert len(bloom._slices) > 1
+    assert all(url in bloom for url in urls)
+    # Adds rejected as "probably present" stay within the configured error rate
+    assert added == len(bloom) and added >= 5000 * (1 - 0.01)
+
+
+@pytest.mark.parametrize('kind', ['exact', 'bloom', 'strings'])
+def test_seen_sets_share_one_interface(kind):
+    seen = make_seen_set(kind)
+    assert seen.add('https://site.example/') and not seen.add('https://site.example/')
+    assert 'https://site.example/' in seen and len(seen) == 1 and seen.memory_bytes() > 0
+    with pytest.raises(ValueError):
+        make_seen_set('unknown')
+
+
+def test_spill_queue_keeps_fifo_order_across_spill_and_refill(tmp_path):
+    queue = SpillQueue(memory_items=4, directory=str(tmp_path))
+    popped = []
+    for n in range(10):
+        queue.append((f'https://site.example/{n}', n))
+    assert (queue.in_memory, queue.on_disk) == (4, 6)
+    popped += [queue.popleft() for _ in range(5)]
+    # Entries appended while the refilled tail is being read still queue behind it
+    for n in range(10, 15):
+        queue.append((f'https://site.example/{n}', n))
+    while queue:
+        popped.append(queue.popleft())
+    assert popped == [(f'https://site.example/{n}', n) for n in range(15)]
+    assert queue.total_spilled >= 6
+    with pytest.raises(IndexError):
+        queue.popleft()
+    queue.close()
+
+
+def test_appendleft_goes_before_spilled_entries(tmp_path):
+    queue = SpillQueue(items=['a', 'b', 'c'], memory_items=2, directory=str(tmp_path))
+    queue.appendleft('next')
+    assert [queue.popleft() for _ in range(len(queue))] == ['next', 'a', 'b', 'c']
+    queue.close()
+
+
+def test_close_removes_the_spill_file(tmp_path):
+    queue = SpillQueue(memory_items=1, directory=str(tmp_path))
+    for n in range(5):
+        queue.append(n)
+    spill_file = queue._file
+    assert spill_file is not None and not spill_file.closed
+    queue.close()
+    assert spill_file.closed and queue._file is None
+    assert not queue and list(tmp_path.iterdir()) == []
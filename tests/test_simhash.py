@@ -0,0 +1,70 @@
+"""SimHash near-duplicate detection."""
+import logging
+
+from webfetcher import core
+from webfetcher.crawl import NearDuplicateDetector, SimHashIndex, page_fingerprint, visible_text
+
+SIDEBAR = ('<div class="sidebar-right"><h3>Popular</h3>'
+           + ''.join(f'<p>Popular story number {n} with a long teaser line about the news.</p>' for n in range(40))
+           + '</div>')
+
+
+def _article(topic, extra=''):
+    body = ' '.join(f'The {topic} report, part {n}, covers detail {n * 7} of the {topic} story.'
+                    for n in range(30))
+    return (f'<html><body class="has-sidebar"><ul class="menu"><li>Home</li><li>News</li></ul>'
+            f'<div class="content"><h1>{topic}</h1><p>{body}{extra}</p></div>{SIDEBAR}</body></html>')
+
+
+def test_sidebar_and_menu_blocks_are_not_text():
+    text = visible_text(_article('harbour'))
+    assert 'part 3, covers detail 21' in text
+    assert 'Popular story' not in text and 'Home' not in text
+
+
+def test_pages_sharing_a_sidebar_are_not_duplicates():
+    detector = NearDuplicateDetector(3)
+    assert detector.check('https://news.example/harbour', _article('harbour')) is None
+    assert detector.check('https://news.example/election', _article('election')) is None
+    assert detector.duplicates == 0
+
+
+def test_same_article_under_another_url_is_a_duplicate():
+    detector = NearDuplicateDetector(3)
+    detector.check('https://news.example/harbour', _article('harbour'))
+    duplicate_of = detector.check('https://news.example/harbour?print=1', _article('harbour', ' Printed.'))
+    assert duplicate_of == 'https://news.example/harbour'
+
+
+def test_short_pages_are_not_fingerprinted():
+    html = '<html><body><p>' + 'Only a short note here. ' * 10 + '</p>' + SIDEBAR + '</body></html>'
+    assert page_fingerprint(html) is None
+
+
+def test_index_finds_fingerprints_within_distance():
+    index = SimHashIndex(max_distance=3)
+    index.add(0b1011 << 40, 'a')
+    assert index.find((0b1011 << 40) ^ 0b111) == 'a'
+    assert index.find((0b1011 << 40) ^ 0b1111) is None
+
+
+def _crawl(monkeypatch, **kwargs):
+    index = _article('index').replace('<li>News</li>', '<li><a href="/a">a</a></li><li><a href="/b">b</a></li>')
+    pages = {'https://news.example/': index,
+             'https://news.example/a': _article('harbour'),
+             'https://news.example/b': _article('harbour', ' Printed.')}
+    monkeypatch.setattr(core, '_fetch_crawl_page', lambda url, ua, render=False: pages[url])
+    return core.crawl_site('https://news.example/', 'test-agent', max_depth=1, max_pages=10, delay=0,
+                           crawl_order='bfs', **kwargs)
+
+
+def test_crawls_keep_near_duplicates_unless_asked(monkeypatch):
+    assert len(_crawl(monkeypatch)) == 3
+
+
+def test_skipped_pages_are_logged_with_the_matched_url(monkeypatch, caplog):
+    with caplog.at_level(logging.WARNING):
+        pages = _crawl(monkeypatch, near_dup_distance=3)
+    assert [url for url, _, _ in pages] == ['https://news.example/', 'https://news.example/a']
+    assert any('https://news.example/b' in r.message and 'https://news.example/a' in r.message
+               for r in caplog.records)
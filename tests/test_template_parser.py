@@ -0,0 +1,104 @@
+"""Shared template parser, precompiled selectors and selector fallbacks."""
+import os
+import shutil
+
+import pytest
+
+from webfetcher.parsing.engine import template_parser
+from webfetcher.parsing.engine.strategies import CSSStrategy, FieldMatch, SelectionError, XPathStrategy
+from webfetcher.parsing.engine.template_parser import (
+    DEFAULT_TEMPLATE_DIR, SharedTemplateParser, TemplateParser, get_shared_template_parser,
+)
+
+ARTICLE = ('<html><head><title>Sample article</title></head><body><article><h1>Sample article</h1>'
+           + '<p>Body paragraph with enough words to be kept as content.</p>' * 10
+           + '</article></body></html>')
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    target = tmp_path / 'templates'
+    shutil.copytree(DEFAULT_TEMPLATE_DIR, target)
+    return target
+
+
+def test_shared_parser_is_one_per_directory(template_dir):
+    assert get_shared_template_parser(template_dir) is get_shared_template_parser(str(template_dir))
+    assert get_shared_template_parser() is get_shared_template_parser(DEFAULT_TEMPLATE_DIR)
+
+
+def test_parses_reuse_one_loader(template_dir):
+    shared = SharedTemplateParser(template_dir, check_interval=0.0)
+    loader = shared.loader
+    for n in range(3):
+        result = shared.parse(ARTICLE, f'https://blog.example/post/{n}')
+        assert result.success
+    assert shared.loader is loader
+    assert shared.reloads == 0
+
+
+def test_template_change_triggers_a_reload(template_dir):
+    shared = SharedTemplateParser(template_dir, check_interval=0.0)
+    shared.parse(ARTICLE, 'https://blog.example/post')
+    template = next(template_dir.rglob('*.yaml'))
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    shared.parse(ARTICLE, 'https://blog.example/post')
+    assert shared.reloads == 1
+
+
+def test_template_files_are_checked_at_most_once_per_interval(template_dir, monkeypatch):
+    calls = []
+    original = template_parser.template_dir_stamp
+
+    def counting_stamp(directory):
+        calls.append(directory)
+        return original(directory)
+
+    monkeypatch.setattr(template_parser, 'template_dir_stamp', counting_stamp)
+    shared = SharedTemplateParser(template_dir, check_interval=3600.0)
+    for _ in range(5):
+        shared.parse(ARTICLE, 'https://blog.example/post')
+    assert len(calls) == 1
+
+
+FALLBACK_PAGE = ('<html><head><meta property="og:title" content="OG title"></head><body>'
+                 '<h1>Heading</h1><p class="byline">By Ann</p></body></html>')
+
+
+def test_second_selector_is_used_when_the_first_misses():
+    css = CSSStrategy()
+    matches = css.extract_many(FALLBACK_PAGE, {
+        'title': ['#atitle', 'h1'],
+        'author': ["meta[name='author']@content", 'p.byline'],
+        'site': ["meta[property='og:title']@content", 'h1'],
+        'missing': ['#nope', '.nothing'],
+    })
+    assert matches['title'] == FieldMatch('Heading', 'h1', 1)
+    assert matches['author'].value == 'By Ann' and matches['author'].index == 1
+    assert matches['site'].index == 0
+    assert 'missing' not in matches
+    xpath = XPathStrategy()
+    assert xpath.extract_many(FALLBACK_PAGE, {'title': ['//h2', '//h1']})['title'].index == 1
+
+
+def test_invalid_selectors_are_skipped_and_stay_rejected():
+    css = CSSStrategy()
+    assert css.extract_many(FALLBACK_PAGE, {'title': ['h1[', 'h1']})['title'].selector == 'h1'
+    misses = CSSStrategy._selector_cache.misses
+    with pytest.raises(SelectionError):
+        css.compile_selector('h1[')
+    assert CSSStrategy._selector_cache.misses == misses
+    assert css.compile_selector('p.byline') is css.compile_selector('p.byline')
+
+
+def test_template_fields_fall_back_across_strategies_and_empty_post_processing(template_dir):
+    parser = TemplateParser(template_dir=str(template_dir))
+    fields = parser._extract_fields(FALLBACK_PAGE, {
+        # A CSS miss falls through to the XPath run
+        'title': [{'selector': '#atitle'}, {'selector': '//h1', 'strategy': 'xpath'}],
+        # A match that post-processing empties resumes with the next fallback
+        'author': [{'selector': 'p.byline', 'post_process': [{'type': 'replace', 'old': 'By Ann', 'new': ''}]},
+                   {'selector': "meta[property='og:title']", 'attribute': 'content'}],
+    })
+    assert fields == {'title': 'Heading', 'author': 'OG title'}
@@ -0,0 +1,82 @@
+"""Stage timings (span/timed)."""
+import threading
+
+import pytest
+
+from webfetcher.utils import timing
+from webfetcher.utils.timing import disable_timings, enable_timings, get_timings, span, timed
+
+
+@pytest.fixture
+def timings():
+    disable_timings()
+    recorder = enable_timings()
+    yield recorder
+    disable_timings()
+
+
+def _spans(recorder):
+    return {entry['path']: entry for entry in recorder.to_dict()['spans']}
+
+
+def test_spans_are_no_ops_while_disabled():
+    disable_timings()
+    assert get_timings() is None
+    assert span('fetch') is timing._NULL_SPAN
+
+
+def test_nested_spans_report_self_time(timings):
+    with span('fetch'):
+        with span('decode'):
+            pass
+        with span('decode'):
+            pass
+    spans = _spans(timings)
+    assert spans['fetch/decode']['calls'] == 2
+    fetch = spans['fetch']
+    assert fetch['self_s'] <= fetch['total_s']
+    assert list(spans) == ['fetch', 'fetch/decode']
+
+
+def test_timed_records_every_call(timings):
+    @timed('parse')
+    def parse(value):
+        return value * 2
+
+    assert parse(2) == 4 and parse(3) == 6
+    assert _spans(timings)['parse']['calls'] == 2
+
+
+def test_spans_nest_per_thread(timings):
+    def worker():
+        with span('prefetch'):
+            pass
+
+    with span('crawl'):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    assert set(_spans(timings)) == {'crawl', 'prefetch'}
+
+
+def test_report_lists_stages_and_wall(timings):
+    with span('write'):
+        pass
+    report = timings.report()
+    assert 'write' in report and report.rstrip().splitlines()[-1].startswith('wall')
+
+
+def test_each_run_gets_fresh_timings_and_one_exit_report(monkeypatch):
+    from webfetcher import core
+
+    registered = []
+    monkeypatch.setattr(core.atexit, 'register', registered.append)
+    monkeypatch.setattr(core, '_timings_report_registered', False)
+    core._start_timings()
+    with span('fetch'):
+        pass
+    first = get_timings()
+    core._start_timings()
+    assert get_timings() is not first and get_timings().to_dict()['spans'] == []
+    assert registered == [core._print_timings]
+    disable_timings()
@@ -0,0 +1,65 @@
+"""Plain-URL to Markdown link replacement."""
+import pytest
+
+from webfetcher.utils.url_formatter import detect_urls_in_text, replace_urls_with_markdown
+
+
+def _link(url):
+    return f'[{url}]({url})'
+
+
+def test_plain_urls_become_links_without_trailing_punctuation():
+    assert replace_urls_with_markdown('Visit https://example.com for info.') == \
+        f'Visit {_link("https://example.com")} for info.'
+    assert replace_urls_with_markdown('(see https://paren.example.com)') == \
+        f'(see {_link("https://paren.example.com")})'
+    assert replace_urls_with_markdown('https://start.example.com') == _link('https://start.example.com')
+
+
+@pytest.mark.parametrize('text', [
+    'Run `curl https://api.example.com/v1` now',
+    '```\nfetch https://code.example.com/x\n```',
+    '```python\nurl = "https://a.example.com"\n# https://b.example.com\n```',
+    '    indented https://indented.example.com',
+])
+def test_urls_in_code_are_untouched(text):
+    assert replace_urls_with_markdown(text) == text
+
+
+def test_code_spans_only_protect_what_they_cover():
+    text = 'see https://x.example.com/`code https://in.example.com` and\n```\nhttps://f.example.com\n```\nhttps://after.example.com'
+    assert replace_urls_with_markdown(text) == (
+        f'see {_link("https://x.example.com/")}`code https://in.example.com` and\n'
+        f'```\nhttps://f.example.com\n```\n{_link("https://after.example.com")}')
+    assert replace_urls_with_markdown(text, preserve_code_blocks=False).count('](') == 4
+
+
+@pytest.mark.parametrize('text', [
+    'Already [docs](https://docs.example.com) linked.',
+    'Already [https://a.example.com](https://a.example.com) linked.',
+    'Autolink <https://angle.example.com> stays.',
+    '![logo](https://img.example.com/logo.png)',
+])
+def test_already_linked_urls_are_untouched(text):
+    assert replace_urls_with_markdown(text) == text
+
+
+def test_adjacent_and_overlapping_matches():
+    # Punctuation without spaces does not end a URL; one link covers the run
+    run = 'https://a.example.com,https://b.example.com'
+    assert replace_urls_with_markdown(f'Adjacent {run}') == f'Adjacent {_link(run)}'
+    # A URL embedded in another URL's query is part of the outer match
+    nested = 'https://a.example.com/?next=https://b.example.com/path'
+    assert detect_urls_in_text(nested) == [(nested, 0, len(nested))]
+    assert replace_urls_with_markdown(f'{nested} end') == f'{_link(nested)} end'
+    # Back-to-back links and a plain URL right after a link
+    text = '[a](https://a.example.com)[b](https://b.example.com) https://c.example.com'
+    assert replace_urls_with_markdown(text) == \
+        f'[a](https://a.example.com)[b](https://b.example.com) {_link("https://c.example.com")}'
+
+
+def test_many_urls_are_all_replaced():
+    text = ' '.join(f'https://site.example/{n}' for n in range(2000))
+    result = replace_urls_with_markdown(text)
+    assert result.count('](https://site.example/') == 2000
+    assert result.endswith(_link('https://site.example/1999'))